@@ -0,0 +1,87 @@
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pix_framework.io.event_log import EventLogIDs, read_csv_log
+
+from simod.native_metrics import (
+    EncodedEventLog,
+    _aligned_variants,
+    approximate_control_flow_log_distance,
+    native_distance,
+)
+from simod.settings.common_settings import Metric
+
+# Directory with the benchmark logs (pairs of <name>_train.csv.gz and <name>_test.csv.gz)
+logs_dir = Path(__file__).parent / Path("input/logs")
+# Maximum number of cases taken from each log, as the exact DL is quadratic in the number of cases
+max_cases = 1000
+
+log_ids = EventLogIDs(
+    case="case_id",
+    activity="activity",
+    resource="resource",
+    start_time="start_time",
+    end_time="end_time",
+    enabled_time="enabled_time",
+)
+
+
+def _sample_cases(event_log: pd.DataFrame, seed: int = 42) -> pd.DataFrame:
+    cases = event_log[log_ids.case].unique()
+    if len(cases) > max_cases:
+        cases = np.random.default_rng(seed).choice(cases, max_cases, replace=False)
+    return event_log[event_log[log_ids.case].isin(cases)]
+
+
+def measure(test_log_path: Path, train_log_path: Path) -> dict:
+    """
+    Computes the exact and the approximated DL between the test and train logs of a benchmark process (the train log
+    acting as the simulated one), reporting the observed error and the bounds of the approximation.
+    """
+    original = EncodedEventLog.from_event_log(_sample_cases(read_csv_log(test_log_path, log_ids)), log_ids)
+    simulated = EncodedEventLog.from_event_log(_sample_cases(read_csv_log(train_log_path, log_ids)), log_ids)
+
+    start = time.time()
+    exact = native_distance(Metric.DL, original, simulated)
+    exact_runtime = time.time() - start
+
+    start = time.time()
+    original_variants, original_indexes = original.variants
+    simulated_variants, simulated_indexes = _aligned_variants(original, simulated)
+    approximation = approximate_control_flow_log_distance(
+        list(original_variants),
+        np.bincount(original_indexes),
+        simulated_variants,
+        np.bincount(simulated_indexes),
+    )
+    approximate_runtime = time.time() - start
+
+    return {
+        "log": test_log_path.name.replace("_test.csv.gz", ""),
+        "exact": exact,
+        "approximate": approximation.distance,
+        "observed_error": abs(approximation.distance - exact),
+        "lower_bound": approximation.lower_bound,
+        "upper_bound": approximation.upper_bound,
+        "error_bound": approximation.error_bound,
+        "exact_runtime": exact_runtime,
+        "approximate_runtime": approximate_runtime,
+    }
+
+
+def main():
+    results = []
+    for train_log_path in sorted(logs_dir.glob("*_train.csv.gz")):
+        test_log_path = train_log_path.with_name(train_log_path.name.replace("_train", "_test"))
+        if test_log_path.exists():
+            print(f"Measuring {train_log_path.name}")
+            results.append(measure(test_log_path, train_log_path))
+    results = pd.DataFrame(results)
+    print(results.to_string(index=False))
+    results.to_csv(Path(__file__).parent / "approximate_dl_error.csv", index=False)
+
+
+if __name__ == "__main__":
+    main()
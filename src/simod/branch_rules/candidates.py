@@ -0,0 +1,228 @@
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import optuna
+import pandas as pd
+from pix_framework.discovery.gateway_conditions.branching_rules import (
+    create_single_target,
+    extract_or_rules,
+    extract_xor_rules,
+    objective,
+)
+from pix_framework.discovery.gateway_conditions.gateway_conditions import DEFAULT_SAMPLING_SIZE, format_branch_rules
+from pix_framework.discovery.gateway_conditions.preprocessing import preprocess_event_log
+from pix_framework.discovery.gateway_conditions.replayer import parse_dataframe
+from pix_framework.discovery.gateway_conditions.rules_postprocessing import process_rules
+from pix_framework.discovery.gateway_conditions.trace_processing import encode_dataframes, traces_to_dataframes
+from pix_framework.io.bpm_graph import BPMNGraph
+from pix_framework.io.event_log import EventLogIDs
+from sklearn.metrics import f1_score
+from sklearn.tree import DecisionTreeClassifier
+
+from simod.control_flow.replay import ReplayCache, model_key
+
+# Prefixes of the IDs of the sequence flows (columns of the decisions in the gateway dataframes)
+FLOW_PREFIXES = ["Flow_", "edge", "node"]
+# Number of trials to tune the hyperparameters of the decision tree of each gateway (or OR gateway flow)
+NUM_TUNING_TRIALS = 100
+# Maximum number of process models and training partitions whose candidate rules are kept by default
+DEFAULT_MAX_ENTRIES = 8
+
+
+@dataclass
+class CandidateBranchRules:
+    """
+    Branch rules learned for the gateways of a process model from a training partition, before filtering them by the
+    F-score of the decision tree they were extracted from.
+
+    The decision trees (and their F-scores) do not depend on the F-score threshold, so the rules for any threshold are
+    obtained by filtering these candidates, as :func:`pix_framework.discovery.gateway_conditions.gateway_conditions.
+    discover_gateway_conditions` does when training the trees for that threshold.
+
+    Attributes
+    ----------
+    xor_rules : Dict[str, Tuple[float, Dict[str, list]]]
+        For each XOR gateway, F-score of its decision tree and rules extracted from it for each outgoing flow.
+    or_rules : Dict[str, Dict[str, Tuple[float, list]]]
+        For each OR gateway and outgoing flow, F-score of its decision tree and rules extracted from it.
+    encoders : Dict[str, dict]
+        Encoders of the categorical attributes of the decisions of each gateway, to decode the rules.
+    columns : Dict[str, :class:`pandas.DataFrame`]
+        Empty dataframe with the columns (attributes and flows) of the decisions of each gateway.
+    """
+
+    xor_rules: Dict[str, Tuple[float, Dict[str, list]]]
+    or_rules: Dict[str, Dict[str, Tuple[float, list]]]
+    encoders: Dict[str, dict]
+    columns: Dict[str, pd.DataFrame]
+
+    @staticmethod
+    def learn(gateway_states: dict) -> "CandidateBranchRules":
+        """
+        Trains a decision tree for each XOR gateway, and for each outgoing flow of each OR gateway, from the decisions
+        (and data attributes) in [gateway_states], keeping the rules extracted from all of them with their F-scores.
+        """
+        dataframes = traces_to_dataframes(gateway_states)
+        dataframes, encoders = encode_dataframes(dataframes, FLOW_PREFIXES)
+
+        xor_rules, or_rules = {}, {}
+        for gateway_id, gateway_info in gateway_states.items():
+            if gateway_id not in dataframes:
+                continue
+            df = dataframes[gateway_id]
+            feature_columns = [col for col in df.columns if not any(col.startswith(prefix) for prefix in FLOW_PREFIXES)]
+            target_columns = [col for col in df.columns if any(col.startswith(prefix) for prefix in FLOW_PREFIXES)]
+            if not feature_columns or not target_columns:
+                continue
+            features = df[feature_columns]
+
+            if gateway_info["type"] != "OR":
+                # Single tree predicting the outgoing flow taken
+                df["target"] = create_single_target(df[target_columns])
+                f_score, tree = _train_decision_tree(features, df["target"])
+                rules = {}
+                for rule_conditions, outcome in extract_xor_rules(tree, features.columns):
+                    rules.setdefault(outcome, []).append((rule_conditions, 1))
+                xor_rules[gateway_id] = (f_score, rules)
+            if gateway_info["type"] != "XOR":
+                # One tree per outgoing flow predicting whether it is taken
+                or_rules[gateway_id] = {}
+                for target_column in target_columns:
+                    f_score, tree = _train_decision_tree(features, df[target_column])
+                    rules = [
+                        (rule_conditions, 1)
+                        for rule_conditions, outcome in extract_or_rules(tree, tree.feature_names_in_)
+                        if outcome
+                    ]
+                    or_rules[gateway_id][target_column] = (f_score, rules)
+
+        columns = {gateway_id: df.iloc[:0] for gateway_id, df in dataframes.items()}
+        return CandidateBranchRules(xor_rules=xor_rules, or_rules=or_rules, encoders=encoders, columns=columns)
+
+    def filter(self, f_score: float) -> List[dict]:
+        """
+        Branch rules (in the format of :class:`~simod.branch_rules.types.BranchRules`) of the decision trees with an
+        F-score higher than [f_score].
+        """
+        xor_rules = {
+            gateway_id: rules for gateway_id, (tree_f_score, rules) in self.xor_rules.items() if tree_f_score > f_score
+        }
+        or_rules = {}
+        for gateway_id, flows in self.or_rules.items():
+            for flow_id, (tree_f_score, rules) in flows.items():
+                if tree_f_score > f_score:
+                    or_rules.setdefault(gateway_id, {})
+                    if len(rules) > 0:
+                        or_rules[gateway_id][flow_id] = rules
+
+        xor_rules = format_branch_rules(process_rules(xor_rules, self.encoders), self.columns, FLOW_PREFIXES)
+        or_rules = format_branch_rules(process_rules(or_rules, self.encoders), self.columns, FLOW_PREFIXES)
+        return xor_rules + or_rules
+
+
+class BranchRulesCache:
+    """
+    Candidate branch rules (see :class:`CandidateBranchRules`) learned for each process model and training partition,
+    so the decision trees of a model are trained once, and each F-score threshold is a filter over their rules.
+
+    The process models are identified by their content (including the IDs of the sequence flows the rules refer to),
+    and the training partitions by a hash of their content.
+
+    Attributes
+    ----------
+    max_entries : int
+        Maximum number of process models and training partitions whose candidate rules are kept (the least recently
+        used are dropped).
+    hits : int
+        Number of times the candidate rules were reused.
+    misses : int
+        Number of times the candidate rules were learned.
+    """
+
+    max_entries: int
+    hits: int
+    misses: int
+    _candidates: "OrderedDict[Tuple[str, str], CandidateBranchRules]"
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._candidates = OrderedDict()
+
+    def candidates(
+        self,
+        bpmn_graph: BPMNGraph,
+        log: pd.DataFrame,
+        log_ids: EventLogIDs,
+        replay_cache: Optional[ReplayCache] = None,
+    ) -> CandidateBranchRules:
+        """
+        Candidate branch rules of [bpmn_graph] learned from [log] (only the first time they are requested for this
+        model and log, later calls reuse them).
+
+        Parameters
+        ----------
+        bpmn_graph : :class:`pix_framework.io.bpm_graph.BPMNGraph`
+            Graph of the process model.
+        log : :class:`pandas.DataFrame`
+            Training partition to learn the rules from.
+        log_ids : :class:`EventLogIDs`
+            Identifiers for mapping column names in the event log.
+        replay_cache : :class:`~simod.control_flow.replay.ReplayCache`, optional
+            Cache to replay the variants of [log] on the model with. If not provided, a temporary one is used.
+
+        Returns
+        -------
+        :class:`CandidateBranchRules`
+            Rules of the decision trees of all the gateways, with their F-scores.
+        """
+        key = (model_key(bpmn_graph), _partition_key(log))
+        if key in self._candidates:
+            self.hits += 1
+            self._candidates.move_to_end(key)
+        else:
+            self.misses += 1
+            gateway_states = replay_gateway_states(
+                bpmn_graph, log, log_ids, replay_cache if replay_cache is not None else ReplayCache()
+            )
+            self._candidates[key] = CandidateBranchRules.learn(gateway_states)
+            while len(self._candidates) > self.max_entries:
+                self._candidates.popitem(last=False)
+        return self._candidates[key]
+
+
+def replay_gateway_states(
+    bpmn_graph: BPMNGraph, log: pd.DataFrame, log_ids: EventLogIDs, replay_cache: ReplayCache
+) -> dict:
+    """
+    Decisions taken in the gateways of [bpmn_graph] by the cases of [log] (preprocessed as in
+    :func:`pix_framework.discovery.gateway_conditions.gateway_conditions.discover_gateway_conditions`), with their
+    data attributes, replaying the variants of [log] with [replay_cache].
+    """
+    avoid_columns = [
+        log_ids.case,
+        log_ids.activity,
+        log_ids.start_time,
+        log_ids.end_time,
+        log_ids.resource,
+        log_ids.enabled_time,
+    ]
+    log_by_case = preprocess_event_log(log, log_ids, DEFAULT_SAMPLING_SIZE)
+    log_traces = parse_dataframe(log_by_case, log_ids, avoid_columns)
+    return replay_cache.gateway_states(bpmn_graph, log_traces)
+
+
+def _train_decision_tree(features: pd.DataFrame, target: pd.Series) -> Tuple[float, DecisionTreeClassifier]:
+    # Tune the hyperparameters of the tree, and fit the best one to all the decisions
+    study = optuna.create_study(direction="maximize")
+    study.optimize(lambda trial: objective(trial, features, target), n_trials=NUM_TUNING_TRIALS)
+    tree = DecisionTreeClassifier(**study.best_params, random_state=42)
+    tree.fit(features, target)
+    return f1_score(target, tree.predict(features), average="weighted"), tree
+
+
+def _partition_key(log: pd.DataFrame) -> str:
+    return hashlib.sha256(pd.util.hash_pandas_object(log).values.tobytes()).hexdigest()
@@ -1,18 +1,38 @@
 import pandas as pd
-from typing import List
+from typing import List, Optional
 
+from simod.branch_rules.candidates import BranchRulesCache, CandidateBranchRules, replay_gateway_states
 from simod.branch_rules.types import BranchRules
+from simod.control_flow.replay import ReplayCache
 
 from pix_framework.io.event_log import EventLogIDs
 from pix_framework.discovery.gateway_probabilities import GatewayProbabilities
 from pix_framework.discovery.gateway_conditions.gateway_conditions import discover_gateway_conditions
 
 
-def discover_branch_rules(bpmn_graph, log: pd.DataFrame, log_ids: EventLogIDs, f_score=0.7) -> list[BranchRules]:
+def discover_branch_rules(
+    bpmn_graph,
+    log: pd.DataFrame,
+    log_ids: EventLogIDs,
+    f_score=0.7,
+    replay_cache: Optional[ReplayCache] = None,
+    rules_cache: Optional[BranchRulesCache] = None,
+) -> list[BranchRules]:
     """
     Discover branch_rules from a log.
+
+    If [replay_cache] is provided, the traces of the log are replayed on the model once per variant (see
+    :class:`~simod.control_flow.replay.ReplayCache`) instead of once per case. If [rules_cache] is provided, the
+    decision trees of the gateways are trained once per process model and log, and reused for any [f_score] (see
+    :class:`~simod.branch_rules.candidates.BranchRulesCache`).
     """
-    rules = discover_gateway_conditions(bpmn_graph, log, log_ids, f_score_threshold=f_score)
+    if rules_cache is not None:
+        rules = rules_cache.candidates(bpmn_graph, log, log_ids, replay_cache).filter(f_score)
+    elif replay_cache is not None:
+        gateway_states = replay_gateway_states(bpmn_graph, log, log_ids, replay_cache)
+        rules = CandidateBranchRules.learn(gateway_states).filter(f_score)
+    else:
+        rules = discover_gateway_conditions(bpmn_graph, log, log_ids, f_score_threshold=f_score)
 
     rules = list(map(lambda x: BranchRules.from_dict(x), rules))
 
@@ -0,0 +1,214 @@
+import time
+import timeit
+from typing import Callable, Dict, Optional
+
+from .settings.common_settings import BudgetPolicy
+from .simulation.prosimos import pool_cpu_time
+
+
+def run_cpu_time() -> float:
+    """
+    CPU seconds spent so far by this process (all its threads) and the workers of its simulation pools.
+    """
+    return time.process_time() + pool_cpu_time()
+
+
+class Budget:
+    """
+    Wall-clock and CPU time budget of a run of the pipeline, split across its optimization stages.
+
+    Each optimization stage is allotted a share of the budget when it starts (see :meth:`start_stage`), following the
+    [policy] and the number of simulations each stage plans to run ([stage_weights]). The rest of the stages are not
+    limited, but they consume from the budget of the run too.
+
+    Attributes
+    ----------
+    time_budget : float, optional
+        Wall-clock seconds of the run. If None, the stages are not limited in wall-clock time.
+    cpu_budget : float, optional
+        CPU seconds of the run. If None, the stages are not limited in CPU time.
+    policy : :class:`~simod.settings.common_settings.BudgetPolicy`
+        Policy to split the budget across the optimization stages.
+    stage_weights : Dict[str, float]
+        Weight of each optimization stage (e.g., the number of simulations it plans to run), in the order they run.
+    stages : Dict[str, :class:`StageBudget`]
+        Share of the budget allotted to each optimization stage started so far.
+    """
+
+    # Wall-clock and CPU seconds of the run (None if not limited)
+    time_budget: Optional[float]
+    cpu_budget: Optional[float]
+    # Policy to split the budget across the optimization stages
+    policy: BudgetPolicy
+    # Weight of each optimization stage, in the order they run
+    stage_weights: Dict[str, float]
+    # Share of the budget allotted to each optimization stage started so far
+    stages: Dict[str, "StageBudget"]
+
+    # Clocks measuring the wall-clock and CPU seconds spent by the run
+    _clock: Callable[[], float]
+    _cpu_clock: Callable[[], float]
+    # Readings of the clocks when the run started, minus the seconds spent before (when resumed)
+    _time_start: float
+    _cpu_start: float
+
+    def __init__(
+        self,
+        time_budget: Optional[float],
+        cpu_budget: Optional[float],
+        policy: BudgetPolicy,
+        stage_weights: Dict[str, float],
+        clock: Callable[[], float] = timeit.default_timer,
+        cpu_clock: Callable[[], float] = run_cpu_time,
+    ):
+        self.time_budget = time_budget
+        self.cpu_budget = cpu_budget
+        self.policy = policy
+        self.stage_weights = stage_weights
+        self.stages = {}
+        self._clock = clock
+        self._cpu_clock = cpu_clock
+        self._time_start = self._clock()
+        self._cpu_start = self._cpu_clock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.time_budget is not None or self.cpu_budget is not None
+
+    def time_used(self) -> float:
+        return self._clock() - self._time_start
+
+    def cpu_used(self) -> float:
+        return self._cpu_clock() - self._cpu_start
+
+    def start_stage(self, stage: str) -> "StageBudget":
+        """
+        Allots the share of the budget of the optimization [stage] (one of [stage_weights]), starting to measure
+        its consumption.
+        """
+        following_stages = [name for name in self.stage_weights if name not in self.stages]
+        if self.policy == BudgetPolicy.PROPORTIONAL:
+            fraction = self.stage_weights[stage] / sum(self.stage_weights.values())
+        else:
+            fraction = self.stage_weights[stage] / sum(self.stage_weights[name] for name in following_stages)
+        self.stages[stage] = StageBudget(
+            self,
+            time_allocated=_share(self.time_budget, self.time_used(), fraction, self.policy),
+            cpu_allocated=_share(self.cpu_budget, self.cpu_used(), fraction, self.policy),
+        )
+        return self.stages[stage]
+
+    def restore(self, report: dict):
+        """
+        Restores the consumption of the run, and the shares of its stages, from a [report] (see :meth:`report`) of
+        the run being resumed.
+        """
+        self._time_start = self._clock() - report["time_used"]
+        self._cpu_start = self._cpu_clock() - report["cpu_used"]
+        self.stages = {
+            stage: StageBudget(
+                self,
+                time_allocated=stage_report["time_allocated"],
+                cpu_allocated=stage_report["cpu_allocated"],
+                time_used=stage_report["time_used"],
+                cpu_used=stage_report["cpu_used"],
+            )
+            for stage, stage_report in report["stages"].items()
+        }
+
+    def report(self) -> dict:
+        """
+        Budget allocated and used by the run and each of its optimization stages, in seconds.
+        """
+        return {
+            "policy": str(self.policy),
+            "time_allocated": self.time_budget,
+            "time_used": self.time_used(),
+            "cpu_allocated": self.cpu_budget,
+            "cpu_used": self.cpu_used(),
+            "stages": {stage: stage_budget.report() for stage, stage_budget in self.stages.items()},
+        }
+
+
+class StageBudget:
+    """
+    Share of the :class:`Budget` of a run allotted to one of its optimization stages, which stops launching trials
+    once it is exhausted.
+
+    Attributes
+    ----------
+    time_allocated : float, optional
+        Wall-clock seconds allotted to the stage (None if not limited).
+    cpu_allocated : float, optional
+        CPU seconds allotted to the stage (None if not limited).
+    """
+
+    # Wall-clock and CPU seconds allotted to the stage (None if not limited)
+    time_allocated: Optional[float]
+    cpu_allocated: Optional[float]
+
+    # Budget of the run the stage consumes from
+    _budget: Budget
+    # Consumption of the run when the stage started
+    _time_start: float
+    _cpu_start: float
+    # Consumption of the stage, once finished
+    _time_used: Optional[float]
+    _cpu_used: Optional[float]
+
+    def __init__(
+        self,
+        budget: Budget,
+        time_allocated: Optional[float],
+        cpu_allocated: Optional[float],
+        time_used: Optional[float] = None,
+        cpu_used: Optional[float] = None,
+    ):
+        self.time_allocated = time_allocated
+        self.cpu_allocated = cpu_allocated
+        self._budget = budget
+        self._time_start = budget.time_used()
+        self._cpu_start = budget.cpu_used()
+        self._time_used = time_used
+        self._cpu_used = cpu_used
+
+    def time_used(self) -> float:
+        return self._time_used if self._time_used is not None else self._budget.time_used() - self._time_start
+
+    def cpu_used(self) -> float:
+        return self._cpu_used if self._cpu_used is not None else self._budget.cpu_used() - self._cpu_start
+
+    def exhausted(self) -> bool:
+        """
+        Whether the stage spent any of its shares of the budget.
+        """
+        return (self.time_allocated is not None and self.time_used() >= self.time_allocated) or (
+            self.cpu_allocated is not None and self.cpu_used() >= self.cpu_allocated
+        )
+
+    def stop(self):
+        """
+        Stops measuring the consumption of the stage, once finished.
+        """
+        self._time_used, self._cpu_used = self.time_used(), self.cpu_used()
+
+    def report(self) -> dict:
+        return {
+            "time_allocated": self.time_allocated,
+            "time_used": self.time_used(),
+            "cpu_allocated": self.cpu_allocated,
+            "cpu_used": self.cpu_used(),
+        }
+
+
+def _share(budget: Optional[float], used: float, fraction: float, policy: BudgetPolicy) -> Optional[float]:
+    """
+    Seconds of [budget] allotted to a stage with [fraction] of it, [used] seconds being already spent by the run.
+    """
+    if budget is None:
+        return None
+    remaining = max(0.0, budget - used)
+    if policy == BudgetPolicy.PROPORTIONAL:
+        # Fixed share of the budget, without exceeding what is left of it
+        return min(budget * fraction, remaining)
+    return remaining * fraction
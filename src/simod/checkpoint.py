@@ -0,0 +1,160 @@
+import shutil
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pandas as pd
+from hyperopt import Trials
+from hyperopt.base import JOB_STATE_DONE
+
+from .utilities import read_pickle, write_pickle
+
+# Name of the directory of the checkpoint of a run, inside its output directory
+CHECKPOINT_DIR = "checkpoint"
+# Files of the checkpoint with the inputs of the run and the state of its pipeline
+RUN = "run.pkl"
+PIPELINE = "pipeline.pkl"
+# Key of the response of a trial with the output directories of the iterations whose measurements it recorded, when
+# they are not (only) the [output_dir] of the response (e.g., the inner iterations of a factorized search)
+ITERATION_DIRS_KEY = "iteration_dirs"
+
+
+class Checkpoint:
+    """
+    Progress of a run of the pipeline persisted in a directory, to resume it after a crash (see ``simod --resume``).
+
+    The directory stores the settings and the preprocessed event log of the run (see :meth:`save_run`), the state of the
+    pipeline after its last completed stage (see :meth:`save_pipeline`), and the trials of the search of each
+    optimization stage after every finished trial (see :meth:`search`). The files are written to a temporary file and
+    renamed, so a crash while writing one leaves its previous version.
+
+    Attributes
+    ----------
+    directory : :class:`pathlib.Path`
+        Directory storing the checkpoint.
+    """
+
+    # Directory storing the checkpoint
+    directory: Path
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def clear(self):
+        """
+        Removes the checkpoint of a previous run in the directory, if any.
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def save_run(self, settings: object, event_log: object):
+        """
+        Saves the settings (:class:`~simod.settings.simod_settings.SimodSettings`) and the preprocessed event log
+        (:class:`~simod.event_log.event_log.EventLog`) of the run, to resume it without preprocessing the log again.
+        """
+        write_pickle(self.directory / RUN, (settings, event_log))
+
+    def load_run(self) -> Tuple[object, object]:
+        """
+        Loads the settings and the preprocessed event log of the run.
+
+        Raises
+        ------
+        FileNotFoundError
+            If there is no run saved in the directory.
+        """
+        return read_pickle(self.directory / RUN)
+
+    def save_pipeline(self, state: dict):
+        """
+        Saves the state of the pipeline after completing a stage (the completed stages, the best BPS model so far,
+        ...), replacing the one of the previous stage.
+        """
+        write_pickle(self.directory / PIPELINE, state)
+
+    def load_pipeline(self) -> Optional[dict]:
+        """
+        Loads the state of the pipeline after its last completed stage, or None if no stage was completed.
+        """
+        try:
+            return read_pickle(self.directory / PIPELINE)
+        except FileNotFoundError:
+            return None
+
+    def search(self, stage: str) -> "SearchCheckpoint":
+        """
+        Checkpoint of the search of the optimization [stage].
+        """
+        return SearchCheckpoint(self.directory / f"{stage}.pkl")
+
+
+class SearchCheckpoint:
+    """
+    Trials of the search of an optimization stage, persisted after every finished trial (see :meth:`save`) to resume
+    the search from them (see :meth:`load`) without evaluating the finished trials again.
+
+    Only the finished trials, and the measurements of the iterations they evaluated, are persisted: the trials running
+    concurrently when saved (and the measurements they already recorded) are evaluated again when resumed.
+
+    Attributes
+    ----------
+    path : :class:`pathlib.Path`
+        File storing the checkpoint.
+    """
+
+    # File storing the checkpoint
+    path: Path
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def save(self, trials: List[Trials], evaluation_measurements: pd.DataFrame, iteration_index: int):
+        """
+        Saves the finished trials of the search (one :class:`hyperopt.Trials` per rung in a multi-fidelity search),
+        the measurements of the candidates they evaluated (matched by the ``output_dir`` of their iterations, see
+        :func:`iteration_dirs`), and the number of iterations evaluated.
+        """
+        finished_trials = [_finished_trials(rung_trials) for rung_trials in trials]
+        if "output_dir" in evaluation_measurements.columns:
+            finished_dirs = {
+                output_dir
+                for rung_trials in finished_trials
+                for result in rung_trials.results
+                for output_dir in iteration_dirs(result)
+            }
+            evaluation_measurements = evaluation_measurements[
+                evaluation_measurements["output_dir"].astype(str).isin(finished_dirs)
+            ]
+        write_pickle(self.path, (finished_trials, evaluation_measurements, iteration_index))
+
+    def load(self) -> Optional[Tuple[List[Trials], pd.DataFrame, int]]:
+        """
+        Loads the finished trials, measurements, and number of iterations of the search, or None if nothing was saved.
+        """
+        try:
+            return read_pickle(self.path)
+        except FileNotFoundError:
+            return None
+
+
+def iteration_dirs(result: dict) -> List[str]:
+    """
+    Output directories of the iterations whose measurements were recorded by the trial with [result]: the ones in its
+    :data:`ITERATION_DIRS_KEY`, or its ``output_dir``.
+    """
+    if ITERATION_DIRS_KEY in result:
+        return [str(output_dir) for output_dir in result[ITERATION_DIRS_KEY]]
+    return [str(result["output_dir"])] if "output_dir" in result else []
+
+
+def _finished_trials(trials: Trials) -> Trials:
+    """
+    Copy of [trials] with only its finished trials, reserving the identifiers of all of them (also the unfinished
+    ones), so they are not given to the new trials of the resumed search.
+    """
+    docs, finished = trials.trials, Trials()
+    if len(docs) > 0:
+        finished.new_trial_ids(max(doc["tid"] for doc in docs) + 1)
+    finished.insert_trial_docs([doc for doc in docs if doc["state"] == JOB_STATE_DONE])
+    finished.refresh()
+    return finished
@@ -6,17 +6,21 @@ import click
 import yaml
 from pix_framework.filesystem.file_manager import get_random_folder_id
 
+from simod.checkpoint import CHECKPOINT_DIR, Checkpoint
+from simod.cli_formatter import print_message
 from simod.event_log.event_log import EventLog
 from simod.runtime_meter import RuntimeMeter
 from simod.settings.simod_settings import SimodSettings
 from simod.simod import Simod
+from simod.trial_store import TrialStore
 
 
-@click.command(
+@click.group(
+    invoke_without_command=True,
     help="""
     Simod combines process mining and machine learning techniques to automate the discovery and tuning of
     Business Process Simulation models from event logs extracted from enterprise information systems.
-    """
+    """,
 )
 @click.option(
     "--configuration",
@@ -50,6 +54,23 @@ from simod.simod import Simod
     help="Path to the event log file when using the --one-shot flag. "
     "Columns must be named 'case_id', 'activity', 'start_time', 'end_time', 'resource'.",
 )
+@click.option(
+    "--checkpoint",
+    default=False,
+    is_flag=True,
+    required=False,
+    type=bool,
+    help="Checkpoint the progress of the run in its output directory, to resume it with --resume if interrupted "
+    "(same as the 'checkpoint' setting).",
+)
+@click.option(
+    "--resume",
+    default=None,
+    required=False,
+    type=click.Path(exists=True, file_okay=False, resolve_path=True, path_type=Path),
+    help="Path to the output directory of an interrupted run to resume it from its checkpoint, skipping the completed "
+    "stages and the finished trials of the interrupted one. Its settings and preprocessed event log are reused.",
+)
 @click.option(
     "--schema-yaml",
     required=False,
@@ -63,14 +84,21 @@ from simod.simod import Simod
     help="Print the configuration JSON schema and exit.",
 )
 @click.version_option()
+@click.pass_context
 def main(
+    context: click.Context,
     configuration: Optional[Path],
     output: Optional[Path],
     one_shot: bool,
     event_log: Optional[Path],
+    checkpoint: bool,
+    resume: Optional[Path],
     schema_yaml: bool,
     schema_json: bool,
 ) -> None:
+    if context.invoked_subcommand is not None:
+        return
+
     if schema_yaml:
         print(yaml.dump(SimodSettings().model_json_schema()))
         return
@@ -79,12 +107,24 @@ def main(
         print(json.dumps(SimodSettings().model_json_schema()))
         return
 
+    if resume is not None:
+        # Continue the interrupted run with its settings and preprocessed event log
+        try:
+            settings, event_log = Checkpoint(resume / CHECKPOINT_DIR).load_run()
+        except FileNotFoundError:
+            raise click.BadParameter(f"No checkpoint to resume in {resume}", param_hint="--resume")
+        simod = Simod(settings, event_log=event_log, output_dir=resume, resume=True)
+        simod.run(runtimes=RuntimeMeter())
+        return
+
     if one_shot:
         settings = SimodSettings.one_shot()
         settings.common.train_log_path = event_log
         settings.common.test_log_path = None
     else:
         settings = SimodSettings.from_path(configuration)
+    if checkpoint:
+        settings.common.checkpoint = True
 
     output = output if output is not None else (Path.cwd() / "outputs" / get_random_folder_id()).absolute()
 
@@ -107,5 +147,38 @@ def main(
     simod.run(runtimes=runtimes)
 
 
+@main.command(
+    help="""
+    Evaluates the optimization trials queued in a trial store (see the 'trial_store_path' setting). Any number of
+    workers can be started, in any node with access to the directory of the store and to the output directory of the
+    optimization.
+    """
+)
+@click.option(
+    "--store",
+    "-s",
+    required=True,
+    type=click.Path(file_okay=False, resolve_path=True, path_type=Path),
+    help="Path to the directory of the trial store.",
+)
+@click.option(
+    "--max-trials",
+    default=None,
+    required=False,
+    type=click.IntRange(min=1),
+    help="Number of trials to evaluate before stopping. Unlimited if not provided.",
+)
+@click.option(
+    "--idle-timeout",
+    default=None,
+    required=False,
+    type=click.FloatRange(min=0),
+    help="Seconds without trials to evaluate after which to stop. If not provided, the worker waits forever.",
+)
+def worker(store: Path, max_trials: Optional[int], idle_timeout: Optional[float]) -> None:
+    num_trials = TrialStore(store).work(max_trials=max_trials, idle_timeout=idle_timeout)
+    print_message(f"Worker stopped after evaluating {num_trials} trials")
+
+
 if __name__ == "__main__":
     main()
@@ -1,8 +1,15 @@
+import hashlib
+import json
+import math
+import os
+import shutil
+import subprocess
+import zipfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from simod.cli_formatter import print_step
+from simod.cli_formatter import print_step, print_warning
 from simod.control_flow.settings import HyperoptIterationParams
 from simod.settings.control_flow_settings import (
     ProcessModelDiscoveryAlgorithm,
@@ -11,9 +18,232 @@ from simod.utilities import execute_external_command, is_windows
 
 split_miner_jar_path: Path = Path(__file__).parent / "lib/split-miner-1.7.1-all.jar"
 bpmn_layout_jar_path: Path = Path(__file__).parent / "lib/bpmn-layout-1.0.6-jar-with-dependencies.jar"
+split_miner_service_script_path: Path = Path(__file__).parent / "lib/split_miner_service.js"
 
+# Bounds (in MB) of the JVM heap for Split Miner, sized in between from the size of the event log
+MIN_SPLIT_MINER_HEAP_SIZE = 1024
+MAX_SPLIT_MINER_HEAP_SIZE = 16 * 1024
 
-def discover_process_model(log_path: Path, output_model_path: Path, params: HyperoptIterationParams):
+
+class SplitMinerService:
+    """
+    Long-lived Split Miner process to discover several process models from the same event log.
+
+    Running Split Miner through the command line pays, for each discovery, the startup of a JVM and the warm-up of
+    its JIT compiler. This service starts a single JVM (with the heap sized from the event log, see
+    :func:`split_miner_heap_size`) with the first discovery, and keeps it running to serve the next ones through its
+    standard input/output. The JVM runs the Nashorn shell of the JDK (``jjs``, available from Java 8 to 14) with a
+    small script (``lib/split_miner_service.js``) calling the entry point of the Split Miner JAR for each request.
+
+    If the service cannot be started (e.g., ``jjs`` is not available) or fails, the discoveries fall back to running
+    Split Miner through the command line.
+
+    Attributes
+    ----------
+    log_path : :class:`pathlib.Path`
+        Path to the event log (in XES format) the process models are discovered from.
+    heap_size : int
+        Maximum heap size (in MB) of the JVM.
+    """
+
+    # Event log the process models are discovered from
+    log_path: Path
+    # Maximum heap size (in MB) of the JVM
+    heap_size: int
+
+    # Running service process, if started
+    _process: Optional[subprocess.Popen] = None
+    # Whether the service failed, so the discoveries fall back to the command line
+    _failed: bool = False
+
+    def __init__(self, log_path: Path):
+        self.log_path = log_path
+        self.heap_size = split_miner_heap_size(log_path)
+
+    def discover(self, arguments: List[str]) -> bool:
+        """
+        Runs Split Miner with the given command-line [arguments] in the service, starting it if needed.
+
+        Parameters
+        ----------
+        arguments : List[str]
+            Command-line arguments of Split Miner (without the JVM and JAR ones).
+
+        Returns
+        -------
+        bool
+            Whether the discovery was run in the service. If False, the caller should run it through the command line.
+        """
+        if arguments[arguments.index("--logPath") + 1] != str(self.log_path) or not self._start():
+            return False
+        try:
+            self._process.stdin.write(json.dumps(arguments) + "\n")
+            self._process.stdin.flush()
+            response = self._process.stdout.readline().strip()
+        except (BrokenPipeError, OSError) as error:
+            response = f"ERROR {error}"
+        if response != "OK":
+            print_warning(f"Split Miner service failed ({response or 'terminated'}), using the command line instead.")
+            self.close()
+            self._failed = True
+            return False
+        return True
+
+    def close(self):
+        """
+        Stops the service process, if running.
+        """
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+                self._process.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                self._process.kill()
+            self._process = None
+
+    def __getstate__(self) -> dict:
+        # The unpickled copy (e.g., in a worker of a trial store) starts its own service process
+        return self.__dict__ | {"_process": None}
+
+    def __enter__(self) -> "SplitMinerService":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _start(self) -> bool:
+        global split_miner_jar_path, split_miner_service_script_path
+
+        if self._process is not None and self._process.poll() is None:
+            return True
+        if self._failed:
+            return False
+        self._failed = True
+        jjs_path = _find_jjs()
+        main_class = _jar_main_class(split_miner_jar_path)
+        if jjs_path is None or main_class is None:
+            return False
+        args = [
+            jjs_path,
+            f"-J-Xmx{self.heap_size}M",
+            f"-J-Xms{min(self.heap_size, MIN_SPLIT_MINER_HEAP_SIZE)}M",
+            "-J-Djava.awt.headless=true",
+            "-cp",
+            str(split_miner_jar_path),
+            str(split_miner_service_script_path),
+            "--",
+            main_class,
+        ]
+        print_step(f"Starting Split Miner service: {args}")
+        try:
+            self._process = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1)
+            ready = self._process.stdout.readline().strip() == "READY"
+        except OSError:
+            ready = False
+        if not ready:
+            print_warning("Split Miner service could not be started, using the command line instead.")
+            self.close()
+            return False
+        self._failed = False
+        return True
+
+
+class ProcessModelMemo:
+    """
+    Memo table of the process models discovered in an optimization, to reuse them instead of running the discovery
+    again for the same event log, algorithm, and parameters.
+
+    The table maps the digest of the event log, the discovery algorithm, and its parameters (epsilon, eta, and the
+    Split Miner flags) to the path of the process model discovered with them.
+
+    Attributes
+    ----------
+    hits : int
+        Number of lookups that found a discovered process model.
+    misses : int
+        Number of lookups that did not find one.
+    """
+
+    # Lookup statistics
+    hits: int
+    misses: int
+
+    # Path to the process model discovered for each key
+    _process_models: Dict[tuple, Path]
+    # Digest of each event log, computed once
+    _log_digests: Dict[Path, str]
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._process_models = {}
+        self._log_digests = {}
+
+    def get(self, log_path: Path, params: HyperoptIterationParams) -> Optional[Path]:
+        """
+        Path to the process model discovered from [log_path] with the discovery parameters of [params], or None if
+        there is none (or it does not exist anymore).
+        """
+        process_model_path = self._process_models.get(self._key(log_path, params))
+        if process_model_path is None or not process_model_path.exists():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return process_model_path
+
+    def put(self, log_path: Path, params: HyperoptIterationParams, process_model_path: Path):
+        """
+        Records [process_model_path] as the process model discovered from [log_path] with the discovery parameters of
+        [params].
+        """
+        self._process_models[self._key(log_path, params)] = process_model_path
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Fraction of the lookups that found a discovered process model (0 if there were none).
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def _key(self, log_path: Path, params: HyperoptIterationParams) -> tuple:
+        if log_path not in self._log_digests:
+            digest = hashlib.sha256()
+            with open(log_path, "rb") as log_file:
+                for block in iter(lambda: log_file.read(2**20), b""):
+                    digest.update(block)
+            self._log_digests[log_path] = digest.hexdigest()
+        return (
+            self._log_digests[log_path],
+            params.mining_algorithm.value,
+            params.epsilon,
+            params.eta,
+            params.prioritize_parallelism,
+            params.replace_or_joins,
+        )
+
+
+def split_miner_heap_size(log_path: Path) -> int:
+    """
+    Maximum JVM heap size (in MB) to run Split Miner with the event log in [log_path], proportional to the size of
+    the log (parsed XES logs take a few times their size on disk), bounded by [MIN_SPLIT_MINER_HEAP_SIZE],
+    [MAX_SPLIT_MINER_HEAP_SIZE], and half of the physical memory.
+    """
+    log_size = log_path.stat().st_size / 2**20 if log_path.exists() else 0.0
+    heap_size = max(MIN_SPLIT_MINER_HEAP_SIZE, math.ceil(4 * log_size) + 512)
+    upper_bound = MAX_SPLIT_MINER_HEAP_SIZE
+    physical_memory = _physical_memory()
+    if physical_memory is not None:
+        upper_bound = min(upper_bound, max(MIN_SPLIT_MINER_HEAP_SIZE, physical_memory // 2))
+    return min(heap_size, upper_bound)
+
+
+def discover_process_model(
+    log_path: Path,
+    output_model_path: Path,
+    params: HyperoptIterationParams,
+    service: Optional[SplitMinerService] = None,
+):
     """
         Runs the specified process model discovery algorithm to extract a process model
         from an event log and save it to the given output path.
@@ -28,6 +258,9 @@ def discover_process_model(log_path: Path, output_model_path: Path, params: Hype
             Path to save the discovered process model.
         params : :class:`~simod.resource_model.settings.HyperoptIterationParams`
             Configuration containing the process model discovery algorithm and its parameters.
+        service : :class:`SplitMinerService`, optional
+            Long-lived Split Miner process to run the discovery in (if it is for its event log). If not provided, Split
+            Miner is run through the command line.
 
         Raises
         ------
@@ -43,10 +276,13 @@ def discover_process_model(log_path: Path, output_model_path: Path, params: Hype
                 params.epsilon,
                 params.prioritize_parallelism,
                 params.replace_or_joins,
-            )
+            ),
+            service,
         )
     elif params.mining_algorithm is ProcessModelDiscoveryAlgorithm.SPLIT_MINER_V2:
-        discover_process_model_with_split_miner_v2(SplitMinerV2Settings(log_path, output_model_path, params.epsilon))
+        discover_process_model_with_split_miner_v2(
+            SplitMinerV2Settings(log_path, output_model_path, params.epsilon), service
+        )
     else:
         raise ValueError(f"Unknown process model discovery algorithm: {params.mining_algorithm}")
 
@@ -97,16 +333,62 @@ class SplitMinerV2Settings:
     epsilon: float
 
 
-def discover_process_model_with_split_miner_v1(settings: SplitMinerV1Settings):
+def discover_process_model_with_split_miner_v1(
+    settings: SplitMinerV1Settings, service: Optional[SplitMinerService] = None
+):
     global split_miner_jar_path
 
+    service_arguments = _split_miner_v1_arguments(
+        settings, str(settings.log_path), str(_split_miner_output_path(settings.output_model_path))
+    )
+    if service is not None and service.discover(service_arguments):
+        print_step(f"SplitMiner v1 was run in the service with the following arguments: {service_arguments}")
+        return
+
     args, split_miner_path, input_log_path, model_output_path = _prepare_split_miner_params(
-        split_miner_jar_path, settings.log_path, settings.output_model_path, strip_output_suffix=False
+        split_miner_jar_path,
+        settings.log_path,
+        settings.output_model_path,
+        strip_output_suffix=False,
+        heap_size=split_miner_heap_size(settings.log_path),
     )
 
-    args += [
-        "-jar",
-        split_miner_path,
+    args += ["-jar", split_miner_path] + _split_miner_v1_arguments(settings, input_log_path, model_output_path)
+
+    print_step(f"SplitMiner v1 is running with the following arguments: {args}")
+    execute_external_command(args)
+
+
+def discover_process_model_with_split_miner_v2(
+    settings: SplitMinerV2Settings, service: Optional[SplitMinerService] = None
+):
+    global split_miner_jar_path
+
+    assert settings.epsilon is not None, "Epsilon must be provided for Split Miner v2."
+
+    service_arguments = _split_miner_v2_arguments(
+        settings, str(settings.log_path), str(_split_miner_output_path(settings.output_model_path))
+    )
+    if service is not None and service.discover(service_arguments):
+        print_step(f"SplitMiner v2 was run in the service with the following arguments: {service_arguments}")
+        return
+
+    args, split_miner_path, input_log_path, model_output_path = _prepare_split_miner_params(
+        split_miner_jar_path,
+        settings.log_path,
+        settings.output_model_path,
+        strip_output_suffix=False,
+        heap_size=split_miner_heap_size(settings.log_path),
+    )
+
+    args += ["-jar", split_miner_path] + _split_miner_v2_arguments(settings, input_log_path, model_output_path)
+
+    print_step(f"SplitMiner v2 is running with the following arguments: {args}")
+    execute_external_command(args)
+
+
+def _split_miner_v1_arguments(settings: SplitMinerV1Settings, input_log_path: str, model_output_path: str) -> List[str]:
+    args = [
         "--logPath",
         input_log_path,
         "--outputPath",
@@ -125,22 +407,11 @@ def discover_process_model_with_split_miner_v1(settings: SplitMinerV1Settings):
     if settings.remove_loop_activity_markers:
         args += ["--removeLoopActivityMarkers"]
 
-    print_step(f"SplitMiner v1 is running with the following arguments: {args}")
-    execute_external_command(args)
-
+    return args
 
-def discover_process_model_with_split_miner_v2(settings: SplitMinerV2Settings):
-    global split_miner_jar_path
-
-    assert settings.epsilon is not None, "Epsilon must be provided for Split Miner v2."
-
-    args, split_miner_path, input_log_path, model_output_path = _prepare_split_miner_params(
-        split_miner_jar_path, settings.log_path, settings.output_model_path, strip_output_suffix=False
-    )
 
-    args += [
-        "-jar",
-        split_miner_path,
+def _split_miner_v2_arguments(settings: SplitMinerV2Settings, input_log_path: str, model_output_path: str) -> List[str]:
+    return [
         "--logPath",
         input_log_path,
         "--outputPath",
@@ -150,8 +421,9 @@ def discover_process_model_with_split_miner_v2(settings: SplitMinerV2Settings):
         "--splitminer2",  # Boolean flag is always added here to run Split Miner v2
     ]
 
-    print_step(f"SplitMiner v2 is running with the following arguments: {args}")
-    execute_external_command(args)
+
+def _split_miner_output_path(output_model_path: Path) -> Path:
+    return output_model_path if ".bpmn" in str(output_model_path) else output_model_path.with_suffix(".bpmn")
 
 
 def _prepare_split_miner_params(
@@ -160,6 +432,7 @@ def _prepare_split_miner_params(
         output_model_path: Path,
         strip_output_suffix: bool = True,
         headless: bool = True,
+        heap_size: int = 2048,
 ) -> Tuple[List[str], str, str, str]:
     if is_windows():
         # Windows: ';' as separator and escape string with '"'
@@ -177,7 +450,7 @@ def _prepare_split_miner_params(
                 model_output_path = '"' + str(output_model_path) + '"'
     else:
         # Linux: ':' as separator and add memory specs
-        args = ["java", "-Xmx2G", "-Xms1024M"]
+        args = ["java", f"-Xmx{heap_size}M", f"-Xms{min(heap_size, MIN_SPLIT_MINER_HEAP_SIZE)}M"]
         if headless:
             args += ["-Djava.awt.headless=true"]
         split_miner_path = str(split_miner)
@@ -191,3 +464,41 @@ def _prepare_split_miner_params(
                 model_output_path = str(output_model_path)
 
     return args, split_miner_path, input_log_path, model_output_path
+
+
+def _find_jjs() -> Optional[str]:
+    """
+    Path to the Nashorn shell of the JDK (next to the Java executable in use), or None if it is not available.
+    """
+    java_path = shutil.which("java")
+    if java_path is not None:
+        for name in ["jjs", "jjs.exe"]:
+            jjs_path = Path(java_path).resolve().parent / name
+            if jjs_path.exists():
+                return str(jjs_path)
+    return shutil.which("jjs")
+
+
+def _jar_main_class(jar_path: Path) -> Optional[str]:
+    """
+    Main class declared in the manifest of the JAR in [jar_path], or None if it cannot be read.
+    """
+    try:
+        with zipfile.ZipFile(jar_path) as jar:
+            manifest = jar.read("META-INF/MANIFEST.MF").decode("utf-8")
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return None
+    for line in manifest.splitlines():
+        if line.startswith("Main-Class:"):
+            return line.split(":", 1)[1].strip()
+    return None
+
+
+def _physical_memory() -> Optional[int]:
+    """
+    Physical memory of the machine (in MB), or None if it cannot be retrieved (e.g., on Windows).
+    """
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2**20
+    except (AttributeError, ValueError, OSError):
+        return None
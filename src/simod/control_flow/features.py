@@ -0,0 +1,92 @@
+import math
+from typing import Dict, List, Tuple
+
+from pix_framework.discovery.gateway_probabilities import GatewayProbabilities
+from pix_framework.io.bpm_graph import BPMNGraph, BPMNNodeType
+
+from ..event_log.variants import VariantIndex
+
+# Artificial activities marking the start and end of the cases in a directly-follows graph
+DFG_START = "__start__"
+DFG_END = "__end__"
+
+
+def log_dfg(variants: VariantIndex) -> Dict[Tuple[str, str], int]:
+    """
+    Directly-follows graph of the event log with [variants]: number of times each activity is directly followed by
+    another one in its cases (including the artificial :data:`DFG_START` and :data:`DFG_END` activities).
+    """
+    dfg = {}
+    for sequence, count in zip(variants.sequences, variants.counts):
+        activities = [DFG_START, *sequence, DFG_END]
+        for pair in zip(activities[:-1], activities[1:]):
+            dfg[pair] = dfg.get(pair, 0) + count
+    return dfg
+
+
+def model_dfg(bpmn_graph: BPMNGraph) -> List[Tuple[str, str]]:
+    """
+    Directly-follows relations of the process model in [bpmn_graph]: pairs of tasks (or start and end of the process)
+    connected through a path of sequence flows without other tasks in between (i.e., only gateways and events).
+    """
+    successors = {element_id: [] for element_id in bpmn_graph.element_info}
+    for source_id, target_id in bpmn_graph.flow_arcs.values():
+        successors[source_id].append(target_id)
+
+    def activity(element_id: str) -> str:
+        element = bpmn_graph.element_info[element_id]
+        if element.type == BPMNNodeType.START_EVENT:
+            return DFG_START
+        if element.type == BPMNNodeType.END_EVENT:
+            return DFG_END
+        return element.name
+
+    def is_activity(element_id: str) -> bool:
+        return bpmn_graph.element_info[element_id].type in [
+            BPMNNodeType.TASK,
+            BPMNNodeType.START_EVENT,
+            BPMNNodeType.END_EVENT,
+        ]
+
+    relations = set()
+    for source_id in filter(is_activity, bpmn_graph.element_info):
+        # Traverse the gateways and intermediate events from [source_id] up to the next activities
+        pending, visited = list(successors[source_id]), set()
+        while len(pending) > 0:
+            element_id = pending.pop()
+            if element_id in visited:
+                continue
+            visited.add(element_id)
+            if is_activity(element_id):
+                relations.add((activity(source_id), activity(element_id)))
+            else:
+                pending += successors[element_id]
+    return sorted(relations)
+
+
+def dfg_precision_recall(bpmn_graph: BPMNGraph, dfg: Dict[Tuple[str, str], int]) -> Tuple[float, float]:
+    """
+    Precision (fraction of the directly-follows relations of the process model observed in the event log) and recall
+    (fraction of the directly-follows occurrences of the event log allowed by the process model) of the process model
+    in [bpmn_graph] w.r.t. the directly-follows graph [dfg] of an event log (see :func:`log_dfg`).
+    """
+    relations = model_dfg(bpmn_graph)
+    precision = sum(relation in dfg for relation in relations) / len(relations) if len(relations) > 0 else 0.0
+    total_occurrences = sum(dfg.values())
+    allowed_occurrences = sum(dfg.get(relation, 0) for relation in relations)
+    recall = allowed_occurrences / total_occurrences if total_occurrences > 0 else 0.0
+    return precision, recall
+
+
+def gateway_entropy(gateway_probabilities: List[GatewayProbabilities]) -> float:
+    """
+    Mean normalized Shannon entropy (between 0, deterministic, and 1, equiprobable) of the probabilities of the
+    outgoing flows of the split gateways, or 0 if there is none.
+    """
+    entropies = []
+    for gateway in gateway_probabilities:
+        probabilities = [path.probability for path in gateway.outgoing_paths if path.probability > 0]
+        if len(gateway.outgoing_paths) > 1:
+            entropy = -sum(probability * math.log(probability) for probability in probabilities)
+            entropies.append(entropy / math.log(len(gateway.outgoing_paths)))
+    return sum(entropies) / len(entropies) if len(entropies) > 0 else 0.0
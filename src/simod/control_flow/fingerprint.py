@@ -0,0 +1,74 @@
+import hashlib
+from typing import Dict, List
+
+from pix_framework.io.bpm_graph import BPMNGraph, BPMNNodeType
+
+# Element types whose name (if any) identifies them, the rest are identified by their type and position in the graph
+_LABELED_ELEMENT_TYPES = [BPMNNodeType.TASK, BPMNNodeType.INTERMEDIATE_EVENT]
+
+
+def bpmn_fingerprint(bpmn_graph: BPMNGraph) -> str:
+    """
+    Canonical structural hash of a BPMN model, independent of the IDs of its elements and flows.
+
+    Two process models have the same fingerprint when they have the same structure: the same elements (tasks and
+    intermediate events identified by their name, and gateways and start/end events by their type) connected by the
+    same sequence flows. For example, two models discovered by Split Miner with different parameters but leading to
+    the same structure, which differ only in their generated IDs.
+
+    The elements are labeled by iterative color refinement (Weisfeiler-Lehman): starting from the label of each
+    element, each iteration extends it with the sorted labels of its predecessors and successors, until the partition
+    of the elements induced by the labels stops changing. The fingerprint is the hash of the sorted element labels and
+    of the sorted labels of the sequence flows (pairs of source and target labels).
+
+    Parameters
+    ----------
+    bpmn_graph : :class:`pix_framework.io.bpm_graph.BPMNGraph`
+        Graph of the BPMN model.
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 digest of the structure.
+    """
+    predecessors: Dict[str, List[str]] = {element_id: [] for element_id in bpmn_graph.element_info}
+    successors: Dict[str, List[str]] = {element_id: [] for element_id in bpmn_graph.element_info}
+    for source_id, target_id in bpmn_graph.flow_arcs.values():
+        successors[source_id].append(target_id)
+        predecessors[target_id].append(source_id)
+
+    labels = {
+        element_id: _hash(str(element.type), _element_name(element))
+        for element_id, element in bpmn_graph.element_info.items()
+    }
+    num_classes = len(set(labels.values()))
+    for _ in range(len(labels)):
+        labels = {
+            element_id: _hash(
+                labels[element_id],
+                *sorted(labels[predecessor] for predecessor in predecessors[element_id]),
+                "|",
+                *sorted(labels[successor] for successor in successors[element_id]),
+            )
+            for element_id in labels
+        }
+        new_num_classes = len(set(labels.values()))
+        if new_num_classes == num_classes:
+            break
+        num_classes = new_num_classes
+
+    flows = sorted(
+        _hash(labels[source_id], labels[target_id]) for source_id, target_id in bpmn_graph.flow_arcs.values()
+    )
+    return _hash(*sorted(labels.values()), "||", *flows)
+
+
+def _element_name(element) -> str:
+    # Elements without name are given their ID as name when parsed, which does not identify their structure
+    if element.type in _LABELED_ELEMENT_TYPES and element.name != element.id:
+        return element.name
+    return ""
+
+
+def _hash(*values: str) -> str:
+    return hashlib.sha256("\0".join(values).encode("utf-8")).hexdigest()
@@ -0,0 +1,63 @@
+/*
+ * Long-lived Split Miner process, run with the Nashorn shell of the JDK (jjs, JDK 8 to 14):
+ *
+ *   jjs -J-Xmx<heap> -cp split-miner.jar split_miner_service.js -- <main class of the jar>
+ *
+ * Protocol: once ready, it writes "READY" to stdout. Then, each line read from stdin is a JSON array with the
+ * command-line arguments of a Split Miner run, answered with a stdout line "OK" or "ERROR <message>" when the run
+ * finishes. The output of Split Miner itself is redirected to stderr. The service stops when stdin is closed.
+ */
+var System = Java.type("java.lang.System");
+var SecurityManager = Java.type("java.lang.SecurityManager");
+var SecurityException = Java.type("java.lang.SecurityException");
+var BufferedReader = Java.type("java.io.BufferedReader");
+var InputStreamReader = Java.type("java.io.InputStreamReader");
+
+var EXIT_PREFIX = "System.exit:";
+
+// Split Miner exits the JVM when it finishes, turn the exit into an exception so the service survives it
+var ExitTrap = Java.extend(SecurityManager, {
+    checkExit: function (status) {
+        throw new SecurityException(EXIT_PREFIX + status);
+    },
+    checkPermission: function () {
+        // Everything else is allowed
+    }
+});
+
+function exitStatus(error) {
+    while (error != null) {
+        if (error instanceof SecurityException && String(error.getMessage()).indexOf(EXIT_PREFIX) === 0) {
+            return parseInt(String(error.getMessage()).substring(EXIT_PREFIX.length));
+        }
+        error = error instanceof java.lang.Throwable ? error.getCause() : null;
+    }
+    return null;
+}
+
+var protocolOut = System.out;
+System.setOut(System.err);
+var SplitMiner = Java.type(arguments[0]);
+System.setSecurityManager(new ExitTrap());
+
+var input = new BufferedReader(new InputStreamReader(System.in));
+protocolOut.println("READY");
+protocolOut.flush();
+
+var line;
+while ((line = input.readLine()) != null) {
+    if (line.trim() === "") {
+        continue;
+    }
+    var response = "OK";
+    try {
+        SplitMiner.main(Java.to(JSON.parse(line), "java.lang.String[]"));
+    } catch (error) {
+        var status = exitStatus(error);
+        if (status !== 0) {
+            response = "ERROR " + String(status === null ? error : "exit status " + status).replace(/\s+/g, " ");
+        }
+    }
+    protocolOut.println(response);
+    protocolOut.flush();
+}
@@ -1,30 +1,52 @@
 import json
+import math
 import shutil
+import threading
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 import hyperopt
 import numpy as np
 import pandas as pd
 from hyperopt import STATUS_FAIL, STATUS_OK, Trials, fmin, hp, tpe
-from pix_framework.discovery.gateway_probabilities import (
-    GatewayProbabilities,
-    GatewayProbabilitiesDiscoveryMethod,
-    compute_gateway_probabilities,
-)
-from simod.branch_rules.discovery import discover_branch_rules, map_branch_rules_to_flows
-from simod.branch_rules.types import BranchRules
+from pix_framework.discovery.gateway_probabilities import GatewayProbabilities, GatewayProbabilitiesDiscoveryMethod
 from pix_framework.filesystem.file_manager import create_folder, get_random_folder_id, remove_asset
 from pix_framework.io.bpm_graph import BPMNGraph
 
-from .discovery import discover_process_model
-from .settings import HyperoptIterationParams
+from ..branch_rules.candidates import BranchRulesCache
+from ..branch_rules.discovery import discover_branch_rules, map_branch_rules_to_flows
+from ..branch_rules.types import BranchRules
+from ..budget import StageBudget
+from ..checkpoint import ITERATION_DIRS_KEY, SearchCheckpoint, iteration_dirs
 from ..cli_formatter import print_message, print_step, print_subsection
 from ..event_log.event_log import EventLog
+from ..parallel_search import parallel_fmin, replay_suggest
+from ..settings.common_settings import MetricEngine, SearchStrategy
 from ..settings.control_flow_settings import ControlFlowSettings, ProcessModelDiscoveryAlgorithm
+from ..simulation.cache import SimulationCache
 from ..simulation.parameters.BPS_model import BPSModel
 from ..simulation.prosimos import simulate_and_evaluate
-from ..utilities import get_process_model_path, get_simulation_parameters_path, hyperopt_step
+from ..successive_halving import promoted_points, successive_halving
+from ..surrogate import FEATURES_KEY, SCREENED_KEY, STATUS_SCREENED, LossSurrogate
+from ..trial_store import TrialStore
+from ..utilities import (
+    cannot_beat_incumbent,
+    get_incumbent_loss,
+    get_process_model_path,
+    get_simulation_parameters_path,
+    hyperopt_step,
+    released,
+)
+from ..warm_start import prior_points
+from .discovery import ProcessModelMemo, SplitMinerService, discover_process_model
+from .features import dfg_precision_recall, gateway_entropy, log_dfg
+from .fingerprint import bpmn_fingerprint
+from .replay import ReplayCache
+from .settings import HyperoptIterationParams
+
+# Parameters of the search space that determine the structure of the discovered process model
+STRUCTURAL_PARAMETERS = ["epsilon", "eta", "prioritize_parallelism", "replace_or_joins"]
 
 
 class ControlFlowOptimizer:
@@ -52,11 +74,73 @@ class ControlFlowOptimizer:
         Best discovered BPS model after the optimization process.
     evaluation_measurements : :class:`pandas.DataFrame`
         Quality measures recorded for each hyperopt iteration.
+    simulation_pool : :class:`concurrent.futures.Executor`, optional
+        Pool of workers, shared across iterations, to run the simulations of each candidate in. If not provided,
+        temporary pools are created for each evaluation.
+    metric_engine : :class:`~simod.settings.common_settings.MetricEngine`
+        Implementation used to compute the optimization metric.
+    approximate_dl : bool
+        Whether to use the approximated control-flow log distance when the optimization metric is DL.
+    simulation_cache : :class:`~simod.simulation.cache.SimulationCache`, optional
+        Store of the measurements of already simulated candidates, to reuse them for identical candidates.
+    seed : int, optional
+        Seed the seeds of the replicas are derived from. Every candidate is simulated with the same replica seeds
+        (common random numbers), so their losses are compared under the same simulation noise.
+    replay_cache : :class:`~simod.control_flow.replay.ReplayCache`
+        Replays of the variants of the training partition on the candidate process models, shared by the discovery of
+        their gateway probabilities and branch rules. If not provided, one is created for this optimizer.
+    branch_rules_cache : :class:`~simod.branch_rules.candidates.BranchRulesCache`
+        Branch rules learned for the candidate process models from the training partition, filtered by the f-score of
+        each candidate. If not provided, one is created for this optimizer.
+    max_parallel_trials : int
+        Maximum number of candidates evaluated concurrently (see :func:`~simod.parallel_search.parallel_fmin`).
+    trial_store : :class:`~simod.trial_store.TrialStore`, optional
+        Store to queue the candidates in, to be evaluated by its workers instead of by this process.
+    checkpoint : :class:`~simod.checkpoint.SearchCheckpoint`, optional
+        Checkpoint to persist the trials of the search in after every finished trial, and to resume it from.
+    warm_start_path : :class:`~pathlib.Path`, optional
+        Path to the measurements of the candidates evaluated by a previous run of this optimization on the same
+        process (its ``evaluation_measures.csv``), to warm-start the search with its best candidates.
+    num_warm_start_points : int
+        Maximum number of candidates of the previous run evaluated to warm-start the search.
+    budget : :class:`~simod.budget.StageBudget`, optional
+        Share of the time budget of the run allotted to the search, which stops launching candidates once it is spent.
 
     Notes
     -----
     - If no process model is provided, a discovery method will be used.
     - Optimization is performed using TPE-hyperparameter optimization.
+    - The process models are discovered by a single Split Miner process kept running during the optimization (if
+      possible, see :class:`~simod.control_flow.discovery.SplitMinerService`).
+    - The candidates whose process model has the same structure (see
+      :func:`~simod.control_flow.fingerprint.bpmn_fingerprint`) and non-structural parameters as an already evaluated
+      one are not evaluated again, reusing (and reporting to hyperopt) its loss, output directory, and measurements.
+    - With [num_inner_iterations] in the settings, the search is factorized: each process model is discovered (and
+      parsed) once, and several candidates of the gateway probabilities method and f-score are evaluated with it.
+    - The decision trees of the branch rules are trained once per process model, and each f-score only filters their
+      rules.
+    - With the successive halving search strategy, the candidates are first evaluated simulating a fraction of the
+      validation cases, and only the best ones are re-evaluated with all of them.
+    - With [max_parallel_trials] greater than one, the discovery steps of the concurrent candidates run one at a time,
+      and their simulations run concurrently in the shared pool of workers. In the factorized search, the process
+      models are evaluated concurrently, each of them with a sequential inner search.
+    - With a [trial_store], the optimizer (without its pool of workers) is published in the store, and the candidates
+      are queued in it with their parameters, up to [max_parallel_trials] at a time. Each worker evaluates them with
+      its copy of the optimizer, which reports the response and measurements of the evaluation back to this one. The
+      [base_directory] must be reachable by the workers under the same path.
+    - With a [warm_start_path], the first candidates of the search are the best ones of the previous run (see
+      :func:`~simod.warm_start.prior_points`), evaluated again on this event log, and TPE takes over from them. They
+      count towards the number of iterations, which can thus be lower than for a search starting from scratch.
+    - With a [budget], no new candidates are launched once it is spent (and a candidate succeeded), so the search can
+      end before evaluating all its iterations. The running candidates are awaited.
+    - With screening in the settings, a surrogate model fitted on the simulated candidates (see
+      :class:`~simod.surrogate.LossSurrogate`) predicts the loss of each new one from the directly-follows precision
+      and recall of its process model and the entropy of its gateway probabilities. The candidates predicted to lose
+      by more than the screening margin are not simulated: hyperopt gets their predicted loss, and the measurements
+      record them as screened.
+    - With a [checkpoint] holding the trials of an interrupted search, the search continues from its finished trials
+      (and rungs), evaluating only the rest of the candidates. In the factorized search, the finished trials are the
+      ones of the outer search, i.e., an interrupted inner search is evaluated again.
     """
 
     # Event log with train/validation partitions
@@ -71,20 +155,107 @@ class ControlFlowOptimizer:
     best_bps_model: Optional[BPSModel]
     # Quality measure of each hyperopt iteration
     evaluation_measurements: pd.DataFrame
+    # Pool of workers to run the simulations in
+    simulation_pool: Optional[Executor]
+    # Implementation used to compute the optimization metric
+    metric_engine: MetricEngine
+    # Whether to approximate the DL optimization metric
+    approximate_dl: bool
+    # Store of the measurements of already simulated candidates
+    simulation_cache: Optional[SimulationCache]
+    # Seed of the simulations of every candidate
+    seed: Optional[int]
+    # Replays of the training variants on the candidate process models
+    replay_cache: ReplayCache
+    # Branch rules learned for the candidate process models
+    branch_rules_cache: BranchRulesCache
+    # Maximum number of candidates evaluated concurrently
+    max_parallel_trials: int
+    # Store to queue the candidates in, for its workers to evaluate them
+    trial_store: Optional[TrialStore]
+    # Checkpoint of the trials of the search
+    checkpoint: Optional[SearchCheckpoint]
+    # Measurements of the candidates of a previous run to warm-start the search from
+    warm_start_path: Optional[Path]
+    # Maximum number of candidates of the previous run evaluated to warm-start the search
+    num_warm_start_points: int
+    # Share of the time budget of the run allotted to the search
+    budget: Optional[StageBudget]
 
     # Flag indicating if the model is provided of it needs to be discovered
     _need_to_discover_model: bool
     # Path to the training log in XES format, needed for Split Miner
     _xes_train_log_path: Optional[Path] = None
+    # Long-lived Split Miner process discovering the process models from the training log
+    _split_miner_service: Optional[SplitMinerService] = None
+    # Process models already discovered, by discovery parameters
+    _process_model_memo: ProcessModelMemo
+    # Response and measurements of the evaluated candidates, by structure and non-structural parameters
+    _evaluated_structures: Dict[tuple, Tuple[dict, List[dict]]]
+    # State of the iteration being evaluated in each thread: whether its process model was taken from the memo table
+    # (None if not discovered), its structural fingerprint, and whether that structure was already evaluated
+    _iteration_state: threading.local
+    # Lock held by the iterations except while waiting for their simulations
+    _iteration_lock: threading.Lock
+    # Stage of the trial store evaluating the queued candidates, if published
+    _stage: Optional[str] = None
+    # Best loss of the search when the iteration being evaluated (by a worker of the trial store) was queued
+    _queued_incumbent_loss: Optional[float] = None
+    # Surrogate model of the search when the iteration being evaluated (by a worker of the trial store) was queued
+    _queued_surrogate: Optional[LossSurrogate] = None
+    # Directly-follows graph of the training log, to compute the features of the candidates for the surrogate model
+    _log_dfg: Optional[Dict[Tuple[str, str], int]] = None
+    # Path and graph of the last parsed process model, shared by the steps of the iterations using it
+    _parsed_process_model: Optional[Tuple[Path, BPMNGraph]] = None
     # Set of trials for the hyperparameter optimization process
     _bayes_trials = Trials
-
-    def __init__(self, event_log: EventLog, bps_model: BPSModel, settings: ControlFlowSettings, base_directory: Path):
+    # Trials of the whole search (one per rung in a multi-fidelity search), to persist them in the checkpoint
+    _search_trials: List[Trials]
+    # Fraction of the validation cases simulated to evaluate the current iteration (lower in multi-fidelity search)
+    _fidelity: float = 1.0
+
+    def __init__(
+        self,
+        event_log: EventLog,
+        bps_model: BPSModel,
+        settings: ControlFlowSettings,
+        base_directory: Path,
+        simulation_pool: Optional[Executor] = None,
+        metric_engine: MetricEngine = MetricEngine.LOG_DISTANCE_MEASURES,
+        approximate_dl: bool = False,
+        simulation_cache: Optional[SimulationCache] = None,
+        seed: Optional[int] = None,
+        replay_cache: Optional[ReplayCache] = None,
+        branch_rules_cache: Optional[BranchRulesCache] = None,
+        max_parallel_trials: int = 1,
+        trial_store: Optional[TrialStore] = None,
+        checkpoint: Optional[SearchCheckpoint] = None,
+        warm_start_path: Optional[Path] = None,
+        num_warm_start_points: int = 5,
+        budget: Optional[StageBudget] = None,
+    ):
         # Save event log, optimization settings, and output directory
         self.event_log = event_log
         self.initial_bps_model = bps_model.deep_copy()
         self.settings = settings
         self.base_directory = base_directory
+        self.simulation_pool = simulation_pool
+        self.metric_engine = metric_engine
+        self.approximate_dl = approximate_dl
+        self.simulation_cache = simulation_cache
+        self.seed = seed
+        self.replay_cache = replay_cache if replay_cache is not None else ReplayCache()
+        self.branch_rules_cache = branch_rules_cache if branch_rules_cache is not None else BranchRulesCache()
+        self.max_parallel_trials = max_parallel_trials
+        self.trial_store = trial_store
+        self.checkpoint = checkpoint
+        self.warm_start_path = warm_start_path
+        self.num_warm_start_points = num_warm_start_points
+        self.budget = budget
+        self._process_model_memo = ProcessModelMemo()
+        self._evaluated_structures = {}
+        self._iteration_state = threading.local()
+        self._iteration_lock = threading.Lock()
         # Check if it is needed to discover the process model
         self.best_bps_model = None
         if self.initial_bps_model.process_model is None:
@@ -93,6 +264,7 @@ class ControlFlowOptimizer:
             # Export training log (XES format) for SplitMiner
             self._xes_train_log_path = self.base_directory / (self.event_log.process_name + ".xes")
             self.event_log.train_to_xes(self._xes_train_log_path)
+            self._split_miner_service = SplitMinerService(self._xes_train_log_path)
         else:
             # Process model provided
             self._need_to_discover_model = False
@@ -108,16 +280,30 @@ class ControlFlowOptimizer:
                 "prioritize_parallelism",
                 "replace_or_joins",
                 "output_dir",
-                "f_score"
+                "f_score",
+                "fidelity",
+                "discovery_memo_hit",
+                "discovery_memo_hit_rate",
+                "structure_fingerprint",
+                "duplicate_structure",
             ]
         )
         # Instantiate trials for hyper-optimization process
         self._bayes_trials = Trials()
         self.iteration_index = 0
 
-    def _hyperopt_iteration(self, hyperopt_iteration_dict: dict):
+    def _hyperopt_iteration(self, hyperopt_iteration_dict: dict, process_model: Optional[Path] = None):
+        if self.trial_store is not None:
+            return self._queue_iteration(hyperopt_iteration_dict, process_model)
+        # Concurrent iterations run one at a time, except for their simulations
+        with self._iteration_lock:
+            return self._run_iteration(hyperopt_iteration_dict, process_model)
+
+    def _run_iteration(self, hyperopt_iteration_dict: dict, process_model: Optional[Path] = None):
+        iteration_index = self.iteration_index
+        self.iteration_index += 1
         # Report new iteration
-        print_subsection(f"Control-flow optimization iteration {self.iteration_index}")
+        print_subsection(f"Control-flow optimization iteration {iteration_index}")
         # Initialize status
         status = STATUS_OK
         # Create folder for this iteration
@@ -125,6 +311,8 @@ class ControlFlowOptimizer:
         create_folder(output_dir)
         # Initialize BPS model for this iteration
         current_bps_model = self.initial_bps_model.deep_copy()
+        self._iteration_state.process_model_memo_hit = None
+        self._iteration_state.structure_fingerprint, self._iteration_state.duplicate_structure = None, False
         # Parameters of this iteration
         hyperopt_iteration_params = HyperoptIterationParams.from_hyperopt_dict(
             hyperopt_dict=hyperopt_iteration_dict,
@@ -133,11 +321,15 @@ class ControlFlowOptimizer:
             provided_model_path=None if self._need_to_discover_model else self.initial_bps_model.process_model,
             output_dir=output_dir,
             project_name=self.event_log.process_name,
+            discovery_parameters_step=self.settings.discovery_parameters_step,
         )
         print_message(f"Parameters: {hyperopt_iteration_params}")
 
         # Discover process model (if needed)
-        if self._need_to_discover_model:
+        if process_model is not None:
+            # Already discovered with the structural parameters of this iteration (factorized search)
+            current_bps_model.process_model = process_model
+        elif self._need_to_discover_model:
             try:
                 status, current_bps_model.process_model = hyperopt_step(
                     status, self._discover_process_model, hyperopt_iteration_params
@@ -148,6 +340,20 @@ class ControlFlowOptimizer:
         else:
             current_bps_model.process_model = hyperopt_iteration_params.provided_model_path
 
+        # Reuse the evaluation of a candidate with the same structure and non-structural parameters (if any)
+        status, structure_key = hyperopt_step(
+            status, self._structure_key, current_bps_model.process_model, hyperopt_iteration_params
+        )
+        if status == STATUS_OK and structure_key in self._evaluated_structures:
+            response, evaluation_measurements = self._evaluated_structures[structure_key]
+            self._iteration_state.duplicate_structure = True
+            print_step(f"Same structure as the candidate evaluated in {response['output_dir']}, reusing its evaluation")
+            print(f"Control-flow optimization iteration response: {response}")
+            self._process_measurements(hyperopt_iteration_params, STATUS_OK, evaluation_measurements)
+            remove_asset(output_dir)
+            # (the measurements of this iteration are recorded under its own output directory)
+            return dict(response) | {ITERATION_DIRS_KEY: [output_dir]}
+
         # Discover gateway probabilities
         status, current_bps_model.gateway_probabilities = hyperopt_step(
             status,
@@ -156,6 +362,28 @@ class ControlFlowOptimizer:
             hyperopt_iteration_params.gateway_probabilities_method,
         )
 
+        # Screen the candidate with the surrogate model, skipping its simulation if it is expected to lose
+        features, predicted_loss = None, None
+        if self.settings.screening:
+            status, features = hyperopt_step(
+                status,
+                self._surrogate_features,
+                current_bps_model.process_model,
+                current_bps_model.gateway_probabilities,
+            )
+            predicted_loss = self._screen(features) if status == STATUS_OK else None
+        if predicted_loss is not None:
+            print_step(f"Screened out by the surrogate model with predicted loss {predicted_loss}")
+            evaluation_measurements = [{"distance": predicted_loss, "metric": self.settings.optimization_metric}]
+            _, response = self._define_response(
+                STATUS_OK, evaluation_measurements, output_dir, current_bps_model.process_model
+            )
+            response |= {SCREENED_KEY: True, FEATURES_KEY: features}
+            print(f"Control-flow optimization iteration response: {response}")
+            self._process_measurements(hyperopt_iteration_params, STATUS_SCREENED, evaluation_measurements)
+            remove_asset(output_dir)
+            return response
+
         #  Discover branch rules
         if self.settings.discover_branch_rules:
             status, current_bps_model.branch_rules = hyperopt_step(
@@ -179,14 +407,95 @@ class ControlFlowOptimizer:
         status, response = self._define_response(
             status, evaluation_measurements, hyperopt_iteration_params.output_dir, current_bps_model.process_model
         )
+        if status == STATUS_OK and features is not None:
+            response[FEATURES_KEY] = features
         print(f"Control-flow optimization iteration response: {response}")
+        if status == STATUS_OK:
+            self._evaluated_structures[structure_key] = (dict(response), evaluation_measurements)
 
-        # Save the quality of this evaluation and increase iteration index
+        # Save the quality of this evaluation
         self._process_measurements(hyperopt_iteration_params, status, evaluation_measurements)
-        self.iteration_index += 1
 
         return response
 
+    def _queue_iteration(self, hyperopt_iteration_dict: dict, process_model: Optional[Path]) -> dict:
+        """
+        Queues the iteration in the trial store, and records the response and measurements of its evaluation.
+        """
+        response, evaluation_measurements = self.trial_store.evaluate(
+            self._stage,
+            hyperopt_iteration_dict,
+            process_model,
+            get_incumbent_loss(self._bayes_trials),
+            self._fit_surrogate(),
+        )
+        print(f"Control-flow optimization iteration response: {response}")
+        with self._iteration_lock:
+            self.iteration_index += 1
+            self.evaluation_measurements = pd.concat([self.evaluation_measurements, evaluation_measurements])
+        return response
+
+    def _evaluate_queued_iteration(
+        self,
+        hyperopt_iteration_dict: dict,
+        process_model: Optional[Path],
+        incumbent_loss: Optional[float],
+        surrogate: Optional[LossSurrogate] = None,
+    ) -> Tuple[dict, pd.DataFrame]:
+        """
+        Evaluates an iteration queued in the trial store (in a worker of the store), racing its simulations against the
+        best loss of the search when it was queued, and screening it with the surrogate model of the search back then.
+
+        Returns
+        -------
+        Tuple[dict, :class:`pandas.DataFrame`]
+            Response of the iteration, and the measurements recorded by its evaluation.
+        """
+        self._queued_incumbent_loss = incumbent_loss
+        self._queued_surrogate = surrogate
+        num_measurements = len(self.evaluation_measurements)
+        response = self._hyperopt_iteration(hyperopt_iteration_dict, process_model)
+        return response, self.evaluation_measurements.iloc[num_measurements:]
+
+    def _publish_stage(self):
+        """
+        Publishes this optimizer in the trial store (with its current state, e.g., the fidelity of the rung) to
+        evaluate the next queued iterations, retiring the previously published one.
+        """
+        self._retire_stage()
+        self._stage = self.trial_store.publish(self._evaluate_queued_iteration)
+
+    def _retire_stage(self):
+        if self._stage is not None:
+            self.trial_store.retire(self._stage)
+            self._stage = None
+
+    def __getstate__(self) -> dict:
+        # Published in a trial store: without the resources of this process nor the trials of the search
+        state = self.__dict__.copy()
+        for name in [
+            "simulation_pool",
+            "trial_store",
+            "checkpoint",
+            "budget",
+            "_iteration_lock",
+            "_iteration_state",
+            "_bayes_trials",
+            "_search_trials",
+        ]:
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.simulation_pool = None
+        self.trial_store = None
+        self.checkpoint = None
+        self.budget = None
+        self._iteration_lock = threading.Lock()
+        self._iteration_state = threading.local()
+        self._bayes_trials = Trials()
+
     def run(self) -> HyperoptIterationParams:
         """
         Runs the control-flow optimization process.
@@ -209,16 +518,54 @@ class ControlFlowOptimizer:
         # Define search space
         self.iteration_index = 0
         search_space = self._define_search_space(settings=self.settings)
+        resumed_trials = self._resume_search()
 
         # Launch optimization process
-        best_hyperopt_params = fmin(
-            fn=self._hyperopt_iteration,
-            space=search_space,
-            algo=tpe.suggest,
-            max_evals=self.settings.num_iterations,
-            trials=self._bayes_trials,
-            show_progressbar=False,
-        )
+        try:
+            if self.trial_store is not None:
+                self._publish_stage()
+            if self.settings.search_strategy == SearchStrategy.SUCCESSIVE_HALVING:
+                # Multi-fidelity search, the trials of the full-fidelity rung are left in self._bayes_trials
+                self._search_trials = list(resumed_trials)
+                best_hyperopt_params = successive_halving(
+                    fn=self._hyperopt_iteration,
+                    space=search_space,
+                    num_candidates=self.settings.num_iterations,
+                    start_rung=self._start_rung,
+                    max_parallel_trials=self.max_parallel_trials,
+                    resumed_rungs=resumed_trials,
+                    algo=self._warm_start_algo(search_space),
+                    on_trial_done=self._save_checkpoint,
+                    stop=self._budget_exhausted,
+                )
+            else:
+                if len(resumed_trials) > 0:
+                    self._bayes_trials = resumed_trials[0]
+                self._search_trials = [self._bayes_trials]
+                if self.settings.num_inner_iterations is not None and self._need_to_discover_model:
+                    # Two-level search, the trials of the outer search (one per process model) are left in
+                    # self._bayes_trials
+                    best_hyperopt_params = self._factorized_search(search_space)
+                else:
+                    best_hyperopt_params = parallel_fmin(
+                        fn=self._hyperopt_iteration,
+                        space=search_space,
+                        max_evals=self.settings.num_iterations,
+                        trials=self._bayes_trials,
+                        max_parallel_trials=self.max_parallel_trials,
+                        algo=self._warm_start_algo(search_space),
+                        on_trial_done=self._save_checkpoint,
+                        stop=self._budget_exhausted,
+                    )
+        finally:
+            # All the process models are discovered, stop the Split Miner process
+            if self._split_miner_service is not None:
+                self._split_miner_service.close()
+            if self.trial_store is not None:
+                self._retire_stage()
+        if self.trial_store is None:
+            # (the statistics of the workers of a trial store are not gathered)
+            self._print_cache_statistics()
         best_hyperopt_params = hyperopt.space_eval(search_space, best_hyperopt_params)
 
         # Process best results
@@ -236,6 +583,7 @@ class ControlFlowOptimizer:
             provided_model_path=None if self._need_to_discover_model else self.initial_bps_model.process_model,
             output_dir=best_result["output_dir"],
             project_name=self.event_log.process_name,
+            discovery_parameters_step=self.settings.discovery_parameters_step,
         )
 
         # Instantiate best BPS model
@@ -312,6 +660,70 @@ class ControlFlowOptimizer:
 
         return space
 
+    def _factorized_search(self, search_space: dict) -> dict:
+        """
+        Two-level search: an outer TPE search samples the structural parameters of [search_space], discovering the
+        process model of each sample once, and, for each of them, an inner TPE search evaluates [num_inner_iterations]
+        candidates of the rest of parameters with that process model. The result of each outer trial is the one of the
+        best candidate of its inner search.
+
+        Returns
+        -------
+        dict
+            Best point of [search_space] (in the same format as returned by :func:`hyperopt.fmin`).
+        """
+        structure_space = {key: value for key, value in search_space.items() if key in STRUCTURAL_PARAMETERS}
+        inner_space = {key: value for key, value in search_space.items() if key not in STRUCTURAL_PARAMETERS}
+        num_inner_iterations = max(1, self.settings.num_inner_iterations)
+
+        def structure_iteration(structure_dict: dict) -> dict:
+            print_message(f"Structural parameters: {structure_dict}")
+            process_model = None
+
+            def inner_iteration(inner_dict: dict) -> dict:
+                nonlocal process_model
+                response = self._hyperopt_iteration(structure_dict | inner_dict, process_model)
+                process_model = response["process_model_path"]
+                return response
+
+            inner_trials = Trials()
+            # Discover the process model in the first candidate, and evaluate the rest only if it succeeded (and there
+            # is budget left)
+            for max_evals in [1, num_inner_iterations]:
+                fmin(
+                    fn=inner_iteration,
+                    space=inner_space,
+                    algo=tpe.suggest,
+                    max_evals=max_evals,
+                    trials=inner_trials,
+                    show_progressbar=False,
+                )
+                if process_model is None or self._budget_exhausted():
+                    break
+
+            # Output directories of the inner iterations, whose measurements are checkpointed with the outer trial
+            inner_dirs = [output_dir for result in inner_trials.results for output_dir in iteration_dirs(result)]
+            best_points = promoted_points(inner_trials, 1)
+            if len(best_points) == 0:
+                return {"loss": 1.0, "status": STATUS_FAIL, ITERATION_DIRS_KEY: inner_dirs}
+            best_result = min(
+                [result for result in inner_trials.results if result["status"] == STATUS_OK],
+                key=lambda result: result["loss"],
+            )
+            return best_result | {"inner_point": best_points[0], ITERATION_DIRS_KEY: inner_dirs}
+
+        best_structure = parallel_fmin(
+            fn=structure_iteration,
+            space=structure_space,
+            max_evals=max(1, math.ceil(self.settings.num_iterations / num_inner_iterations)),
+            trials=self._bayes_trials,
+            max_parallel_trials=self.max_parallel_trials,
+            algo=self._warm_start_algo(structure_space),
+            on_trial_done=self._save_checkpoint,
+            stop=self._budget_exhausted,
+        )
+        return best_structure | self._bayes_trials.best_trial["result"]["inner_point"]
+
     def cleanup(self):
         remove_asset(self.base_directory)
 
@@ -340,8 +752,13 @@ class ControlFlowOptimizer:
     def _process_measurements(self, params: HyperoptIterationParams, status, evaluation_measurements):
         optimization_parameters = params.to_dict()
         optimization_parameters["status"] = status
+        optimization_parameters["fidelity"] = self._fidelity
+        optimization_parameters["discovery_memo_hit"] = self._iteration_state.process_model_memo_hit
+        optimization_parameters["discovery_memo_hit_rate"] = self._process_model_memo.hit_rate
+        optimization_parameters["structure_fingerprint"] = self._iteration_state.structure_fingerprint
+        optimization_parameters["duplicate_structure"] = self._iteration_state.duplicate_structure
 
-        if status == STATUS_OK:
+        if status in [STATUS_OK, STATUS_SCREENED]:
             for measurement in evaluation_measurements:
                 values = {
                     "distance": measurement["distance"],
@@ -357,48 +774,215 @@ class ControlFlowOptimizer:
             values = values | optimization_parameters
             self.evaluation_measurements = pd.concat([self.evaluation_measurements, pd.DataFrame([values])])
 
+    def _print_cache_statistics(self):
+        if self._need_to_discover_model:
+            print_message(
+                f"Process discovery memo: {self._process_model_memo.hits} process models reused, "
+                f"{self._process_model_memo.misses} discovered"
+            )
+        print_message(
+            f"Variant replays: {self.replay_cache.hits} reused, "
+            f"{self.replay_cache.misses} replayed on the process models"
+        )
+        if self.settings.discover_branch_rules:
+            print_message(
+                f"Branch rules: {self.branch_rules_cache.hits} reused, "
+                f"{self.branch_rules_cache.misses} learned for the process models"
+            )
+
     def _discover_process_model(self, params: HyperoptIterationParams) -> Path:
-        print_step(f"Discovering Process Model with {params.mining_algorithm.value}")
         output_model_path = get_process_model_path(params.output_dir, self.event_log.process_name)
-        discover_process_model(self._xes_train_log_path, output_model_path, params)
+        memoized_model_path = self._process_model_memo.get(self._xes_train_log_path, params)
+        self._iteration_state.process_model_memo_hit = memoized_model_path is not None
+        if memoized_model_path is not None:
+            # Already discovered with the same parameters, reuse it
+            print_step(f"Reusing Process Model discovered with the same parameters: {memoized_model_path}")
+            shutil.copyfile(memoized_model_path, output_model_path)
+        else:
+            print_step(f"Discovering Process Model with {params.mining_algorithm.value}")
+            discover_process_model(self._xes_train_log_path, output_model_path, params, self._split_miner_service)
+            self._process_model_memo.put(self._xes_train_log_path, params, output_model_path)
         return output_model_path
 
+    def _structure_key(self, process_model: Path, params: HyperoptIterationParams) -> tuple:
+        """
+        Key identifying the evaluation of a candidate: the structural fingerprint of its process model (independent of
+        the element IDs), and the parameters not related to the structure (gateway probabilities method, f-score of
+        the branch rules, and fidelity of the evaluation).
+        """
+        self._iteration_state.structure_fingerprint = bpmn_fingerprint(self._bpmn_graph(process_model))
+        return (
+            self._iteration_state.structure_fingerprint,
+            params.gateway_probabilities_method.value,
+            params.f_score if self.settings.discover_branch_rules else None,
+            self._fidelity,
+        )
+
+    def _bpmn_graph(self, process_model: Path) -> BPMNGraph:
+        """
+        Graph of the BPMN model in [process_model], parsed only once for all the steps (and iterations) using it.
+        """
+        if self._parsed_process_model is None or self._parsed_process_model[0] != process_model:
+            self._parsed_process_model = (process_model, BPMNGraph.from_bpmn_path(process_model))
+        return self._parsed_process_model[1]
+
+    def _surrogate_features(
+        self, process_model: Path, gateway_probabilities: List[GatewayProbabilities]
+    ) -> List[float]:
+        """
+        Features of a candidate for the surrogate model: precision and recall of its [process_model] w.r.t. the
+        directly-follows graph of the training log, and mean entropy of its [gateway_probabilities].
+        """
+        if self._log_dfg is None:
+            self._log_dfg = log_dfg(self.event_log.train_variants())
+        precision, recall = dfg_precision_recall(self._bpmn_graph(process_model), self._log_dfg)
+        return [precision, recall, gateway_entropy(gateway_probabilities)]
+
+    def _fit_surrogate(self) -> Optional[LossSurrogate]:
+        """
+        Surrogate model fitted on the candidates simulated so far in the search (in the current rung), or None if
+        screening is disabled or there are not enough of them.
+        """
+        if not self.settings.screening:
+            return None
+        return LossSurrogate.from_results(self._bayes_trials.results)
+
+    def _screen(self, features: List[float]) -> Optional[float]:
+        """
+        Predicted loss of the candidate with [features] if the surrogate model screens it out, or None if it has to be
+        simulated.
+        """
+        surrogate, incumbent_loss = self._fit_surrogate(), get_incumbent_loss(self._bayes_trials)
+        if self._queued_incumbent_loss is not None or self._queued_surrogate is not None:
+            # Evaluating an iteration queued in a trial store, whose trials are not in this copy of the optimizer
+            surrogate, incumbent_loss = self._queued_surrogate, self._queued_incumbent_loss
+        if surrogate is None or incumbent_loss is None:
+            return None
+        return surrogate.screened_loss(features, incumbent_loss, self.settings.screening_margin)
+
     def _discover_branch_rules(self, process_model: Path, params: HyperoptIterationParams) -> List[BranchRules]:
         print_step(f"Discovering branch rules with f_score {params.f_score}")
-        bpmn_graph = BPMNGraph.from_bpmn_path(process_model)
         return discover_branch_rules(
-            bpmn_graph,
+            self._bpmn_graph(process_model),
             self.event_log.train_partition,
             self.event_log.log_ids,
-            f_score=params.f_score
+            f_score=params.f_score,
+            replay_cache=self.replay_cache,
+            rules_cache=self.branch_rules_cache,
         )
 
     def _discover_gateway_probabilities(
         self, process_model: Path, gateway_probabilities_method: GatewayProbabilitiesDiscoveryMethod
     ) -> List[GatewayProbabilities]:
         print_step(f"Computing gateway probabilities with {gateway_probabilities_method}")
-        bpmn_graph = BPMNGraph.from_bpmn_path(process_model)
-        return compute_gateway_probabilities(
-            event_log=self.event_log.train_partition,
-            log_ids=self.event_log.log_ids,
-            bpmn_graph=bpmn_graph,
-            discovery_method=gateway_probabilities_method,
+        return self.replay_cache.gateway_probabilities(
+            self._bpmn_graph(process_model), self.event_log.train_variants(), gateway_probabilities_method
         )
 
     def _simulate_bps_model(self, bps_model: BPSModel, output_dir: Path) -> List[dict]:
         bps_model.replace_activity_names_with_ids()
 
         json_parameters_path = bps_model.to_json(output_dir, self.event_log.process_name)
-        evaluation_measures = simulate_and_evaluate(
-            process_model_path=bps_model.process_model,
-            parameters_path=json_parameters_path,
-            output_dir=output_dir,
-            simulation_cases=self.event_log.validation_partition[self.event_log.log_ids.case].nunique(),
-            simulation_start_time=self.event_log.validation_partition[self.event_log.log_ids.start_time].min(),
-            validation_log=self.event_log.validation_partition,
-            validation_log_ids=self.event_log.log_ids,
-            metrics=[self.settings.optimization_metric],
-            num_simulations=self.settings.num_evaluations_per_iteration,
+        simulation_cases = self.event_log.validation_partition[self.event_log.log_ids.case].nunique()
+        validation_cases = None
+        if self._fidelity < 1.0:
+            # Low-fidelity evaluation, simulate as many cases as the first ones of the validation partition
+            simulation_cases = validation_cases = max(1, math.ceil(simulation_cases * self._fidelity))
+        validation_log = self.event_log.shared_validation_partition(validation_cases)
+        reference_profile = self.event_log.validation_profile(
+            [self.settings.optimization_metric], self.metric_engine, self.approximate_dl, validation_cases
         )
+        stop_early = self._racing_rule()
+
+        # Let the other iterations proceed while this one waits for its simulations
+        with released(self._iteration_lock):
+            evaluation_measures = simulate_and_evaluate(
+                process_model_path=bps_model.process_model,
+                parameters_path=json_parameters_path,
+                output_dir=output_dir,
+                simulation_cases=simulation_cases,
+                simulation_start_time=self.event_log.validation_partition[self.event_log.log_ids.start_time].min(),
+                validation_log=validation_log,
+                validation_log_ids=self.event_log.log_ids,
+                metrics=[self.settings.optimization_metric],
+                num_simulations=self.settings.num_evaluations_per_iteration,
+                pool=self.simulation_pool,
+                reference_profile=reference_profile,
+                stop_early=stop_early,
+                cache=self.simulation_cache,
+                seed=self.seed,
+            )
 
         return evaluation_measures
+
+    def _start_rung(self, fidelity: float, trials: Trials):
+        """
+        Sets the fidelity and trials of the next rung of the successive halving search.
+        """
+        print_subsection(f"Successive halving rung simulating {fidelity:.0%} of the validation cases")
+        self._fidelity = fidelity
+        self._bayes_trials = trials
+        if not any(trials is rung_trials for rung_trials in self._search_trials):
+            # (the trials of a rung resumed from the checkpoint are already in them)
+            self._search_trials.append(trials)
+        if self.trial_store is not None:
+            # The queued iterations are evaluated with the fidelity of the new rung
+            self._publish_stage()
+
+    def _resume_search(self) -> List[Trials]:
+        """
+        Restores the measurements of the search saved in the checkpoint (if any), returning its trials (one per rung
+        in a multi-fidelity search), or an empty list if there is nothing to resume.
+        """
+        checkpoint = self.checkpoint.load() if self.checkpoint is not None else None
+        if checkpoint is None:
+            return []
+        trials, self.evaluation_measurements, self.iteration_index = checkpoint
+        num_trials = sum(len(rung_trials.trials) for rung_trials in trials)
+        print_message(f"Resuming the search from {num_trials} finished trials")
+        return trials
+
+    def _warm_start_algo(self, space: dict) -> Callable:
+        """
+        Suggestion algorithm of the search of [space]: TPE, after proposing the best candidates of the previous run to
+        warm-start from (if any).
+        """
+        if self.warm_start_path is None:
+            return tpe.suggest
+        points = prior_points(
+            self.warm_start_path,
+            space,
+            self.num_warm_start_points,
+            # (the measurements record the gateway probabilities method under another name)
+            columns={"gateway_probabilities_method": "gateway_probabilities"},
+        )
+        print_message(f"Warm-starting the search with {len(points)} candidates of a previous run")
+        return replay_suggest(points, algo=tpe.suggest)
+
+    def _budget_exhausted(self) -> bool:
+        """
+        Whether the share of the time budget of the run allotted to the search (if any) is spent.
+        """
+        return self.budget is not None and self.budget.exhausted()
+
+    def _save_checkpoint(self, trials: Trials):
+        """
+        Saves the trials of the search in the checkpoint (if any), once [trials] (of the current rung) changed.
+        """
+        if self.checkpoint is not None:
+            self.checkpoint.save(self._search_trials, self.evaluation_measurements, self.iteration_index)
+
+    def _racing_rule(self) -> Optional[Callable[[List[dict]], bool]]:
+        """
+        Stopping rule to abandon the replicas of a candidate once they show it cannot beat the best trial so far, or
+        None if racing is disabled or there is no successful trial yet.
+        """
+        incumbent_loss = get_incumbent_loss(self._bayes_trials)
+        if self._queued_incumbent_loss is not None:
+            # Evaluating an iteration queued in a trial store, whose trials are not in this copy of the optimizer
+            incumbent_loss = self._queued_incumbent_loss
+        if not self.settings.racing or incumbent_loss is None:
+            return None
+        return lambda measurements: cannot_beat_incumbent(
+            [measurement["distance"] for measurement in measurements], incumbent_loss
+        )
@@ -0,0 +1,260 @@
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from pix_framework.discovery.gateway_conditions.replayer import Trace
+from pix_framework.discovery.gateway_conditions.trace_processing import (
+    is_event_in_bpmn_model,
+    is_trace_event_start_or_end,
+    sort_by_completion_times,
+)
+from pix_framework.discovery.gateway_probabilities import (
+    GatewayProbabilities,
+    GatewayProbabilitiesDiscoveryMethod,
+    PathProbability,
+)
+from pix_framework.io.bpm_graph import BPMNGraph
+
+from ..event_log.variants import VariantIndex
+
+# Maximum number of process models whose replays are kept by default
+DEFAULT_MAX_MODELS = 16
+
+# Decisions taken in the gateways when replaying a variant: for each gateway, its type, its outgoing flows, and the
+# flows taken in each of its activations with the index of the activity instance whose attributes were current then
+# (None if no activity instance was fired yet), and the index of the last fired activity instance
+GatewayDecisions = Tuple[Dict[str, Tuple[object, list, List[Tuple[Tuple[str, ...], Optional[int]]]]], Optional[int]]
+
+
+@dataclass
+class _ModelReplays:
+    # Frequency of each sequence flow when replaying each variant (activity instances ordered by start)
+    arc_frequencies: Dict[Tuple[str, ...], Dict[str, int]]
+    # Gateway decisions when replaying each variant (activity instances ordered by completion)
+    gateway_decisions: Dict[Tuple[str, ...], GatewayDecisions]
+
+
+@dataclass(frozen=True)
+class _ReplayedEvent:
+    # Activity instance passed to the replay, with the index of the instance instead of its attributes
+    started_at: object
+    completed_at: object
+    attributes: int
+
+
+class ReplayCache:
+    """
+    Cache of the replays of the variants of an event log (its distinct sequences of activities) on process models.
+
+    Replaying a case on a process model depends only on its sequence of activities, so each variant is replayed once
+    per process model, and its result is scaled by the number of cases following it: the frequencies of the sequence
+    flows (to discover the gateway probabilities), and the decisions taken in the gateways (to discover the branch
+    rules, combining them with the data attributes of each case). The process models are identified by their content,
+    so the same model in another file (e.g., the best model of the optimization copied to the final one) reuses its
+    replays.
+
+    The replays are performed on the given :class:`pix_framework.io.bpm_graph.BPMNGraph`, leaving no gateway states
+    accumulated in it.
+
+    Attributes
+    ----------
+    max_models : int
+        Maximum number of process models whose replays are kept (the least recently used are dropped).
+    hits : int
+        Number of variants whose replay was reused.
+    misses : int
+        Number of variants replayed.
+    """
+
+    max_models: int
+    hits: int
+    misses: int
+    _replays: "OrderedDict[str, _ModelReplays]"
+
+    def __init__(self, max_models: int = DEFAULT_MAX_MODELS):
+        self.max_models = max_models
+        self.hits = 0
+        self.misses = 0
+        self._replays = OrderedDict()
+
+    def gateway_probabilities(
+        self,
+        bpmn_graph: BPMNGraph,
+        variants: VariantIndex,
+        discovery_method: GatewayProbabilitiesDiscoveryMethod = GatewayProbabilitiesDiscoveryMethod.DISCOVERY,
+    ) -> List[GatewayProbabilities]:
+        """
+        Computes the gateway probabilities of [bpmn_graph], as
+        :func:`pix_framework.discovery.gateway_probabilities.compute_gateway_probabilities` does with the cases of
+        [variants].
+
+        Parameters
+        ----------
+        bpmn_graph : :class:`pix_framework.io.bpm_graph.BPMNGraph`
+            Graph of the process model.
+        variants : :class:`~simod.event_log.variants.VariantIndex`
+            Variants of the event log to discover the probabilities from.
+        discovery_method : :class:`GatewayProbabilitiesDiscoveryMethod`
+            Method to compute the probabilities (equiprobable branches, or discovered by replaying the variants).
+
+        Returns
+        -------
+        List[:class:`GatewayProbabilities`]
+            Probabilities of the outgoing flows of each gateway.
+        """
+        if discovery_method is GatewayProbabilitiesDiscoveryMethod.EQUIPROBABLE:
+            gateway_probabilities = bpmn_graph.compute_equiprobable_gateway_probabilities()
+        elif discovery_method is GatewayProbabilitiesDiscoveryMethod.DISCOVERY:
+            gateway_probabilities = bpmn_graph.discover_gateway_probabilities(
+                self.arc_frequencies(bpmn_graph, variants)
+            )
+        else:
+            raise ValueError(f"Unknown gateway probabilities discovery method: {discovery_method}")
+
+        return [
+            GatewayProbabilities(
+                gateway_id,
+                [PathProbability(flow_id, probability) for flow_id, probability in path_probabilities.items()],
+            )
+            for gateway_id, path_probabilities in gateway_probabilities.items()
+        ]
+
+    def arc_frequencies(self, bpmn_graph: BPMNGraph, variants: VariantIndex) -> Dict[str, int]:
+        """
+        Frequency of each sequence flow of [bpmn_graph] when replaying the cases of [variants] on it.
+        """
+        replays = self._model_replays(bpmn_graph).arc_frequencies
+        arc_frequencies = {}
+        for sequence, count in zip(variants.sequences, variants.counts):
+            if sequence in replays:
+                self.hits += 1
+            else:
+                self.misses += 1
+                replays[sequence] = {}
+                bpmn_graph.replay_trace(list(sequence), replays[sequence])
+                bpmn_graph.gateway_states = {}
+            for flow_id, frequency in replays[sequence].items():
+                arc_frequencies[flow_id] = arc_frequencies.get(flow_id, 0) + frequency * count
+        return arc_frequencies
+
+    def gateway_states(self, bpmn_graph: BPMNGraph, log_traces: list) -> dict:
+        """
+        Decisions taken in the gateways of [bpmn_graph] when replaying [log_traces], with the data attributes of the
+        case at each decision, as accumulated in :meth:`pix_framework.io.bpm_graph.BPMNGraph.get_gateway_states` when
+        processing the traces to discover the branch rules.
+
+        Parameters
+        ----------
+        bpmn_graph : :class:`pix_framework.io.bpm_graph.BPMNGraph`
+            Graph of the process model.
+        log_traces : list
+            Traces of the event log (as parsed by
+            :func:`pix_framework.discovery.gateway_conditions.replayer.parse_dataframe`).
+
+        Returns
+        -------
+        dict
+            For each gateway, its type, outgoing flows, and the decisions taken in it with the attributes of the case.
+        """
+        replays = self._model_replays(bpmn_graph).gateway_decisions
+        gateway_states = {}
+        # As in the replay of the graph, the decisions before firing any activity instance get the last attributes
+        previous_attributes = {}
+        for trace in log_traces:
+            trace_info = _activity_instances(trace, bpmn_graph)
+            if len(trace_info.event_list) == 0:
+                continue
+            sequence = tuple(sort_by_completion_times(trace_info))
+            if sequence in replays:
+                self.hits += 1
+            else:
+                self.misses += 1
+                replays[sequence] = _replay_gateway_decisions(bpmn_graph, trace_info)
+            gateway_decisions, last_index = replays[sequence]
+            for gateway_id, (gateway_type, outgoing_flows, decisions) in gateway_decisions.items():
+                if gateway_id not in gateway_states:
+                    gateway_states[gateway_id] = {
+                        "type": gateway_type,
+                        "decisions": [],
+                        "outgoing_flows": outgoing_flows,
+                        "attributes": [],
+                    }
+                for decision, event_index in decisions:
+                    gateway_states[gateway_id]["decisions"].append(list(decision))
+                    gateway_states[gateway_id]["attributes"].append(
+                        trace_info.event_list[event_index].attributes
+                        if event_index is not None
+                        else previous_attributes
+                    )
+            if last_index is not None:
+                previous_attributes = trace_info.event_list[last_index].attributes
+        return gateway_states
+
+    def _model_replays(self, bpmn_graph: BPMNGraph) -> _ModelReplays:
+        key = model_key(bpmn_graph)
+        if key in self._replays:
+            self._replays.move_to_end(key)
+        else:
+            self._replays[key] = _ModelReplays(arc_frequencies={}, gateway_decisions={})
+            while len(self._replays) > self.max_models:
+                self._replays.popitem(last=False)
+        return self._replays[key]
+
+
+def model_key(bpmn_graph: BPMNGraph) -> str:
+    """
+    Identifier of the content of [bpmn_graph] (its elements and sequence flows, with their IDs).
+    """
+    elements = sorted(f"{element.id}\0{element.type}\0{element.name}" for element in bpmn_graph.element_info.values())
+    flows = sorted(f"{flow_id}\0{source}\0{target}" for flow_id, (source, target) in bpmn_graph.flow_arcs.items())
+    return hashlib.sha256("\n".join(elements + ["|"] + flows).encode("utf-8")).hexdigest()
+
+
+def _activity_instances(trace: list, bpmn_graph: BPMNGraph) -> Trace:
+    """
+    Complete activity instances of [trace] (events of tasks of [bpmn_graph] with start and end), with the data
+    attributes of their events, as built by
+    :func:`pix_framework.discovery.gateway_conditions.trace_processing.process_traces`.
+    """
+    trace_info = Trace(trace.attributes["concept:name"])
+    started_events = {}
+    for event in trace:
+        if is_trace_event_start_or_end(event, bpmn_graph) or not is_event_in_bpmn_model(event, bpmn_graph):
+            continue
+        state = event["lifecycle:transition"].lower()
+        task_name = event["concept:name"]
+        attributes = event.get("attributes", {})
+        if state in ["start", "assign"]:
+            started_events[task_name] = trace_info.start_event(
+                task_name, task_name, event["time:timestamp"], "None", attributes=attributes
+            )
+        elif state == "complete" and task_name in started_events:
+            trace_info.complete_event(started_events.pop(task_name), event["time:timestamp"], attributes=attributes)
+    trace_info.filter_incomplete_events()
+    return trace_info
+
+
+def _replay_gateway_decisions(bpmn_graph: BPMNGraph, trace_info: Trace) -> GatewayDecisions:
+    """
+    Replays the activity instances of [trace_info] (sorted by completion) on [bpmn_graph], recording the decisions
+    taken in each gateway with the index of the activity instance whose attributes were current at that point.
+    """
+    # The graph records the attributes of the last fired activity instance, replay their indexes instead
+    events = [
+        _ReplayedEvent(started_at=event.started_at, completed_at=event.completed_at, attributes=index)
+        for index, event in enumerate(trace_info.event_list)
+    ]
+    bpmn_graph.gateway_states, bpmn_graph.current_attributes = {}, None
+    bpmn_graph.replay_trace([event.task_id for event in trace_info.event_list], {}, True, events)
+    gateway_decisions = {
+        gateway_id: (
+            state["type"],
+            state["outgoing_flows"],
+            [(tuple(decision), event_index) for decision, event_index in zip(state["decisions"], state["attributes"])],
+        )
+        for gateway_id, state in bpmn_graph.gateway_states.items()
+    }
+    last_index = bpmn_graph.current_attributes
+    bpmn_graph.gateway_states, bpmn_graph.current_attributes = {}, {}
+    return gateway_decisions, last_index
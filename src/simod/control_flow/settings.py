@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from decimal import Decimal
 from pathlib import Path
 from typing import Optional
 
@@ -108,8 +109,12 @@ class HyperoptIterationParams:
         output_dir: Path,
         provided_model_path: Optional[Path],
         project_name: str,
+        discovery_parameters_step: Optional[float] = None,
     ) -> "HyperoptIterationParams":
-        """Create the params for this run from the hyperopt dictionary returned by the fmin function."""
+        """
+        Create the params for this run from the hyperopt dictionary returned by the fmin function, rounding epsilon and
+        eta to multiples of [discovery_parameters_step] (if provided).
+        """
         gateway_probabilities_method = GatewayProbabilitiesDiscoveryMethod.from_str(
             hyperopt_dict["gateway_probabilities_method"]
         )
@@ -125,6 +130,10 @@ class HyperoptIterationParams:
             elif mining_algorithm == ProcessModelDiscoveryAlgorithm.SPLIT_MINER_V2:
                 epsilon = hyperopt_dict["epsilon"]
 
+        if discovery_parameters_step is not None:
+            epsilon = quantize(epsilon, discovery_parameters_step)
+            eta = quantize(eta, discovery_parameters_step)
+
         f_score = hyperopt_dict.get("f_score", None)
 
         return HyperoptIterationParams(
@@ -140,3 +149,11 @@ class HyperoptIterationParams:
             replace_or_joins=replace_or_joins,
             f_score=f_score
         )
+
+
+def quantize(value: Optional[float], step: float) -> Optional[float]:
+    """Rounds [value] to the closest multiple of [step] (without floating-point residue), or None if it is None."""
+    if value is None or step <= 0:
+        return value
+    decimals = max(0, -Decimal(str(step)).normalize().as_tuple().exponent)
+    return round(round(value / step) * step, decimals)
@@ -1,12 +1,17 @@
+import weakref
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 from pix_framework.io.event_log import DEFAULT_XES_IDS, EventLogIDs, read_csv_log
 from pix_framework.io.event_log import split_log_training_validation_trace_wise as split_log
 
 from .preprocessor import Preprocessor
+from .shared_partition import SharedEventLogPartition
 from .utilities import convert_df_to_xes
+from .variants import VariantIndex
+from ..metrics import ReferenceLogProfile
+from ..settings.common_settings import Metric, MetricEngine
 from ..settings.preprocessing_settings import PreprocessingSettings
 from ..utilities import get_process_name_from_log_path
 
@@ -41,6 +46,11 @@ class EventLog:
     test_partition: pd.DataFrame
     log_ids: EventLogIDs
     process_name: str  # a name of the process that is used mainly for file names
+    _shared_partitions: Dict[str, SharedEventLogPartition]  # partitions exported to be shared with workers
+    # precomputed metric profiles, by partition, metrics, engine, and DL approximation
+    _reference_profiles: Dict[Tuple[str, Tuple[Metric, ...], MetricEngine, bool], ReferenceLogProfile]
+    _first_validation_cases: Dict[int, pd.DataFrame]  # validation partition with shortened horizons, by cases
+    _variant_indexes: Dict[str, VariantIndex]  # variants of the partitions, by partition
 
     def __init__(
         self,
@@ -62,6 +72,13 @@ class EventLog:
         else:
             self.process_name = "business_process"
 
+        self._shared_partitions = {}
+        self._reference_profiles = {}
+        self._first_validation_cases = {}
+        self._variant_indexes = {}
+        # Remove the exported partitions (if any) when this instance is garbage collected or the interpreter exits
+        weakref.finalize(self, _remove_shared_partitions, self._shared_partitions)
+
     @staticmethod
     def from_path(
         train_log_path: Path,
@@ -150,6 +167,180 @@ class EventLog:
             process_name=get_process_name_from_log_path(train_log_path) if process_name is None else process_name,
         )
 
+    def shared_validation_partition(self, num_cases: Optional[int] = None) -> SharedEventLogPartition:
+        """
+        Exports the validation partition to be shared with the simulation workers (only the first time it is
+        requested, later calls reuse the exported one).
+
+        Parameters
+        ----------
+        num_cases : int, optional
+            If provided, export only the first [num_cases] cases (by start time) of the validation partition.
+
+        Returns
+        -------
+        :class:`~simod.event_log.shared_partition.SharedEventLogPartition`
+            Reference to the exported validation partition.
+        """
+        if num_cases is None:
+            return self._get_shared_partition("validation", self.validation_partition)
+        return self._get_shared_partition(f"validation_{num_cases}", self.first_validation_cases(num_cases))
+
+    def shared_test_partition(self) -> SharedEventLogPartition:
+        """
+        Exports the test partition to be shared with the simulation workers (only the first time it is requested,
+        later calls reuse the exported one).
+
+        Returns
+        -------
+        :class:`~simod.event_log.shared_partition.SharedEventLogPartition`
+            Reference to the exported test partition.
+        """
+        return self._get_shared_partition("test", self.test_partition)
+
+    def validation_profile(
+        self,
+        metrics: List[Metric],
+        engine: MetricEngine = MetricEngine.LOG_DISTANCE_MEASURES,
+        approximate_dl: bool = False,
+        num_cases: Optional[int] = None,
+    ) -> ReferenceLogProfile:
+        """
+        Computes the side of the validation partition in the given metrics (only the first time it is requested for
+        these metrics, later calls reuse the computed one).
+
+        Parameters
+        ----------
+        metrics : List[:class:`~simod.settings.common_settings.Metric`]
+            Metrics to compute the profile for.
+        engine : :class:`~simod.settings.common_settings.MetricEngine`
+            Implementation used to compute the metrics.
+        approximate_dl : bool
+            Whether to compute the approximated control-flow log distance instead of the exact one.
+        num_cases : int, optional
+            If provided, compute the profile of the first [num_cases] cases (by start time) of the validation
+            partition.
+
+        Returns
+        -------
+        :class:`~simod.metrics.ReferenceLogProfile`
+            Profile of the validation partition.
+        """
+        if num_cases is None:
+            return self._get_reference_profile("validation", self.validation_partition, metrics, engine, approximate_dl)
+        return self._get_reference_profile(
+            f"validation_{num_cases}", self.first_validation_cases(num_cases), metrics, engine, approximate_dl
+        )
+
+    def first_validation_cases(self, num_cases: int) -> pd.DataFrame:
+        """
+        Subset of the validation partition with its first [num_cases] cases (by start time), i.e., the validation
+        partition with a shortened horizon, used to evaluate low-fidelity simulations of [num_cases] cases.
+
+        Parameters
+        ----------
+        num_cases : int
+            Number of cases to keep.
+
+        Returns
+        -------
+        :class:`pandas.DataFrame`
+            Events of the first [num_cases] cases of the validation partition.
+        """
+        if num_cases not in self._first_validation_cases:
+            case_starts = self.validation_partition.groupby(self.log_ids.case)[self.log_ids.start_time].min()
+            first_cases = case_starts.sort_values(kind="stable").index[:num_cases]
+            self._first_validation_cases[num_cases] = self.validation_partition[
+                self.validation_partition[self.log_ids.case].isin(first_cases)
+            ]
+        return self._first_validation_cases[num_cases]
+
+    def test_profile(
+        self, metrics: List[Metric], engine: MetricEngine = MetricEngine.LOG_DISTANCE_MEASURES
+    ) -> ReferenceLogProfile:
+        """
+        Computes the side of the test partition in the given metrics (only the first time it is requested for these
+        metrics, later calls reuse the computed one).
+
+        Parameters
+        ----------
+        metrics : List[:class:`~simod.settings.common_settings.Metric`]
+            Metrics to compute the profile for.
+        engine : :class:`~simod.settings.common_settings.MetricEngine`
+            Implementation used to compute the metrics.
+
+        Returns
+        -------
+        :class:`~simod.metrics.ReferenceLogProfile`
+            Profile of the test partition.
+        """
+        return self._get_reference_profile("test", self.test_partition, metrics, engine, False)
+
+    def train_variants(self) -> VariantIndex:
+        """
+        Computes the variants of the training partition (only the first time it is requested, later calls reuse the
+        computed one).
+
+        Returns
+        -------
+        :class:`~simod.event_log.variants.VariantIndex`
+            Variants of the training partition, with the cases following each of them.
+        """
+        return self._get_variant_index("train", self.train_partition)
+
+    def train_validation_variants(self) -> VariantIndex:
+        """
+        Computes the variants of the training+validation partition (only the first time it is requested, later calls
+        reuse the computed one).
+
+        Returns
+        -------
+        :class:`~simod.event_log.variants.VariantIndex`
+            Variants of the training+validation partition, with the cases following each of them.
+        """
+        return self._get_variant_index("train_validation", self.train_validation_partition)
+
+    def __getstate__(self) -> dict:
+        # The exported partitions are files of this process (and node), the unpickled copy exports its own
+        return self.__dict__ | {"_shared_partitions": {}}
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        weakref.finalize(self, _remove_shared_partitions, self._shared_partitions)
+
+    def release_shared_partitions(self):
+        """
+        Removes the files of the partitions exported to be shared with the simulation workers.
+        """
+        _remove_shared_partitions(self._shared_partitions)
+
+    def _get_shared_partition(self, name: str, partition: pd.DataFrame) -> SharedEventLogPartition:
+        if name not in self._shared_partitions:
+            self._shared_partitions[name] = SharedEventLogPartition.export(
+                partition, self.log_ids, f"{self.process_name}_{name}"
+            )
+        return self._shared_partitions[name]
+
+    def _get_reference_profile(
+        self,
+        name: str,
+        partition: pd.DataFrame,
+        metrics: List[Metric],
+        engine: MetricEngine,
+        approximate_dl: bool,
+    ) -> ReferenceLogProfile:
+        key = (name, tuple(metrics), engine, approximate_dl)
+        if key not in self._reference_profiles:
+            self._reference_profiles[key] = ReferenceLogProfile.from_event_log(
+                partition, self.log_ids, metrics, engine, approximate_dl
+            )
+        return self._reference_profiles[key]
+
+    def _get_variant_index(self, name: str, partition: pd.DataFrame) -> VariantIndex:
+        if name not in self._variant_indexes:
+            self._variant_indexes[name] = VariantIndex.from_event_log(partition, self.log_ids)
+        return self._variant_indexes[name]
+
     def train_to_xes(self, path: Path):
         """
         Saves the training log to an XES file.
@@ -195,6 +386,12 @@ class EventLog:
         write_xes(self.test_partition, self.log_ids, path)
 
 
+def _remove_shared_partitions(shared_partitions: Dict[str, SharedEventLogPartition]):
+    for shared_partition in shared_partitions.values():
+        shared_partition.remove()
+    shared_partitions.clear()
+
+
 def write_xes(
     log: pd.DataFrame,
     log_ids: EventLogIDs,
@@ -223,6 +420,8 @@ def write_xes(
         ]
     ]
 
-    df.fillna("UNDEFINED", inplace=True)
+    # Missing labels are written as such, and the events with missing timestamps are omitted
+    labels = ["case:concept:name", "concept:name", "org:resource"]
+    df = df.assign(**{label: df[label].where(df[label].notna(), "UNDEFINED") for label in labels})
 
     convert_df_to_xes(df, DEFAULT_XES_IDS, output_path)
@@ -0,0 +1,93 @@
+import hashlib
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+from pix_framework.io.event_log import EventLogIDs
+
+SHARED_MEMORY_DIR = Path("/dev/shm")
+
+
+@dataclass(frozen=True)
+class SharedEventLogPartition:
+    """
+    Reference to an event log partition exported to an Arrow IPC file, so it can be sent to the simulation workers
+    as a lightweight handle instead of pickling the whole DataFrame in each task.
+
+    The file is written in shared memory (``/dev/shm``) when available, and in the temporary directory otherwise.
+    Each worker memory-maps the file and keeps the loaded partition in a small per-process cache, so the partition is
+    transferred once per worker instead of once per replica and iteration.
+
+    Attributes
+    ----------
+    path : :class:`pathlib.Path`
+        Path to the Arrow IPC file storing the partition.
+    digest : str
+        SHA-256 digest of the exported content, identifying the partition (e.g., in the keys of the simulation cache).
+    """
+
+    path: Path
+    digest: str = ""
+
+    @staticmethod
+    def export(event_log: pd.DataFrame, log_ids: EventLogIDs, name: str) -> "SharedEventLogPartition":
+        """
+        Exports the columns of [event_log] used to evaluate simulated logs (case, activity, start/end times, and
+        resource) to an Arrow IPC file.
+
+        Parameters
+        ----------
+        event_log : :class:`pandas.DataFrame`
+            Event log partition to export.
+        log_ids : :class:`EventLogIDs`
+            Identifiers for mapping column names in the event log.
+        name : str
+            Name used as prefix of the exported file.
+
+        Returns
+        -------
+        :class:`SharedEventLogPartition`
+            Reference to the exported partition.
+        """
+        columns = [log_ids.case, log_ids.activity, log_ids.start_time, log_ids.end_time, log_ids.resource]
+        table = pa.Table.from_pandas(event_log[columns], preserve_index=False)
+        path = _get_shared_directory() / f"simod_{name}_{uuid.uuid4().hex}.arrow"
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        return SharedEventLogPartition(path=path, digest=hashlib.sha256(path.read_bytes()).hexdigest())
+
+    def load(self) -> pd.DataFrame:
+        """
+        Loads the partition as a DataFrame, reusing the one already loaded in this process if any.
+
+        Returns
+        -------
+        :class:`pandas.DataFrame`
+            Event log partition.
+        """
+        return _read_shared_partition(str(self.path))
+
+    def remove(self):
+        """
+        Removes the exported file. Processes that already loaded the partition keep their copy.
+        """
+        self.path.unlink(missing_ok=True)
+
+
+@lru_cache(maxsize=4)
+def _read_shared_partition(path: str) -> pd.DataFrame:
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+
+def _get_shared_directory() -> Path:
+    if SHARED_MEMORY_DIR.is_dir() and os.access(SHARED_MEMORY_DIR, os.W_OK):
+        return SHARED_MEMORY_DIR
+    return Path(tempfile.gettempdir())
@@ -0,0 +1,61 @@
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import pandas as pd
+from pix_framework.io.event_log import EventLogIDs
+
+
+@dataclass(frozen=True)
+class VariantIndex:
+    """
+    Index of the variants of an event log, i.e., its distinct sequences of activities (the activity instances of each
+    case ordered by start and end time, the order in which they are replayed on a process model), with the cases
+    following each of them.
+
+    Most event logs have a few hundred variants for thousands of cases, so the computations that depend only on the
+    sequence of activities of each case (e.g., the replay of the cases on a process model) can be performed once per
+    variant and scaled by its number of cases.
+
+    Attributes
+    ----------
+    sequences : List[Tuple[str, ...]]
+        Sequence of activities of each variant.
+    case_ids : List[list]
+        IDs of the cases following each variant (in the same order as [sequences]).
+    """
+
+    sequences: List[Tuple[str, ...]]
+    case_ids: List[list]
+
+    @staticmethod
+    def from_event_log(event_log: pd.DataFrame, log_ids: EventLogIDs) -> "VariantIndex":
+        """
+        Builds the variant index of [event_log].
+
+        Parameters
+        ----------
+        event_log : :class:`pandas.DataFrame`
+            Event log to index.
+        log_ids : :class:`EventLogIDs`
+            Identifiers for mapping column names in the event log.
+
+        Returns
+        -------
+        :class:`VariantIndex`
+            Variants of [event_log], in order of appearance of their first case.
+        """
+        # Stable sort, so the activity instances with the same start and end keep their order in the log
+        sorted_log = event_log.sort_values([log_ids.start_time, log_ids.end_time], kind="stable")
+        case_sequences = sorted_log.groupby(log_ids.case, sort=False)[log_ids.activity].agg(tuple)
+        variants: Dict[Tuple[str, ...], list] = {}
+        for case_id, sequence in case_sequences.items():
+            variants.setdefault(sequence, []).append(case_id)
+        return VariantIndex(sequences=list(variants.keys()), case_ids=list(variants.values()))
+
+    @property
+    def counts(self) -> List[int]:
+        """Number of cases following each variant."""
+        return [len(case_ids) for case_ids in self.case_ids]
+
+    def __len__(self) -> int:
+        return len(self.sequences)
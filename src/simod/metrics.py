@@ -1,6 +1,13 @@
 import datetime
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import cached_property
+from statistics import mean
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
+from jellyfish import damerau_levenshtein_distance
 from log_distance_measures.absolute_event_distribution import (
     absolute_event_distribution_distance,
     discretize_to_hour,
@@ -18,29 +25,100 @@ from log_distance_measures.cycle_time_distribution import (
 from log_distance_measures.n_gram_distribution import n_gram_distribution_distance
 from log_distance_measures.relative_event_distribution import relative_event_distribution_distance
 from pix_framework.io.event_log import EventLogIDs
+from scipy.optimize import linear_sum_assignment
+from scipy.stats import wasserstein_distance
 
-from simod.settings.common_settings import Metric
+from simod.native_metrics import (
+    EncodedEventLog,
+    approximate_control_flow_log_distance,
+    native_distance,
+    native_distances,
+)
+from simod.settings.common_settings import Metric, MetricEngine
+
+HOUR = np.int64(3600 * 10**9)  # One hour in nanoseconds
+
+
+def compute_metrics(
+    metrics: List[Metric],
+    original_log: Optional[pd.DataFrame],
+    original_log_ids: EventLogIDs,
+    simulated_log: pd.DataFrame,
+    simulated_log_ids: EventLogIDs,
+    reference_profile: Optional["ReferenceLogProfile"] = None,
+    engine: MetricEngine = MetricEngine.LOG_DISTANCE_MEASURES,
+) -> Dict[Metric, float]:
+    """Computes several distances between an original (test) event log and a simulated one.
+
+    The metrics covered by [reference_profile], and all of them with the native engine, are computed in a single pass
+    over the simulated log (sorting and grouping it once and sharing the intermediate structures among metrics). The
+    rest are computed one by one with :func:`compute_metric`.
+
+    :param metrics: The metrics to compute.
+    :param original_log: Original event log. Can be None if [reference_profile] covers all [metrics].
+    :param original_log_ids: Column names of the original event log.
+    :param simulated_log: Simulated event log.
+    :param simulated_log_ids: Column names of the simulated event log.
+    :param reference_profile: Precomputed profile of the original event log.
+    :param engine: Implementation used to compute the metrics not covered by [reference_profile].
+
+    :return: The computed distance for each metric.
+    """
+    covered_metrics = [
+        metric for metric in metrics if reference_profile is not None and metric in reference_profile.metrics
+    ]
+    remaining_metrics = [metric for metric in metrics if metric not in covered_metrics]
+
+    results = {}
+    if len(covered_metrics) > 0:
+        results.update(reference_profile.distances(covered_metrics, simulated_log, simulated_log_ids))
+    if len(remaining_metrics) > 0 and engine is MetricEngine.NATIVE:
+        results.update(
+            native_distances(
+                remaining_metrics,
+                EncodedEventLog.from_event_log(original_log, original_log_ids),
+                EncodedEventLog.from_event_log(simulated_log, simulated_log_ids),
+            )
+        )
+    elif len(remaining_metrics) > 0:
+        for metric in remaining_metrics:
+            results[metric] = compute_metric(metric, original_log, original_log_ids, simulated_log, simulated_log_ids)
+
+    return {metric: results[metric] for metric in metrics}
 
 
 def compute_metric(
     metric: Metric,
-    original_log: pd.DataFrame,
+    original_log: Optional[pd.DataFrame],
     original_log_ids: EventLogIDs,
     simulated_log: pd.DataFrame,
     simulated_log_ids: EventLogIDs,
+    reference_profile: Optional["ReferenceLogProfile"] = None,
+    engine: MetricEngine = MetricEngine.LOG_DISTANCE_MEASURES,
 ) -> float:
     """Computes the distance between an original (test) event log and a simulated one.
 
     :param metric: The metric to compute.
-    :param original_log: Original event log.
+    :param original_log: Original event log. Can be None if [reference_profile] covers [metric].
     :param original_log_ids: Column names of the original event log.
     :param simulated_log: Simulated event log.
     :param simulated_log_ids: Column names of the simulated event log.
+    :param reference_profile: Precomputed profile of the original event log. If it covers [metric], only the simulated
+    side of the distance is computed (with the engine of the profile).
+    :param engine: Implementation used to compute the metric when it is not covered by [reference_profile].
 
     :return: The computed metric.
     """
 
-    if metric is Metric.DL:
+    if reference_profile is not None and metric in reference_profile.metrics:
+        result = reference_profile.distance(metric, simulated_log, simulated_log_ids)
+    elif engine is MetricEngine.NATIVE:
+        result = native_distance(
+            metric,
+            EncodedEventLog.from_event_log(original_log, original_log_ids),
+            EncodedEventLog.from_event_log(simulated_log, simulated_log_ids),
+        )
+    elif metric is Metric.DL:
         result = get_dl(original_log, original_log_ids, simulated_log, simulated_log_ids)
     elif metric is Metric.TWO_GRAM_DISTANCE:
         result = get_n_grams_distribution_distance(original_log, original_log_ids, simulated_log, simulated_log_ids, 2)
@@ -206,3 +284,393 @@ def get_dl(
 ) -> float:
     cfld = control_flow_log_distance(original_log, original_log_ids, simulated_log, simulated_log_ids, True)
     return cfld
+
+
+@dataclass
+class ReferenceLogProfile:
+    """
+    Precomputed side of the original (reference) event log in each of the distance metrics.
+
+    The original log does not change across the simulations evaluated against it, so the structures that each metric
+    extracts from it (activity sequences, n-gram histograms, discretized timestamps, cycle times, etc.) are computed
+    once and reused, computing only the simulated side of the distance for each simulated log. The distances are the
+    same as the ones computed by ``log_distance_measures``.
+
+    With the native engine, the profile stores the integer-encoded original log instead (see
+    :class:`~simod.native_metrics.EncodedEventLog`), and each simulated log is encoded and compared with it.
+
+    Attributes
+    ----------
+    metrics : List[:class:`~simod.settings.common_settings.Metric`]
+        Metrics covered by this profile.
+    engine : :class:`~simod.settings.common_settings.MetricEngine`
+        Implementation used to compute the distances.
+    encoded_log : :class:`~simod.native_metrics.EncodedEventLog`, optional
+        Encoded original log (only with the native engine).
+    approximate_dl : bool
+        Whether to compute the approximated control-flow log distance (see
+        :func:`~simod.native_metrics.approximate_control_flow_log_distance`) instead of the exact one. Meant for the
+        optimization iterations, the final evaluation uses the exact distance.
+    activity_sequences : List[Tuple[str, ...]], optional
+        Sequence of activities of each case (for the control-flow log distance).
+    n_grams : Dict[int, :class:`collections.Counter`]
+        Histogram of the n-grams (as tuples of activity labels) of the log, for each n.
+    first_start : int, optional
+        First start time of the log, in nanoseconds (for the absolute event distribution).
+    event_timestamps : :class:`numpy.ndarray`, optional
+        Start and end times of the events, in nanoseconds (for the absolute event distribution).
+    circadian_hours : Dict[int, :class:`numpy.ndarray`], optional
+        Hour of each start and end time for each day of the week (for the circadian event distribution).
+    workforce : Dict[int, Dict[int, float]], optional
+        Average number of active resources per hour for each day of the week (for the circadian workforce
+        distribution).
+    arrivals : :class:`numpy.ndarray`, optional
+        Arrival time of each case, in nanoseconds (for the case arrival distribution).
+    relative_hours : :class:`numpy.ndarray`, optional
+        Start and end times relative to the start of their case, discretized by hour (for the relative event
+        distribution).
+    cycle_times : :class:`numpy.ndarray`, optional
+        Cycle time of each case, in nanoseconds (for the cycle time distribution).
+    """
+
+    metrics: List[Metric]
+    engine: MetricEngine = MetricEngine.LOG_DISTANCE_MEASURES
+    encoded_log: Optional[EncodedEventLog] = None
+    approximate_dl: bool = False
+    activity_sequences: Optional[List[Tuple[str, ...]]] = None
+    n_grams: Dict[int, Counter] = field(default_factory=dict)
+    first_start: Optional[int] = None
+    event_timestamps: Optional[np.ndarray] = None
+    circadian_hours: Optional[Dict[int, np.ndarray]] = None
+    workforce: Optional[Dict[int, Dict[int, float]]] = None
+    arrivals: Optional[np.ndarray] = None
+    relative_hours: Optional[np.ndarray] = None
+    cycle_times: Optional[np.ndarray] = None
+
+    @staticmethod
+    def from_event_log(
+        event_log: pd.DataFrame,
+        log_ids: EventLogIDs,
+        metrics: List[Metric],
+        engine: MetricEngine = MetricEngine.LOG_DISTANCE_MEASURES,
+        approximate_dl: bool = False,
+    ) -> "ReferenceLogProfile":
+        """
+        Computes the original side of the specified metrics for the given event log.
+
+        Parameters
+        ----------
+        event_log : :class:`pandas.DataFrame`
+            Original (reference) event log.
+        log_ids : :class:`EventLogIDs`
+            Column names of the event log.
+        metrics : List[:class:`~simod.settings.common_settings.Metric`]
+            Metrics to precompute the original side of.
+        engine : :class:`~simod.settings.common_settings.MetricEngine`
+            Implementation used to compute the distances.
+        approximate_dl : bool
+            Whether to compute the approximated control-flow log distance instead of the exact one.
+
+        Returns
+        -------
+        :class:`ReferenceLogProfile`
+            Profile of the event log for the specified metrics.
+        """
+        profile = ReferenceLogProfile(
+            metrics=list(dict.fromkeys(metrics)), engine=engine, approximate_dl=approximate_dl
+        )
+        if engine is MetricEngine.NATIVE:
+            profile.encoded_log = EncodedEventLog.from_event_log(event_log, log_ids)
+            profile.encoded_log.prepare(profile.metrics)
+            return profile
+
+        prepared_log = _PreparedEventLog(event_log, log_ids)
+        for metric in profile.metrics:
+            if metric is Metric.DL:
+                profile.activity_sequences = prepared_log.activity_sequences
+            elif metric is Metric.TWO_GRAM_DISTANCE:
+                profile.n_grams[2] = _n_gram_histogram(prepared_log, 2)
+            elif metric is Metric.THREE_GRAM_DISTANCE:
+                profile.n_grams[3] = _n_gram_histogram(prepared_log, 3)
+            elif metric is Metric.CIRCADIAN_EMD:
+                profile.circadian_hours = _circadian_hours(prepared_log)
+            elif metric is Metric.CIRCADIAN_WORKFORCE_EMD:
+                profile.workforce = _circadian_workforce(prepared_log)
+            elif metric is Metric.ARRIVAL_EMD:
+                profile.arrivals = _arrival_times(prepared_log)
+            elif metric is Metric.RELATIVE_EMD:
+                profile.relative_hours = _relative_hours(prepared_log)
+            elif metric is Metric.ABSOLUTE_EMD:
+                profile.first_start = prepared_log.starts.min()
+                profile.event_timestamps = _event_timestamps(prepared_log)
+            elif metric is Metric.CYCLE_TIME_EMD:
+                profile.cycle_times = _cycle_times(prepared_log)
+            else:
+                raise ValueError(f"Unsupported metric: {metric}")
+        return profile
+
+    def distance(self, metric: Metric, simulated_log: pd.DataFrame, simulated_log_ids: EventLogIDs) -> float:
+        """
+        Computes the distance between the profiled (original) event log and a simulated one.
+
+        Parameters
+        ----------
+        metric : :class:`~simod.settings.common_settings.Metric`
+            Metric to compute, must be one of the metrics covered by this profile.
+        simulated_log : :class:`pandas.DataFrame`
+            Simulated event log.
+        simulated_log_ids : :class:`EventLogIDs`
+            Column names of the simulated event log.
+
+        Returns
+        -------
+        float
+            The computed distance.
+        """
+        return self.distances([metric], simulated_log, simulated_log_ids)[metric]
+
+    def distances(
+        self, metrics: List[Metric], simulated_log: pd.DataFrame, simulated_log_ids: EventLogIDs
+    ) -> Dict[Metric, float]:
+        """
+        Computes several distances between the profiled (original) event log and a simulated one, processing the
+        simulated log only once: it is sorted and grouped by case a single time, and the intermediate structures
+        shared by several metrics (traces, case start and end times, hourly instants) are reused.
+
+        Parameters
+        ----------
+        metrics : List[:class:`~simod.settings.common_settings.Metric`]
+            Metrics to compute, must be covered by this profile.
+        simulated_log : :class:`pandas.DataFrame`
+            Simulated event log.
+        simulated_log_ids : :class:`EventLogIDs`
+            Column names of the simulated event log.
+
+        Returns
+        -------
+        Dict[:class:`~simod.settings.common_settings.Metric`, float]
+            The computed distance for each metric.
+        """
+        for metric in metrics:
+            if metric not in self.metrics:
+                raise ValueError(f"Metric {metric} not covered by this reference profile ({self.metrics})")
+
+        if self.engine is MetricEngine.NATIVE:
+            encoded_log = EncodedEventLog.from_event_log(simulated_log, simulated_log_ids)
+            return native_distances(metrics, self.encoded_log, encoded_log, self.approximate_dl)
+
+        prepared_log = _PreparedEventLog(simulated_log, simulated_log_ids)
+        return {metric: self._distance(metric, prepared_log) for metric in metrics}
+
+    def _distance(self, metric: Metric, simulated: "_PreparedEventLog") -> float:
+        if metric is Metric.DL and self.approximate_dl:
+            result = _approximate_control_flow_log_distance(self.activity_sequences, simulated.activity_sequences)
+        elif metric is Metric.DL:
+            result = _control_flow_log_distance(self.activity_sequences, simulated.activity_sequences)
+        elif metric is Metric.TWO_GRAM_DISTANCE:
+            result = _n_gram_distance(self.n_grams[2], _n_gram_histogram(simulated, 2))
+        elif metric is Metric.THREE_GRAM_DISTANCE:
+            result = _n_gram_distance(self.n_grams[3], _n_gram_histogram(simulated, 3))
+        elif metric is Metric.CIRCADIAN_EMD:
+            result = _circadian_distance(self.circadian_hours, _circadian_hours(simulated))
+        elif metric is Metric.CIRCADIAN_WORKFORCE_EMD:
+            result = _workforce_distance(self.workforce, _circadian_workforce(simulated))
+        elif metric is Metric.ARRIVAL_EMD:
+            result = _anchored_hourly_distance(self.arrivals, _arrival_times(simulated))
+        elif metric is Metric.RELATIVE_EMD:
+            result = wasserstein_distance(self.relative_hours, _relative_hours(simulated))
+        elif metric is Metric.ABSOLUTE_EMD:
+            result = _anchored_hourly_distance(
+                self.event_timestamps,
+                _event_timestamps(simulated),
+                anchor=min(self.first_start, simulated.starts.min()),
+            )
+        elif metric is Metric.CYCLE_TIME_EMD:
+            result = _anchored_hourly_distance(self.cycle_times, _cycle_times(simulated), floor_anchor=False)
+        else:
+            raise ValueError(f"Unsupported metric: {metric}")
+
+        return result
+
+
+def _to_nanoseconds(timestamps: pd.Series) -> np.ndarray:
+    return timestamps.dt.as_unit("ns").astype("int64").to_numpy()
+
+
+class _PreparedEventLog:
+    """
+    Event log sorted once by case, start and end time (the order in which ``log_distance_measures`` builds each trace),
+    with the intermediate structures shared by several metrics computed on first use.
+    """
+
+    def __init__(self, event_log: pd.DataFrame, log_ids: EventLogIDs):
+        self.log_ids = log_ids
+        self.event_log = event_log.sort_values([log_ids.case, log_ids.start_time, log_ids.end_time], kind="stable")
+
+    @cached_property
+    def activity_sequences(self) -> List[Tuple[str, ...]]:
+        cases = self.event_log.groupby(self.log_ids.case)[self.log_ids.activity]
+        return [tuple(activities) for _, activities in cases]
+
+    @cached_property
+    def starts(self) -> np.ndarray:
+        return _to_nanoseconds(self.event_log[self.log_ids.start_time])
+
+    @cached_property
+    def ends(self) -> np.ndarray:
+        return _to_nanoseconds(self.event_log[self.log_ids.end_time])
+
+    @cached_property
+    def case_starts(self) -> pd.Series:
+        return self.event_log.groupby(self.log_ids.case)[self.log_ids.start_time].min()
+
+    @cached_property
+    def case_ends(self) -> pd.Series:
+        return self.event_log.groupby(self.log_ids.case)[self.log_ids.end_time].max()
+
+    @cached_property
+    def instants(self) -> pd.DataFrame:
+        # Start and end times with their resource, weekday, and hour
+        log_ids = self.log_ids
+        instants = pd.concat(
+            [
+                self.event_log[[log_ids.start_time, log_ids.resource]].rename(columns={log_ids.start_time: "instant"}),
+                self.event_log[[log_ids.end_time, log_ids.resource]].rename(columns={log_ids.end_time: "instant"}),
+            ]
+        )
+        instants["weekday"] = instants["instant"].dt.dayofweek
+        instants["hour"] = instants["instant"].dt.hour
+        return instants
+
+
+def _n_gram_histogram(event_log: _PreparedEventLog, n: int) -> Counter:
+    n_grams = Counter()
+    padding = (None,) * (n - 1)
+    for sequence in event_log.activity_sequences:
+        trace = padding + sequence + padding
+        n_grams.update(trace[i : i + n] for i in range(len(trace) - n + 1))
+    return n_grams
+
+
+def _event_timestamps(event_log: _PreparedEventLog) -> np.ndarray:
+    return np.concatenate([event_log.starts, event_log.ends])
+
+
+def _circadian_hours(event_log: _PreparedEventLog) -> Dict[int, np.ndarray]:
+    weekdays, hours = event_log.instants["weekday"].to_numpy(), event_log.instants["hour"].to_numpy()
+    return {week_day: hours[weekdays == week_day] for week_day in range(7)}
+
+
+def _circadian_workforce(event_log: _PreparedEventLog) -> Dict[int, Dict[int, float]]:
+    instants = event_log.instants.copy()
+    instants["day"] = instants["instant"].dt.floor("D")
+    instants["day_hour"] = instants["instant"].dt.floor("h")
+    # Number of observed Mondays, Tuesdays...
+    days = instants[["day", "weekday"]].drop_duplicates().groupby("weekday").size()
+    # Average number of active resources per weekday and hour
+    active_instants = instants.drop_duplicates(subset=["day_hour", event_log.log_ids.resource])
+    active = active_instants.groupby(["weekday", "hour"]).size()
+    workforce = {}
+    for (week_day, hour), num_resources in active.items():
+        workforce.setdefault(week_day, {})[hour] = num_resources / days[week_day]
+    return workforce
+
+
+def _arrival_times(event_log: _PreparedEventLog) -> np.ndarray:
+    return _to_nanoseconds(event_log.case_starts)
+
+
+def _relative_hours(event_log: _PreparedEventLog) -> np.ndarray:
+    case_starts = _to_nanoseconds(event_log.case_starts.reindex(event_log.event_log[event_log.log_ids.case]))
+    return np.concatenate([event_log.starts - case_starts, event_log.ends - case_starts]) // HOUR
+
+
+def _cycle_times(event_log: _PreparedEventLog) -> np.ndarray:
+    return _to_nanoseconds(event_log.case_ends) - _to_nanoseconds(event_log.case_starts)
+
+
+def _anchored_hourly_distance(
+    original: np.ndarray, simulated: np.ndarray, anchor: Optional[int] = None, floor_anchor: bool = True
+) -> float:
+    """
+    Wasserstein distance between two sets of instants (or durations) discretized by hour, taking as reference the
+    [anchor] (by default, the minimum of both sets), floored to the hour if [floor_anchor].
+    """
+    if anchor is None:
+        anchor = min(original.min(), simulated.min())
+    if floor_anchor:
+        anchor = anchor // HOUR * HOUR
+    return wasserstein_distance((original - anchor) // HOUR, (simulated - anchor) // HOUR)
+
+
+def _n_gram_distance(original: Counter, simulated: Counter) -> float:
+    n_grams = set(original) | set(simulated)
+    distance = sum(abs(original[n_gram] - simulated[n_gram]) for n_gram in n_grams)
+    return distance / (sum(original.values()) + sum(simulated.values()))
+
+
+def _circadian_distance(original: Dict[int, np.ndarray], simulated: Dict[int, np.ndarray]) -> float:
+    distances = []
+    for week_day in range(7):
+        original_window, simulated_window = original[week_day], simulated[week_day]
+        if len(original_window) > 0 and len(simulated_window) > 0:
+            distances += [wasserstein_distance(original_window, simulated_window)]
+        elif len(original_window) == 0 and len(simulated_window) == 0:
+            distances += [0.0]
+        else:
+            distances += [23.0]  # Maximum distance between two histograms with values between 0 and 23
+    return mean(distances)
+
+
+def _workforce_distance(original: Dict[int, Dict[int, float]], simulated: Dict[int, Dict[int, float]]) -> float:
+    distances = []
+    for week_day in range(7):
+        original_window, simulated_window = original.get(week_day, {}), simulated.get(week_day, {})
+        if len(original_window) > 0 and len(simulated_window) > 0:
+            distances += [
+                wasserstein_distance(
+                    [hour for hour, workforce in original_window.items() for _ in range(int(workforce * 100))],
+                    [hour for hour, workforce in simulated_window.items() for _ in range(int(workforce * 100))],
+                )
+            ]
+        elif len(original_window) == 0 and len(simulated_window) == 0:
+            distances += [0.0]
+        else:
+            distances += [23.0]  # Maximum distance between two histograms with values between 0 and 23
+    return mean(distances)
+
+
+def _to_character_sequences(
+    original: List[Tuple[str, ...]], simulated: List[Tuple[str, ...]]
+) -> Tuple[List[str], List[str]]:
+    # Map each activity to a single character to compute the Damerau-Levenshtein distance over strings
+    activities = {activity for sequence in original + simulated for activity in sequence}
+    mapping = {activity: chr(0x100 + index) for index, activity in enumerate(sorted(activities, key=str))}
+    original = ["".join(mapping[activity] for activity in sequence) for sequence in original]
+    simulated = ["".join(mapping[activity] for activity in sequence) for sequence in simulated]
+    return original, simulated
+
+
+def _approximate_control_flow_log_distance(original: List[Tuple[str, ...]], simulated: List[Tuple[str, ...]]) -> float:
+    original_variants, simulated_variants = (
+        Counter(sequences) for sequences in _to_character_sequences(original, simulated)
+    )
+    return approximate_control_flow_log_distance(
+        list(original_variants.keys()),
+        np.array(list(original_variants.values())),
+        list(simulated_variants.keys()),
+        np.array(list(simulated_variants.values())),
+    ).distance
+
+
+def _control_flow_log_distance(original: List[Tuple[str, ...]], simulated: List[Tuple[str, ...]]) -> float:
+    original, simulated = _to_character_sequences(original, simulated)
+    # Normalized distance between each pair of traces, and optimal pairing
+    cost_matrix = np.array(
+        [
+            [damerau_levenshtein_distance(trace_1, trace_2) / max(len(trace_1), len(trace_2)) for trace_2 in simulated]
+            for trace_1 in original
+        ]
+    )
+    row_indexes, col_indexes = linear_sum_assignment(cost_matrix)
+    return mean([cost_matrix[i_1, i_2] for i_1, i_2 in zip(row_indexes, col_indexes)])
@@ -0,0 +1,551 @@
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from jellyfish import damerau_levenshtein_distance
+from pix_framework.io.event_log import EventLogIDs
+from scipy.optimize import linear_sum_assignment
+
+from simod.settings.common_settings import Metric
+
+HOUR = np.int64(3600 * 10**9)  # One hour in nanoseconds
+N_GRAM_CODE_BITS = 21  # Bits used by each activity code in the hash of an n-gram (up to ~2M activities with n <= 3)
+APPROXIMATE_DL_CUTOFF = 0.5  # Normalized distance above which variant pairs are not compared in the approximate DL
+
+
+@dataclass
+class EncodedEventLog:
+    """
+    Integer-encoded representation of an event log, used by the native metric engine to compute the distance metrics
+    with vectorized NumPy operations instead of the row-wise pandas processing of ``log_distance_measures``.
+
+    The events are sorted by case, and by start and end time within each case (the same order in which
+    ``log_distance_measures`` builds the traces), so each case is a contiguous slice of the arrays.
+
+    Attributes
+    ----------
+    case_bounds : :class:`numpy.ndarray`
+        Index of the first event of each case, followed by the total number of events.
+    activities : :class:`numpy.ndarray`
+        Code of the activity of each event (starting at 1, code 0 is reserved for the padding of the n-grams).
+    activity_labels : :class:`numpy.ndarray`
+        Label of each activity code (the label of the code ``c`` is in the position ``c - 1``).
+    resources : :class:`numpy.ndarray`
+        Code of the resource of each event.
+    starts : :class:`numpy.ndarray`
+        Start time of each event, in nanoseconds since the epoch.
+    ends : :class:`numpy.ndarray`
+        End time of each event, in nanoseconds since the epoch.
+    start_hours : :class:`numpy.ndarray`
+        Hour (in local time, counted from the epoch) in which each event started.
+    end_hours : :class:`numpy.ndarray`
+        Hour (in local time, counted from the epoch) in which each event ended.
+
+    Notes
+    -----
+    The intermediate structures derived from the arrays (case start and end times, hourly histograms, n-gram
+    histograms, trace variants) are computed on first use and kept in the instance, so evaluating several metrics
+    over the same log processes it only once.
+    """
+
+    case_bounds: np.ndarray
+    activities: np.ndarray
+    activity_labels: np.ndarray
+    resources: np.ndarray
+    starts: np.ndarray
+    ends: np.ndarray
+    start_hours: np.ndarray
+    end_hours: np.ndarray
+    _n_gram_histograms: Dict[int, Tuple[np.ndarray, np.ndarray]] = field(default_factory=dict, repr=False)
+
+    @staticmethod
+    def from_event_log(event_log: pd.DataFrame, log_ids: EventLogIDs) -> "EncodedEventLog":
+        """
+        Encodes the columns of the event log used by the distance metrics.
+
+        Parameters
+        ----------
+        event_log : :class:`pandas.DataFrame`
+            Event log to encode.
+        log_ids : :class:`EventLogIDs`
+            Column names of the event log.
+
+        Returns
+        -------
+        :class:`EncodedEventLog`
+            Encoded event log.
+        """
+        cases, _ = pd.factorize(event_log[log_ids.case], sort=True)
+        activities, activity_labels = pd.factorize(event_log[log_ids.activity])
+        resources, _ = pd.factorize(event_log[log_ids.resource])
+        starts = _to_nanoseconds(event_log[log_ids.start_time])
+        ends = _to_nanoseconds(event_log[log_ids.end_time])
+        # Stable sort by case, start and end (ties keep the original order, as in the per-case sort of pandas)
+        order = np.lexsort((ends, starts, cases))
+        cases = cases[order]
+        case_bounds = np.concatenate([[0], np.flatnonzero(np.diff(cases)) + 1, [len(cases)]])
+        return EncodedEventLog(
+            case_bounds=case_bounds,
+            activities=activities[order].astype(np.int64) + 1,
+            activity_labels=np.asarray(activity_labels, dtype=object),
+            resources=resources[order].astype(np.int64),
+            starts=starts[order],
+            ends=ends[order],
+            start_hours=(_to_local_nanoseconds(event_log[log_ids.start_time])[order] // HOUR),
+            end_hours=(_to_local_nanoseconds(event_log[log_ids.end_time])[order] // HOUR),
+        )
+
+    @cached_property
+    def case_sizes(self) -> np.ndarray:
+        return np.diff(self.case_bounds)
+
+    @cached_property
+    def case_starts(self) -> np.ndarray:
+        return np.minimum.reduceat(self.starts, self.case_bounds[:-1])
+
+    @cached_property
+    def case_ends(self) -> np.ndarray:
+        return np.maximum.reduceat(self.ends, self.case_bounds[:-1])
+
+    @cached_property
+    def relative_hours(self) -> np.ndarray:
+        # Start and end times relative to the start of their case, discretized by hour
+        case_starts = np.repeat(self.case_starts, self.case_sizes)
+        return np.concatenate([self.starts - case_starts, self.ends - case_starts]) // HOUR
+
+    @cached_property
+    def circadian_histograms(self) -> np.ndarray:
+        # Number of start and end times in each hour of each day of the week (7 x 24)
+        weekdays, hours = _weekdays_and_hours(np.concatenate([self.start_hours, self.end_hours]))
+        return np.bincount(weekdays * 24 + hours, minlength=7 * 24).reshape(7, 24)
+
+    @cached_property
+    def workforce_histograms(self) -> np.ndarray:
+        # Average number of active resources in each hour of each day of the week (7 x 24), scaled by 100 and
+        # truncated as in log_distance_measures
+        instant_hours = np.concatenate([self.start_hours, self.end_hours])
+        resources = np.concatenate([self.resources, self.resources])
+        # Number of observed Mondays, Tuesdays...
+        num_days = np.bincount((np.unique(instant_hours // 24) + 3) % 7, minlength=7)
+        # Number of different resources active in each day-hour, aggregated by weekday and hour
+        num_resource_codes = resources.max() + 2
+        active_hours = np.unique(instant_hours * num_resource_codes + resources + 1) // num_resource_codes
+        weekdays, hours = _weekdays_and_hours(active_hours)
+        active = np.bincount(weekdays * 24 + hours, minlength=7 * 24).reshape(7, 24)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            workforce = np.where(active > 0, active / num_days[:, np.newaxis], 0.0)
+        return (workforce * 100).astype(np.int64)
+
+    @cached_property
+    def variants(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Unique traces (activity codes mapped to single characters) and the variant of each case
+        events = np.array([_code_to_char(code) for code in range(len(self.activity_labels) + 1)], dtype=object)
+        events = events[self.activities]
+        traces = np.array(
+            ["".join(events[start:end]) for start, end in zip(self.case_bounds[:-1], self.case_bounds[1:])],
+            dtype=object,
+        )
+        return np.unique(traces, return_inverse=True)
+
+    def n_gram_histogram(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Histogram of the n-grams of the log, as the hash of each observed n-gram and its frequency.
+        """
+        if n not in self._n_gram_histograms:
+            self._n_gram_histograms[n] = np.unique(
+                _n_gram_hashes(self.case_bounds, self.activities, n), return_counts=True
+            )
+        return self._n_gram_histograms[n]
+
+    def prepare(self, metrics: List[Metric]):
+        """
+        Computes the intermediate structures needed by [metrics], e.g., before sending this log to other processes.
+        """
+        for metric in metrics:
+            if metric is Metric.DL:
+                _ = self.variants
+            elif metric is Metric.TWO_GRAM_DISTANCE:
+                self.n_gram_histogram(2)
+            elif metric is Metric.THREE_GRAM_DISTANCE:
+                self.n_gram_histogram(3)
+            elif metric is Metric.CIRCADIAN_EMD:
+                _ = self.circadian_histograms
+            elif metric is Metric.CIRCADIAN_WORKFORCE_EMD:
+                _ = self.workforce_histograms
+            elif metric is Metric.RELATIVE_EMD:
+                _ = self.relative_hours
+            elif metric in [Metric.ARRIVAL_EMD, Metric.CYCLE_TIME_EMD]:
+                _ = self.case_starts, self.case_ends
+
+
+def native_distances(
+    metrics: List[Metric], original: EncodedEventLog, simulated: EncodedEventLog, approximate_dl: bool = False
+) -> Dict[Metric, float]:
+    """
+    Computes several distances between two encoded event logs, reusing the intermediate structures shared by the
+    metrics (see :class:`EncodedEventLog`).
+
+    Parameters
+    ----------
+    metrics : List[:class:`~simod.settings.common_settings.Metric`]
+        Metrics to compute.
+    original : :class:`EncodedEventLog`
+        Original (reference) event log.
+    simulated : :class:`EncodedEventLog`
+        Simulated event log.
+    approximate_dl : bool
+        Whether to compute the approximated control-flow log distance (see
+        :func:`approximate_control_flow_log_distance`) instead of the exact one.
+
+    Returns
+    -------
+    Dict[:class:`~simod.settings.common_settings.Metric`, float]
+        The computed distance for each metric.
+    """
+    return {metric: native_distance(metric, original, simulated, approximate_dl) for metric in metrics}
+
+
+def native_distance(
+    metric: Metric, original: EncodedEventLog, simulated: EncodedEventLog, approximate_dl: bool = False
+) -> float:
+    """
+    Computes the distance between two encoded event logs. The results are the same as the ones computed by
+    ``log_distance_measures`` (up to floating-point rounding), except for the approximated control-flow log distance.
+
+    Parameters
+    ----------
+    metric : :class:`~simod.settings.common_settings.Metric`
+        Metric to compute.
+    original : :class:`EncodedEventLog`
+        Original (reference) event log.
+    simulated : :class:`EncodedEventLog`
+        Simulated event log.
+    approximate_dl : bool
+        Whether to compute the approximated control-flow log distance (see
+        :func:`approximate_control_flow_log_distance`) instead of the exact one.
+
+    Returns
+    -------
+    float
+        The computed distance.
+    """
+    if metric is Metric.DL and approximate_dl:
+        result = _approximate_control_flow_log_distance(original, simulated)
+    elif metric is Metric.DL:
+        result = _control_flow_log_distance(original, simulated)
+    elif metric is Metric.TWO_GRAM_DISTANCE:
+        result = _n_gram_distance(original, simulated, 2)
+    elif metric is Metric.THREE_GRAM_DISTANCE:
+        result = _n_gram_distance(original, simulated, 3)
+    elif metric is Metric.CIRCADIAN_EMD:
+        result = _circadian_distance(original, simulated)
+    elif metric is Metric.CIRCADIAN_WORKFORCE_EMD:
+        result = _workforce_distance(original, simulated)
+    elif metric is Metric.ARRIVAL_EMD:
+        original_arrivals, simulated_arrivals = original.case_starts, simulated.case_starts
+        anchor = min(original_arrivals.min(), simulated_arrivals.min()) // HOUR * HOUR
+        result = _integer_wasserstein((original_arrivals - anchor) // HOUR, (simulated_arrivals - anchor) // HOUR)
+    elif metric is Metric.RELATIVE_EMD:
+        result = _integer_wasserstein(original.relative_hours, simulated.relative_hours)
+    elif metric is Metric.ABSOLUTE_EMD:
+        anchor = min(original.starts.min(), simulated.starts.min()) // HOUR * HOUR
+        result = _integer_wasserstein(
+            (np.concatenate([original.starts, original.ends]) - anchor) // HOUR,
+            (np.concatenate([simulated.starts, simulated.ends]) - anchor) // HOUR,
+        )
+    elif metric is Metric.CYCLE_TIME_EMD:
+        original_cycle_times = original.case_ends - original.case_starts
+        simulated_cycle_times = simulated.case_ends - simulated.case_starts
+        anchor = min(original_cycle_times.min(), simulated_cycle_times.min())
+        result = _integer_wasserstein((original_cycle_times - anchor) // HOUR, (simulated_cycle_times - anchor) // HOUR)
+    else:
+        raise ValueError(f"Unsupported metric: {metric}")
+
+    return result
+
+
+def _to_nanoseconds(timestamps: pd.Series) -> np.ndarray:
+    return timestamps.dt.as_unit("ns").astype("int64").to_numpy()
+
+
+def _to_local_nanoseconds(timestamps: pd.Series) -> np.ndarray:
+    # Wall-clock time, to get the same weekdays and hours as the timestamps in their own timezone
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_localize(None)
+    return _to_nanoseconds(timestamps)
+
+
+def _weekdays_and_hours(hours: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # The epoch (1970-01-01) was a Thursday (weekday 3)
+    return (hours // 24 + 3) % 7, hours % 24
+
+
+def _histogram_wasserstein(u_weights: np.ndarray, v_weights: np.ndarray) -> float:
+    """
+    1-D Wasserstein distance between two histograms over the same consecutive integer bins, as the area between their
+    cumulative distribution functions.
+    """
+    u_cdf = np.cumsum(u_weights) / u_weights.sum()
+    v_cdf = np.cumsum(v_weights) / v_weights.sum()
+    return float(np.abs(u_cdf - v_cdf)[:-1].sum())
+
+
+def _integer_wasserstein(u_values: np.ndarray, v_values: np.ndarray) -> float:
+    """
+    1-D Wasserstein distance between two samples of integer values (e.g., discretized timestamps).
+    """
+    offset = min(u_values.min(), v_values.min())
+    num_bins = max(u_values.max(), v_values.max()) - offset + 1
+    return _histogram_wasserstein(
+        np.bincount(u_values - offset, minlength=num_bins), np.bincount(v_values - offset, minlength=num_bins)
+    )
+
+
+def _code_to_char(code: int) -> str:
+    # Single character for each activity code, to compute the Damerau-Levenshtein distance over strings
+    return chr(0x100 + code)
+
+
+def _activity_alignment(original: EncodedEventLog, simulated: EncodedEventLog) -> np.ndarray:
+    """
+    Mapping from the activity codes of the simulated log to the codes of the original one (new codes for the
+    activities not present in the original log). Position 0 (padding) is mapped to itself.
+    """
+    codes = {label: code for code, label in enumerate(original.activity_labels, start=1)}
+    for label in simulated.activity_labels:
+        codes.setdefault(label, len(codes) + 1)
+    return np.array([0] + [codes[label] for label in simulated.activity_labels], dtype=np.int64)
+
+
+def _n_gram_hashes(case_bounds: np.ndarray, activities: np.ndarray, n: int) -> np.ndarray:
+    """
+    Hash of each n-gram of the log (each case padded with n-1 zeros at the beginning and end), computed as a rolling
+    combination of the activity codes in the window.
+    """
+    num_cases, case_sizes = len(case_bounds) - 1, np.diff(case_bounds)
+    # Padded sequence, where the case i starts at position case_bounds[i] + 2 * i * (n - 1)
+    padding_offsets = np.repeat(np.arange(num_cases) * 2 * (n - 1) + (n - 1), case_sizes)
+    padded = np.zeros(len(activities) + 2 * (n - 1) * num_cases, dtype=np.int64)
+    padded[np.arange(len(activities)) + padding_offsets] = activities
+    # Each case has (case size + n - 1) windows, starting at its padded start
+    windows_per_case = case_sizes + n - 1
+    window_offsets = np.cumsum(windows_per_case) - windows_per_case
+    window_starts = np.arange(windows_per_case.sum()) - np.repeat(window_offsets, windows_per_case)
+    window_starts += np.repeat(case_bounds[:-1] + np.arange(num_cases) * 2 * (n - 1), windows_per_case)
+    hashes = np.zeros(len(window_starts), dtype=np.int64)
+    for i in range(n):
+        hashes = (hashes << N_GRAM_CODE_BITS) | padded[window_starts + i]
+    return hashes
+
+
+def _n_gram_distance(original: EncodedEventLog, simulated: EncodedEventLog, n: int) -> float:
+    original_n_grams, original_counts = original.n_gram_histogram(n)
+    simulated_n_grams, simulated_counts = simulated.n_gram_histogram(n)
+    # Translate the (unique) n-grams of the simulated log to the activity codes of the original one
+    alignment, mask = _activity_alignment(original, simulated), (1 << N_GRAM_CODE_BITS) - 1
+    aligned_n_grams = np.zeros(len(simulated_n_grams), dtype=np.int64)
+    for i in reversed(range(n)):
+        aligned_n_grams = (aligned_n_grams << N_GRAM_CODE_BITS) | alignment[
+            (simulated_n_grams >> (N_GRAM_CODE_BITS * i)) & mask
+        ]
+    # Histograms over the union of the n-grams of both logs
+    n_grams, indexes = np.unique(np.concatenate([original_n_grams, aligned_n_grams]), return_inverse=True)
+    original_histogram = np.bincount(indexes[: len(original_n_grams)], original_counts, minlength=len(n_grams))
+    simulated_histogram = np.bincount(indexes[len(original_n_grams) :], simulated_counts, minlength=len(n_grams))
+    distance = np.abs(original_histogram - simulated_histogram).sum()
+    return float(distance / (original_counts.sum() + simulated_counts.sum()))
+
+
+def _windowed_distance(original_histograms: np.ndarray, simulated_histograms: np.ndarray) -> float:
+    """
+    Mean, over the days of the week, of the distance between the (7 x 24) hourly histograms of two logs.
+    """
+    distances = []
+    for original_window, simulated_window in zip(original_histograms, simulated_histograms):
+        if original_window.any() and simulated_window.any():
+            distances += [_histogram_wasserstein(original_window, simulated_window)]
+        elif not original_window.any() and not simulated_window.any():
+            distances += [0.0]
+        else:
+            distances += [23.0]  # Maximum distance between two histograms with values between 0 and 23
+    return float(np.mean(distances))
+
+
+def _circadian_distance(original: EncodedEventLog, simulated: EncodedEventLog) -> float:
+    return _windowed_distance(original.circadian_histograms, simulated.circadian_histograms)
+
+
+def _workforce_distance(original: EncodedEventLog, simulated: EncodedEventLog) -> float:
+    return _windowed_distance(original.workforce_histograms, simulated.workforce_histograms)
+
+
+def _aligned_variants(original: EncodedEventLog, simulated: EncodedEventLog) -> Tuple[List[str], np.ndarray]:
+    """
+    Variants of the simulated log translated to the activity codes of the original one.
+    """
+    simulated_variants, simulated_indexes = simulated.variants
+    alignment = _activity_alignment(original, simulated)
+    translation = {ord(_code_to_char(code)): _code_to_char(aligned) for code, aligned in enumerate(alignment)}
+    return [variant.translate(translation) for variant in simulated_variants], simulated_indexes
+
+
+def _approximate_control_flow_log_distance(original: EncodedEventLog, simulated: EncodedEventLog) -> float:
+    original_variants, original_indexes = original.variants
+    simulated_variants, simulated_indexes = _aligned_variants(original, simulated)
+    return approximate_control_flow_log_distance(
+        list(original_variants),
+        np.bincount(original_indexes, minlength=len(original_variants)),
+        simulated_variants,
+        np.bincount(simulated_indexes, minlength=len(simulated_variants)),
+    ).distance
+
+
+def _control_flow_log_distance(original: EncodedEventLog, simulated: EncodedEventLog) -> float:
+    original_variants, original_indexes = original.variants
+    simulated_variants, simulated_indexes = _aligned_variants(original, simulated)
+    # Compute the distance only once for each pair of variants, and expand to all the pairs of traces
+    variant_distances = np.array(
+        [
+            [
+                damerau_levenshtein_distance(trace_1, trace_2) / max(len(trace_1), len(trace_2))
+                for trace_2 in simulated_variants
+            ]
+            for trace_1 in original_variants
+        ]
+    )
+    cost_matrix = variant_distances[np.ix_(original_indexes, simulated_indexes)]
+    # Optimal pairing of the traces
+    row_indexes, col_indexes = linear_sum_assignment(cost_matrix)
+    return float(cost_matrix[row_indexes, col_indexes].mean())
+
+
+@dataclass
+class ApproximateDistance:
+    """
+    Approximation of a distance, with bounds on its exact value.
+
+    Attributes
+    ----------
+    distance : float
+        Approximated distance.
+    lower_bound : float
+        Lower bound of the exact distance.
+    upper_bound : float
+        Upper bound of the exact distance.
+    """
+
+    distance: float
+    lower_bound: float
+    upper_bound: float
+
+    @property
+    def error_bound(self) -> float:
+        """Maximum absolute error of the approximated distance w.r.t. the exact one."""
+        return max(self.distance - self.lower_bound, self.upper_bound - self.distance)
+
+
+def approximate_control_flow_log_distance(
+    original_variants: List[str],
+    original_frequencies: np.ndarray,
+    simulated_variants: List[str],
+    simulated_frequencies: np.ndarray,
+    cutoff: float = APPROXIMATE_DL_CUTOFF,
+) -> ApproximateDistance:
+    """
+    Bounded-cost approximation of the control-flow log distance (CFLD), meant for the optimization iterations, where it
+    is computed for each candidate (the exact one is kept for the final evaluation).
+
+    The approximation works at the level of trace variants (each one weighted by its frequency) instead of individual
+    traces:
+
+    - For each pair of variants, a lower bound of their normalized Damerau-Levenshtein distance is computed from their
+      lengths and activity counts (vectorized). Only the pairs whose lower bound is below [cutoff] are compared with the
+      exact edit distance, the rest cost 1.0 (the maximum normalized distance) when paired, so the approximation never
+      falls below the exact distance. Their lower bound is only used for the lower bound of the CFLD.
+    - Instead of the optimal (Hungarian) assignment of traces, the variants are paired greedily by increasing cost,
+      transferring as many traces as both variants have left.
+
+    Parameters
+    ----------
+    original_variants : List[str]
+        Unique traces of the original log, with each activity mapped to a single character.
+    original_frequencies : :class:`numpy.ndarray`
+        Number of traces of each variant in the original log.
+    simulated_variants : List[str]
+        Unique traces of the simulated log, with the same character mapping as the original ones.
+    simulated_frequencies : :class:`numpy.ndarray`
+        Number of traces of each variant in the simulated log.
+    cutoff : float
+        Normalized distance above which variant pairs are not compared exactly.
+
+    Returns
+    -------
+    :class:`ApproximateDistance`
+        Approximated CFLD, and bounds of the exact one.
+    """
+    original_lengths = np.array([len(variant) for variant in original_variants])
+    simulated_lengths = np.array([len(variant) for variant in simulated_variants])
+    max_lengths = np.maximum(original_lengths[:, np.newaxis], simulated_lengths[np.newaxis, :])
+    # Lower bound of the (normalized) edit distance of each pair of variants
+    distances = _edit_distance_lower_bounds(original_variants, simulated_variants) / max_lengths
+    exact = distances < cutoff
+    for i, j in zip(*np.nonzero(exact)):
+        distances[i, j] = damerau_levenshtein_distance(original_variants[i], simulated_variants[j]) / max_lengths[i, j]
+    # Cost of pairing each pair of variants: not compared exactly, the distance is at most 1.0
+    costs = np.where(exact, distances, 1.0)
+    # Greedy pairing of the traces of each variant, by increasing cost
+    original_left, simulated_left = original_frequencies.astype(np.int64), simulated_frequencies.astype(np.int64)
+    num_pairs = min(original_left.sum(), simulated_left.sum())
+    paired, cost = 0, 0.0
+    for index in np.argsort(costs, axis=None, kind="stable"):
+        i, j = divmod(int(index), len(simulated_variants))
+        num_traces = min(original_left[i], simulated_left[j])
+        if num_traces > 0:
+            original_left[i] -= num_traces
+            simulated_left[j] -= num_traces
+            paired += num_traces
+            cost += num_traces * costs[i, j]
+            if paired == num_pairs:
+                break
+    # Each trace of the smallest log is paired, at least, with its closest variant
+    lower_bounds = []
+    if original_frequencies.sum() <= simulated_frequencies.sum():
+        lower_bounds += [(distances.min(axis=1) * original_frequencies).sum() / num_pairs]
+    if simulated_frequencies.sum() <= original_frequencies.sum():
+        lower_bounds += [(distances.min(axis=0) * simulated_frequencies).sum() / num_pairs]
+    # The greedy pairing is a feasible assignment costing at least the exact distances: also an upper bound
+    return ApproximateDistance(
+        distance=float(cost / num_pairs),
+        lower_bound=float(max(lower_bounds)),
+        upper_bound=float(cost / num_pairs),
+    )
+
+
+def _edit_distance_lower_bounds(variants_1: List[str], variants_2: List[str]) -> np.ndarray:
+    """
+    Lower bound of the Damerau-Levenshtein distance between each pair of traces: each insertion or deletion changes
+    the length and the activity counts by one, each substitution changes the activity counts by two, and
+    transpositions change none of them.
+    """
+    alphabet = {character: index for index, character in enumerate(sorted(set("".join(variants_1 + variants_2))))}
+    counts_1, counts_2 = _activity_counts(variants_1, alphabet), _activity_counts(variants_2, alphabet)
+    length_differences = np.abs(counts_1.sum(axis=1)[:, np.newaxis] - counts_2.sum(axis=1)[np.newaxis, :])
+    count_differences = np.empty(length_differences.shape, dtype=np.int64)
+    # Chunks of rows to bound the memory of the (rows x variants_2 x activities) differences
+    chunk_size = max(1, 10_000_000 // max(1, counts_2.size))
+    for start in range(0, len(variants_1), chunk_size):
+        chunk = counts_1[start : start + chunk_size]
+        count_differences[start : start + chunk_size] = np.abs(
+            chunk[:, np.newaxis, :] - counts_2[np.newaxis, :, :]
+        ).sum(axis=2)
+    return np.ceil((count_differences + length_differences) / 2)
+
+
+def _activity_counts(variants: List[str], alphabet: Dict[str, int]) -> np.ndarray:
+    counts = np.zeros((len(variants), len(alphabet)), dtype=np.int64)
+    for index, variant in enumerate(variants):
+        for character in variant:
+            counts[index, alphabet[character]] += 1
+    return counts
@@ -0,0 +1,167 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, List, Optional
+
+import numpy as np
+from hyperopt import STATUS_OK, Trials, fmin, tpe
+from hyperopt.base import JOB_STATE_DONE, JOB_STATE_ERROR, JOB_STATE_RUNNING, Ctrl, Domain, spec_from_misc
+from hyperopt.fmin import generate_trial
+from hyperopt.utils import coarse_utcnow
+
+
+def parallel_fmin(
+    fn: Callable[[dict], dict],
+    space: dict,
+    max_evals: int,
+    trials: Trials,
+    max_parallel_trials: int = 1,
+    algo: Callable = tpe.suggest,
+    on_trial_done: Optional[Callable[[Trials], None]] = None,
+    stop: Optional[Callable[[], bool]] = None,
+) -> dict:
+    """
+    Same as :func:`hyperopt.fmin`, evaluating up to [max_parallel_trials] trials concurrently.
+
+    Each time a trial finishes (and initially), new candidates are asked to [algo] one at a time until there are
+    [max_parallel_trials] running. The running trials are part of [trials] without a loss, which TPE takes as the
+    worst possible loss (a constant liar), so the candidates asked while others are running are spread over the search
+    space instead of repeating the same point. The trials are evaluated in threads of this process, so [fn] must be
+    thread-safe, and is expected to spend most of its time waiting for work done elsewhere (e.g., simulations in a
+    pool of processes).
+
+    Parameters
+    ----------
+    fn : Callable[[dict], dict]
+        Hyperopt objective function.
+    space : dict
+        Hyperopt search space.
+    max_evals : int
+        Number of trials in [trials] to stop the search at (including the ones already in it).
+    trials : :class:`hyperopt.Trials`
+        Trials to store the evaluations in.
+    max_parallel_trials : int
+        Maximum number of trials evaluated concurrently. With 1, the search is performed by :func:`hyperopt.fmin`.
+    algo : Callable
+        Hyperopt suggestion algorithm.
+    on_trial_done : Callable[[Trials], None], optional
+        Function called with [trials] each time a trial finishes (and is recorded in them), e.g., to persist them.
+    stop : Callable[[], bool], optional
+        Function telling whether to stop launching new trials (e.g., once the time budget of the search is spent),
+        before reaching [max_evals]. It is only checked once [trials] have a successful trial, so the search always
+        returns a point, and the running trials are awaited.
+
+    Returns
+    -------
+    dict
+        Best point found (in the same format as returned by :func:`hyperopt.fmin`).
+    """
+    if max_parallel_trials <= 1:
+        return fmin(
+            fn=fn,
+            space=space,
+            algo=algo,
+            max_evals=max_evals,
+            trials=trials,
+            show_progressbar=False,
+            early_stop_fn=_early_stop(on_trial_done, stop),
+        )
+
+    domain = Domain(fn, space)
+    rstate = np.random.default_rng()
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_parallel_trials) as executor:
+        stopped = False
+        while True:
+            # Fill the free slots with new candidates
+            while not stopped and len(running) < max_parallel_trials and len(trials.trials) < max_evals:
+                if _should_stop(trials, stop):
+                    stopped = True
+                    break
+                new_ids = trials.new_trial_ids(1)
+                trials.refresh()
+                new_trials = algo(new_ids, domain, trials, rstate.integers(2**31 - 1))
+                if len(new_trials) == 0:
+                    # The suggestion algorithm has no more candidates
+                    stopped = True
+                    break
+                trials.insert_trial_docs(new_trials)
+                trials.refresh()
+                trial = next(trial for trial in trials.trials if trial["tid"] == new_ids[0])
+                trial["state"] = JOB_STATE_RUNNING
+                trial["book_time"] = trial["refresh_time"] = coarse_utcnow()
+                ctrl = Ctrl(trials, current_trial=trial)
+                running[executor.submit(domain.evaluate, spec_from_misc(trial["misc"]), ctrl)] = trial
+            if len(running) == 0:
+                break
+            # Record the results of the finished trials
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                trial = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    trial["state"] = JOB_STATE_ERROR
+                    trial["misc"]["error"] = (str(type(e)), str(e))
+                    trial["refresh_time"] = coarse_utcnow()
+                    trials.refresh()
+                    raise
+                trial["state"] = JOB_STATE_DONE
+                trial["result"] = result
+                trial["refresh_time"] = coarse_utcnow()
+            trials.refresh()
+            if on_trial_done is not None:
+                on_trial_done(trials)
+    return trials.argmin
+
+
+def replay_suggest(points: List[dict], algo: Optional[Callable] = None) -> Callable:
+    """
+    Hyperopt suggestion algorithm proposing the given [points] (label to raw value, see :func:`trial_point`) in order,
+    skipping the ones already in the trials (which are not necessarily the first ones, e.g., when resuming a search
+    without the trials that were running when interrupted). Once all of them are proposed, the candidates are asked
+    to [algo], or the search is stopped if not provided.
+    """
+
+    def suggest(new_ids: list, domain: Domain, trials: Trials, seed: int) -> list:
+        proposed_points = [trial_point(trial) for trial in trials.trials]
+        pending_points = []
+        for point in points:
+            if point in proposed_points:
+                proposed_points.remove(point)
+            else:
+                pending_points.append(point)
+        new_trials = [generate_trial(new_id, point) for new_id, point in zip(new_ids, pending_points)]
+        if algo is not None and len(new_trials) < len(new_ids):
+            new_trials += algo(new_ids[len(new_trials) :], domain, trials, seed)
+        return new_trials
+
+    return suggest
+
+
+def trial_point(trial: dict) -> dict:
+    """
+    Hyperopt point (label to raw value, e.g., the index of the option of a choice) of [trial].
+    """
+    return {label: values[0] for label, values in trial["misc"]["vals"].items() if len(values) > 0}
+
+
+def _early_stop(on_trial_done: Optional[Callable[[Trials], None]], stop: Optional[Callable[[], bool]]) -> Callable:
+    """
+    Hyperopt early stopping function calling [on_trial_done] after each trial, and stopping the search once [stop]
+    tells so (see :func:`_should_stop`).
+    """
+
+    def early_stop_fn(trials: Trials, *args) -> tuple:
+        if on_trial_done is not None:
+            on_trial_done(trials)
+        return _should_stop(trials, stop), args
+
+    return early_stop_fn
+
+
+def _should_stop(trials: Trials, stop: Optional[Callable[[], bool]]) -> bool:
+    """
+    Whether to stop launching new trials: [stop] tells so, and there is a successful trial to return.
+    """
+    if stop is None or not any(result.get("status") == STATUS_OK for result in trials.results):
+        return False
+    return stop()
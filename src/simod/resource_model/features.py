@@ -0,0 +1,82 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from pix_framework.discovery.resource_calendar_and_performance.crisp.resource_calendar import RCalendar
+from pix_framework.discovery.resource_model import ResourceModel
+from pix_framework.io.event_log import EventLogIDs
+
+# Minutes in a week, the cells of the calendar masks
+MINUTES_PER_WEEK = 7 * 1440
+
+
+class CalendarCoverage:
+    """
+    Coverage of the working time observed in an event log by the calendars of a resource model, a cheap feature of its
+    quality (e.g., to predict the loss of a candidate of the resource model optimization before simulating it).
+
+    The start and end timestamps of the events are binned, once, into the minute of the week they happened in, so the
+    coverage of each resource model is computed by looking them up in its calendars.
+
+    Attributes
+    ----------
+    resources : :class:`numpy.ndarray`
+        Distinct resources of the event log.
+    observed_resources : :class:`numpy.ndarray`
+        Index in [resources] of the resource of each observation (start and end timestamp of each event).
+    observed_minutes : :class:`numpy.ndarray`
+        Minute of the week (from Monday at 00:00) of each observation.
+    """
+
+    resources: np.ndarray
+    observed_resources: np.ndarray
+    observed_minutes: np.ndarray
+
+    def __init__(self, event_log: pd.DataFrame, log_ids: EventLogIDs):
+        timestamps = pd.concat([event_log[log_ids.start_time], event_log[log_ids.end_time]])
+        resources = pd.concat([event_log[log_ids.resource], event_log[log_ids.resource]]).astype(str)
+        self.resources, self.observed_resources = np.unique(resources.to_numpy(), return_inverse=True)
+        self.observed_minutes = (
+            timestamps.dt.weekday * 1440 + timestamps.dt.hour * 60 + timestamps.dt.minute
+        ).to_numpy(dtype=int)
+
+    def features(self, resource_model: ResourceModel) -> Optional[List[float]]:
+        """
+        Fraction of the observations falling in the calendar of their resource in [resource_model], and mean fraction
+        of the week the resources are available, or None if its calendars are not crisp (e.g., fuzzy calendars).
+        """
+        if not all(isinstance(calendar, RCalendar) for calendar in resource_model.resource_calendars):
+            return None
+        masks = {calendar.calendar_id: _week_mask(calendar) for calendar in resource_model.resource_calendars}
+        resource_masks = {
+            resource.name: masks[resource.calendar_id]
+            for resource_profile in resource_model.resource_profiles
+            for resource in resource_profile.resources
+            if resource.calendar_id in masks
+        }
+        if len(resource_masks) == 0:
+            return None
+        # Calendar of each resource of the event log (all-false for the ones without calendar, left out)
+        calendars = np.zeros((len(self.resources), MINUTES_PER_WEEK), dtype=bool)
+        with_calendar = np.zeros(len(self.resources), dtype=bool)
+        for index, resource in enumerate(self.resources):
+            if resource in resource_masks:
+                calendars[index], with_calendar[index] = resource_masks[resource], True
+        observed = with_calendar[self.observed_resources]
+        covered = calendars[self.observed_resources[observed], self.observed_minutes[observed]]
+        coverage = float(covered.mean()) if len(covered) > 0 else 0.0
+        availability = float(np.mean([mask.mean() for mask in resource_masks.values()]))
+        return [coverage, availability]
+
+
+def _week_mask(calendar: RCalendar) -> np.ndarray:
+    """
+    Whether [calendar] is working in each minute of the week.
+    """
+    mask = np.zeros(MINUTES_PER_WEEK, dtype=bool)
+    for weekday, intervals in calendar.work_intervals.items():
+        for interval in intervals:
+            start = weekday * 1440 + interval.start.hour * 60 + interval.start.minute
+            end = weekday * 1440 + interval.end.hour * 60 + interval.end.minute
+            mask[start : end + 1] = True
+    return mask
@@ -0,0 +1,448 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pix_framework.discovery.resource_calendar_and_performance.calendar_discovery_parameters import (
+    CalendarDiscoveryParameters,
+    CalendarType,
+    int_week_days,
+)
+from pix_framework.discovery.resource_calendar_and_performance.crisp.resource_activity_performance import (
+    discover_crisp_activity_resource_distributions,
+)
+from pix_framework.discovery.resource_calendar_and_performance.crisp.resource_calendar import RCalendar
+from pix_framework.discovery.resource_model import ResourceModel
+from pix_framework.discovery.resource_profiles import (
+    ResourceProfile,
+    discover_differentiated_resource_profiles,
+    discover_pool_resource_profiles,
+    discover_undifferentiated_resource_profile,
+)
+from pix_framework.io.event_log import EventLogIDs
+
+# Calendar types whose calendars are discovered from the observed working granules
+OBSERVED_CALENDAR_TYPES = [
+    CalendarType.UNDIFFERENTIATED,
+    CalendarType.DIFFERENTIATED_BY_RESOURCE,
+    CalendarType.DIFFERENTIATED_BY_POOL,
+]
+# Name of the group of all the resources when discovering a single calendar for them
+UNDIFFERENTIATED_GROUP = "Undifferentiated"
+# Maximum number of observation tables (granularity and grouping of the resources) kept by default
+DEFAULT_MAX_TABLES = 8
+
+
+@dataclass
+class CalendarObservations:
+    """
+    Observations of the working time of groups of resources (e.g., resource profiles) in an event log, binned into
+    weekday and granule (slot of [granularity] minutes of the day) cells.
+
+    They contain all the event log information used by the crisp calendar discovery of
+    :class:`pix_framework.discovery.resource_calendar_and_performance.crisp.factory.CalendarFactory`, where each
+    start and end timestamp is an observation of its group performing its activity in that cell. Thus, the calendars
+    for any confidence, support, and participation are computed from these tables without going over the events again.
+
+    Attributes
+    ----------
+    granularity : int
+        Minutes per granule.
+    groups : List[str]
+        Groups of resources, in order of first observation.
+    task_events : :class:`numpy.ndarray`
+        Number of observations of each group performing each activity (group x activity).
+    active_dates : :class:`numpy.ndarray`
+        Number of distinct dates each group was observed performing each activity in each cell (group x activity x
+        weekday x granule).
+    active_weekday_dates : :class:`numpy.ndarray`
+        Number of distinct dates each group was observed performing each activity in each weekday (group x activity x
+        weekday).
+    granule_events : :class:`numpy.ndarray`
+        Number of observations of each group in each cell (group x weekday x granule).
+    observation_order : :class:`numpy.ndarray`
+        Position of each cell in the order the calendar discovery goes over the cells of each group (granules in order
+        of first observation, and weekdays of each granule in order of first observation), -1 if not observed (group x
+        weekday x granule).
+    """
+
+    granularity: int
+    groups: List[str]
+    task_events: np.ndarray
+    active_dates: np.ndarray
+    active_weekday_dates: np.ndarray
+    granule_events: np.ndarray
+    observation_order: np.ndarray
+
+    @staticmethod
+    def from_event_log(
+        event_log: pd.DataFrame,
+        log_ids: EventLogIDs,
+        granularity: int,
+        resource_groups: Optional[Dict[str, str]] = None,
+    ) -> "CalendarObservations":
+        """
+        Bins the start and end timestamps of the events in [event_log] into the weekday and granule cells of their
+        resource group.
+
+        Parameters
+        ----------
+        event_log : :class:`pandas.DataFrame`
+            Event log to observe the working time of the resources in.
+        log_ids : :class:`EventLogIDs`
+            Identifiers for mapping column names in the event log.
+        granularity : int
+            Minutes per granule (must be a divisor of 1440).
+        resource_groups : Dict[str, str], optional
+            Group of each resource, the events of the resources without group are not observed. If not provided, all
+            the events are observed for a single group (:data:`UNDIFFERENTIATED_GROUP`).
+
+        Returns
+        -------
+        :class:`CalendarObservations`
+            Observation tables of [event_log].
+        """
+        if 1440 % granularity != 0:
+            raise ValueError(
+                "The number of minutes per granule must be a divisor of the total minutes in one day (1440)."
+            )
+        num_granules = 1440 // granularity
+
+        # Observations ordered as registered by the calendar discovery (start and end timestamp of each event)
+        if resource_groups is None:
+            groups = pd.Series(UNDIFFERENTIATED_GROUP, index=event_log.index)
+        else:
+            groups = event_log[log_ids.resource].map(resource_groups)
+        observations = pd.concat(
+            [
+                pd.DataFrame(
+                    {
+                        "group": groups.reset_index(drop=True),
+                        "task": event_log[log_ids.activity].reset_index(drop=True),
+                        "time": event_log[time_column].reset_index(drop=True),
+                        "order": np.arange(len(event_log)) * 2 + offset,
+                    }
+                )
+                for offset, time_column in enumerate([log_ids.start_time, log_ids.end_time])
+            ]
+        )
+        observations = observations[observations["group"].notna()].sort_values("order")
+        times = pd.to_datetime(observations["time"])
+
+        group_codes, group_names = pd.factorize(observations["group"])
+        task_codes, task_names = pd.factorize(observations["task"])
+        cells = pd.DataFrame(
+            {
+                "group": group_codes,
+                "task": task_codes,
+                "weekday": times.dt.weekday.values,
+                "granule": ((times.dt.hour * 60 + times.dt.minute) // granularity).values,
+                "date": pd.factorize(times.dt.normalize())[0],
+                "order": observations["order"].values,
+            }
+        )
+        shape = (len(group_names), len(task_names), 7, num_granules)
+
+        task_events = np.zeros(shape[:2], dtype=np.int64)
+        np.add.at(task_events, (cells["group"], cells["task"]), 1)
+        granule_events = np.zeros((shape[0], 7, num_granules), dtype=np.int64)
+        np.add.at(granule_events, (cells["group"], cells["weekday"], cells["granule"]), 1)
+        active_dates = np.zeros(shape, dtype=np.int32)
+        dates = cells.drop_duplicates(["group", "task", "weekday", "granule", "date"])
+        np.add.at(active_dates, (dates["group"], dates["task"], dates["weekday"], dates["granule"]), 1)
+        active_weekday_dates = np.zeros(shape[:3], dtype=np.int32)
+        dates = cells.drop_duplicates(["group", "task", "weekday", "date"])
+        np.add.at(active_weekday_dates, (dates["group"], dates["task"], dates["weekday"]), 1)
+
+        # Cells of each group sorted by first observation of their granule, and then of the cell itself
+        first_cells = cells.groupby(["group", "weekday", "granule"], as_index=False)["order"].min()
+        first_granules = cells.groupby(["group", "granule"])["order"].min().rename("granule_order")
+        first_cells = first_cells.join(first_granules, on=["group", "granule"])
+        first_cells = first_cells.sort_values(["group", "granule_order", "order"])
+        observation_order = np.full((shape[0], 7, num_granules), -1, dtype=np.int32)
+        observation_order[first_cells["group"], first_cells["weekday"], first_cells["granule"]] = (
+            first_cells.groupby("group").cumcount().values
+        )
+
+        return CalendarObservations(
+            granularity=granularity,
+            groups=list(group_names),
+            task_events=task_events,
+            active_dates=active_dates,
+            active_weekday_dates=active_weekday_dates,
+            granule_events=granule_events,
+            observation_order=observation_order,
+        )
+
+    def build_calendars(
+        self, confidence: float, support: float, participation: float
+    ) -> Dict[str, Optional[RCalendar]]:
+        """
+        Builds the calendar of each group, as
+        :meth:`pix_framework.discovery.resource_calendar_and_performance.crisp.factory.CalendarFactory.build_weekly_calendars`
+        does with the same observations.
+
+        Parameters
+        ----------
+        confidence : float
+            Minimum confidence of a cell to be part of the calendar of a group.
+        support : float
+            Desired fraction of the observations of a group within its calendar (adding the most observed cells until
+            reaching it).
+        participation : float
+            Minimum participation of a group in the activities it performs to discover its calendar.
+
+        Returns
+        -------
+        Dict[str, Optional[:class:`RCalendar`]]
+            Calendar of each group, None for the groups under the minimum participation.
+        """
+        # Maximum number of observations of any group for each activity
+        max_task_events = self.task_events.max(axis=0)
+        # Confidence of each cell: highest fraction of the dates a group performed an activity in that weekday, that
+        # it performed it in that granule
+        with np.errstate(divide="ignore", invalid="ignore"):
+            task_confidences = np.where(
+                self.active_dates > 0, self.active_dates / self.active_weekday_dates[..., np.newaxis], 0.0
+            )
+        cell_confidences = task_confidences.max(axis=1)
+
+        calendars = {}
+        for index, group in enumerate(self.groups):
+            total_max = max_task_events[self.task_events[index] > 0].sum()
+            group_participation = self.task_events[index].sum() / total_max if total_max > 0 else 0
+            if group_participation >= participation:
+                calendars[group] = self._build_calendar(index, cell_confidences[index], confidence, support)
+            else:
+                calendars[group] = None
+        return calendars
+
+    def _build_calendar(self, index: int, cell_confidences: np.ndarray, confidence: float, support: float) -> RCalendar:
+        calendar = RCalendar(f"{self.groups[index]}_Schedule")
+        granule_events = self.granule_events[index]
+        # Observed cells in discovery order, accepting the ones with enough confidence
+        order = self.observation_order[index]
+        cells = [tuple(cell) for cell in np.argwhere(order >= 0)]
+        cells.sort(key=lambda cell: order[cell])
+        accepted = [cell for cell in cells if confidence <= cell_confidences[cell]]
+        for weekday, granule in accepted:
+            self._add_granule(calendar, weekday, granule)
+        # Add the discarded cells with more observations until reaching the desired support
+        events_in_log = self.task_events[index].sum()
+        events_in_calendar = sum(granule_events[cell] for cell in accepted)
+        if len(accepted) > 0 and events_in_calendar / events_in_log < support:
+            discarded = [cell for cell in cells if confidence > cell_confidences[cell]]
+            discarded.sort(key=lambda cell: granule_events[cell], reverse=True)
+            for weekday, granule in discarded:
+                self._add_granule(calendar, weekday, granule)
+                events_in_calendar += granule_events[weekday, granule]
+                if events_in_calendar / events_in_log >= support:
+                    break
+        return calendar
+
+    def _add_granule(self, calendar: RCalendar, weekday: int, granule: int):
+        # Same working interval as the calendar factory for this granule
+        week_day = int_week_days[weekday]
+        hour = (granule * self.granularity) // 60
+        from_minute = (granule * self.granularity) % 60
+        to_minute = from_minute + self.granularity
+        if to_minute >= 60:
+            end_time = "23:59:59.999" if hour == 23 else "%d:%d:%d" % (hour + 1, 0, 0)
+        else:
+            end_time = "%d:%d:%d" % (hour, to_minute, 0)
+        calendar.add_calendar_item(week_day, week_day, "%d:%d:%d" % (hour, from_minute, 0), end_time)
+
+
+class CalendarObservationsCache:
+    """
+    Observation tables (see :class:`CalendarObservations`) of an event log for each granularity and grouping of the
+    resources, built the first time they are needed.
+
+    The tables depend only on the granularity and the grouping, so discovering the calendars with other confidence,
+    support, or participation values is a threshold over them.
+
+    Attributes
+    ----------
+    event_log : :class:`pandas.DataFrame`
+        Event log to observe the working time of the resources in.
+    log_ids : :class:`EventLogIDs`
+        Identifiers for mapping column names in the event log.
+    max_tables : int
+        Maximum number of observation tables kept (the least recently used are dropped).
+    hits : int
+        Number of times an observation table was reused.
+    misses : int
+        Number of observation tables built.
+    """
+
+    event_log: pd.DataFrame
+    log_ids: EventLogIDs
+    max_tables: int
+    hits: int
+    misses: int
+    _tables: "OrderedDict[Tuple[int, Optional[tuple]], CalendarObservations]"
+
+    def __init__(self, event_log: pd.DataFrame, log_ids: EventLogIDs, max_tables: int = DEFAULT_MAX_TABLES):
+        self.event_log = event_log
+        self.log_ids = log_ids
+        self.max_tables = max_tables
+        self.hits = 0
+        self.misses = 0
+        self._tables = OrderedDict()
+
+    def observations(self, granularity: int, resource_groups: Optional[Dict[str, str]] = None) -> CalendarObservations:
+        """
+        Observation tables for [granularity] and [resource_groups] (see :meth:`CalendarObservations.from_event_log`).
+        """
+        key = (granularity, None if resource_groups is None else tuple(sorted(resource_groups.items())))
+        if key in self._tables:
+            self.hits += 1
+            self._tables.move_to_end(key)
+        else:
+            self.misses += 1
+            self._tables[key] = CalendarObservations.from_event_log(
+                self.event_log, self.log_ids, granularity, resource_groups
+            )
+            while len(self._tables) > self.max_tables:
+                self._tables.popitem(last=False)
+        return self._tables[key]
+
+
+def discover_observed_resource_model(
+    observations: CalendarObservationsCache,
+    params: CalendarDiscoveryParameters,
+    provided_profiles: Optional[List[ResourceProfile]] = None,
+) -> ResourceModel:
+    """
+    Discovers the resource model of the event log of [observations] as
+    :func:`pix_framework.discovery.resource_model.discover_resource_model` does for the calendar types discovered
+    from the observed working granules (see :data:`OBSERVED_CALENDAR_TYPES`), building their calendars from the
+    cached observation tables.
+
+    Parameters
+    ----------
+    observations : :class:`CalendarObservationsCache`
+        Observation tables of the event log to discover the resource model from.
+    params : :class:`CalendarDiscoveryParameters`
+        Parameters for the calendar discovery.
+    provided_profiles : List[:class:`ResourceProfile`], optional
+        Resource profiles to use instead of discovering them (their calendar IDs are updated).
+
+    Returns
+    -------
+    :class:`ResourceModel`
+        Resource profiles, their calendars, and the activity-resource duration distributions.
+    """
+    event_log, log_ids = observations.event_log, observations.log_ids
+    if provided_profiles is not None:
+        resource_profiles = provided_profiles
+    elif params.discovery_type == CalendarType.UNDIFFERENTIATED:
+        resource_profiles = [discover_undifferentiated_resource_profile(event_log, log_ids)]
+    elif params.discovery_type == CalendarType.DIFFERENTIATED_BY_RESOURCE:
+        resource_profiles = discover_differentiated_resource_profiles(event_log, log_ids)
+    elif params.discovery_type == CalendarType.DIFFERENTIATED_BY_POOL:
+        resource_profiles = discover_pool_resource_profiles(event_log, log_ids)
+    else:
+        raise ValueError(f"Calendar type not discovered from the observed working granules: {params.discovery_type}")
+    assert len(resource_profiles) > 0, "No resource profiles found"
+
+    resource_calendars = _discover_resource_calendars(observations, params, resource_profiles)
+    activity_resource_distributions = discover_crisp_activity_resource_distributions(
+        event_log, log_ids, resource_profiles, resource_calendars
+    )
+    assert len(resource_calendars) > 0, "No resource calendars found"
+    assert len(activity_resource_distributions) > 0, "No activity resource distributions found"
+
+    return ResourceModel(
+        resource_profiles=resource_profiles,
+        resource_calendars=resource_calendars,
+        activity_resource_distributions=activity_resource_distributions,
+    )
+
+
+def _discover_resource_calendars(
+    observations: CalendarObservationsCache,
+    params: CalendarDiscoveryParameters,
+    resource_profiles: List[ResourceProfile],
+) -> List[RCalendar]:
+    """
+    Calendar of each resource profile, assigning its ID to the resources, as
+    :func:`pix_framework.discovery.resource_calendar_and_performance.crisp.discovery.discover_crisp_resource_calendars_per_profile`
+    does: an undifferentiated calendar for all the resources, or one calendar per profile with an undifferentiated
+    calendar for the profiles without enough data (and 24/7 if there is not enough data for it either).
+    """
+    if params.discovery_type == CalendarType.UNDIFFERENTIATED:
+        calendar = _undifferentiated_calendar(observations, params)
+        if calendar is None:
+            calendar = _full_day_calendar()
+        _update_resource_calendars(resource_profiles, calendar.calendar_id)
+        return [calendar]
+
+    resource_groups = {
+        resource.id: resource_profile.id
+        for resource_profile in resource_profiles
+        for resource in resource_profile.resources
+    }
+    discovered_calendars = observations.observations(params.granularity, resource_groups).build_calendars(
+        params.confidence, params.support, params.participation
+    )
+    resource_calendars, missing_profiles = [], []
+    for resource_profile in resource_profiles:
+        calendar = discovered_calendars.get(resource_profile.id)
+        if calendar is not None and not calendar.is_empty():
+            calendar.calendar_id = f"{resource_profile.id}_calendar"
+            resource_calendars += [calendar]
+            _update_resource_calendars([resource_profile], calendar.calendar_id)
+        else:
+            missing_profiles += [resource_profile]
+
+    if len(missing_profiles) > 0:
+        # Undifferentiated calendar observing the events of the resources in the profiles, or all the events
+        calendar = _undifferentiated_calendar(observations, params, list(resource_groups.keys()))
+        if calendar is None:
+            calendar = _undifferentiated_calendar(observations, params)
+            if calendar is None:
+                calendar = _full_day_calendar()
+        resource_calendars += [calendar]
+        _update_resource_calendars(missing_profiles, calendar.calendar_id)
+
+    return resource_calendars
+
+
+def _undifferentiated_calendar(
+    observations: CalendarObservationsCache,
+    params: CalendarDiscoveryParameters,
+    resource_ids: Optional[List[str]] = None,
+) -> Optional[RCalendar]:
+    # Single calendar observing the events of [resource_ids] (all the events if they are all the resources in the log)
+    log_resources = set(observations.event_log[observations.log_ids.resource].unique())
+    if resource_ids is None or log_resources.issubset(resource_ids):
+        resource_groups = None
+    else:
+        resource_groups = {resource_id: UNDIFFERENTIATED_GROUP for resource_id in resource_ids}
+    calendar = (
+        observations.observations(params.granularity, resource_groups)
+        .build_calendars(params.confidence, params.support, params.participation)
+        .get(UNDIFFERENTIATED_GROUP)
+    )
+    if calendar is not None:
+        calendar.calendar_id = "Undifferentiated_calendar"
+    return calendar
+
+
+def _full_day_calendar() -> RCalendar:
+    calendar = RCalendar("24_7_CALENDAR")
+    calendar.add_calendar_item(
+        from_day="MONDAY",
+        to_day="SUNDAY",
+        begin_time="00:00:00.000",
+        end_time="23:59:59.999",
+    )
+    return calendar
+
+
+def _update_resource_calendars(resource_profiles: List[ResourceProfile], calendar_id: str):
+    for resource_profile in resource_profiles:
+        for resource in resource_profile.resources:
+            resource.calendar_id = calendar_id
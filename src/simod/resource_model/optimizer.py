@@ -1,13 +1,16 @@
 import copy
 import json
+import math
 import shutil
+import threading
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 
 import hyperopt
 import numpy as np
 import pandas as pd
-from hyperopt import STATUS_FAIL, STATUS_OK, Trials, fmin, hp, tpe
+from hyperopt import STATUS_FAIL, STATUS_OK, Trials, hp, tpe
 from pix_framework.discovery.resource_calendar_and_performance.calendar_discovery_parameters import (
     CalendarDiscoveryParameters,
 )
@@ -15,16 +18,34 @@ from pix_framework.discovery.resource_model import ResourceModel, discover_resou
 from pix_framework.discovery.resource_profiles import discover_pool_resource_profiles
 from pix_framework.filesystem.file_manager import create_folder, get_random_folder_id, remove_asset
 
+from .features import CalendarCoverage
+from .observations import OBSERVED_CALENDAR_TYPES, CalendarObservationsCache, discover_observed_resource_model
 from .repair import repair_with_missing_activities
 from .settings import HyperoptIterationParams
 from ..batching.discovery import discover_batching_rules
+from ..budget import StageBudget
+from ..checkpoint import SearchCheckpoint
 from ..cli_formatter import print_message, print_step, print_subsection
 from ..event_log.event_log import EventLog
 from ..prioritization.discovery import discover_prioritization_rules
+from ..settings.common_settings import MetricEngine, SearchStrategy
 from ..settings.resource_model_settings import CalendarType, ResourceModelSettings
 from ..simulation.parameters.BPS_model import BPSModel
+from ..simulation.cache import SimulationCache
+from ..parallel_search import parallel_fmin, replay_suggest
 from ..simulation.prosimos import simulate_and_evaluate
-from ..utilities import get_process_model_path, get_simulation_parameters_path, hyperopt_step
+from ..successive_halving import successive_halving
+from ..surrogate import FEATURES_KEY, SCREENED_KEY, STATUS_SCREENED, LossSurrogate
+from ..trial_store import TrialStore
+from ..utilities import (
+    cannot_beat_incumbent,
+    get_incumbent_loss,
+    get_process_model_path,
+    get_simulation_parameters_path,
+    hyperopt_step,
+    released,
+)
+from ..warm_start import prior_points
 
 
 class ResourceModelOptimizer:
@@ -53,10 +74,59 @@ class ResourceModelOptimizer:
         Best discovered BPS model after the optimization process.
     evaluation_measurements : :class:`pandas.DataFrame`
         Quality measures recorded for each hyperopt iteration.
+    simulation_pool : :class:`concurrent.futures.Executor`, optional
+        Pool of workers, shared across iterations, to run the simulations of each candidate in. If not provided,
+        temporary pools are created for each evaluation.
+    metric_engine : :class:`~simod.settings.common_settings.MetricEngine`
+        Implementation used to compute the optimization metric.
+    approximate_dl : bool
+        Whether to use the approximated control-flow log distance when the optimization metric is DL.
+    simulation_cache : :class:`~simod.simulation.cache.SimulationCache`, optional
+        Store of the measurements of already simulated candidates, to reuse them for identical candidates.
+    seed : int, optional
+        Seed the seeds of the replicas are derived from. Every candidate is simulated with the same replica seeds
+        (common random numbers), so their losses are compared under the same simulation noise.
+    max_parallel_trials : int
+        Maximum number of candidates evaluated concurrently (see :func:`~simod.parallel_search.parallel_fmin`).
+    trial_store : :class:`~simod.trial_store.TrialStore`, optional
+        Store to queue the candidates in, to be evaluated by its workers instead of by this process.
+    checkpoint : :class:`~simod.checkpoint.SearchCheckpoint`, optional
+        Checkpoint to persist the trials of the search in after every finished trial, and to resume it from.
+    warm_start_path : :class:`~pathlib.Path`, optional
+        Path to the measurements of the candidates evaluated by a previous run of this optimization on the same
+        process (its ``evaluation_measures.csv``), to warm-start the search with its best candidates.
+    num_warm_start_points : int
+        Maximum number of candidates of the previous run evaluated to warm-start the search.
+    budget : :class:`~simod.budget.StageBudget`, optional
+        Share of the time budget of the run allotted to the search, which stops launching candidates once it is spent.
 
     Notes
     -----
     - Optimization is performed using TPE-hyperparameter optimization.
+    - The working time of the resources in the training partition is binned into weekday and granule cells once per
+      granularity (see :class:`~simod.resource_model.observations.CalendarObservations`), and the calendars of each
+      candidate are built from these observations.
+    - With the successive halving search strategy, the candidates are first evaluated simulating a fraction of the
+      validation cases, and only the best ones are re-evaluated with all of them.
+    - With [max_parallel_trials] greater than one, the discovery steps of the concurrent candidates run one at a time,
+      and their simulations run concurrently in the shared pool of workers.
+    - With a [trial_store], the optimizer (without its pool of workers) is published in the store, and the candidates
+      are queued in it with their parameters, up to [max_parallel_trials] at a time. Each worker evaluates them with
+      its copy of the optimizer, which reports the response and measurements of the evaluation back to this one. The
+      [base_directory] must be reachable by the workers under the same path.
+    - With a [warm_start_path], the first candidates of the search are the best ones of the previous run (see
+      :func:`~simod.warm_start.prior_points`), evaluated again on this event log, and TPE takes over from them. They
+      count towards the number of iterations, which can thus be lower than for a search starting from scratch.
+    - With a [budget], no new candidates are launched once it is spent (and a candidate succeeded), so the search can
+      end before evaluating all its iterations. The running candidates are awaited.
+    - With screening in the settings, a surrogate model fitted on the simulated candidates (see
+      :class:`~simod.surrogate.LossSurrogate`) predicts the loss of each new one from the coverage of the observed
+      working time by its calendars (see :class:`~simod.resource_model.features.CalendarCoverage`), their availability,
+      and the use of prioritization and batching rules. The candidates predicted to lose by more than the screening
+      margin are not simulated: hyperopt gets their predicted loss, and the measurements record them as screened. The
+      candidates with fuzzy calendars are always simulated.
+    - With a [checkpoint] holding the trials of an interrupted search, the search continues from its finished trials
+      (and rungs), evaluating only the rest of the candidates.
     """
 
     # Event log with train/validation partitions
@@ -71,9 +141,47 @@ class ResourceModelOptimizer:
     best_bps_model: Optional[BPSModel]
     # Quality measure of each hyperopt iteration
     evaluation_measurements: pd.DataFrame
-
+    # Pool of workers to run the simulations in
+    simulation_pool: Optional[Executor]
+    # Implementation used to compute the optimization metric
+    metric_engine: MetricEngine
+    # Whether to approximate the DL optimization metric
+    approximate_dl: bool
+    # Store of the measurements of already simulated candidates
+    simulation_cache: Optional[SimulationCache]
+    # Seed of the simulations of every candidate
+    seed: Optional[int]
+    # Maximum number of candidates evaluated concurrently
+    max_parallel_trials: int
+    # Store to queue the candidates in, for its workers to evaluate them
+    trial_store: Optional[TrialStore]
+    # Checkpoint of the trials of the search
+    checkpoint: Optional[SearchCheckpoint]
+    # Measurements of the candidates of a previous run to warm-start the search from
+    warm_start_path: Optional[Path]
+    # Maximum number of candidates of the previous run evaluated to warm-start the search
+    num_warm_start_points: int
+    # Share of the time budget of the run allotted to the search
+    budget: Optional[StageBudget]
+
+    # Observations of the working time of the resources in the training partition, per granularity
+    _calendar_observations: CalendarObservationsCache
+    # Lock held by the iterations except while waiting for their simulations
+    _iteration_lock: threading.Lock
+    # Stage of the trial store evaluating the queued candidates, if published
+    _stage: Optional[str] = None
+    # Best loss of the search when the iteration being evaluated (by a worker of the trial store) was queued
+    _queued_incumbent_loss: Optional[float] = None
+    # Surrogate model of the search when the iteration being evaluated (by a worker of the trial store) was queued
+    _queued_surrogate: Optional[LossSurrogate] = None
+    # Observed working time of the resources in the training partition, to compute the features of the candidates
+    _calendar_coverage: Optional[CalendarCoverage] = None
     # Set of trials for the hyperparameter optimization process
     _bayes_trials = Trials
+    # Trials of the whole search (one per rung in a multi-fidelity search), to persist them in the checkpoint
+    _search_trials: List[Trials]
+    # Fraction of the validation cases simulated to evaluate the current iteration (lower in multi-fidelity search)
+    _fidelity: float = 1.0
 
     def __init__(
         self,
@@ -82,6 +190,17 @@ class ResourceModelOptimizer:
         settings: ResourceModelSettings,
         base_directory: Path,
         model_activities: Optional[list[str]] = None,
+        simulation_pool: Optional[Executor] = None,
+        metric_engine: MetricEngine = MetricEngine.LOG_DISTANCE_MEASURES,
+        approximate_dl: bool = False,
+        simulation_cache: Optional[SimulationCache] = None,
+        seed: Optional[int] = None,
+        max_parallel_trials: int = 1,
+        trial_store: Optional[TrialStore] = None,
+        checkpoint: Optional[SearchCheckpoint] = None,
+        warm_start_path: Optional[Path] = None,
+        num_warm_start_points: int = 5,
+        budget: Optional[StageBudget] = None,
     ):
         # Save event log, optimization settings, and output directory
         self.event_log = event_log
@@ -89,6 +208,19 @@ class ResourceModelOptimizer:
         self.settings = settings
         self.base_directory = base_directory
         self.model_activities = model_activities
+        self.simulation_pool = simulation_pool
+        self.metric_engine = metric_engine
+        self.approximate_dl = approximate_dl
+        self.simulation_cache = simulation_cache
+        self.seed = seed
+        self.max_parallel_trials = max_parallel_trials
+        self.trial_store = trial_store
+        self.checkpoint = checkpoint
+        self.warm_start_path = warm_start_path
+        self.num_warm_start_points = num_warm_start_points
+        self.budget = budget
+        self._iteration_lock = threading.Lock()
+        self._calendar_observations = CalendarObservationsCache(self.event_log.train_partition, self.event_log.log_ids)
         # Initialize table to store quality measures of each iteration
         self.evaluation_measurements = pd.DataFrame(
             columns=[
@@ -101,6 +233,7 @@ class ResourceModelOptimizer:
                 "support",
                 "participation",
                 "output_dir",
+                "fidelity",
             ]
         )
         # Instantiate trials for hyper-optimization process
@@ -134,8 +267,17 @@ class ResourceModelOptimizer:
             self._batching_rules = None
 
     def _hyperopt_iteration(self, hyperopt_iteration_dict: dict):
+        if self.trial_store is not None:
+            return self._queue_iteration(hyperopt_iteration_dict)
+        # Concurrent iterations run one at a time, except for their simulations
+        with self._iteration_lock:
+            return self._run_iteration(hyperopt_iteration_dict)
+
+    def _run_iteration(self, hyperopt_iteration_dict: dict):
+        iteration_index = self.iteration_index
+        self.iteration_index += 1
         # Report new iteration
-        print_subsection(f"Resource Model optimization iteration {self.iteration_index}")
+        print_subsection(f"Resource Model optimization iteration {iteration_index}")
 
         # Initialize status
         status = STATUS_OK
@@ -177,6 +319,25 @@ class ResourceModelOptimizer:
         if hyperopt_iteration_params.discover_batching_rules:
             current_bps_model.batching_rules = self._batching_rules
 
+        # Screen the candidate with the surrogate model, skipping its simulation if it is expected to lose
+        features, predicted_loss = None, None
+        if self.settings.screening:
+            status, features = hyperopt_step(
+                status, self._surrogate_features, current_bps_model.resource_model, hyperopt_iteration_params
+            )
+            predicted_loss = self._screen(features) if status == STATUS_OK and features is not None else None
+        if predicted_loss is not None:
+            print_step(f"Screened out by the surrogate model with predicted loss {predicted_loss}")
+            evaluation_measurements = [{"distance": predicted_loss, "metric": self.settings.optimization_metric}]
+            _, response = self._define_response(
+                STATUS_OK, evaluation_measurements, output_dir, current_bps_model.process_model
+            )
+            response |= {SCREENED_KEY: True, FEATURES_KEY: features}
+            print(f"Resource Model optimization iteration response: {response}")
+            self._process_measurements(hyperopt_iteration_params, STATUS_SCREENED, evaluation_measurements)
+            remove_asset(output_dir)
+            return response
+
         # Simulate candidate and evaluate its quality
         status, evaluation_measurements = hyperopt_step(
             status,
@@ -189,14 +350,86 @@ class ResourceModelOptimizer:
         status, response = self._define_response(
             status, evaluation_measurements, hyperopt_iteration_params.output_dir, current_bps_model.process_model
         )
+        if status == STATUS_OK and features is not None:
+            response[FEATURES_KEY] = features
         print(f"Resource Model optimization iteration response: {response}")
 
-        # Save the quality of this evaluation and increase iteration index
+        # Save the quality of this evaluation
         self._process_measurements(hyperopt_iteration_params, status, evaluation_measurements)
-        self.iteration_index += 1
 
         return response
 
+    def _queue_iteration(self, hyperopt_iteration_dict: dict) -> dict:
+        """
+        Queues the iteration in the trial store, and records the response and measurements of its evaluation.
+        """
+        response, evaluation_measurements = self.trial_store.evaluate(
+            self._stage, hyperopt_iteration_dict, get_incumbent_loss(self._bayes_trials), self._fit_surrogate()
+        )
+        print(f"Resource Model optimization iteration response: {response}")
+        with self._iteration_lock:
+            self.iteration_index += 1
+            self.evaluation_measurements = pd.concat([self.evaluation_measurements, evaluation_measurements])
+        return response
+
+    def _evaluate_queued_iteration(
+        self,
+        hyperopt_iteration_dict: dict,
+        incumbent_loss: Optional[float],
+        surrogate: Optional[LossSurrogate] = None,
+    ) -> Tuple[dict, pd.DataFrame]:
+        """
+        Evaluates an iteration queued in the trial store (in a worker of the store), racing its simulations against the
+        best loss of the search when it was queued, and screening it with the surrogate model of the search back then.
+
+        Returns
+        -------
+        Tuple[dict, :class:`pandas.DataFrame`]
+            Response of the iteration, and the measurements recorded by its evaluation.
+        """
+        self._queued_incumbent_loss = incumbent_loss
+        self._queued_surrogate = surrogate
+        num_measurements = len(self.evaluation_measurements)
+        response = self._hyperopt_iteration(hyperopt_iteration_dict)
+        return response, self.evaluation_measurements.iloc[num_measurements:]
+
+    def _publish_stage(self):
+        """
+        Publishes this optimizer in the trial store (with its current state, e.g., the fidelity of the rung) to
+        evaluate the next queued iterations, retiring the previously published one.
+        """
+        self._retire_stage()
+        self._stage = self.trial_store.publish(self._evaluate_queued_iteration)
+
+    def _retire_stage(self):
+        if self._stage is not None:
+            self.trial_store.retire(self._stage)
+            self._stage = None
+
+    def __getstate__(self) -> dict:
+        # Published in a trial store: without the resources of this process nor the trials of the search
+        state = self.__dict__.copy()
+        for name in [
+            "simulation_pool",
+            "trial_store",
+            "checkpoint",
+            "budget",
+            "_iteration_lock",
+            "_bayes_trials",
+            "_search_trials",
+        ]:
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.simulation_pool = None
+        self.trial_store = None
+        self.checkpoint = None
+        self.budget = None
+        self._iteration_lock = threading.Lock()
+        self._bayes_trials = Trials()
+
     def run(self) -> HyperoptIterationParams:
         """
         Runs the resource model optimization process.
@@ -214,16 +447,48 @@ class ResourceModelOptimizer:
         # Define search space
         self.iteration_index = 0
         search_space = self._define_search_space(settings=self.settings)
+        resumed_trials = self._resume_search()
 
         # Launch optimization process
-        params_best_iteration = fmin(
-            fn=self._hyperopt_iteration,
-            space=search_space,
-            algo=tpe.suggest,
-            max_evals=self.settings.num_iterations,
-            trials=self._bayes_trials,
-            show_progressbar=False,
-        )
+        try:
+            if self.trial_store is not None:
+                self._publish_stage()
+            if self.settings.search_strategy == SearchStrategy.SUCCESSIVE_HALVING:
+                # Multi-fidelity search, the trials of the full-fidelity rung are left in self._bayes_trials
+                self._search_trials = list(resumed_trials)
+                params_best_iteration = successive_halving(
+                    fn=self._hyperopt_iteration,
+                    space=search_space,
+                    num_candidates=self.settings.num_iterations,
+                    start_rung=self._start_rung,
+                    max_parallel_trials=self.max_parallel_trials,
+                    resumed_rungs=resumed_trials,
+                    algo=self._warm_start_algo(search_space),
+                    on_trial_done=self._save_checkpoint,
+                    stop=self._budget_exhausted,
+                )
+            else:
+                if len(resumed_trials) > 0:
+                    self._bayes_trials = resumed_trials[0]
+                self._search_trials = [self._bayes_trials]
+                params_best_iteration = parallel_fmin(
+                    fn=self._hyperopt_iteration,
+                    space=search_space,
+                    max_evals=self.settings.num_iterations,
+                    trials=self._bayes_trials,
+                    max_parallel_trials=self.max_parallel_trials,
+                    algo=self._warm_start_algo(search_space),
+                    on_trial_done=self._save_checkpoint,
+                    stop=self._budget_exhausted,
+                )
+        finally:
+            if self.trial_store is not None:
+                self._retire_stage()
+        if self._calendar_observations.misses > 0:
+            print_message(
+                f"Calendar observations: {self._calendar_observations.hits} reused, "
+                f"{self._calendar_observations.misses} built from the training partition"
+            )
         params_best_iteration = hyperopt.space_eval(search_space, params_best_iteration)
 
         # Process best results
@@ -263,6 +528,12 @@ class ResourceModelOptimizer:
 
     def _discover_resource_model(self, params: CalendarDiscoveryParameters) -> ResourceModel:
         print_step(f"Discovering resource model with {params}")
+        if params.discovery_type in OBSERVED_CALENDAR_TYPES:
+            return discover_observed_resource_model(
+                observations=self._calendar_observations,
+                params=params,
+                provided_profiles=copy.deepcopy(self._resource_pools),
+            )
         return discover_resource_model(
             event_log=self.event_log.train_partition,
             log_ids=self.event_log.log_ids,
@@ -339,8 +610,9 @@ class ResourceModelOptimizer:
             "discover_prioritization_rules": params.discover_prioritization_rules,
             "discover_batching_rules": params.discover_batching_rules,
             "status": status,
+            "fidelity": self._fidelity,
         }
-        if status == STATUS_OK:
+        if status in [STATUS_OK, STATUS_SCREENED]:
             for measurement in evaluation_measurements:
                 values = {
                     "distance": measurement["distance"],
@@ -383,16 +655,137 @@ class ResourceModelOptimizer:
 
         json_parameters_path = bps_model.to_json(output_dir, self.event_log.process_name)
 
-        evaluation_measures = simulate_and_evaluate(
-            process_model_path=bps_model.process_model,
-            parameters_path=json_parameters_path,
-            output_dir=output_dir,
-            simulation_cases=self.event_log.validation_partition[self.event_log.log_ids.case].nunique(),
-            simulation_start_time=self.event_log.validation_partition[self.event_log.log_ids.start_time].min(),
-            validation_log=self.event_log.validation_partition,
-            validation_log_ids=self.event_log.log_ids,
-            metrics=[self.settings.optimization_metric],
-            num_simulations=self.settings.num_evaluations_per_iteration,
+        simulation_cases = self.event_log.validation_partition[self.event_log.log_ids.case].nunique()
+        validation_cases = None
+        if self._fidelity < 1.0:
+            # Low-fidelity evaluation, simulate as many cases as the first ones of the validation partition
+            simulation_cases = validation_cases = max(1, math.ceil(simulation_cases * self._fidelity))
+        validation_log = self.event_log.shared_validation_partition(validation_cases)
+        reference_profile = self.event_log.validation_profile(
+            [self.settings.optimization_metric], self.metric_engine, self.approximate_dl, validation_cases
         )
+        stop_early = self._racing_rule()
+
+        # Let the other iterations proceed while this one waits for its simulations
+        with released(self._iteration_lock):
+            evaluation_measures = simulate_and_evaluate(
+                process_model_path=bps_model.process_model,
+                parameters_path=json_parameters_path,
+                output_dir=output_dir,
+                simulation_cases=simulation_cases,
+                simulation_start_time=self.event_log.validation_partition[self.event_log.log_ids.start_time].min(),
+                validation_log=validation_log,
+                validation_log_ids=self.event_log.log_ids,
+                metrics=[self.settings.optimization_metric],
+                num_simulations=self.settings.num_evaluations_per_iteration,
+                pool=self.simulation_pool,
+                reference_profile=reference_profile,
+                stop_early=stop_early,
+                cache=self.simulation_cache,
+                seed=self.seed,
+            )
 
         return evaluation_measures
+
+    def _start_rung(self, fidelity: float, trials: Trials):
+        """
+        Sets the fidelity and trials of the next rung of the successive halving search.
+        """
+        print_subsection(f"Successive halving rung simulating {fidelity:.0%} of the validation cases")
+        self._fidelity = fidelity
+        self._bayes_trials = trials
+        if not any(trials is rung_trials for rung_trials in self._search_trials):
+            # (the trials of a rung resumed from the checkpoint are already in them)
+            self._search_trials.append(trials)
+        if self.trial_store is not None:
+            # The queued iterations are evaluated with the fidelity of the new rung
+            self._publish_stage()
+
+    def _resume_search(self) -> List[Trials]:
+        """
+        Restores the measurements of the search saved in the checkpoint (if any), returning its trials (one per rung
+        in a multi-fidelity search), or an empty list if there is nothing to resume.
+        """
+        checkpoint = self.checkpoint.load() if self.checkpoint is not None else None
+        if checkpoint is None:
+            return []
+        trials, self.evaluation_measurements, self.iteration_index = checkpoint
+        num_trials = sum(len(rung_trials.trials) for rung_trials in trials)
+        print_message(f"Resuming the search from {num_trials} finished trials")
+        return trials
+
+    def _warm_start_algo(self, space: dict) -> Callable:
+        """
+        Suggestion algorithm of the search of [space]: TPE, after proposing the best candidates of the previous run to
+        warm-start from (if any).
+        """
+        if self.warm_start_path is None:
+            return tpe.suggest
+        points = prior_points(self.warm_start_path, space, self.num_warm_start_points)
+        print_message(f"Warm-starting the search with {len(points)} candidates of a previous run")
+        return replay_suggest(points, algo=tpe.suggest)
+
+    def _budget_exhausted(self) -> bool:
+        """
+        Whether the share of the time budget of the run allotted to the search (if any) is spent.
+        """
+        return self.budget is not None and self.budget.exhausted()
+
+    def _save_checkpoint(self, trials: Trials):
+        """
+        Saves the trials of the search in the checkpoint (if any), once [trials] (of the current rung) changed.
+        """
+        if self.checkpoint is not None:
+            self.checkpoint.save(self._search_trials, self.evaluation_measurements, self.iteration_index)
+
+    def _surrogate_features(
+        self, resource_model: ResourceModel, params: HyperoptIterationParams
+    ) -> Optional[List[float]]:
+        """
+        Features of a candidate for the surrogate model: coverage of the observed working time by the calendars of its
+        [resource_model] and their availability (see :class:`~simod.resource_model.features.CalendarCoverage`), and
+        whether it uses prioritization and batching rules. None if its calendars are not crisp.
+        """
+        if self._calendar_coverage is None:
+            self._calendar_coverage = CalendarCoverage(self.event_log.train_partition, self.event_log.log_ids)
+        calendar_features = self._calendar_coverage.features(resource_model)
+        if calendar_features is None:
+            return None
+        return calendar_features + [float(params.discover_prioritization_rules), float(params.discover_batching_rules)]
+
+    def _fit_surrogate(self) -> Optional[LossSurrogate]:
+        """
+        Surrogate model fitted on the candidates simulated so far in the search (in the current rung), or None if
+        screening is disabled or there are not enough of them.
+        """
+        if not self.settings.screening:
+            return None
+        return LossSurrogate.from_results(self._bayes_trials.results)
+
+    def _screen(self, features: List[float]) -> Optional[float]:
+        """
+        Predicted loss of the candidate with [features] if the surrogate model screens it out, or None if it has to be
+        simulated.
+        """
+        surrogate, incumbent_loss = self._fit_surrogate(), get_incumbent_loss(self._bayes_trials)
+        if self._queued_incumbent_loss is not None or self._queued_surrogate is not None:
+            # Evaluating an iteration queued in a trial store, whose trials are not in this copy of the optimizer
+            surrogate, incumbent_loss = self._queued_surrogate, self._queued_incumbent_loss
+        if surrogate is None or incumbent_loss is None:
+            return None
+        return surrogate.screened_loss(features, incumbent_loss, self.settings.screening_margin)
+
+    def _racing_rule(self) -> Optional[Callable[[List[dict]], bool]]:
+        """
+        Stopping rule to abandon the replicas of a candidate once they show it cannot beat the best trial so far, or
+        None if racing is disabled or there is no successful trial yet.
+        """
+        incumbent_loss = get_incumbent_loss(self._bayes_trials)
+        if self._queued_incumbent_loss is not None:
+            # Evaluating an iteration queued in a trial store, whose trials are not in this copy of the optimizer
+            incumbent_loss = self._queued_incumbent_loss
+        if not self.settings.racing or incumbent_loss is None:
+            return None
+        return lambda measurements: cannot_beat_incumbent(
+            [measurement["distance"] for measurement in measurements], incumbent_loss
+        )
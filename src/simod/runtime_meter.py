@@ -23,8 +23,12 @@ class RuntimeMeter:
         self.runtime_stop = dict()
         self.runtimes = dict()
 
-    def start(self, stage_name: str):
-        self.runtime_start[stage_name] = timeit.default_timer()
+    def start(self, stage_name: str, elapsed: float = 0.0):
+        # [elapsed]: seconds already spent in the stage before (e.g., by an interrupted run being resumed)
+        self.runtime_start[stage_name] = timeit.default_timer() - elapsed
+
+    def elapsed(self, stage_name: str) -> float:
+        return timeit.default_timer() - self.runtime_start[stage_name]
 
     def stop(self, stage_name: str):
         self.runtime_stop[stage_name] = timeit.default_timer()
@@ -127,6 +127,96 @@ class Metric(str, Enum):
         return f"Unknown Metric {str(self)}"
 
 
+class MetricEngine(str, Enum):
+    """
+    Enum class storing the implementations available to compute the evaluation metrics.
+
+    Attributes
+    ----------
+    LOG_DISTANCE_MEASURES : str
+        Row-wise implementation of the ``log_distance_measures`` package.
+    NATIVE : str
+        Vectorized implementation over integer-encoded NumPy arrays (see :mod:`simod.native_metrics`). Computes the
+        same distances (up to floating-point rounding) in a fraction of the time for large event logs.
+    """
+
+    LOG_DISTANCE_MEASURES = "log_distance_measures"
+    NATIVE = "native"
+
+    @classmethod
+    def from_str(cls, value: str) -> "MetricEngine":
+        if value.lower() in ["log_distance_measures", "ldm"]:
+            return cls.LOG_DISTANCE_MEASURES
+        elif value.lower() in ["native", "numpy"]:
+            return cls.NATIVE
+        else:
+            raise ValueError(f"Unknown value {value}")
+
+    def __str__(self):
+        return self.value
+
+
+class SearchStrategy(str, Enum):
+    """
+    Enum class storing the strategies available to search the hyperparameter space of the optimization stages.
+
+    Attributes
+    ----------
+    TPE : str
+        Tree-structured Parzen Estimator, every candidate is simulated with all the cases of the validation partition.
+    SUCCESSIVE_HALVING : str
+        Multi-fidelity successive halving (see :mod:`simod.successive_halving`). The candidates are first simulated
+        with a fraction of the cases (and thus, a shortened horizon), and only the most promising ones are promoted
+        to simulations with more cases, up to the full validation partition.
+    """
+
+    TPE = "tpe"
+    SUCCESSIVE_HALVING = "successive_halving"
+
+    @classmethod
+    def from_str(cls, value: str) -> "SearchStrategy":
+        if value.lower() in ["tpe"]:
+            return cls.TPE
+        elif value.lower() in ["successive_halving", "successive-halving", "sh"]:
+            return cls.SUCCESSIVE_HALVING
+        else:
+            raise ValueError(f"Unknown value {value}")
+
+    def __str__(self):
+        return self.value
+
+
+class BudgetPolicy(str, Enum):
+    """
+    Enum class storing the policies available to split the time budget of a run across its optimization stages.
+
+    Attributes
+    ----------
+    PROPORTIONAL : str
+        Each optimization stage is allotted a fixed fraction of the budget of the run, proportional to the number of
+        simulations it plans to run (iterations times evaluations per iteration).
+    ADAPTIVE : str
+        Each optimization stage is allotted, when it starts, a fraction of the budget remaining at that time,
+        proportional to the number of simulations it plans to run among the ones planned by it and the following
+        optimization stages. The budget left unused by a stage (or overrun by another) is thus redistributed.
+    """
+
+    PROPORTIONAL = "proportional"
+    ADAPTIVE = "adaptive"
+
+    @classmethod
+    def from_str(cls, value: str) -> "BudgetPolicy":
+        if value.lower() in ["proportional"]:
+            return cls.PROPORTIONAL
+        elif value.lower() in ["adaptive"]:
+            return cls.ADAPTIVE
+        else:
+            raise ValueError(f"Unknown value {value}")
+
+    def __str__(self):
+        return self.value
+
+
 class CommonSettings(BaseModel):
     """
     General configuration parameters of SIMOD and parameters common to all pipeline stages
@@ -149,6 +239,52 @@ class CommonSettings(BaseModel):
             Number of replications of the final evaluation to perform.
         evaluation_metrics : list
             List of :class:`Metric` evaluation metrics to use in the final evaluation.
+        metric_engine : :class:`MetricEngine`
+            Implementation used to compute the metrics, both in the optimization stages and in the final evaluation.
+        approximate_dl_in_optimization : bool
+            Boolean indicating whether to use a bounded-cost approximation of the control-flow log distance (DL) in
+            the optimization iterations. The final evaluation always uses the exact one.
+        simulation_cache_path : :class:`~pathlib.Path`, optional
+            Directory of the on-disk cache storing the measurements of the simulations in the optimization iterations,
+            so identical candidates (same BPMN model and simulation parameters) are not simulated again. It can be
+            reused across runs. If not provided, or without a [seed] (the simulations not being reproducible), the
+            simulations are not cached.
+        simulation_cache_size : int
+            Maximum number of simulated replicas kept in the cache (the least recently used ones are evicted).
+        seed : int, optional
+            Seed of the run. The seeds of the simulated replicas are derived from it, and every candidate of an
+            optimization stage is simulated with the same replica seeds (common random numbers), so the differences
+            between their losses are due to the candidates and not to the simulation noise. If not provided, the
+            simulations are not reproducible.
+        max_parallel_trials : int
+            Maximum number of trials of an optimization stage evaluated concurrently. With more than one, each time a
+            trial finishes a new candidate is asked to TPE (taking the running ones as the worst possible result), and
+            the simulations of the running trials share the pool of workers, sized accordingly.
+        trial_store_path : :class:`~pathlib.Path`, optional
+            Directory of a trial store (see :class:`~simod.trial_store.TrialStore`) to queue the trials of the
+            control-flow and resource model optimizations in, to be evaluated by ``simod worker`` processes (in this or
+            other nodes sharing the directory, and the output directory) instead of by this process. Up to
+            [max_parallel_trials] trials are queued at a time. If not provided, the trials are evaluated locally.
+        warm_start_path : :class:`~pathlib.Path`, optional
+            Output directory of a previous run on the same process, to warm-start the control-flow and resource model
+            optimizations with the best candidates it evaluated (see :func:`~simod.warm_start.prior_points`). They are
+            evaluated again as the first iterations, so the searches can converge in fewer iterations.
+        num_warm_start_points : int
+            Maximum number of candidates of the previous run evaluated to warm-start each optimization.
+        time_budget : float, optional
+            Wall-clock seconds the whole run (:meth:`~simod.simod.Simod.run`) is expected to take. It is split across
+            the control-flow and resource model optimizations following [budget_policy], which stop launching trials
+            once their share is spent. If not provided, the optimizations run all their iterations.
+        cpu_budget : float, optional
+            CPU seconds (e.g., 36000 for 10 CPU-hours) the whole run is expected to consume, counting this process and
+            the workers of its simulation pool (not the ``simod worker`` processes of a trial store). Split across the
+            optimizations as [time_budget], which stop launching trials once any of their shares is spent.
+        budget_policy : :class:`BudgetPolicy`
+            Policy to split [time_budget] and [cpu_budget] across the optimization stages.
+        checkpoint : bool
+            Whether to checkpoint the progress of the run in its output directory (see
+            :class:`~simod.checkpoint.Checkpoint`), to resume it if interrupted (``simod --resume``). Disabled by
+            default, as it stores the preprocessed event log and the state of the pipeline on disk.
         use_observed_arrival_distribution : bool
             Boolean indicating whether to use the distribution of observed case arrival times (true), or to discover a
             probability distribution function to model them (false).
@@ -167,6 +303,26 @@ class CommonSettings(BaseModel):
     perform_final_evaluation: bool = False
     num_final_evaluations: int = 10
     evaluation_metrics: List[Metric] = field(default_factory=list)
+    metric_engine: MetricEngine = MetricEngine.LOG_DISTANCE_MEASURES
+    approximate_dl_in_optimization: bool = False
+    # Simulation cache
+    simulation_cache_path: Optional[Path] = None
+    simulation_cache_size: int = 10_000
+    # Seed of the simulations
+    seed: Optional[int] = None
+    # Number of trials of the optimization stages evaluated concurrently
+    max_parallel_trials: int = 1
+    # Directory of the store to queue the trials in, for the workers to evaluate them
+    trial_store_path: Optional[Path] = None
+    # Output directory of a previous run to warm-start the optimizations from
+    warm_start_path: Optional[Path] = None
+    num_warm_start_points: int = 5
+    # Wall-clock and CPU seconds budget of the run, and policy to split it across the optimization stages
+    time_budget: Optional[float] = None
+    cpu_budget: Optional[float] = None
+    budget_policy: BudgetPolicy = BudgetPolicy.ADAPTIVE
+    # Whether to checkpoint the progress of the run, to resume it if interrupted
+    checkpoint: bool = False
     # Common config
     use_observed_arrival_distribution: bool = False
     clean_intermediate_files: bool = True
@@ -219,6 +375,30 @@ class CommonSettings(BaseModel):
         else:
             process_model_path = None
 
+        # Simulation cache path
+        if config.get("simulation_cache_path") is not None:
+            simulation_cache_path = Path(config["simulation_cache_path"])
+            if not simulation_cache_path.is_absolute():
+                simulation_cache_path = base_files_dir / simulation_cache_path
+        else:
+            simulation_cache_path = None
+
+        # Trial store path
+        if config.get("trial_store_path") is not None:
+            trial_store_path = Path(config["trial_store_path"])
+            if not trial_store_path.is_absolute():
+                trial_store_path = base_files_dir / trial_store_path
+        else:
+            trial_store_path = None
+
+        # Warm-start path
+        if config.get("warm_start_path") is not None:
+            warm_start_path = Path(config["warm_start_path"])
+            if not warm_start_path.is_absolute():
+                warm_start_path = base_files_dir / warm_start_path
+        else:
+            warm_start_path = None
+
         # Flag to perform final evaluation (set to true if there is a test log)
         if test_log_path is not None:
             perform_final_evaluation = True
@@ -254,6 +434,16 @@ class CommonSettings(BaseModel):
             )
             num_final_evaluations = 10
 
+        metric_engine = MetricEngine.from_str(config.get("metric_engine", "log_distance_measures"))
+        approximate_dl_in_optimization = config.get("approximate_dl_in_optimization", False)
+        simulation_cache_size = config.get("simulation_cache_size", 10_000)
+        seed = config.get("seed")
+        max_parallel_trials = max(1, config.get("max_parallel_trials", 1))
+        num_warm_start_points = config.get("num_warm_start_points", 5)
+        time_budget = config.get("time_budget")
+        cpu_budget = config.get("cpu_budget")
+        budget_policy = BudgetPolicy.from_str(config.get("budget_policy", "adaptive"))
+        checkpoint = config.get("checkpoint", False)
         use_observed_arrival_distribution = config.get("use_observed_arrival_distribution", False)
         clean_up = config.get("clean_intermediate_files", True)
         discover_data_attributes = config.get("discover_data_attributes", False)
@@ -266,6 +456,19 @@ class CommonSettings(BaseModel):
             perform_final_evaluation=perform_final_evaluation,
             num_final_evaluations=num_final_evaluations,
             evaluation_metrics=metrics,
+            metric_engine=metric_engine,
+            approximate_dl_in_optimization=approximate_dl_in_optimization,
+            simulation_cache_path=simulation_cache_path,
+            simulation_cache_size=simulation_cache_size,
+            seed=seed,
+            max_parallel_trials=max_parallel_trials,
+            trial_store_path=trial_store_path,
+            warm_start_path=warm_start_path,
+            num_warm_start_points=num_warm_start_points,
+            time_budget=time_budget,
+            cpu_budget=cpu_budget,
+            budget_policy=budget_policy,
+            checkpoint=checkpoint,
             use_observed_arrival_distribution=use_observed_arrival_distribution,
             clean_intermediate_files=clean_up,
             discover_data_attributes=discover_data_attributes,
@@ -287,6 +490,21 @@ class CommonSettings(BaseModel):
             "process_model_path": str(self.process_model_path) if self.process_model_path is not None else None,
             "num_final_evaluations": self.num_final_evaluations,
             "evaluation_metrics": [str(metric) for metric in self.evaluation_metrics],
+            "metric_engine": str(self.metric_engine),
+            "approximate_dl_in_optimization": self.approximate_dl_in_optimization,
+            "simulation_cache_path": (
+                str(self.simulation_cache_path) if self.simulation_cache_path is not None else None
+            ),
+            "simulation_cache_size": self.simulation_cache_size,
+            "seed": self.seed,
+            "max_parallel_trials": self.max_parallel_trials,
+            "trial_store_path": str(self.trial_store_path) if self.trial_store_path is not None else None,
+            "warm_start_path": str(self.warm_start_path) if self.warm_start_path is not None else None,
+            "num_warm_start_points": self.num_warm_start_points,
+            "time_budget": self.time_budget,
+            "cpu_budget": self.cpu_budget,
+            "budget_policy": str(self.budget_policy),
+            "checkpoint": self.checkpoint,
             "use_observed_arrival_distribution": self.use_observed_arrival_distribution,
             "clean_intermediate_files": self.clean_intermediate_files,
             "discover_data_attributes": self.discover_data_attributes,
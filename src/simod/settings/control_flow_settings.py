@@ -4,7 +4,7 @@ from typing import List, Optional, Tuple, Union
 from pix_framework.discovery.gateway_probabilities import GatewayProbabilitiesDiscoveryMethod
 from pydantic import BaseModel
 
-from .common_settings import Metric
+from .common_settings import Metric, SearchStrategy
 from ..utilities import parse_single_value_or_interval
 
 
@@ -102,6 +102,26 @@ class ControlFlowSettings(BaseModel):
         The number of optimization iterations to perform.
     num_evaluations_per_iteration : int
         The number of replications for the evaluations of each iteration.
+    racing : bool
+        Whether to evaluate the replications of each iteration as they finish, abandoning the iteration (and reporting
+        the mean of the evaluated ones) once a statistical test shows that it cannot beat the best iteration so far.
+    screening : bool
+        Whether to screen the candidates with a surrogate model (see :class:`~simod.surrogate.LossSurrogate`) before
+        simulating them: once enough candidates are simulated, the ones whose loss, predicted from cheap features of
+        their process model (directly-follows precision and recall w.r.t. the training log, and entropy of the gateway
+        probabilities), is worse than the best one by more than [screening_margin] are not simulated.
+    screening_margin : float
+        Relative margin (e.g., 0.1 for 10%) by which the predicted loss of a candidate has to be worse than the best
+        loss so far (on top of the prediction error of the surrogate model) to screen it out.
+    search_strategy : :class:`~simod.settings.common_settings.SearchStrategy`
+        Strategy to search the hyperparameter space (TPE with full-size simulations, or multi-fidelity successive
+        halving).
+    num_inner_iterations : int, optional
+        If provided, the search is factorized (with the TPE search strategy and a discovered process model): an outer
+        search samples the structural parameters (epsilon, eta, replace_or_joins, and prioritize_parallelism) and
+        discovers each process model once, and an inner search evaluates this number of candidates of the rest of
+        parameters (gateway probabilities method and f-score) with it. The total number of evaluated candidates is still
+        [num_iterations]. If not provided, all the parameters are sampled together in each iteration.
     gateway_probabilities : Union[:class:`GatewayProbabilitiesDiscoveryMethod`, List[:class:`GatewayProbabilitiesDiscoveryMethod`]]
         Fixed method or list of methods to use in each iteration to discover gateway probabilities.
     mining_algorithm : :class:`ProcessModelDiscoveryAlgorithm`, optional
@@ -112,6 +132,10 @@ class ControlFlowSettings(BaseModel):
     eta : Union[float, Tuple[float, float]], optional
         Fixed number or range for the threshold for filtering the incoming and outgoing edges in the discovery
         algorithm (between 0.0 and 1.0).
+    discovery_parameters_step : float, optional
+        Step to which the sampled values of the continuous parameters of the discovery algorithm (epsilon and eta)
+        are rounded, so candidates differing only in negligible decimals reuse the same discovered process model. If
+        not provided, the sampled values are used as they are.
     replace_or_joins : Union[bool, List[bool]], optional
         Fixed value or list for whether to replace non-trivial OR joins.
     prioritize_parallelism : Union[bool, List[bool]], optional
@@ -125,12 +149,18 @@ class ControlFlowSettings(BaseModel):
     optimization_metric: Metric = Metric.THREE_GRAM_DISTANCE
     num_iterations: int = 10
     num_evaluations_per_iteration: int = 3
+    racing: bool = False
+    screening: bool = False
+    screening_margin: float = 0.1
+    search_strategy: SearchStrategy = SearchStrategy.TPE
+    num_inner_iterations: Optional[int] = None
     gateway_probabilities: Union[
         GatewayProbabilitiesDiscoveryMethod, List[GatewayProbabilitiesDiscoveryMethod]
     ] = GatewayProbabilitiesDiscoveryMethod.DISCOVERY
     mining_algorithm: Optional[ProcessModelDiscoveryAlgorithm] = ProcessModelDiscoveryAlgorithm.SPLIT_MINER_V1
     epsilon: Optional[Union[float, Tuple[float, float]]] = (0.0, 1.0)  # parallelism threshold (epsilon)
     eta: Optional[Union[float, Tuple[float, float]]] = (0.0, 1.0)  # percentile for frequency threshold (eta)
+    discovery_parameters_step: Optional[float] = None  # rounding step of epsilon and eta
     discover_branch_rules: Optional[bool] = False
     f_score: Optional[Union[float, Tuple[float, float]]] = 0.7  # quality gateway for branch rules (f_score)
     replace_or_joins: Optional[Union[bool, List[bool]]] = False  # should replace non-trivial OR joins
@@ -177,6 +207,11 @@ class ControlFlowSettings(BaseModel):
         optimization_metric = Metric.from_str(config.get("optimization_metric", "n_gram_distance"))
         num_iterations = config.get("num_iterations", 10)
         num_evaluations_per_iteration = config.get("num_evaluations_per_iteration", 3)
+        racing = config.get("racing", False)
+        screening = config.get("screening", False)
+        screening_margin = config.get("screening_margin", 0.1)
+        search_strategy = SearchStrategy.from_str(config.get("search_strategy", "tpe"))
+        num_inner_iterations = config.get("num_inner_iterations")
         gateway_probabilities = GatewayProbabilitiesDiscoveryMethod.from_str(
             config.get("gateway_probabilities", "discovery")
         )
@@ -193,6 +228,8 @@ class ControlFlowSettings(BaseModel):
         else:
             raise ValueError(f"Unknown process model discovery algorithm: {mining_algorithm}")
 
+        discovery_parameters_step = config.get("discovery_parameters_step")
+
         discover_branch_rules = config.get("discover_branch_rules", False)
         f_score = None
         if discover_branch_rules:
@@ -202,10 +239,16 @@ class ControlFlowSettings(BaseModel):
             optimization_metric=optimization_metric,
             num_iterations=num_iterations,
             num_evaluations_per_iteration=num_evaluations_per_iteration,
+            racing=racing,
+            screening=screening,
+            screening_margin=screening_margin,
+            search_strategy=search_strategy,
+            num_inner_iterations=num_inner_iterations,
             gateway_probabilities=gateway_probabilities,
             mining_algorithm=mining_algorithm,
             epsilon=epsilon,
             eta=eta,
+            discovery_parameters_step=discovery_parameters_step,
             replace_or_joins=replace_or_joins,
             prioritize_parallelism=prioritize_parallelism,
             discover_branch_rules=discover_branch_rules,
@@ -225,6 +268,11 @@ class ControlFlowSettings(BaseModel):
             "optimization_metric": self.optimization_metric.value,
             "num_iterations": self.num_iterations,
             "num_evaluations_per_iteration": self.num_evaluations_per_iteration,
+            "racing": self.racing,
+            "screening": self.screening,
+            "screening_margin": self.screening_margin,
+            "search_strategy": self.search_strategy.value,
+            "num_inner_iterations": self.num_inner_iterations,
         }
 
         if isinstance(self.gateway_probabilities, GatewayProbabilitiesDiscoveryMethod):
@@ -241,6 +289,7 @@ class ControlFlowSettings(BaseModel):
                 dictionary["eta"] = self.eta
                 dictionary["replace_or_joins"] = self.replace_or_joins
                 dictionary["prioritize_parallelism"] = self.prioritize_parallelism
+            dictionary["discovery_parameters_step"] = self.discovery_parameters_step
 
         if self.discover_branch_rules and self.f_score is not None:
             dictionary["f_score"] = self.f_score
@@ -3,7 +3,7 @@ from typing import Optional, Tuple, Union
 from pix_framework.discovery.resource_calendar_and_performance.calendar_discovery_parameters import CalendarType
 from pydantic import BaseModel
 
-from simod.settings.common_settings import Metric
+from simod.settings.common_settings import Metric, SearchStrategy
 from simod.utilities import parse_single_value_or_interval
 
 
@@ -24,6 +24,21 @@ class ResourceModelSettings(BaseModel):
         The number of optimization iterations to perform.
     num_evaluations_per_iteration : int
         The number of replications for the evaluations of each iteration.
+    racing : bool
+        Whether to evaluate the replications of each iteration as they finish, abandoning the iteration (and reporting
+        the mean of the evaluated ones) once a statistical test shows that it cannot beat the best iteration so far.
+    screening : bool
+        Whether to screen the candidates with a surrogate model (see :class:`~simod.surrogate.LossSurrogate`) before
+        simulating them: once enough candidates are simulated, the ones whose loss, predicted from cheap features of
+        their resource model (fraction of the working time observed in the training log within the calendars,
+        fraction of the week the resources are available, and use of prioritization and batching rules), is worse
+        than the best one by more than [screening_margin] are not simulated. Fuzzy calendars are not screened.
+    screening_margin : float
+        Relative margin (e.g., 0.1 for 10%) by which the predicted loss of a candidate has to be worse than the best
+        loss so far (on top of the prediction error of the surrogate model) to screen it out.
+    search_strategy : :class:`~simod.settings.common_settings.SearchStrategy`
+        Strategy to search the hyperparameter space (TPE with full-size simulations, or multi-fidelity successive
+        halving).
     discovery_type : :class:`CalendarType`
         Type of calendar discovery method used for resource modeling.
     granularity : Union[int, Tuple[int, int]], optional
@@ -51,6 +66,10 @@ class ResourceModelSettings(BaseModel):
     optimization_metric: Metric = Metric.CIRCADIAN_EMD
     num_iterations: int = 10  # number of iterations for the optimization process
     num_evaluations_per_iteration: int = 3
+    racing: bool = False
+    screening: bool = False
+    screening_margin: float = 0.1
+    search_strategy: SearchStrategy = SearchStrategy.TPE
     discovery_type: CalendarType = CalendarType.UNDIFFERENTIATED
     granularity: Optional[Union[int, Tuple[int, int]]] = (15, 60)  # minutes per granule
     confidence: Optional[Union[float, Tuple[float, float]]] = (0.5, 0.85)  # from 0 to 1.0
@@ -103,6 +122,10 @@ class ResourceModelSettings(BaseModel):
         optimization_metric = Metric.from_str(config.get("optimization_metric", "circadian_emd"))
         num_iterations = config.get("num_iterations", 10)
         num_evaluations_per_iteration = config.get("num_evaluations_per_iteration", 3)
+        racing = config.get("racing", False)
+        screening = config.get("screening", False)
+        screening_margin = config.get("screening_margin", 0.1)
+        search_strategy = SearchStrategy.from_str(config.get("search_strategy", "tpe"))
         discover_prioritization_rules = config.get("discover_prioritization_rules", False)
         discover_batching_rules = config.get("discover_batching_rules", False)
 
@@ -128,6 +151,10 @@ class ResourceModelSettings(BaseModel):
             optimization_metric=optimization_metric,
             num_iterations=num_iterations,
             num_evaluations_per_iteration=num_evaluations_per_iteration,
+            racing=racing,
+            screening=screening,
+            screening_margin=screening_margin,
+            search_strategy=search_strategy,
             discovery_type=discovery_type,
             granularity=granularity,
             confidence=confidence,
@@ -152,6 +179,10 @@ class ResourceModelSettings(BaseModel):
             "optimization_metric": self.optimization_metric.value,
             "num_iterations": self.num_iterations,
             "num_evaluations_per_iteration": self.num_evaluations_per_iteration,
+            "racing": self.racing,
+            "screening": self.screening,
+            "screening_margin": self.screening_margin,
+            "search_strategy": self.search_strategy.value,
             "discovery_type": self.discovery_type.value,
             "discover_prioritization_rules": self.discover_prioritization_rules,
             "discover_batching_rules": self.discover_batching_rules,
@@ -1,11 +1,11 @@
 import json
 import shutil
+from concurrent.futures import Executor
 from pathlib import Path
 from typing import List, Optional
 
 import pandas as pd
 from pix_framework.discovery.case_arrival import discover_case_arrival_model
-from pix_framework.discovery.gateway_probabilities import compute_gateway_probabilities
 from pix_framework.discovery.resource_calendar_and_performance.calendar_discovery_parameters import (
     CalendarDiscoveryParameters,
 )
@@ -16,9 +16,12 @@ from pix_framework.io.bpmn import get_activities_names_from_bpmn
 
 from simod.batching.discovery import discover_batching_rules
 from simod.branch_rules.discovery import discover_branch_rules, map_branch_rules_to_flows
-from simod.cli_formatter import print_section, print_subsection
+from simod.budget import Budget, StageBudget
+from simod.checkpoint import CHECKPOINT_DIR, Checkpoint, SearchCheckpoint
+from simod.cli_formatter import print_message, print_section, print_subsection, print_warning
 from simod.control_flow.discovery import discover_process_model, add_bpmn_diagram_to_model
 from simod.control_flow.optimizer import ControlFlowOptimizer
+from simod.control_flow.replay import ReplayCache
 from simod.control_flow.settings import HyperoptIterationParams as ControlFlowHyperoptIterationParams
 from simod.data_attributes.discovery import discover_data_attributes
 from simod.event_log.event_log import EventLog
@@ -32,9 +35,15 @@ from simod.resource_model.settings import HyperoptIterationParams as ResourceMod
 from simod.runtime_meter import RuntimeMeter
 from simod.settings.simod_settings import SimodSettings
 from simod.simulation.parameters.BPS_model import BPSModel
-from simod.simulation.prosimos import simulate_and_evaluate
+from simod.simulation.cache import SimulationCache
+from simod.simulation.prosimos import create_simulation_pool, simulate_and_evaluate
+from simod.trial_store import TrialStore
 from simod.utilities import get_process_model_path, get_simulation_parameters_path
 
+# Measurements of the candidates of each optimization stage exported to the best result, to warm-start later runs
+CONTROL_FLOW_MEASUREMENTS = "control_flow_evaluation_measures.csv"
+RESOURCE_MODEL_MEASUREMENTS = "resource_model_evaluation_measures.csv"
+
 
 class Simod:
     """
@@ -50,6 +59,10 @@ class Simod:
             Path to the folder where to write all the SIMOD outputs.
         final_bps_model : :class:`~simod.simulation.parameters.BPS_model.BPSModel`
             Instance of the best BPS model discovered by SIMOD.
+        resume : bool
+            Whether to resume the run interrupted in [output_dir] from its checkpoint (see
+            :class:`~simod.checkpoint.Checkpoint`), instead of starting a new one. The resumed run keeps checkpointing
+            its progress.
     """
 
     # Event log with the train, validation and test logs.
@@ -69,12 +82,27 @@ class Simod:
     _resource_model_optimizer: Optional[ResourceModelOptimizer]
     # Optimizer for the Extraneous Delay Timers
     _extraneous_delays_optimizer: Optional[ExtraneousDelaysOptimizer]
+    # Pool of workers shared by the simulations of all the stages (alive only while running)
+    _simulation_pool: Optional[Executor] = None
+    # On-disk cache of the simulations of the optimization stages (if enabled)
+    _simulation_cache: Optional[SimulationCache] = None
+    # Store queueing the trials of the optimization stages for the workers to evaluate them (if enabled)
+    _trial_store: Optional[TrialStore] = None
+    # Replays of the variants of the event log on the process models, shared by the control-flow stage and final model
+    _replay_cache: ReplayCache
+    # Progress of the run persisted in the output directory, to resume it if interrupted (if enabled)
+    _checkpoint: Optional[Checkpoint] = None
+    # Whether the run resumes an interrupted one from the checkpoint
+    _resume: bool
+    # Time budget of the run, split across the optimization stages (alive only while running)
+    _budget: Optional[Budget] = None
 
     def __init__(
         self,
         settings: SimodSettings,
         event_log: EventLog,
         output_dir: Optional[Path] = None,
+        resume: bool = False,
     ):
         self._settings = settings
         self._event_log = event_log
@@ -93,6 +121,19 @@ class Simod:
             create_folder(self._extraneous_delays_dir)
         self._best_result_dir = self._output_dir / "best_result"
         create_folder(self._best_result_dir)
+        self._replay_cache = ReplayCache()
+        if self._settings.common.simulation_cache_path is not None:
+            if self._settings.common.seed is None:
+                print_warning("Simulation cache disabled: the simulations are only cached when a seed is provided")
+            else:
+                self._simulation_cache = SimulationCache(
+                    self._settings.common.simulation_cache_path, self._settings.common.simulation_cache_size
+                )
+        if self._settings.common.trial_store_path is not None:
+            self._trial_store = TrialStore(self._settings.common.trial_store_path)
+        self._resume = resume
+        if self._settings.common.checkpoint or self._resume:
+            self._checkpoint = Checkpoint(self._output_dir / CHECKPOINT_DIR)
 
     def run(self, runtimes: Optional[RuntimeMeter] = None):
         """
@@ -116,11 +157,65 @@ class Simod:
         - This method generates all output files under the folder ``[output_dir]/<latest_run>/best_result/``.
         - This method updates internal attributes of the class, such as `final_bps_model`, with the best BPS model found
           during the pipeline execution.
+        - All the simulations of the pipeline (optimization iterations and final evaluation) run in one pool of workers
+          that is kept alive during the entire execution, and shut down when it finishes.
+        - With checkpointing enabled in the settings, the settings and preprocessed event log are saved in
+          ``[output_dir]/checkpoint/`` when the run starts, and the state of the pipeline after each discovery stage,
+          and the trials of the optimization stages after each finished trial. A resumed run skips the completed
+          stages, and continues the interrupted one from its finished trials.
+        - With a time or CPU budget in the settings, the control-flow and resource model optimizations stop launching
+          trials once their share of the budget is spent, and ``runtimes.json`` reports the budget allocated to and
+          used by the run and each optimization (see :class:`~simod.budget.Budget`).
         """
+        if self._checkpoint is not None and not self._resume:
+            # New run, discard the progress of any previous one in the same directory
+            self._checkpoint.clear()
+            self._checkpoint.save_run(self._settings, self._event_log)
+        with create_simulation_pool(self._get_num_simulation_workers()) as simulation_pool:
+            self._simulation_pool = simulation_pool
+            self._run_pipeline(runtimes)
+        self._simulation_pool = None
+        self._event_log.release_shared_partitions()
+        if self._simulation_cache is not None:
+            print_message(
+                f"Simulation cache: {self._simulation_cache.hits} cached replicas reused, "
+                f"{self._simulation_cache.misses} simulated"
+            )
 
+    def _run_pipeline(self, runtimes: Optional[RuntimeMeter] = None):
         # Runtime object
         runtimes = RuntimeMeter() if runtimes is None else runtimes
-        runtimes.start(RuntimeMeter.TOTAL)
+
+        # State after the last stage completed by the run being resumed, if any
+        state = self._checkpoint.load_pipeline() if self._resume else None
+        if state is not None:
+            print_section(f"Resuming after completed stages: {', '.join(state['completed_stages'])}")
+            self._best_bps_model = state["best_bps_model"]
+            runtimes.runtimes.update(state["runtimes"])
+        else:
+            state = {
+                "completed_stages": [],
+                "best_control_flow_params": None,
+                "best_resource_model_params": None,
+                "total_runtime": 0.0,
+            }
+        completed_stages = state["completed_stages"]
+        best_control_flow_params = state["best_control_flow_params"]
+        best_resource_model_params = state["best_resource_model_params"]
+        runtimes.start(RuntimeMeter.TOTAL, elapsed=state["total_runtime"])
+        self._budget = Budget(
+            time_budget=self._settings.common.time_budget,
+            cpu_budget=self._settings.common.cpu_budget,
+            policy=self._settings.common.budget_policy,
+            stage_weights={
+                RuntimeMeter.CONTROL_FLOW_MODEL: self._settings.control_flow.num_iterations
+                * self._settings.control_flow.num_evaluations_per_iteration,
+                RuntimeMeter.RESOURCE_MODEL: self._settings.resource_model.num_iterations
+                * self._settings.resource_model.num_evaluations_per_iteration,
+            },
+        )
+        if state.get("budget") is not None:
+            self._budget.restore(state["budget"])
 
         # Model activities might be different from event log activities if the model has been provided,
         # because we split the event log into train, test, and validation partitions.
@@ -130,41 +225,51 @@ class Simod:
             model_activities = get_activities_names_from_bpmn(self._settings.common.process_model_path)
 
         # --- Discover Default Case Arrival and Resource Allocation models --- #
-        print_section("Discovering initial BPS Model")
-        runtimes.start(RuntimeMeter.INITIAL_MODEL)
-        self._best_bps_model.case_arrival_model = discover_case_arrival_model(
-            self._event_log.train_validation_partition,  # No optimization process here, use train + validation
-            self._event_log.log_ids,
-            use_observed_arrival_distribution=self._settings.common.use_observed_arrival_distribution,
-        )
-        calendar_discovery_parameters = CalendarDiscoveryParameters()
-        self._best_bps_model.resource_model = discover_resource_model(
-            self._event_log.train_partition,  # Only train to not discover tasks that won't exist for control-flow opt.
-            self._event_log.log_ids,
-            calendar_discovery_parameters,
-        )
-        self._best_bps_model.calendar_granularity = calendar_discovery_parameters.granularity
-        if model_activities is not None:
-            repair_with_missing_activities(
-                resource_model=self._best_bps_model.resource_model,
-                model_activities=model_activities,
-                event_log=self._event_log.train_validation_partition,
-                log_ids=self._event_log.log_ids,
+        if RuntimeMeter.INITIAL_MODEL not in completed_stages:
+            print_section("Discovering initial BPS Model")
+            runtimes.start(RuntimeMeter.INITIAL_MODEL)
+            self._best_bps_model.case_arrival_model = discover_case_arrival_model(
+                self._event_log.train_validation_partition,  # No optimization process here, use train + validation
+                self._event_log.log_ids,
+                use_observed_arrival_distribution=self._settings.common.use_observed_arrival_distribution,
+            )
+            calendar_discovery_parameters = CalendarDiscoveryParameters()
+            self._best_bps_model.resource_model = discover_resource_model(
+                self._event_log.train_partition,  # Only train to not discover tasks that won't exist for CF opt.
+                self._event_log.log_ids,
+                calendar_discovery_parameters,
             )
-        runtimes.stop(RuntimeMeter.INITIAL_MODEL)
+            self._best_bps_model.calendar_granularity = calendar_discovery_parameters.granularity
+            if model_activities is not None:
+                repair_with_missing_activities(
+                    resource_model=self._best_bps_model.resource_model,
+                    model_activities=model_activities,
+                    event_log=self._event_log.train_validation_partition,
+                    log_ids=self._event_log.log_ids,
+                )
+            runtimes.stop(RuntimeMeter.INITIAL_MODEL)
+            completed_stages.append(RuntimeMeter.INITIAL_MODEL)
+            self._save_checkpoint(completed_stages, best_control_flow_params, best_resource_model_params, runtimes)
 
         # --- Control-Flow Optimization --- #
-        print_section("Optimizing control-flow parameters")
-        runtimes.start(RuntimeMeter.CONTROL_FLOW_MODEL)
-        best_control_flow_params = self._optimize_control_flow()
-        self._best_bps_model.process_model = self._control_flow_optimizer.best_bps_model.process_model
-        self._best_bps_model.gateway_probabilities = self._control_flow_optimizer.best_bps_model.gateway_probabilities
-        self._best_bps_model.branch_rules = self._control_flow_optimizer.best_bps_model.branch_rules
-        runtimes.stop(RuntimeMeter.CONTROL_FLOW_MODEL)
+        if RuntimeMeter.CONTROL_FLOW_MODEL not in completed_stages:
+            print_section("Optimizing control-flow parameters")
+            runtimes.start(RuntimeMeter.CONTROL_FLOW_MODEL)
+            best_control_flow_params = self._optimize_control_flow()
+            self._best_bps_model.process_model = self._control_flow_optimizer.best_bps_model.process_model
+            self._best_bps_model.gateway_probabilities = (
+                self._control_flow_optimizer.best_bps_model.gateway_probabilities
+            )
+            self._best_bps_model.branch_rules = self._control_flow_optimizer.best_bps_model.branch_rules
+            runtimes.stop(RuntimeMeter.CONTROL_FLOW_MODEL)
+            completed_stages.append(RuntimeMeter.CONTROL_FLOW_MODEL)
+            self._save_checkpoint(completed_stages, best_control_flow_params, best_resource_model_params, runtimes)
 
         # --- Data Attributes --- #
-        if (self._settings.common.discover_data_attributes or
-                self._settings.resource_model.discover_prioritization_rules):
+        if (
+            self._settings.common.discover_data_attributes
+            or self._settings.resource_model.discover_prioritization_rules
+        ) and RuntimeMeter.DATA_ATTRIBUTES_MODEL not in completed_stages:
             print_section("Discovering data attributes")
             runtimes.start(RuntimeMeter.DATA_ATTRIBUTES_MODEL)
             global_attributes, case_attributes, event_attributes = discover_data_attributes(
@@ -175,25 +280,36 @@ class Simod:
             self._best_bps_model.case_attributes = case_attributes
             self._best_bps_model.event_attributes = event_attributes
             runtimes.stop(RuntimeMeter.DATA_ATTRIBUTES_MODEL)
+            completed_stages.append(RuntimeMeter.DATA_ATTRIBUTES_MODEL)
+            self._save_checkpoint(completed_stages, best_control_flow_params, best_resource_model_params, runtimes)
 
         # --- Resource Model Discovery --- #
-        print_section("Optimizing resource model parameters")
-        runtimes.start(RuntimeMeter.RESOURCE_MODEL)
-        best_resource_model_params = self._optimize_resource_model(model_activities)
-        self._best_bps_model.resource_model = self._resource_model_optimizer.best_bps_model.resource_model
-        self._best_bps_model.calendar_granularity = self._resource_model_optimizer.best_bps_model.calendar_granularity
-        self._best_bps_model.prioritization_rules = self._resource_model_optimizer.best_bps_model.prioritization_rules
-        self._best_bps_model.batching_rules = self._resource_model_optimizer.best_bps_model.batching_rules
-        runtimes.stop(RuntimeMeter.RESOURCE_MODEL)
+        if RuntimeMeter.RESOURCE_MODEL not in completed_stages:
+            print_section("Optimizing resource model parameters")
+            runtimes.start(RuntimeMeter.RESOURCE_MODEL)
+            best_resource_model_params = self._optimize_resource_model(model_activities)
+            best_resource_model = self._resource_model_optimizer.best_bps_model
+            self._best_bps_model.resource_model = best_resource_model.resource_model
+            self._best_bps_model.calendar_granularity = best_resource_model.calendar_granularity
+            self._best_bps_model.prioritization_rules = best_resource_model.prioritization_rules
+            self._best_bps_model.batching_rules = best_resource_model.batching_rules
+            runtimes.stop(RuntimeMeter.RESOURCE_MODEL)
+            completed_stages.append(RuntimeMeter.RESOURCE_MODEL)
+            self._save_checkpoint(completed_stages, best_control_flow_params, best_resource_model_params, runtimes)
 
         # --- Extraneous Delays Discovery --- #
-        if self._settings.extraneous_activity_delays is not None:
+        if (
+            self._settings.extraneous_activity_delays is not None
+            and RuntimeMeter.EXTRANEOUS_DELAYS not in completed_stages
+        ):
             print_section("Discovering extraneous delays")
             runtimes.start(RuntimeMeter.EXTRANEOUS_DELAYS)
             timers = self._optimize_extraneous_activity_delays()
             self._best_bps_model.extraneous_delays = timers
             add_timers_to_bpmn_model(self._best_bps_model.process_model, timers)  # Update BPMN model on disk
             runtimes.stop(RuntimeMeter.EXTRANEOUS_DELAYS)
+            completed_stages.append(RuntimeMeter.EXTRANEOUS_DELAYS)
+            self._save_checkpoint(completed_stages, best_control_flow_params, best_resource_model_params, runtimes)
 
         # --- Discover final BPS model --- #
         print_section("Discovering final BPS model")
@@ -227,10 +343,9 @@ class Simod:
         # Gateway probabilities
         print_subsection("Discovering gateway probabilities")
         best_bpmn_graph = BPMNGraph.from_bpmn_path(self.final_bps_model.process_model)
-        self.final_bps_model.gateway_probabilities = compute_gateway_probabilities(
-            event_log=self._event_log.train_validation_partition,
-            log_ids=self._event_log.log_ids,
+        self.final_bps_model.gateway_probabilities = self._replay_cache.gateway_probabilities(
             bpmn_graph=best_bpmn_graph,
+            variants=self._event_log.train_validation_variants(),
             discovery_method=best_control_flow_params.gateway_probabilities_method,
         )
         #  Branch Rules
@@ -240,7 +355,8 @@ class Simod:
                 best_bpmn_graph,
                 self._event_log.train_validation_partition,
                 self._event_log.log_ids,
-                f_score=best_control_flow_params.f_score
+                f_score=best_control_flow_params.f_score,
+                replay_cache=self._replay_cache,
             )
             self.final_bps_model.gateway_probabilities = \
                 map_branch_rules_to_flows(self.final_bps_model.gateway_probabilities, self.final_bps_model.branch_rules)
@@ -301,7 +417,8 @@ class Simod:
         canonical_model_path = self._best_result_dir / "canonical_model.json"
         _export_canonical_model(canonical_model_path, best_control_flow_params, best_resource_model_params)
         runtimes_model_path = self._best_result_dir / "runtimes.json"
-        _export_runtimes(runtimes_model_path, runtimes)
+        _export_runtimes(runtimes_model_path, runtimes, self._budget.report() if self._budget.enabled else None)
+        self._export_evaluation_measurements()
         if self._settings.common.clean_intermediate_files:
             self._clean_up()
         self._settings.to_yaml(self._best_result_dir)
@@ -313,13 +430,27 @@ class Simod:
         """
         Control-flow and Gateway Probabilities discovery.
         """
+        budget = self._budget.start_stage(RuntimeMeter.CONTROL_FLOW_MODEL)
         self._control_flow_optimizer = ControlFlowOptimizer(
             event_log=self._event_log,
             bps_model=self._best_bps_model,
             settings=self._settings.control_flow,
             base_directory=self._control_flow_dir,
+            simulation_pool=self._simulation_pool,
+            metric_engine=self._settings.common.metric_engine,
+            approximate_dl=self._settings.common.approximate_dl_in_optimization,
+            simulation_cache=self._simulation_cache,
+            seed=self._settings.common.seed,
+            replay_cache=self._replay_cache,
+            max_parallel_trials=self._settings.common.max_parallel_trials,
+            trial_store=self._trial_store,
+            checkpoint=self._search_checkpoint(RuntimeMeter.CONTROL_FLOW_MODEL),
+            warm_start_path=self._warm_start_path(CONTROL_FLOW_MEASUREMENTS),
+            num_warm_start_points=self._settings.common.num_warm_start_points,
+            budget=budget,
         )
         best_control_flow_params = self._control_flow_optimizer.run()
+        self._stop_stage_budget(budget)
         return best_control_flow_params
 
     def _optimize_resource_model(
@@ -328,14 +459,27 @@ class Simod:
         """
         Resource Model (resource profiles, calendars an activity performances) discovery.
         """
+        budget = self._budget.start_stage(RuntimeMeter.RESOURCE_MODEL)
         self._resource_model_optimizer = ResourceModelOptimizer(
             event_log=self._event_log,
             bps_model=self._best_bps_model,
             settings=self._settings.resource_model,
             base_directory=self._resource_model_dir,
             model_activities=model_activities,
+            simulation_pool=self._simulation_pool,
+            metric_engine=self._settings.common.metric_engine,
+            approximate_dl=self._settings.common.approximate_dl_in_optimization,
+            simulation_cache=self._simulation_cache,
+            seed=self._settings.common.seed,
+            max_parallel_trials=self._settings.common.max_parallel_trials,
+            trial_store=self._trial_store,
+            checkpoint=self._search_checkpoint(RuntimeMeter.RESOURCE_MODEL),
+            warm_start_path=self._warm_start_path(RESOURCE_MODEL_MEASUREMENTS),
+            num_warm_start_points=self._settings.common.num_warm_start_points,
+            budget=budget,
         )
         best_resource_model_params = self._resource_model_optimizer.run()
+        self._stop_stage_budget(budget)
         return best_resource_model_params
 
     def _optimize_extraneous_activity_delays(self) -> List[ExtraneousDelay]:
@@ -349,6 +493,72 @@ class Simod:
         timers = self._extraneous_delays_optimizer.run()
         return timers
 
+    def _stop_stage_budget(self, budget: StageBudget):
+        """
+        Stops measuring the consumption of the budget of a finished optimization stage, reporting it if limited.
+        """
+        budget.stop()
+        if budget.time_allocated is not None:
+            print_message(f"Time budget: {budget.time_used():.0f}s used of {budget.time_allocated:.0f}s allocated")
+        if budget.cpu_allocated is not None:
+            print_message(f"CPU budget: {budget.cpu_used():.0f}s used of {budget.cpu_allocated:.0f}s allocated")
+
+    def _warm_start_path(self, measurements_name: str) -> Optional[Path]:
+        """
+        Path to the measurements of an optimization stage in the run to warm-start from, or None if there is no such
+        run or it did not export them.
+        """
+        if self._settings.common.warm_start_path is None:
+            return None
+        measurements_path = self._settings.common.warm_start_path / "best_result" / measurements_name
+        if not measurements_path.exists():
+            print_message(f"Measurements to warm-start from not found in {measurements_path}, starting from scratch")
+            return None
+        return measurements_path
+
+    def _export_evaluation_measurements(self):
+        """
+        Copies the measurements of the candidates of the optimization stages to the best result, to keep them when the
+        intermediate files are removed and warm-start later runs from them.
+        """
+        for stage_dir, measurements_name in [
+            (self._control_flow_dir, CONTROL_FLOW_MEASUREMENTS),
+            (self._resource_model_dir, RESOURCE_MODEL_MEASUREMENTS),
+        ]:
+            measurements_path = stage_dir / "evaluation_measures.csv"
+            if measurements_path.exists():
+                shutil.copy(measurements_path, self._best_result_dir / measurements_name)
+
+    def _search_checkpoint(self, stage: str) -> Optional[SearchCheckpoint]:
+        """
+        Checkpoint of the search of the optimization [stage], or None if checkpointing is disabled.
+        """
+        return self._checkpoint.search(stage) if self._checkpoint is not None else None
+
+    def _save_checkpoint(
+        self,
+        completed_stages: List[str],
+        best_control_flow_params: Optional[ControlFlowHyperoptIterationParams],
+        best_resource_model_params: Optional[ResourceModelHyperoptIterationParams],
+        runtimes: RuntimeMeter,
+    ):
+        """
+        Checkpoints the state of the pipeline after its last completed stage (if checkpointing is enabled).
+        """
+        if self._checkpoint is None:
+            return
+        self._checkpoint.save_pipeline(
+            {
+                "completed_stages": completed_stages,
+                "best_bps_model": self._best_bps_model,
+                "best_control_flow_params": best_control_flow_params,
+                "best_resource_model_params": best_resource_model_params,
+                "runtimes": runtimes.runtimes,
+                "total_runtime": runtimes.elapsed(RuntimeMeter.TOTAL),
+                "budget": self._budget.report(),
+            }
+        )
+
     def _evaluate_model(self, process_model: Path, json_parameters: Path, output_dir: Path):
         simulation_cases = self._event_log.test_partition[self._settings.common.log_ids.case].nunique()
         simulation_start_time = self._event_log.test_partition[self._settings.common.log_ids.start_time].min()
@@ -367,22 +577,42 @@ class Simod:
             output_dir=output_dir,
             simulation_cases=simulation_cases,
             simulation_start_time=simulation_start_time,
-            validation_log=self._event_log.test_partition,
+            validation_log=self._event_log.shared_test_partition(),
             validation_log_ids=self._event_log.log_ids,
             num_simulations=self._settings.common.num_final_evaluations,
             metrics=metrics,
+            pool=self._simulation_pool,
+            reference_profile=self._event_log.test_profile(metrics, self._settings.common.metric_engine),
+            seed=self._settings.common.seed,
         )
 
         measurements_path = output_dir / "evaluation_metrics.csv"
         measurements_df = pd.DataFrame.from_records(measurements)
         measurements_df.to_csv(measurements_path, index=False)
 
+    def _get_num_simulation_workers(self) -> int:
+        """
+        Maximum number of simulations that any stage of the pipeline runs concurrently (the optimization stages
+        simulating the replicas of several trials at the same time).
+        """
+        max_parallel_trials = self._settings.common.max_parallel_trials
+        num_simulations = [
+            self._settings.control_flow.num_evaluations_per_iteration * max_parallel_trials,
+            self._settings.resource_model.num_evaluations_per_iteration * max_parallel_trials,
+        ]
+        if self._settings.common.perform_final_evaluation:
+            num_simulations += [self._settings.common.num_final_evaluations]
+        return max(num_simulations)
+
     def _clean_up(self):
         print_section("Removing intermediate files")
-        self._control_flow_optimizer.cleanup()
-        self._resource_model_optimizer.cleanup()
+        # (the directories of the stages completed before resuming the run are removed without their optimizers)
+        remove_asset(self._control_flow_dir)
+        remove_asset(self._resource_model_dir)
         if self._settings.extraneous_activity_delays is not None:
-            self._extraneous_delays_optimizer.cleanup()
+            remove_asset(self._extraneous_delays_dir)
+        if self._checkpoint is not None:
+            remove_asset(self._checkpoint.directory)
         if self._settings.common.process_model_path is None:
             final_xes_log_path = self._best_result_dir / f"{self._event_log.process_name}_train_val.xes"
             remove_asset(final_xes_log_path)
@@ -403,11 +633,14 @@ def _export_canonical_model(
 
 def _export_runtimes(
         file_path: Path,
-        runtimes: RuntimeMeter
+        runtimes: RuntimeMeter,
+        budget: Optional[dict] = None,
 ):
+    # [budget]: budget allocated and used by the run and its optimization stages (see Budget.report), if limited
+    reported_runtimes = runtimes.runtimes if budget is None else runtimes.runtimes | {"budget": budget}
     with open(file_path, "w") as file:
         json.dump(
-            runtimes.runtimes | {'explanation': f"Add '{RuntimeMeter.PREPROCESSING}' with '{RuntimeMeter.TOTAL}' "
+            reported_runtimes | {'explanation': f"Add '{RuntimeMeter.PREPROCESSING}' with '{RuntimeMeter.TOTAL}' "
                                                 f"for the runtime of the entire SIMOD pipeline and preprocessing "
                                                 f"stage. '{RuntimeMeter.EVALUATION}', if reported, should be left out "
                                                 f"as it measures the quality assessment of the final BPS model (i.e., "
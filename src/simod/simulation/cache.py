@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from ..settings.common_settings import Metric
+
+
+class SimulationCache:
+    """
+    Content-addressed on-disk store of the evaluation measurements of simulated replicas, with LRU eviction.
+
+    Each entry is keyed by a hash of everything determining the measurements of a replica (see :meth:`key`), so
+    candidates producing byte-identical BPMN models and simulation parameters reuse the measurements of the first one
+    evaluated instead of being simulated again. The store is a directory of small JSON files, so it can be reused
+    across runs (and shared by concurrent ones, as entries are written atomically).
+
+    Attributes
+    ----------
+    directory : :class:`pathlib.Path`
+        Directory storing the entries.
+    max_entries : int
+        Maximum number of entries kept. When exceeded, the least recently used ones are evicted in a batch (down to
+        90% of it), so the store is not scanned on every write once full.
+    hits : int
+        Number of lookups of this instance that found their entry.
+    misses : int
+        Number of lookups of this instance that did not find their entry.
+    """
+
+    # Directory storing the entries
+    directory: Path
+    # Maximum number of entries kept in the store
+    max_entries: int
+    # Lookup statistics of this instance
+    hits: int
+    misses: int
+    # Number of entries in the store, counted on the first write and kept up to date by the writes of this instance
+    # (the entries written by concurrent runs are only noticed when scanning the store to evict)
+    _num_entries: Optional[int]
+
+    def __init__(self, directory: Path, max_entries: int = 10_000):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._num_entries = None
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(
+        process_model_path: Path,
+        parameters_path: Path,
+        simulation_cases: int,
+        simulation_start_time: object,
+        seed: Optional[int],
+        metrics: Iterable[Metric],
+        reference_digest: str,
+        replica: int,
+    ) -> str:
+        """
+        Hash identifying the measurements of one simulated replica.
+
+        Parameters
+        ----------
+        process_model_path : :class:`pathlib.Path`
+            Path to the simulated BPMN model (its content is hashed).
+        parameters_path : :class:`pathlib.Path`
+            Path to the Prosimos simulation parameters (its content is hashed).
+        simulation_cases : int
+            Number of simulated cases.
+        simulation_start_time : :class:`pandas.Timestamp`
+            Start of the simulation.
+        seed : int, optional
+            Seed of the random number generator of the simulation, if any.
+        metrics : Iterable[:class:`~simod.settings.common_settings.Metric`]
+            Metrics computed for the replica.
+        reference_digest : str
+            Digest of the reference event log the simulated replica is compared with (and of the implementation used
+            to compute the metrics).
+        replica : int
+            Index of the replica.
+
+        Returns
+        -------
+        str
+            Hexadecimal SHA-256 digest.
+        """
+        digest = hashlib.sha256()
+        digest.update(process_model_path.read_bytes())
+        digest.update(b"\0")
+        digest.update(parameters_path.read_bytes())
+        digest.update(b"\0")
+        fields = [
+            simulation_cases,
+            str(simulation_start_time),
+            seed,
+            [metric.value for metric in metrics],
+            reference_digest,
+            replica,
+        ]
+        digest.update(json.dumps(fields).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        """
+        Measurements stored for [key], or None if there is no entry for it.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "r") as entry:
+                measurements = json.load(entry)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        # Mark the entry as recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        return [
+            {
+                "run_num": measurement["run_num"],
+                "metric": Metric(measurement["metric"]),
+                "distance": measurement["distance"],
+            }
+            for measurement in measurements
+        ]
+
+    def put(self, key: str, measurements: List[dict]):
+        """
+        Stores [measurements] under [key], evicting the least recently used entries if the store is full.
+        """
+        if self._num_entries is None:
+            self._num_entries = len(self._entries())
+        path = self._entry_path(key)
+        is_new = not path.exists()
+        path.parent.mkdir(exist_ok=True)
+        serialized = [
+            {
+                "run_num": int(measurement["run_num"]),
+                "metric": measurement["metric"].value,
+                "distance": float(measurement["distance"]),
+            }
+            for measurement in measurements
+        ]
+        temporary_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        with open(temporary_path, "w") as entry:
+            json.dump(serialized, entry)
+        os.replace(temporary_path, path)
+        if is_new:
+            self._num_entries += 1
+        if self._num_entries > self.max_entries:
+            self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _entries(self) -> List[Path]:
+        return list(self.directory.glob("*/*.json"))
+
+    def _evict(self):
+        entries = self._entries()
+        if len(entries) <= self.max_entries:
+            self._num_entries = len(entries)
+            return
+        # Evict 10% more than needed, so the next writes do not scan the store again
+        num_kept = self.max_entries - self.max_entries // 10
+        access_times = {}
+        for entry in entries:
+            try:
+                access_times[entry] = entry.stat().st_mtime
+            except FileNotFoundError:
+                pass
+        for entry in sorted(access_times, key=access_times.get)[: len(access_times) - num_kept]:
+            entry.unlink(missing_ok=True)
+        self._num_entries = min(len(access_times), num_kept)
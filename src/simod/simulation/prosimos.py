@@ -1,19 +1,34 @@
+import hashlib
 import itertools
 import multiprocessing
+import random
+import tempfile
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
 from concurrent.futures import ProcessPoolExecutor as Pool
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 from pix_framework.io.event_log import PROSIMOS_LOG_IDS, EventLogIDs, read_csv_log
 from prosimos.simulation_engine import run_simulation
 
 from simod.cli_formatter import print_message, print_notice, print_warning
-from simod.metrics import compute_metric
-from ..settings.common_settings import Metric
+from simod.metrics import ReferenceLogProfile, compute_metrics
+from ..event_log.shared_partition import SharedEventLogPartition
+from ..settings.common_settings import Metric, MetricEngine
+from .cache import SimulationCache
 
 cpu_count = multiprocessing.cpu_count()
+# Number of replicas of a raced candidate submitted first (the fewest the racing test needs to decide, see
+# simod.utilities.cannot_beat_incumbent), each following wave doubling it
+RACING_FIRST_WAVE = 2
+# CPU seconds spent by the workers of the simulation pools in their tasks (shared with the workers, see _metered)
+_pool_cpu_time = multiprocessing.Value("d", 0.0)
 
 
 @dataclass
@@ -33,6 +48,9 @@ class ProsimosSettings:
         Number of cases to simulate.
     simulation_start : :class:`pandas.Timestamp`
         Start timestamp for the simulation.
+    seed : int, optional
+        Seed of the random number generators used by the simulation. If not provided, the simulation is not
+        reproducible.
     """
 
     bpmn_path: Path
@@ -40,6 +58,7 @@ class ProsimosSettings:
     output_log_path: Path
     num_simulation_cases: int
     simulation_start: pd.Timestamp
+    seed: Optional[int] = None
 
 
 def simulate(settings: ProsimosSettings):
@@ -56,9 +75,15 @@ def simulate(settings: ProsimosSettings):
     - The function prints the simulation settings and invokes `run_simulation()`.
     - The labels of the start event, end event, and event timers are**not** recorded to the output log.
     - The simulation generates a process log stored in `settings.output_log_path`.
+    - Prosimos draws from the global generators of `random` and `numpy.random`, so both are seeded with
+      `settings.seed` (if any) right before the simulation, making it reproducible.
     """
     print_message(f"Simulation settings: {settings}")
 
+    if settings.seed is not None:
+        random.seed(settings.seed)
+        np.random.seed(settings.seed)
+
     run_simulation(
         bpmn_path=settings.bpmn_path.__str__(),
         json_path=settings.parameters_path.__str__(),
@@ -70,16 +95,66 @@ def simulate(settings: ProsimosSettings):
     )
 
 
+def create_simulation_pool(num_workers: int) -> Pool:
+    """
+    Creates a pool of worker processes to run simulations and evaluations in.
+
+    The pool is meant to be created once and shared by all the simulations of a run, so the workers (and the modules
+    they imported) stay warm across optimization iterations and stages. The caller is responsible for shutting it
+    down (e.g., using it as a context manager).
+
+    Parameters
+    ----------
+    num_workers : int
+        Maximum number of simulations to run concurrently. It is capped to the number of available CPUs.
+
+    Returns
+    -------
+    :class:`concurrent.futures.ProcessPoolExecutor`
+        Pool of worker processes.
+    """
+    global cpu_count
+
+    return Pool(max(1, min(num_workers, cpu_count)), initializer=_init_worker, initargs=(_pool_cpu_time,))
+
+
+def pool_cpu_time() -> float:
+    """
+    CPU seconds spent so far by the workers of all the simulation pools (see :func:`create_simulation_pool`) running
+    the simulations and evaluations of this process.
+    """
+    return _pool_cpu_time.value
+
+
+def replica_seeds(seed: Optional[int], num_replicas: int) -> List[Optional[int]]:
+    """
+    Seeds of the first [num_replicas] replicas of a simulation, derived from [seed] as independent streams, or None
+    for all of them if [seed] is None.
+
+    The seed of a replica only depends on [seed] and on its index, so simulating the same replica of different
+    candidates with the same [seed] uses the same random numbers (common random numbers), and their measurements
+    differ only because of the candidates.
+    """
+    if seed is None:
+        return [None] * num_replicas
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(num_replicas)]
+
+
 def simulate_and_evaluate(
     process_model_path: Path,
     parameters_path: Path,
     output_dir: Path,
     simulation_cases: int,
     simulation_start_time: pd.Timestamp,
-    validation_log: pd.DataFrame,
+    validation_log: Union[pd.DataFrame, SharedEventLogPartition],
     validation_log_ids: EventLogIDs,
     metrics: List[Metric],
     num_simulations: int = 1,
+    pool: Optional[Executor] = None,
+    reference_profile: Optional[ReferenceLogProfile] = None,
+    stop_early: Optional[Callable[[List[dict]], bool]] = None,
+    cache: Optional[SimulationCache] = None,
+    seed: Optional[int] = None,
 ) -> List[dict]:
     """
     Simulates a process model using Prosimos multiple times and evaluates the results.
@@ -99,33 +174,122 @@ def simulate_and_evaluate(
         Number of cases to simulate per run.
     simulation_start_time : :class:`pandas.Timestamp`
         Start timestamp for the simulation.
-    validation_log : :class:`pandas.DataFrame`
-        The actual event log to compare against.
+    validation_log : Union[:class:`pandas.DataFrame`, :class:`SharedEventLogPartition`]
+        The actual event log to compare against. When given as a shared partition (see
+        :class:`~simod.event_log.shared_partition.SharedEventLogPartition`), the workers load it from the exported
+        file instead of receiving a pickled copy with each replica.
     validation_log_ids : :class:`EventLogIDs`
         Column mappings for identifying events in the validation log.
     metrics : List[:class:`~simod.settings.common_settings.Metric`]
         A list of metrics used to evaluate the simulated logs.
     num_simulations : int, optional
         Number of parallel simulation runs (default is 1).
+    pool : :class:`concurrent.futures.Executor`, optional
+        Pool of workers to run the simulations and evaluations in (see :func:`create_simulation_pool`). If not
+        provided, a temporary pool is created for each step.
+    reference_profile : :class:`~simod.metrics.ReferenceLogProfile`, optional
+        Precomputed profile of the validation log. The metrics it covers are computed against the profile, and the
+        validation log is only loaded by the workers if some metric is not covered.
+    stop_early : Callable[[List[dict]], bool], optional
+        Racing rule. If provided, the replicas are submitted in waves (see :func:`_race_in_pool`) and evaluated as
+        they finish, and the evaluation stops (discarding the remaining replicas) as soon as this function returns
+        True for the measurements gathered so far.
+    cache : :class:`~simod.simulation.cache.SimulationCache`, optional
+        Store of the measurements of previously evaluated replicas. The replicas with an entry (same BPMN model,
+        parameters, number of cases, start time, seed, metrics, and validation log) reuse its measurements instead of
+        being simulated, and the measurements of the simulated ones are stored in it. Only used with a [seed].
+    seed : int, optional
+        Seed the seeds of the replicas are derived from (see :func:`replica_seeds`). If not provided, the simulations
+        are not reproducible, so they are not cached.
 
     Returns
     -------
     List[dict]
-        A list of evaluation results, one for each simulated log.
+        A list of evaluation results, one for each simulated log (only the evaluated ones when stopped early).
 
     Notes
     -----
     - Uses multiprocessing to speed up simulation when `num_simulations > 1`.
     - Simulated logs are automatically compared with `validation_log`.
+    - Each replica is simulated, read, and evaluated by the same worker, so only the evaluation measurements (and not
+      the simulated logs) are transferred back to the calling process.
+    - When racing, the replicas of the next wave are only submitted once the previous wave is evaluated without
+      stopping, so the ones of a candidate rejected early are never simulated. When stopping early, the submitted
+      replicas that have not started yet are cancelled. A running simulation cannot be interrupted, so the replicas
+      already running finish their simulation (writing their simulated log to `output_dir`) but skip its
+      evaluation. They are awaited before returning, so no replica writes to `output_dir` once this function returns.
+    - The replicas whose measurements are taken from the cache do not write their simulated log to `output_dir`.
     """
+    replica_arguments = [
+        (
+            ProsimosSettings(
+                bpmn_path=process_model_path,
+                parameters_path=parameters_path,
+                output_log_path=output_dir / f"simulated_log_{rep}.csv",
+                num_simulation_cases=simulation_cases,
+                simulation_start=simulation_start_time,
+                seed=replica_seed,
+            ),
+            rep,
+            validation_log,
+            validation_log_ids,
+            metrics,
+            reference_profile,
+            cache,
+            None,
+        )
+        for rep, replica_seed in enumerate(replica_seeds(seed, num_simulations))
+    ]
 
-    simulation_log_paths = simulate_in_parallel(
-        process_model_path, num_simulations, output_dir, parameters_path, simulation_cases, simulation_start_time
-    )
-
-    evaluation_measurements = evaluate_logs(metrics, simulation_log_paths, validation_log, validation_log_ids)
+    # Reuse the measurements of the replicas already evaluated (if caching, only seeded replicas are reproducible)
+    cached_measurements = []
+    if cache is not None and seed is not None:
+        reference_digest = _reference_digest(validation_log, validation_log_ids, reference_profile)
+        pending_arguments = []
+        for arguments in replica_arguments:
+            key = SimulationCache.key(
+                process_model_path,
+                parameters_path,
+                simulation_cases,
+                simulation_start_time,
+                arguments[0].seed,
+                metrics,
+                reference_digest,
+                arguments[1],
+            )
+            measurements = cache.get(key)
+            if measurements is None:
+                pending_arguments.append(arguments[:-1] + (key,))
+            else:
+                cached_measurements += measurements
+        if len(pending_arguments) < len(replica_arguments):
+            print_notice(f"Reusing {len(replica_arguments) - len(pending_arguments)} cached replicas")
+        replica_arguments = pending_arguments
+        if len(replica_arguments) == 0 or (stop_early is not None and stop_early(cached_measurements)):
+            return cached_measurements
+        if stop_early is not None and len(cached_measurements) > 0:
+            racing_rule = stop_early
+
+            def stop_early(measurements: List[dict]) -> bool:
+                return racing_rule(cached_measurements + measurements)
+
+    print_notice(f"Simulating and evaluating {len(replica_arguments)} times")
+
+    if stop_early is None:
+        evaluation_measurements = _map_in_pool(_simulate_and_evaluate_replica, replica_arguments, pool)
+        evaluation_measurements = list(itertools.chain.from_iterable(evaluation_measurements))
+    elif pool is not None:
+        evaluation_measurements = _race_in_pool(_simulate_and_evaluate_replica, replica_arguments, pool, stop_early)
+    else:
+        temporary_pool = create_simulation_pool(len(replica_arguments))
+        try:
+            evaluation_measurements = _race_in_pool(
+                _simulate_and_evaluate_replica, replica_arguments, temporary_pool, stop_early
+            )
+        finally:
+            temporary_pool.shutdown(wait=False, cancel_futures=True)
 
-    return evaluation_measurements
+    return cached_measurements + evaluation_measurements
 
 
 def simulate_in_parallel(
@@ -135,6 +299,8 @@ def simulate_in_parallel(
     parameters_path: Path,
     simulation_cases: int,
     simulation_start_time: pd.Timestamp,
+    pool: Optional[Executor] = None,
+    seed: Optional[int] = None,
 ) -> List[Path]:
     """
     Simulates a process model using Prosimos num_simulations times in parallel.
@@ -145,12 +311,10 @@ def simulate_in_parallel(
     :param parameters_path: Path to the Prosimos parameters.
     :param simulation_cases: Number of cases to simulate.
     :param simulation_start_time: Start time of the simulation.
+    :param pool: Pool of workers to run the simulations in. If not provided, a temporary one is created.
+    :param seed: Seed the seeds of the simulations are derived from (see :func:`replica_seeds`). Default: None.
     :return: Paths to the simulated logs.
     """
-    global cpu_count
-
-    w_count = min(num_simulations, cpu_count)
-
     simulation_arguments = [
         ProsimosSettings(
             bpmn_path=process_model_path,
@@ -158,14 +322,14 @@ def simulate_in_parallel(
             output_log_path=output_dir / f"simulated_log_{rep}.csv",
             num_simulation_cases=simulation_cases,
             simulation_start=simulation_start_time,
+            seed=replica_seed,
         )
-        for rep in range(num_simulations)
+        for rep, replica_seed in enumerate(replica_seeds(seed, num_simulations))
     ]
 
-    print_notice(f"Simulating {len(simulation_arguments)} times with {w_count} workers")
+    print_notice(f"Simulating {len(simulation_arguments)} times")
 
-    with Pool(w_count) as pool:
-        pool.map(simulate, simulation_arguments)
+    _map_in_pool(simulate, simulation_arguments, pool)
 
     simulation_log_paths = [simulation_argument.output_log_path for simulation_argument in simulation_arguments]
 
@@ -175,42 +339,170 @@ def simulate_in_parallel(
 def evaluate_logs(
     metrics: List[Metric],
     simulation_log_paths: List[Path],
-    validation_log: pd.DataFrame,
+    validation_log: Union[pd.DataFrame, SharedEventLogPartition],
     validation_log_ids: EventLogIDs,
+    pool: Optional[Executor] = None,
+    reference_profile: Optional[ReferenceLogProfile] = None,
 ) -> List[dict]:
     """
     Calculates the evaluation metrics for the simulated logs comparing it with the validation log.
+    If [pool] is not provided, the logs are read and evaluated in temporary pools. If [reference_profile] is provided,
+    the metrics it covers are computed against it instead of the validation log.
     """
-    global cpu_count
-
-    w_count = min(len(simulation_log_paths), cpu_count)
-
     # Read simulated logs
 
     read_arguments = [
         (simulation_log_paths[index], PROSIMOS_LOG_IDS, index) for index in range(len(simulation_log_paths))
     ]
 
-    print_notice(f"Reading {len(read_arguments)} simulated logs with {w_count} workers")
+    print_notice(f"Reading {len(read_arguments)} simulated logs")
 
-    with Pool(w_count) as pool:
-        simulated_logs = pool.map(_read_simulated_log, read_arguments)
+    simulated_logs = _map_in_pool(_read_simulated_log, read_arguments, pool)
 
     # Evaluate
 
     evaluation_arguments = [
-        (validation_log, validation_log_ids, log, PROSIMOS_LOG_IDS, metrics) for log in simulated_logs
+        (validation_log, validation_log_ids, log, PROSIMOS_LOG_IDS, metrics, reference_profile)
+        for log in simulated_logs
     ]
 
-    print_notice(f"Evaluating {len(evaluation_arguments)} simulated logs with {w_count} workers")
+    print_notice(f"Evaluating {len(evaluation_arguments)} simulated logs")
 
-    with Pool(w_count) as pool:
-        evaluation_measurements = pool.map(_evaluate_logs_using_metrics, evaluation_arguments)
+    evaluation_measurements = _map_in_pool(_evaluate_logs_using_metrics, evaluation_arguments, pool)
     evaluation_measurements = list(itertools.chain.from_iterable(evaluation_measurements))
 
     return evaluation_measurements
 
 
+def _map_in_pool(function: Callable, arguments: list, pool: Optional[Executor]) -> list:
+    """
+    Maps [function] over [arguments] in [pool]. If no pool is provided, a temporary one (with one worker per argument,
+    up to the number of CPUs) is created and shut down afterward.
+    """
+    if pool is not None:
+        return list(pool.map(partial(_metered, function), arguments))
+
+    with create_simulation_pool(len(arguments)) as temporary_pool:
+        return list(temporary_pool.map(partial(_metered, function), arguments))
+
+
+def _race_in_pool(
+    function: Callable, arguments: list, pool: Executor, stop_early: Callable[[List[dict]], bool]
+) -> List[dict]:
+    """
+    Submits [function] over [arguments] to [pool] in waves and gathers the measurements as they finish, stopping once
+    [stop_early] is satisfied by the measurements gathered so far. The first wave has RACING_FIRST_WAVE tasks, and
+    each following one, submitted once the previous one finishes without stopping, twice as many. When stopping, the
+    tasks not submitted yet are skipped, the submitted ones not started are cancelled, and the running ones are
+    signaled to stop (see the [stop_path] of :func:`_simulate_and_evaluate_replica`) and awaited.
+    """
+    # Flag file signaling the running tasks (in other processes of this node) to stop
+    stop_path = Path(tempfile.gettempdir()) / f"simod_race_{uuid.uuid4().hex}"
+    racing_function = partial(function, stop_path=stop_path)
+    pending = set()
+    num_submitted = 0
+    wave_size = RACING_FIRST_WAVE
+    measurements = []
+    while num_submitted < len(arguments) or len(pending) > 0:
+        if len(pending) == 0:
+            wave = arguments[num_submitted : num_submitted + wave_size]
+            pending = {pool.submit(_metered, racing_function, argument) for argument in wave}
+            num_submitted += len(wave)
+            wave_size *= 2
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            measurements += future.result()
+        if (len(pending) > 0 or num_submitted < len(arguments)) and stop_early(measurements):
+            stop_path.touch()
+            num_cancelled = sum(future.cancel() for future in pending)
+            print_notice(
+                f"Stopped early after evaluating {num_submitted - len(pending)} of {len(arguments)} replicas, "
+                f"skipping {len(arguments) - num_submitted} not submitted, cancelling {num_cancelled}, and waiting for "
+                f"{len(pending) - num_cancelled} still running to stop"
+            )
+            # (their measurements are discarded, and the caller can remove or reuse the output directory afterward)
+            wait(pending)
+            stop_path.unlink(missing_ok=True)
+            break
+    return measurements
+
+
+def _init_worker(pool_cpu_time: multiprocessing.Value):
+    # Inherit the counter of the process creating the pool (with the spawn start method, the module is imported again)
+    global _pool_cpu_time
+    _pool_cpu_time = pool_cpu_time
+
+
+def _metered(function: Callable, argument):
+    """
+    Runs [function] over [argument] in a worker of a simulation pool, adding the CPU time it takes to the counter of
+    the process that created the pool.
+    """
+    start = time.process_time()
+    try:
+        return function(argument)
+    finally:
+        with _pool_cpu_time.get_lock():
+            _pool_cpu_time.value += time.process_time() - start
+
+
+def _simulate_and_evaluate_replica(arguments: Tuple, stop_path: Optional[Path] = None) -> List[dict]:
+    """
+    Simulates one replica, reads the simulated log, and evaluates it against the validation log, returning only the
+    evaluation measurements. If the file [stop_path] exists (the race of the replicas was decided), the replica is not
+    simulated, or, if it was already simulating, not evaluated, returning no measurements.
+    """
+    settings: ProsimosSettings = arguments[0]
+    simulation_repetition_index: int = arguments[1]
+    validation_log: Union[pd.DataFrame, SharedEventLogPartition] = arguments[2]
+    validation_log_ids: EventLogIDs = arguments[3]
+    metrics: List[Metric] = arguments[4]
+    reference_profile: Optional[ReferenceLogProfile] = arguments[5]
+    cache: Optional[SimulationCache] = arguments[6]
+    cache_key: Optional[str] = arguments[7]
+
+    if stop_path is not None and stop_path.exists():
+        return []
+    simulate(settings)
+    if stop_path is not None and stop_path.exists():
+        return []
+    simulated_log = _read_simulated_log((settings.output_log_path, PROSIMOS_LOG_IDS, simulation_repetition_index))
+
+    measurements = _evaluate_logs_using_metrics(
+        (validation_log, validation_log_ids, simulated_log, PROSIMOS_LOG_IDS, metrics, reference_profile)
+    )
+    if cache is not None and cache_key is not None:
+        cache.put(cache_key, measurements)
+
+    return measurements
+
+
+def _reference_digest(
+    validation_log: Union[pd.DataFrame, SharedEventLogPartition],
+    validation_log_ids: EventLogIDs,
+    reference_profile: Optional[ReferenceLogProfile],
+) -> str:
+    """
+    Digest of the validation log and of the implementation computing the metrics against it, for the cache keys.
+    """
+    if isinstance(validation_log, SharedEventLogPartition) and validation_log.digest != "":
+        digest = validation_log.digest
+    else:
+        if isinstance(validation_log, SharedEventLogPartition):
+            validation_log = validation_log.load()
+        columns = [
+            validation_log_ids.case,
+            validation_log_ids.activity,
+            validation_log_ids.start_time,
+            validation_log_ids.end_time,
+            validation_log_ids.resource,
+        ]
+        digest = hashlib.sha256(pd.util.hash_pandas_object(validation_log[columns], index=False).values).hexdigest()
+    if reference_profile is None:
+        return f"{digest}:{MetricEngine.LOG_DISTANCE_MEASURES.value}:False"
+    return f"{digest}:{reference_profile.engine.value}:{reference_profile.approximate_dl}"
+
+
 def _read_simulated_log(arguments: Tuple):
     log_path, log_ids, simulation_repetition_index = arguments
 
@@ -224,11 +516,20 @@ def _read_simulated_log(arguments: Tuple):
 
 
 def _evaluate_logs_using_metrics(arguments: Tuple) -> List[dict]:
-    validation_log: pd.DataFrame = arguments[0]
+    validation_log: Union[pd.DataFrame, SharedEventLogPartition] = arguments[0]
     validation_log_ids: EventLogIDs = arguments[1]
     simulated_log: pd.DataFrame = arguments[2]
     simulated_log_ids: EventLogIDs = arguments[3]
     metrics: List[Metric] = arguments[4]
+    reference_profile: Optional[ReferenceLogProfile] = arguments[5]
+
+    # The validation log is only needed for the metrics not covered by the reference profile
+    covered_metrics = reference_profile.metrics if reference_profile is not None else []
+    if any(metric not in covered_metrics for metric in metrics):
+        if isinstance(validation_log, SharedEventLogPartition):
+            validation_log = validation_log.load()
+    else:
+        validation_log = None
 
     if len(simulated_log) > 0:
         rep = simulated_log.iloc[0].run_num
@@ -236,9 +537,10 @@ def _evaluate_logs_using_metrics(arguments: Tuple) -> List[dict]:
         print_warning("Error with the simulation! Trying to evaluate an empty simulated log.")
         rep = -1
 
-    measurements = []
-    for metric in metrics:
-        value = compute_metric(metric, validation_log, validation_log_ids, simulated_log, simulated_log_ids)
-        measurements.append({"run_num": rep, "metric": metric, "distance": value})
+    # All the metrics are computed in a single pass over the simulated log
+    distances = compute_metrics(
+        metrics, validation_log, validation_log_ids, simulated_log, simulated_log_ids, reference_profile
+    )
+    measurements = [{"run_num": rep, "metric": metric, "distance": distances[metric]} for metric in metrics]
 
     return measurements
@@ -0,0 +1,119 @@
+from typing import Callable, List, Optional, Tuple
+
+from hyperopt import STATUS_OK, Trials, tpe
+
+from .parallel_search import parallel_fmin, replay_suggest, trial_point
+
+# Fraction of candidates kept in each rung (and factor by which the fidelity grows from one rung to the next)
+REDUCTION_FACTOR = 3
+# Lowest fraction of the cases a candidate is simulated with
+MIN_FIDELITY = 1 / 9
+
+
+def successive_halving(
+    fn: Callable[[dict], dict],
+    space: dict,
+    num_candidates: int,
+    start_rung: Callable[[float, Trials], None],
+    reduction_factor: int = REDUCTION_FACTOR,
+    min_fidelity: float = MIN_FIDELITY,
+    max_parallel_trials: int = 1,
+    resumed_rungs: Optional[List[Trials]] = None,
+    algo: Callable = tpe.suggest,
+    on_trial_done: Optional[Callable[[Trials], None]] = None,
+    stop: Optional[Callable[[], bool]] = None,
+) -> dict:
+    """
+    Multi-fidelity hyperparameter search by successive halving.
+
+    The first rung samples [num_candidates] candidates with TPE and evaluates them at the lowest fidelity. Each of
+    the following rungs re-evaluates the best 1/[reduction_factor] candidates of the previous one at a fidelity
+    [reduction_factor] times higher, the last rung evaluating them at full fidelity.
+
+    Parameters
+    ----------
+    fn : Callable[[dict], dict]
+        Hyperopt objective function.
+    space : dict
+        Hyperopt search space.
+    num_candidates : int
+        Number of candidates evaluated in the first rung.
+    start_rung : Callable[[float, Trials], None]
+        Function called before evaluating each rung with its fidelity (fraction of the cases to simulate, between 0
+        and 1) and the trials the rung is evaluated into, so the caller can adapt the objective to them.
+    reduction_factor : int
+        Factor by which the number of candidates is reduced, and the fidelity increased, from one rung to the next.
+    min_fidelity : float
+        Lower bound for the fidelity of the first rung.
+    max_parallel_trials : int
+        Maximum number of candidates of a rung evaluated concurrently (see
+        :func:`~simod.parallel_search.parallel_fmin`).
+    resumed_rungs : List[:class:`hyperopt.Trials`], optional
+        Trials of the first rungs of an interrupted search with the same arguments, to continue it instead of
+        starting over. The rungs with all their candidates evaluated are not evaluated again.
+    algo : Callable
+        Hyperopt suggestion algorithm sampling the candidates of the first rung.
+    on_trial_done : Callable[[Trials], None], optional
+        Function called with the trials of the current rung each time one of its trials finishes.
+    stop : Callable[[], bool], optional
+        Function telling whether to stop launching new trials (see :func:`~simod.parallel_search.parallel_fmin`).
+        Once it does, the remaining rungs evaluate only the best candidates of the previous one until one succeeds,
+        so the search still ends with a full-fidelity evaluation.
+
+    Returns
+    -------
+    dict
+        Best point (in the same format as returned by :func:`hyperopt.fmin`) of the full-fidelity rung.
+    """
+    resumed_rungs = resumed_rungs if resumed_rungs is not None else []
+    best_point, trials = None, None
+    for index, (num_rung_candidates, fidelity) in enumerate(
+        successive_halving_rungs(num_candidates, reduction_factor, min_fidelity)
+    ):
+        if index == 0:
+            rung_algo = algo
+        else:
+            # Re-evaluate the best candidates of the previous rung
+            points = promoted_points(trials, num_rung_candidates)
+            num_rung_candidates = len(points)
+            rung_algo = replay_suggest(points)
+        trials = resumed_rungs[index] if index < len(resumed_rungs) else Trials()
+        start_rung(fidelity, trials)
+        best_point = parallel_fmin(
+            fn=fn,
+            space=space,
+            max_evals=num_rung_candidates,
+            trials=trials,
+            max_parallel_trials=max_parallel_trials,
+            algo=rung_algo,
+            on_trial_done=on_trial_done,
+            stop=stop,
+        )
+    return best_point
+
+
+def successive_halving_rungs(
+    num_candidates: int,
+    reduction_factor: int = REDUCTION_FACTOR,
+    min_fidelity: float = MIN_FIDELITY,
+) -> List[Tuple[int, float]]:
+    """
+    Number of candidates and fidelity of each rung of a successive halving search starting with [num_candidates],
+    e.g., 10 candidates at 1/9 of the cases, 3 at 1/3, and 1 with all the cases.
+    """
+    num_rungs = 1
+    while num_candidates // reduction_factor**num_rungs >= 1 and 1 / reduction_factor**num_rungs >= min_fidelity - 1e-9:
+        num_rungs += 1
+    return [
+        (max(1, num_candidates // reduction_factor**index), 1 / reduction_factor ** (num_rungs - 1 - index))
+        for index in range(num_rungs)
+    ]
+
+
+def promoted_points(trials: Trials, num_points: int) -> List[dict]:
+    """
+    Hyperopt points (label to raw value) of the [num_points] successful trials with the lowest loss.
+    """
+    successful_trials = [trial for trial in trials.trials if trial["result"].get("status") == STATUS_OK]
+    successful_trials = sorted(successful_trials, key=lambda trial: trial["result"]["loss"])[:num_points]
+    return [trial_point(trial) for trial in successful_trials]
@@ -0,0 +1,97 @@
+import math
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+from hyperopt import STATUS_OK
+
+# Keys of the response of an iteration with the features of its candidate, and whether it was screened out
+FEATURES_KEY = "surrogate_features"
+SCREENED_KEY = "screened"
+# Status recorded in the measurements of the candidates screened out by the surrogate model (not simulated)
+STATUS_SCREENED = "screened"
+# Minimum number of simulated candidates to fit the surrogate model on
+MIN_OBSERVATIONS = 8
+# L2 penalty of the ridge regression (over standardized features)
+RIDGE_PENALTY = 1.0
+
+
+@dataclass
+class LossSurrogate:
+    """
+    Surrogate model predicting the loss of a candidate from cheap features of its BPS model (e.g., the precision of
+    the process model w.r.t. the directly-follows graph of the event log), computed before simulating it.
+
+    It is a ridge regression over the standardized features, fitted on the candidates already simulated in the search,
+    whose prediction error is estimated by leave-one-out cross-validation. A candidate is screened out (not simulated)
+    only if its predicted loss, minus this error, is still worse than the best loss so far by more than a margin.
+
+    Attributes
+    ----------
+    mean : :class:`numpy.ndarray`
+        Mean of each feature in the fitted candidates.
+    scale : :class:`numpy.ndarray`
+        Standard deviation of each feature in the fitted candidates (1 for the constant ones).
+    coefficients : :class:`numpy.ndarray`
+        Coefficient of each standardized feature.
+    intercept : float
+        Mean loss of the fitted candidates.
+    error : float
+        Leave-one-out root mean squared error of the predictions.
+    """
+
+    mean: np.ndarray
+    scale: np.ndarray
+    coefficients: np.ndarray
+    intercept: float
+    error: float
+
+    @staticmethod
+    def fit(features: List[List[float]], losses: List[float]) -> Optional["LossSurrogate"]:
+        """
+        Fits the surrogate model on the [features] and [losses] of the simulated candidates, or returns None if there
+        are less than :data:`MIN_OBSERVATIONS` of them.
+        """
+        if len(losses) < MIN_OBSERVATIONS:
+            return None
+        x, y = np.asarray(features, dtype=float), np.asarray(losses, dtype=float)
+        mean, scale = x.mean(axis=0), x.std(axis=0)
+        scale[scale == 0.0] = 1.0
+        z = (x - mean) / scale
+        intercept = float(y.mean())
+        inverse = np.linalg.inv(z.T @ z + RIDGE_PENALTY * np.eye(z.shape[1]))
+        coefficients = inverse @ z.T @ (y - intercept)
+        # Leave-one-out residuals from the leverage of each candidate (including the one of the intercept)
+        leverages = np.einsum("ij,jk,ik->i", z, inverse, z) + 1 / len(y)
+        residuals = (y - intercept - z @ coefficients) / np.maximum(1 - leverages, 1e-9)
+        return LossSurrogate(mean, scale, coefficients, intercept, math.sqrt(float(np.mean(residuals**2))))
+
+    @staticmethod
+    def from_results(results: List[dict]) -> Optional["LossSurrogate"]:
+        """
+        Fits the surrogate model on the successful trials of a search (see :func:`fit`) with the features of their
+        candidate in their response (see :data:`FEATURES_KEY`), leaving out the screened ones.
+        """
+        observations = [
+            (result[FEATURES_KEY], result["loss"])
+            for result in results
+            if result.get("status") == STATUS_OK
+            and result.get(FEATURES_KEY) is not None
+            and not result.get(SCREENED_KEY)
+        ]
+        return LossSurrogate.fit([features for features, _ in observations], [loss for _, loss in observations])
+
+    def predict(self, features: List[float]) -> float:
+        z = (np.asarray(features, dtype=float) - self.mean) / self.scale
+        return float(self.intercept + z @ self.coefficients)
+
+    def screened_loss(self, features: List[float], incumbent_loss: float, margin: float) -> Optional[float]:
+        """
+        Predicted loss of the candidate with [features] if it is expected to lose against [incumbent_loss] by more
+        than a relative [margin] (e.g., 0.1 for 10% worse), even accounting for the prediction error, or None if it
+        has to be simulated.
+        """
+        predicted_loss = self.predict(features)
+        if predicted_loss - self.error > incumbent_loss + margin * abs(incumbent_loss):
+            return predicted_loss
+        return None
@@ -0,0 +1,260 @@
+import os
+import pickle
+import socket
+import threading
+import time
+import traceback
+import uuid
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from .cli_formatter import print_message, print_warning
+from .utilities import read_pickle, write_pickle
+
+# Sub-directories of the store with the trials in each state
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+# Sub-directory of the store with the evaluators of the trials
+STAGES = "stages"
+# Separator of the name of a running trial and the identifier of the lease of the worker that claimed it
+LEASE_SEPARATOR = "@"
+# Errors of the evaluation of a trial reported back to the optimization (the rest, e.g., a MemoryError, stop the
+# worker, and the trial is queued again once its lease expires)
+EVALUATION_ERRORS = (
+    ArithmeticError,
+    AttributeError,
+    ImportError,
+    LookupError,
+    OSError,
+    RuntimeError,
+    TypeError,
+    ValueError,
+    pickle.PickleError,
+)
+
+
+class TrialStore:
+    """
+    Queue of optimization trials in a directory, evaluated by any number of worker processes (see :meth:`work`), also
+    in other nodes with the directory mounted (e.g., over NFS).
+
+    The optimization publishes the evaluator of its trials as a *stage* (see :meth:`publish`), and queues each trial as
+    a file with the stage and the arguments to evaluate (see :meth:`evaluate`). A worker claims a queued trial by
+    moving its file to the running ones, evaluates it with the evaluator of its stage, and writes the outcome for the
+    optimization to pick it up. All the state is in the files: the claims are atomic renames and the outcomes are
+    written to a temporary file and renamed, so neither a broker nor file locks are needed. While evaluating a trial,
+    the worker touches its file every fraction of [lease]; a trial whose file is not touched for [lease] seconds (e.g.,
+    its worker was killed) is queued again. The running file of a trial is named after the lease of the worker that
+    claimed it, so a worker whose lease expired (and the trial was claimed again) does not report it.
+
+    Attributes
+    ----------
+    directory : :class:`pathlib.Path`
+        Directory storing the stages and trials, shared by the optimization and the workers.
+    poll_interval : float
+        Seconds between checks of the store while waiting for a trial (or for trials to evaluate).
+    lease : float
+        Seconds without touching the file of a running trial after which it is queued again.
+    """
+
+    # Directory storing the stages and trials
+    directory: Path
+    # Seconds between checks of the store
+    poll_interval: float
+    # Seconds without signs of life of a running trial after which it is queued again
+    lease: float
+
+    def __init__(self, directory: Path, poll_interval: float = 0.5, lease: float = 120.0):
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.lease = lease
+        for state in [PENDING, RUNNING, DONE, STAGES]:
+            (self.directory / state).mkdir(parents=True, exist_ok=True)
+
+    def publish(self, evaluator: Callable) -> str:
+        """
+        Publishes [evaluator] (pickled, so it must be picklable and importable by the workers) to evaluate the trials
+        of a stage.
+
+        Returns
+        -------
+        str
+            Identifier of the stage, to queue its trials with :meth:`evaluate`.
+        """
+        stage = uuid.uuid4().hex
+        write_pickle(self._path(STAGES, stage), evaluator)
+        return stage
+
+    def retire(self, stage: str):
+        """
+        Removes the evaluator of [stage], once all its trials are evaluated.
+        """
+        self._path(STAGES, stage).unlink(missing_ok=True)
+
+    def evaluate(self, stage: str, *args) -> object:
+        """
+        Queues a trial of [stage] and waits for a worker to evaluate it.
+
+        Parameters
+        ----------
+        stage : str
+            Identifier of the stage of the trial (see :meth:`publish`).
+        *args
+            Arguments of the evaluator of the stage (pickled).
+
+        Returns
+        -------
+        object
+            Result of the evaluator of the stage with [args].
+
+        Raises
+        ------
+        RuntimeError
+            If the evaluation failed in the worker.
+        """
+        # Named after the time it is queued, so the workers take the trials in order
+        trial = f"{time.time_ns():020d}_{uuid.uuid4().hex[:8]}"
+        write_pickle(self._path(PENDING, trial), (stage, args))
+        last_touched, last_change = None, time.monotonic()
+        while True:
+            try:
+                outcome = read_pickle(self._path(DONE, trial))
+                self._path(DONE, trial).unlink(missing_ok=True)
+                break
+            except FileNotFoundError:
+                pass
+            # Measure the lease in the clock of this process, to be independent of the clocks of the workers
+            running_path = self._running_path(trial)
+            try:
+                touched = (running_path, running_path.stat().st_mtime) if running_path is not None else None
+            except FileNotFoundError:
+                touched = None
+            if touched != last_touched:
+                last_touched, last_change = touched, time.monotonic()
+            elif touched is not None and time.monotonic() - last_change > self.lease:
+                print_warning(f"Trial {trial} not reported for {self.lease} seconds, queueing it again.")
+                try:
+                    os.replace(running_path, self._path(PENDING, trial))
+                except FileNotFoundError:
+                    pass
+                last_touched, last_change = None, time.monotonic()
+            time.sleep(self.poll_interval)
+        if "error" in outcome:
+            raise RuntimeError(f"Trial {trial} failed in worker {outcome['worker']}:\n{outcome['error']}")
+        return outcome["result"]
+
+    def work(self, max_trials: Optional[int] = None, idle_timeout: Optional[float] = None) -> int:
+        """
+        Evaluates the trials queued in the store, one at a time, as a worker.
+
+        Parameters
+        ----------
+        max_trials : int, optional
+            Number of trials to evaluate before stopping. Unlimited if not provided.
+        idle_timeout : float, optional
+            Seconds without trials to evaluate after which to stop. If not provided, the worker waits forever.
+
+        Returns
+        -------
+        int
+            Number of trials evaluated.
+        """
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        num_trials = 0
+        evaluators = {}
+        idle_since = time.monotonic()
+        while max_trials is None or num_trials < max_trials:
+            claim = self._claim()
+            if claim is None:
+                if idle_timeout is not None and time.monotonic() - idle_since > idle_timeout:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+            trial, running_path = claim
+            with _Heartbeat(running_path, self.lease / 4):
+                try:
+                    stage, args = read_pickle(running_path)
+                    if stage not in evaluators:
+                        # Keep only the evaluator of the current stage, it may hold a whole optimizer
+                        evaluators = {stage: read_pickle(self._path(STAGES, stage))}
+                    print_message(f"Evaluating trial {trial} of stage {stage}")
+                    outcome = {"result": evaluators[stage](*args)}
+                except EVALUATION_ERRORS:
+                    outcome = {"error": traceback.format_exc()}
+            outcome["worker"] = worker
+            if not self._report(trial, running_path, outcome):
+                print_warning(f"Lease of trial {trial} expired while evaluating it, discarding its outcome.")
+            num_trials += 1
+            idle_since = time.monotonic()
+        return num_trials
+
+    def _claim(self) -> Optional[Tuple[str, Path]]:
+        """
+        Claims the oldest queued trial (if any), moving it to the running ones under a new lease, and returns its name
+        and running file.
+        """
+        for file_name in sorted(os.listdir(self.directory / PENDING)):
+            if file_name.startswith("."):
+                continue
+            running_path = self._path(RUNNING, f"{file_name}{LEASE_SEPARATOR}{uuid.uuid4().hex}")
+            try:
+                os.replace(self._path(PENDING, file_name), running_path)
+            except FileNotFoundError:
+                # Claimed by another worker
+                continue
+            os.utime(running_path)
+            return file_name, running_path
+        return None
+
+    def _report(self, trial: str, running_path: Path, outcome: dict) -> bool:
+        """
+        Reports the [outcome] of [trial] if the lease of its [running_path] is still held, i.e., it was not queued
+        again in the meantime (and maybe claimed by another worker). Returns whether it was reported.
+        """
+        # Hide the running file first, so the trial cannot be queued again while reporting it
+        reporting_path = running_path.with_name(f".{running_path.name}")
+        try:
+            os.replace(running_path, reporting_path)
+        except FileNotFoundError:
+            return False
+        write_pickle(self._path(DONE, trial), outcome)
+        reporting_path.unlink(missing_ok=True)
+        return True
+
+    def _running_path(self, trial: str) -> Optional[Path]:
+        """
+        Running file of [trial] under the lease of the worker that claimed it, or None if it is not running.
+        """
+        return next((self.directory / RUNNING).glob(f"{trial}{LEASE_SEPARATOR}*"), None)
+
+    def _path(self, state: str, name: str) -> Path:
+        return self.directory / state / name
+
+
+class _Heartbeat:
+    """
+    Touches [path] every [interval] seconds while in the context, to show the trial is still being evaluated.
+    """
+
+    def __init__(self, path: Path, interval: float):
+        self._path = path
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            try:
+                os.utime(self._path)
+            except FileNotFoundError:
+                # Queued again, the outcome of this evaluation will be discarded
+                return
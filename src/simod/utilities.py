@@ -1,14 +1,19 @@
 import math
 import os
+import pickle
 import platform
 import subprocess
 import time
 import traceback
+import uuid
 from builtins import float
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Tuple, Union
+from typing import Iterator, List, Optional, Tuple, Union
 
-from hyperopt import STATUS_FAIL, STATUS_OK
+import numpy as np
+from hyperopt import STATUS_FAIL, STATUS_OK, Trials
+from scipy.stats import t as student_t
 
 
 def get_project_dir() -> Path:
@@ -39,6 +44,38 @@ def hyperopt_step(status: str, fn, *args) -> Tuple[str, object]:
         return status, None
 
 
+def get_incumbent_loss(trials: Trials) -> Optional[float]:
+    """Returns the best loss among the successful trials finished so far, or None if there is none."""
+    losses = [result["loss"] for result in trials.results if result.get("status") == STATUS_OK and "loss" in result]
+    return min(losses) if len(losses) > 0 else None
+
+
+def cannot_beat_incumbent(distances: List[float], incumbent_loss: Optional[float], confidence: float = 0.95) -> bool:
+    """
+    Racing test for the replicas of a candidate: one-sided one-sample t-test of whether the mean distance of the
+    candidate is greater than the loss of the incumbent. Needs at least two replicas to decide.
+    """
+    if incumbent_loss is None or len(distances) < 2:
+        return False
+    mean = np.mean(distances)
+    standard_error = np.std(distances, ddof=1) / math.sqrt(len(distances))
+    if standard_error == 0.0:
+        # Identical replicas, the candidate is deterministic
+        return mean > incumbent_loss
+    statistic = (mean - incumbent_loss) / standard_error
+    return student_t.sf(statistic, df=len(distances) - 1) < 1 - confidence
+
+
+@contextmanager
+def released(lock) -> Iterator[None]:
+    """Releases the (held) [lock] during the block, e.g., to wait for work done elsewhere, and acquires it again."""
+    lock.release()
+    try:
+        yield
+    finally:
+        lock.acquire()
+
+
 def nearest_divisor_for_granularity(granularity: int) -> int:
     closest = 1440
     closest_diff = abs(granularity - closest)
@@ -82,6 +119,22 @@ def get_simulation_parameters_path(base_dir: Path, process_name: str) -> Path:
     return base_dir / f"{process_name}.json"
 
 
+def write_pickle(path: Path, value: object):
+    """
+    Pickles [value] into [path] atomically: it is written to a hidden temporary file and renamed, so the readers never
+    see a partial file, and a crash while writing leaves its previous version.
+    """
+    temporary_path = path.parent / f".{path.name}.{uuid.uuid4().hex}"
+    with open(temporary_path, "wb") as file:
+        pickle.dump(value, file)
+    os.replace(temporary_path, path)
+
+
+def read_pickle(path: Path) -> object:
+    with open(path, "rb") as file:
+        return pickle.load(file)
+
+
 def measure_runtime(output_file: str = "runtime.txt"):
     """
     Decorator for measuring runtime of a function and writing it to a file.
@@ -0,0 +1,89 @@
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+from hyperopt import STATUS_OK, space_eval
+from hyperopt.base import Domain
+from hyperopt.pyll import Apply
+
+
+def prior_points(
+    measurements_path: Path,
+    space: dict,
+    num_points: int,
+    columns: Optional[Dict[str, str]] = None,
+) -> List[dict]:
+    """
+    Hyperopt points (label to raw value, see :func:`~simod.parallel_search.trial_point`) of the best candidates
+    evaluated by a previous run of an optimization stage, to warm-start the search of [space] with them.
+
+    The candidates are read from the measurements of the previous run (its ``evaluation_measures.csv``), ranked by
+    their mean distance over their successful full-fidelity replicas. A candidate is taken only if all the sampled
+    parameters of [space] were recorded, with an option of the choices and within the range of the uniform ones, as its
+    loss was measured on another event log and the search has to evaluate it again anyway.
+
+    Parameters
+    ----------
+    measurements_path : :class:`~pathlib.Path`
+        Path to the measurements of the candidates of the previous run.
+    space : dict
+        Hyperopt search space of the new run, with each parameter under the key of its label.
+    num_points : int
+        Maximum number of points to return.
+    columns : Dict[str, str], optional
+        Column of the measurements of each label of [space], if not named after it.
+
+    Returns
+    -------
+    List[dict]
+        Points of the best candidates of the previous run (from best to worst), without duplicates.
+    """
+    columns = columns if columns is not None else {}
+    parameters = {label: expression for label, expression in space.items() if isinstance(expression, Apply)}
+    if len(parameters) == 0 or num_points <= 0:
+        return []
+    distributions = Domain(lambda _: None, parameters).params
+
+    measurements = pd.read_csv(measurements_path)
+    measurements = measurements[measurements["status"] == STATUS_OK]
+    if "fidelity" in measurements.columns:
+        # (the candidates evaluated with a fraction of the cases in a multi-fidelity search are not comparable)
+        measurements = measurements[measurements["fidelity"].fillna(1.0) >= 1.0]
+    losses = measurements.groupby("output_dir")["distance"].mean().sort_values()
+    candidates = measurements.drop_duplicates("output_dir").set_index("output_dir")
+
+    points = []
+    for output_dir in losses.index:
+        point = _to_point(candidates.loc[output_dir], parameters, distributions, columns)
+        if point is not None and point not in points:
+            points.append(point)
+        if len(points) == num_points:
+            break
+    return points
+
+
+def _to_point(candidate: pd.Series, parameters: dict, distributions: dict, columns: Dict[str, str]) -> Optional[dict]:
+    """
+    Point of the sampled [parameters] for the values of [candidate], or None if any is missing or out of the space.
+    """
+    point = {}
+    for label, expression in parameters.items():
+        value = candidate.get(columns.get(label, label))
+        if value is None or pd.isna(value):
+            return None
+        if expression.name == "switch":
+            # Choice, the raw value is the index of the option (compared as strings, as they are read from a CSV)
+            options = [space_eval(expression, {label: index}) for index in range(len(expression.pos_args) - 1)]
+            option_values = [str(getattr(option, "value", option)) for option in options]
+            if str(value) not in option_values:
+                return None
+            point[label] = option_values.index(str(value))
+        else:
+            distribution = distributions[label]
+            value = float(value)
+            if distribution.name == "uniform" and not (
+                distribution.arg["low"].obj <= value <= distribution.arg["high"].obj
+            ):
+                return None
+            point[label] = value
+    return point
@@ -0,0 +1,46 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+from pix_framework.io.bpm_graph import BPMNGraph
+
+from simod.branch_rules.candidates import BranchRulesCache
+from simod.branch_rules.discovery import discover_branch_rules
+from simod.control_flow.replay import ReplayCache
+
+from .test_discovery import ASSET_DIR, LOG_IDS, OR_BPMN, XOR_BPMN
+
+
+def test_branch_rules_cache(entry_point):
+    bpmn_graph = BPMNGraph.from_bpmn_path(Path(os.path.join(entry_point, ASSET_DIR, XOR_BPMN)))
+    log = pd.read_csv(os.path.join(entry_point, ASSET_DIR, "xor_1.csv.gz"), compression="gzip")
+    rules_cache = BranchRulesCache()
+    replay_cache = ReplayCache()
+    # The decision trees are trained once for all the f-scores
+    branch_rules = {
+        f_score: discover_branch_rules(
+            bpmn_graph, log, LOG_IDS, f_score=f_score, replay_cache=replay_cache, rules_cache=rules_cache
+        )
+        for f_score in [0.0, 0.7, 1.0]
+    }
+    assert rules_cache.misses == 1
+    assert rules_cache.hits == 2
+    assert len(branch_rules[0.7]) == 15
+    assert all(len(branch_rule.rules) == 1 for branch_rule in branch_rules[0.7])
+    assert len(branch_rules[0.0]) >= len(branch_rules[0.7]) >= len(branch_rules[1.0])
+    assert len(branch_rules[1.0]) == 0
+    # Another training partition trains the trees again
+    rules_cache.candidates(bpmn_graph, log.iloc[: len(log) // 2], LOG_IDS, replay_cache)
+    assert rules_cache.misses == 2
+
+
+def test_candidate_or_branch_rules(entry_point):
+    bpmn_graph = BPMNGraph.from_bpmn_path(Path(os.path.join(entry_point, ASSET_DIR, OR_BPMN)))
+    log = pd.read_csv(os.path.join(entry_point, ASSET_DIR, "or_8.csv.gz"), compression="gzip")
+    candidates = BranchRulesCache().candidates(bpmn_graph, log, LOG_IDS)
+    # A tree for each outgoing flow of the OR gateways, with its F-score
+    assert len(candidates.xor_rules) == 0
+    assert all(0.0 <= f_score <= 1.0 for flows in candidates.or_rules.values() for f_score, _ in flows.values())
+    branch_rules = candidates.filter(0.7)
+    assert len(branch_rules) == 15
+    assert all(len(branch_rule["rules"]) == 1 for branch_rule in branch_rules)
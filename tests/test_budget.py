@@ -0,0 +1,92 @@
+import pytest
+
+from simod.budget import Budget
+from simod.settings.common_settings import BudgetPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize(
+    "policy, expected_allocations",
+    [(BudgetPolicy.PROPORTIONAL, [50.0, 50.0]), (BudgetPolicy.ADAPTIVE, [45.0, 80.0])],
+)
+def test_budget_allocation(policy, expected_allocations):
+    clock, cpu_clock = FakeClock(), FakeClock()
+    budget = Budget(100.0, None, policy, {"first": 1, "second": 1}, clock=clock, cpu_clock=cpu_clock)
+
+    # The stages before the first optimization one consume from the budget too
+    clock.now = 10.0
+    first = budget.start_stage("first")
+    assert first.time_allocated == expected_allocations[0]
+    assert first.cpu_allocated is None
+    assert not first.exhausted()
+    # The first stage leaves part of its share unused
+    clock.now = 20.0
+    first.stop()
+    second = budget.start_stage("second")
+    assert second.time_allocated == expected_allocations[1]
+    clock.now = 20.0 + expected_allocations[1]
+    assert second.exhausted()
+    second.stop()
+
+    report = budget.report()
+    assert report["time_allocated"] == 100.0
+    assert report["time_used"] == 20.0 + expected_allocations[1]
+    assert report["stages"]["first"] == {
+        "time_allocated": expected_allocations[0],
+        "time_used": 10.0,
+        "cpu_allocated": None,
+        "cpu_used": 0.0,
+    }
+
+
+def test_budget_cpu():
+    clock, cpu_clock = FakeClock(), FakeClock()
+    budget = Budget(None, 40.0, BudgetPolicy.ADAPTIVE, {"first": 1, "second": 1}, clock=clock, cpu_clock=cpu_clock)
+
+    first = budget.start_stage("first")
+    assert first.time_allocated is None
+    assert first.cpu_allocated == 20.0
+    cpu_clock.now = 25.0
+    assert first.exhausted()
+    first.stop()
+    # The overrun of the first stage is taken from the following one
+    assert budget.start_stage("second").cpu_allocated == 15.0
+
+
+def test_budget_restore():
+    clock, cpu_clock = FakeClock(), FakeClock()
+    budget = Budget(100.0, 50.0, BudgetPolicy.ADAPTIVE, {"first": 1, "second": 1}, clock=clock, cpu_clock=cpu_clock)
+    clock.now, cpu_clock.now = 10.0, 5.0
+    first = budget.start_stage("first")
+    clock.now, cpu_clock.now = 30.0, 15.0
+    first.stop()
+    report = budget.report()
+
+    # Resumed in another process, with its own clocks
+    clock, cpu_clock = FakeClock(), FakeClock()
+    clock.now, cpu_clock.now = 1000.0, 2.0
+    resumed = Budget(100.0, 50.0, BudgetPolicy.ADAPTIVE, {"first": 1, "second": 1}, clock=clock, cpu_clock=cpu_clock)
+    resumed.restore(report)
+
+    assert resumed.time_used() == 30.0
+    assert resumed.cpu_used() == 15.0
+    assert resumed.stages["first"].report() == report["stages"]["first"]
+    second = resumed.start_stage("second")
+    assert second.time_allocated == 70.0
+    assert second.cpu_allocated == 35.0
+
+
+def test_budget_unlimited():
+    budget = Budget(None, None, BudgetPolicy.ADAPTIVE, {"first": 1})
+
+    assert not budget.enabled
+    stage = budget.start_stage("first")
+    assert stage.time_allocated is None and stage.cpu_allocated is None
+    assert not stage.exhausted()
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pandas as pd
+from hyperopt import STATUS_OK, Trials, hp
+from hyperopt.base import JOB_STATE_DONE, JOB_STATE_RUNNING
+from pix_framework.filesystem.file_manager import get_random_folder_id
+
+from simod.checkpoint import ITERATION_DIRS_KEY, Checkpoint, iteration_dirs
+from simod.parallel_search import parallel_fmin
+from simod.runtime_meter import RuntimeMeter
+from simod.settings.common_settings import PROJECT_DIR
+
+
+def test_checkpoint_pipeline():
+    checkpoint = Checkpoint(PROJECT_DIR / "outputs" / get_random_folder_id(prefix="test_checkpoint_"))
+    assert checkpoint.load_pipeline() is None
+
+    checkpoint.save_run({"settings": 1}, {"event_log": 2})
+    checkpoint.save_pipeline({"completed_stages": [RuntimeMeter.INITIAL_MODEL]})
+    checkpoint.save_pipeline({"completed_stages": [RuntimeMeter.INITIAL_MODEL, RuntimeMeter.CONTROL_FLOW_MODEL]})
+
+    assert checkpoint.load_run() == ({"settings": 1}, {"event_log": 2})
+    assert checkpoint.load_pipeline()["completed_stages"] == [
+        RuntimeMeter.INITIAL_MODEL,
+        RuntimeMeter.CONTROL_FLOW_MODEL,
+    ]
+    # A new run discards the checkpoint of the previous one
+    checkpoint.clear()
+    assert checkpoint.load_pipeline() is None
+
+
+def test_search_checkpoint():
+    checkpoint = Checkpoint(PROJECT_DIR / "outputs" / get_random_folder_id(prefix="test_checkpoint_"))
+    search_checkpoint = checkpoint.search(RuntimeMeter.RESOURCE_MODEL)
+    assert search_checkpoint.load() is None
+    evaluated, measurements = [], []
+
+    def objective(params):
+        output_dir = f"iteration_{len(evaluated)}"
+        evaluated.append(params["x"])
+        measurements.append({"distance": (params["x"] - 0.3) ** 2, "output_dir": output_dir})
+        return {"loss": (params["x"] - 0.3) ** 2, "status": STATUS_OK, "output_dir": output_dir}
+
+    trials = Trials()
+    parallel_fmin(
+        objective,
+        {"x": hp.uniform("x", 0, 1)},
+        max_evals=5,
+        trials=trials,
+        on_trial_done=lambda _: search_checkpoint.save([trials], pd.DataFrame(measurements), len(evaluated)),
+    )
+    # Interrupted while evaluating its last trial, which already recorded its measurements
+    trials.trials[-1]["state"] = JOB_STATE_RUNNING
+    search_checkpoint.save([trials], pd.DataFrame(measurements), len(evaluated))
+
+    resumed_trials, resumed_measurements, iteration_index = search_checkpoint.load()
+    assert [trial["state"] for trial in resumed_trials[0].trials] == [JOB_STATE_DONE] * 4
+    assert resumed_measurements["output_dir"].tolist() == [f"iteration_{index}" for index in range(4)]
+    assert iteration_index == 5
+    # The search continues evaluating only the unfinished trial, with a new identifier
+    evaluated.clear()
+    parallel_fmin(objective, {"x": hp.uniform("x", 0, 1)}, max_evals=5, trials=resumed_trials[0])
+    assert len(evaluated) == 1
+    assert len({trial["tid"] for trial in resumed_trials[0].trials}) == 5
+    assert max(trial["tid"] for trial in resumed_trials[0].trials) == 5
+
+
+def test_iteration_dirs():
+    assert iteration_dirs({"loss": 0.1, "output_dir": Path("/tmp/iteration_1")}) == ["/tmp/iteration_1"]
+    assert iteration_dirs({"loss": 0.1, "output_dir": "a", ITERATION_DIRS_KEY: ["b", Path("c")]}) == ["b", "c"]
+    assert iteration_dirs({"loss": 1.0}) == []
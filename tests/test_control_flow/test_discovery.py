@@ -5,8 +5,16 @@ import pytest
 from pix_framework.discovery.gateway_probabilities import GatewayProbabilitiesDiscoveryMethod
 from pix_framework.io.bpmn import get_activities_names_from_bpmn
 
-from simod.control_flow.discovery import discover_process_model
-from simod.control_flow.settings import HyperoptIterationParams
+from simod.control_flow import discovery
+from simod.control_flow.discovery import (
+    MAX_SPLIT_MINER_HEAP_SIZE,
+    MIN_SPLIT_MINER_HEAP_SIZE,
+    ProcessModelMemo,
+    SplitMinerService,
+    discover_process_model,
+    split_miner_heap_size,
+)
+from simod.control_flow.settings import HyperoptIterationParams, quantize
 from simod.settings.common_settings import Metric
 from simod.settings.control_flow_settings import ProcessModelDiscoveryAlgorithm
 
@@ -61,3 +69,101 @@ def test_discover_process_model(entry_point, test_data):
         # Assert is BPMN readable and has activities
         activities = get_activities_names_from_bpmn(output_path)
         assert len(activities) > 0
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize(
+    "test_data", structure_optimizer_test_data, ids=[test_data["name"] for test_data in structure_optimizer_test_data]
+)
+def test_discover_process_model_with_service(entry_point, test_data):
+    """The models discovered in the long-lived Split Miner process are the same as through the command line."""
+    log_path = entry_point / "PurchasingExample.xes"
+
+    with tempfile.TemporaryDirectory() as tmp_dir, SplitMinerService(log_path) as service:
+        models = []
+        for name in ["command_line", "service_1", "service_2"]:
+            output_path = Path(tmp_dir) / f"{name}.bpmn"
+            params = HyperoptIterationParams(
+                output_dir=Path(tmp_dir),
+                provided_model_path=None,
+                project_name="PurchasingExample",
+                optimization_metric=Metric.TWO_GRAM_DISTANCE,
+                gateway_probabilities_method=GatewayProbabilitiesDiscoveryMethod.EQUIPROBABLE,
+                mining_algorithm=ProcessModelDiscoveryAlgorithm.from_str(test_data["config_data"]["mining_algorithm"]),
+                epsilon=test_data["config_data"]["epsilon"],
+                eta=test_data["config_data"]["eta"],
+                replace_or_joins=test_data["config_data"]["replace_or_joins"],
+                prioritize_parallelism=test_data["config_data"]["prioritize_parallelism"],
+            )
+            discover_process_model(log_path, output_path, params, None if name == "command_line" else service)
+            models.append(sorted(get_activities_names_from_bpmn(output_path)))
+
+        assert models[0] == models[1] == models[2]
+
+
+def test_split_miner_service_fallback(entry_point, monkeypatch):
+    """Without the Nashorn shell, the service is not started and the caller falls back to the command line."""
+    monkeypatch.setattr(discovery, "_find_jjs", lambda: None)
+    log_path = entry_point / "PurchasingExample.xes"
+
+    with SplitMinerService(log_path) as service:
+        assert not service.discover(["--logPath", str(log_path), "--outputPath", "model.bpmn", "--epsilon", "0.1"])
+        # Requests for other event logs are not served
+        assert not service.discover(["--logPath", "other.xes", "--outputPath", "model.bpmn", "--epsilon", "0.1"])
+
+
+def test_split_miner_heap_size(tmp_path):
+    log_path = tmp_path / "log.xes"
+    log_path.write_bytes(b"0" * 2**20)
+    assert split_miner_heap_size(log_path) == MIN_SPLIT_MINER_HEAP_SIZE
+
+    with open(log_path, "wb") as log_file:
+        log_file.truncate(1024 * 2**20)
+    assert MIN_SPLIT_MINER_HEAP_SIZE < split_miner_heap_size(log_path) <= MAX_SPLIT_MINER_HEAP_SIZE
+
+
+def test_process_model_memo(tmp_path):
+    log_path = tmp_path / "log.xes"
+    log_path.write_text("<log/>")
+    model_path = tmp_path / "model.bpmn"
+    model_path.write_text("<definitions/>")
+
+    def params(epsilon: float, eta: float, step: float = 0.01) -> HyperoptIterationParams:
+        return HyperoptIterationParams.from_hyperopt_dict(
+            hyperopt_dict={
+                "gateway_probabilities_method": "discovery",
+                "epsilon": epsilon,
+                "eta": eta,
+                "prioritize_parallelism": True,
+                "replace_or_joins": False,
+            },
+            optimization_metric=Metric.TWO_GRAM_DISTANCE,
+            mining_algorithm=ProcessModelDiscoveryAlgorithm.SPLIT_MINER_V1,
+            output_dir=tmp_path,
+            provided_model_path=None,
+            project_name="log",
+            discovery_parameters_step=step,
+        )
+
+    memo = ProcessModelMemo()
+    assert memo.get(log_path, params(0.3012, 0.5)) is None
+    memo.put(log_path, params(0.3012, 0.5), model_path)
+
+    # Parameters differing only below the rounding step reuse the process model, the rest do not
+    assert memo.get(log_path, params(0.2998, 0.5004)) == model_path
+    assert memo.get(log_path, params(0.31, 0.5)) is None
+    assert memo.get(log_path, params(0.3012, 0.5, step=0.0001)) is None
+    # Nor the same parameters with another event log
+    other_log_path = tmp_path / "other_log.xes"
+    other_log_path.write_text("<log></log>")
+    assert memo.get(other_log_path, params(0.3012, 0.5)) is None
+
+    assert (memo.hits, memo.misses) == (1, 4)
+    assert memo.hit_rate == 0.2
+
+
+def test_quantize():
+    assert quantize(0.14999, 0.01) == 0.15
+    assert quantize(0.333, 0.1) == 0.3
+    assert quantize(0.6, 0.25) == 0.5
+    assert quantize(None, 0.1) is None
@@ -0,0 +1,52 @@
+import pytest
+from pix_framework.discovery.gateway_probabilities import (
+    GatewayProbabilitiesDiscoveryMethod,
+    compute_gateway_probabilities,
+)
+from pix_framework.io.bpm_graph import BPMNGraph
+from pix_framework.io.event_log import DEFAULT_XES_IDS, read_csv_log
+
+from simod.control_flow.features import DFG_END, DFG_START, dfg_precision_recall, gateway_entropy, log_dfg
+from simod.event_log.variants import VariantIndex
+
+
+def test_log_dfg():
+    variants = VariantIndex(sequences=[("A", "B"), ("A", "C", "B")], case_ids=[[1, 2], [3]])
+
+    assert log_dfg(variants) == {
+        (DFG_START, "A"): 3,
+        ("A", "B"): 2,
+        ("B", DFG_END): 3,
+        ("A", "C"): 1,
+        ("C", "B"): 1,
+    }
+
+
+def test_dfg_precision_recall(entry_point):
+    log_ids = DEFAULT_XES_IDS
+    event_log = read_csv_log(entry_point / "LoanApp_simplified.csv.gz", log_ids)
+    bpmn_graph = BPMNGraph.from_bpmn_path(entry_point / "LoanApp_simplified.bpmn")
+    dfg = log_dfg(VariantIndex.from_event_log(event_log, log_ids))
+
+    precision, recall = dfg_precision_recall(bpmn_graph, dfg)
+    assert 0.0 < precision <= 1.0
+    assert 0.0 < recall <= 1.0
+    # A log with directly-follows relations the process model does not allow has lower recall
+    noisy_dfg = dfg | {("unknown_activity", DFG_END): sum(dfg.values())}
+    assert dfg_precision_recall(bpmn_graph, noisy_dfg)[1] < recall
+
+
+def test_gateway_entropy(entry_point):
+    log_ids = DEFAULT_XES_IDS
+    event_log = read_csv_log(entry_point / "LoanApp_simplified.csv.gz", log_ids)
+    bpmn_graph = BPMNGraph.from_bpmn_path(entry_point / "LoanApp_simplified.bpmn")
+
+    equiprobable = compute_gateway_probabilities(
+        event_log, log_ids, bpmn_graph, GatewayProbabilitiesDiscoveryMethod.EQUIPROBABLE
+    )
+    discovered = compute_gateway_probabilities(
+        event_log, log_ids, bpmn_graph, GatewayProbabilitiesDiscoveryMethod.DISCOVERY
+    )
+    assert gateway_entropy(equiprobable) == pytest.approx(1.0)
+    assert 0.0 <= gateway_entropy(discovered) <= 1.0
+    assert gateway_entropy([]) == 0.0
@@ -0,0 +1,35 @@
+import re
+import uuid
+
+from pix_framework.io.bpm_graph import BPMNGraph
+
+from simod.control_flow.fingerprint import bpmn_fingerprint
+
+
+def _rename_ids(bpmn: str) -> str:
+    # Give new IDs to all the elements and flows, keeping the references between them
+    new_ids = {element_id: f"id_{uuid.uuid4().hex}" for element_id in re.findall(r' id="([^"]+)"', bpmn)}
+    return re.sub(r'"([^"]*)"|>([^<>\s]+)<', lambda match: _replace(match, new_ids), bpmn)
+
+
+def _replace(match: re.Match, new_ids: dict) -> str:
+    if match.group(1) is not None:
+        return f'"{new_ids.get(match.group(1), match.group(1))}"'
+    return f">{new_ids.get(match.group(2), match.group(2))}<"
+
+
+def test_bpmn_fingerprint(entry_point, tmp_path):
+    model_path = entry_point / "LoanApp_simplified.bpmn"
+    fingerprint = bpmn_fingerprint(BPMNGraph.from_bpmn_path(model_path))
+
+    # Same structure with other IDs
+    renamed_model_path = tmp_path / "renamed.bpmn"
+    renamed_model_path.write_text(_rename_ids(model_path.read_text()))
+    assert bpmn_fingerprint(BPMNGraph.from_bpmn_path(renamed_model_path)) == fingerprint
+
+    # Different structure: a sequence flow redirected to another element
+    graph = BPMNGraph.from_bpmn_path(model_path)
+    flow_id, (source_id, target_id) = next(iter(graph.flow_arcs.items()))
+    other_id = next(element_id for element_id in graph.element_info if element_id not in [source_id, target_id])
+    graph.flow_arcs[flow_id] = [source_id, other_id]
+    assert bpmn_fingerprint(graph) != fingerprint
@@ -1,3 +1,4 @@
+import shutil
 from pathlib import Path
 
 import pandas as pd
@@ -14,7 +15,7 @@ from pix_framework.io.bpmn import get_activities_names_from_bpmn
 from pix_framework.io.event_log import APROMORE_LOG_IDS, EventLogIDs
 
 from simod.control_flow.optimizer import ControlFlowOptimizer
-from simod.control_flow.settings import HyperoptIterationParams
+from simod.control_flow.settings import HyperoptIterationParams, quantize
 from simod.event_log.event_log import EventLog
 from simod.settings.control_flow_settings import ControlFlowSettings, ProcessModelDiscoveryAlgorithm
 from simod.simulation.parameters.BPS_model import BPSModel
@@ -36,6 +37,7 @@ control_flow_config_sm2 = {
     "max_evaluations": 3,
     "mining_algorithm": "sm2",
     "epsilon": (0.2, 0.8),
+    "discovery_parameters_step": 0.1,
     "gateway_probabilities": ["equiprobable", "discovery"],
     "num_iterations": 10,
 }
@@ -151,6 +153,11 @@ def test_control_flow_optimizer(entry_point, test_data):
     assert len(optimizer.evaluation_measurements) > 0
     iteration_results = pd.DataFrame(optimizer._bayes_trials.results).sort_values(by="loss", ascending=True)
     assert iteration_results[iteration_results["status"] == STATUS_OK].iloc[0]["output_dir"] == result.output_dir
+    if "discovery_parameters_step" in test_data["parameters"]:
+        # Rounded discovery parameters, 10 iterations over 7 possible values of epsilon reuse at least 3 models
+        assert result.epsilon == quantize(result.epsilon, test_data["parameters"]["discovery_parameters_step"])
+        assert optimizer._process_model_memo.hits >= 3
+        assert optimizer.evaluation_measurements["discovery_memo_hit"].sum() == optimizer._process_model_memo.hits
 
 
 @pytest.mark.integration
@@ -205,3 +212,57 @@ def test_control_flow_optimizer_model_provided(entry_point, test_data):
     assert len(optimizer.evaluation_measurements) > 0
     iteration_results = pd.DataFrame(optimizer._bayes_trials.results).sort_values(by="loss", ascending=True)
     assert iteration_results[iteration_results["status"] == STATUS_OK].iloc[0]["output_dir"] == result.output_dir
+    # Assert that the provided model is evaluated once per gateway probabilities method, and the rest are reused
+    measurements = optimizer.evaluation_measurements
+    assert measurements["structure_fingerprint"].nunique() == 1
+    assert measurements["duplicate_structure"].astype(bool).sum() >= (settings.num_iterations - 2)
+
+
+@pytest.mark.integration
+def test_control_flow_optimizer_factorized_search(entry_point, monkeypatch):
+    base_dir = PROJECT_DIR / "outputs" / get_random_folder_id(prefix="test_control_flow_optimizer_")
+    create_folder(base_dir)
+    event_log = EventLog.from_path(entry_point / "Control_flow_optimization_test.csv", APROMORE_LOG_IDS)
+    bps_model = BPSModel(
+        case_arrival_model=discover_case_arrival_model(event_log.train_validation_partition, event_log.log_ids),
+        resource_model=discover_resource_model(
+            event_log.train_validation_partition, event_log.log_ids, CalendarDiscoveryParameters()
+        ),
+    )
+
+    # Replace Split Miner by a copy of a fixed model, counting the discoveries
+    discovered_models = []
+
+    def discover_process_model(self, params: HyperoptIterationParams) -> Path:
+        output_model_path = params.output_dir / "model.bpmn"
+        shutil.copyfile(entry_point / "Control_flow_optimization_test.bpmn", output_model_path)
+        discovered_models.append(output_model_path)
+        return output_model_path
+
+    monkeypatch.setattr(ControlFlowOptimizer, "_discover_process_model", discover_process_model)
+
+    settings = ControlFlowSettings.from_dict(
+        {
+            "num_iterations": 6,
+            "num_inner_iterations": 3,
+            "num_evaluations_per_iteration": 1,
+            "gateway_probabilities": ["equiprobable", "discovery"],
+            "mining_algorithm": "sm2",
+            "epsilon": (0.2, 0.8),
+        }
+    )
+    optimizer = ControlFlowOptimizer(
+        event_log=event_log, bps_model=bps_model, settings=settings, base_directory=base_dir
+    )
+    result = optimizer.run()
+
+    # Each process model is discovered once, and evaluated with several gateway probabilities methods
+    assert len(discovered_models) == 2
+    assert len(optimizer._bayes_trials.trials) == 2
+    assert len(optimizer.evaluation_measurements) == 6
+    structures = {trial["misc"]["vals"]["epsilon"][0] for trial in optimizer._bayes_trials.trials}
+    assert set(optimizer.evaluation_measurements["epsilon"]) == structures
+    # The best candidate is the one of the best inner search
+    assert result.epsilon is not None
+    assert result.output_dir == optimizer._bayes_trials.best_trial["result"]["output_dir"]
+    assert optimizer.best_bps_model.process_model.exists()
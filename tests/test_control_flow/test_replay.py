@@ -0,0 +1,69 @@
+from pix_framework.discovery.gateway_conditions.preprocessing import preprocess_event_log
+from pix_framework.discovery.gateway_conditions.replayer import parse_dataframe
+from pix_framework.discovery.gateway_conditions.trace_processing import process_traces
+from pix_framework.discovery.gateway_probabilities import (
+    GatewayProbabilitiesDiscoveryMethod,
+    compute_gateway_probabilities,
+)
+from pix_framework.io.bpm_graph import BPMNGraph
+from pix_framework.io.event_log import DEFAULT_XES_IDS, EventLogIDs, read_csv_log
+
+from simod.control_flow.replay import ReplayCache
+from simod.event_log.variants import VariantIndex
+
+BRANCH_RULES_LOG_IDS = EventLogIDs(
+    case="case_id", activity="activity", start_time="start_time", end_time="end_time", resource="resource"
+)
+
+
+def test_gateway_probabilities(entry_point):
+    log_ids = DEFAULT_XES_IDS
+    event_log = read_csv_log(entry_point / "LoanApp_simplified.csv.gz", log_ids)
+    model_path = entry_point / "LoanApp_simplified.bpmn"
+    variants = VariantIndex.from_event_log(event_log, log_ids)
+    replay_cache = ReplayCache()
+
+    for method in [GatewayProbabilitiesDiscoveryMethod.DISCOVERY, GatewayProbabilitiesDiscoveryMethod.EQUIPROBABLE]:
+        expected = compute_gateway_probabilities(event_log, log_ids, BPMNGraph.from_bpmn_path(model_path), method)
+        result = replay_cache.gateway_probabilities(BPMNGraph.from_bpmn_path(model_path), variants, method)
+        assert [gateway.to_dict() for gateway in result] == [gateway.to_dict() for gateway in expected]
+
+    # Each variant is replayed once, the same model in another graph reuses the replays
+    assert replay_cache.misses == len(variants)
+    replay_cache.gateway_probabilities(BPMNGraph.from_bpmn_path(model_path), variants)
+    assert (replay_cache.hits, replay_cache.misses) == (len(variants), len(variants))
+
+
+def test_gateway_states(entry_point):
+    log_ids = BRANCH_RULES_LOG_IDS
+    event_log = read_csv_log(entry_point / "branch_rules" / "xor_1.csv.gz", log_ids)
+    model_path = entry_point / "branch_rules" / "xor.bpmn"
+    avoid_columns = [log_ids.case, log_ids.activity, log_ids.start_time, log_ids.end_time, log_ids.resource]
+    log_traces = parse_dataframe(preprocess_event_log(event_log, log_ids, 25000), log_ids, avoid_columns)
+
+    expected = process_traces(log_traces, BPMNGraph.from_bpmn_path(model_path), {})
+    bpmn_graph = BPMNGraph.from_bpmn_path(model_path)
+    replay_cache = ReplayCache()
+
+    assert replay_cache.gateway_states(bpmn_graph, log_traces) == expected
+    assert replay_cache.misses < len(log_traces)
+    # The replays leave no gateway states in the graph, so replaying again gives the same states
+    assert bpmn_graph.get_gateway_states() == {}
+    assert replay_cache.gateway_states(bpmn_graph, log_traces) == expected
+
+
+def test_max_models(entry_point, tmp_path):
+    log_ids = DEFAULT_XES_IDS
+    event_log = read_csv_log(entry_point / "LoanApp_simplified.csv.gz", log_ids)
+    variants = VariantIndex.from_event_log(event_log, log_ids)
+    model_path = entry_point / "LoanApp_simplified.bpmn"
+    # Same model with other ID for one of its sequence flows
+    other_model_path = tmp_path / "other.bpmn"
+    other_model_path.write_text(model_path.read_text().replace("Flow_0xfev5g", "Flow_other"))
+    replay_cache = ReplayCache(max_models=1)
+
+    for path in [model_path, other_model_path, model_path]:
+        replay_cache.arc_frequencies(BPMNGraph.from_bpmn_path(path), variants)
+
+    # The first model was dropped when replaying the second one, and replayed again
+    assert replay_cache.misses == 3 * len(variants)
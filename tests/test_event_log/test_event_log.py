@@ -1,7 +1,13 @@
+import gzip
+import xml.etree.ElementTree as ET
+
+import pandas as pd
 import pytest
 from pix_framework.io.event_log import APROMORE_LOG_IDS, DEFAULT_XES_IDS
 
-from simod.event_log.event_log import EventLog
+from simod.event_log import utilities
+from simod.event_log.event_log import EventLog, write_xes
+from simod.event_log.utilities import format_xes_timestamps
 
 test_cases = [
     {
@@ -60,3 +66,129 @@ def test_wrong_log_extension(entry_point):
             log_ids=DEFAULT_XES_IDS,
             test_log_path=entry_point / "PurchasingExample.xes.gz",
         )
+
+
+def test_shared_partitions(entry_point):
+    log_ids = DEFAULT_XES_IDS
+    event_log = EventLog.from_path(entry_point / "LoanApp_simplified.csv.gz", log_ids, need_test_partition=True)
+
+    shared_validation = event_log.shared_validation_partition()
+    shared_test = event_log.shared_test_partition()
+    # Exported only once per partition
+    assert event_log.shared_validation_partition() == shared_validation
+    assert shared_validation.path != shared_test.path
+    assert shared_validation.path.exists()
+    # The loaded partition keeps the columns needed for the evaluation
+    columns = [log_ids.case, log_ids.activity, log_ids.start_time, log_ids.end_time, log_ids.resource]
+    loaded = shared_validation.load()
+    assert list(loaded.columns) == columns
+    assert loaded[log_ids.start_time].equals(event_log.validation_partition[log_ids.start_time].reset_index(drop=True))
+    assert loaded[log_ids.activity].tolist() == event_log.validation_partition[log_ids.activity].tolist()
+    # Releasing removes the exported files
+    event_log.release_shared_partitions()
+    assert not shared_validation.path.exists()
+    assert not shared_test.path.exists()
+
+
+def test_first_validation_cases(entry_point):
+    log_ids = DEFAULT_XES_IDS
+    event_log = EventLog.from_path(entry_point / "LoanApp_simplified.csv.gz", log_ids)
+    validation = event_log.validation_partition
+
+    first_cases = event_log.first_validation_cases(10)
+
+    assert first_cases[log_ids.case].nunique() == 10
+    assert event_log.first_validation_cases(10) is first_cases
+    # The kept cases are the ones starting first
+    case_starts = validation.groupby(log_ids.case)[log_ids.start_time].min()
+    assert case_starts[first_cases[log_ids.case].unique()].max() <= case_starts.drop(first_cases[log_ids.case]).min()
+    # Shared partitions and profiles are computed per number of cases
+    shared_first_cases = event_log.shared_validation_partition(10)
+    assert shared_first_cases.path != event_log.shared_validation_partition().path
+    assert shared_first_cases.load()[log_ids.case].nunique() == 10
+    event_log.release_shared_partitions()
+
+
+def test_variants(entry_point):
+    log_ids = DEFAULT_XES_IDS
+    event_log = EventLog.from_path(entry_point / "LoanApp_simplified.csv.gz", log_ids)
+    train = event_log.train_partition
+
+    variants = event_log.train_variants()
+
+    assert event_log.train_variants() is variants
+    assert len(variants) == len(set(variants.sequences)) < train[log_ids.case].nunique()
+    assert sum(variants.counts) == train[log_ids.case].nunique()
+    # Each case follows the activities of its variant, ordered by start and end
+    for sequence, case_ids in zip(variants.sequences, variants.case_ids):
+        for case_id in case_ids:
+            events = train[train[log_ids.case] == case_id].sort_values([log_ids.start_time, log_ids.end_time])
+            assert tuple(events[log_ids.activity]) == sequence
+    assert (
+        sum(event_log.train_validation_variants().counts)
+        == event_log.train_validation_partition[log_ids.case].nunique()
+    )
+
+
+def test_write_xes(tmp_path, monkeypatch):
+    # Small chunks to check that the traces are written correctly across them
+    monkeypatch.setattr(utilities, "XES_CHUNK_SIZE", 2)
+    log = pd.DataFrame(
+        {
+            "case_id": ["1", "2", "1", "2", "1"],
+            "activity": ["A", "A", "B & C", "B & C", "D"],
+            "resource": ["R1", None, "R2", "R2", "<R3>"],
+            "start_time": pd.to_datetime(
+                ["2023-01-01 10:00", "2023-01-01 11:00", "2023-01-01 12:00", None, "2023-01-01 14:00"], utc=True
+            ),
+            "end_time": pd.to_datetime(
+                ["2023-01-01 10:30", "2023-01-01 11:30", "2023-01-01 12:30", "2023-01-01 13:30", "2023-01-01 14:30"],
+                utc=True,
+            ),
+        }
+    )
+    log_ids = APROMORE_LOG_IDS
+    log = log.rename(
+        columns={
+            "case_id": log_ids.case,
+            "activity": log_ids.activity,
+            "resource": log_ids.resource,
+            "start_time": log_ids.start_time,
+            "end_time": log_ids.end_time,
+        }
+    )
+
+    write_xes(log, log_ids, tmp_path / "log.xes")
+    write_xes(log, log_ids, tmp_path / "log.xes.gz")
+
+    with gzip.open(tmp_path / "log.xes.gz", "rt") as compressed_file:
+        assert compressed_file.read() == (tmp_path / "log.xes").read_text()
+    traces = ET.parse(tmp_path / "log.xes").getroot().findall("trace")
+    events = {
+        trace.find("string").get("value"): [
+            {attribute.get("key"): attribute.get("value") for attribute in event} for event in trace.findall("event")
+        ]
+        for trace in traces
+    }
+    # Traces in order of appearance, with a start and a complete event per activity instance (if it has timestamp)
+    assert [trace.find("string").get("value") for trace in traces] == ["1", "2"]
+    assert [(event["concept:name"], event["lifecycle:transition"]) for event in events["1"]] == [
+        ("A", "start"),
+        ("A", "complete"),
+        ("B & C", "start"),
+        ("B & C", "complete"),
+        ("D", "start"),
+        ("D", "complete"),
+    ]
+    assert [event["lifecycle:transition"] for event in events["2"]] == ["start", "complete", "complete"]
+    assert events["1"][4]["org:resource"] == "<R3>"
+    assert events["2"][0]["org:resource"] == "UNDEFINED"
+    assert events["2"][2]["time:timestamp"] == "2023-01-01T13:30:00.000+00:00"
+
+
+def test_format_xes_timestamps():
+    timestamps = pd.Series(pd.to_datetime(["2023-01-31 10:15:00.123456", None])).dt.tz_localize("Europe/Tallinn")
+    assert format_xes_timestamps(timestamps).tolist() == ["2023-01-31T10:15:00.123+02:00", None]
+    # Time zone-naive timestamps are considered UTC
+    timestamps = pd.Series(pd.to_datetime(["2023-07-01 00:00:00"]))
+    assert format_xes_timestamps(timestamps).tolist() == ["2023-07-01T00:00:00.000+00:00"]
@@ -1,6 +1,7 @@
 import pytest
 from pix_framework.io.event_log import DEFAULT_XES_IDS, read_csv_log
-from simod.metrics import get_absolute_emd
+from simod.metrics import ReferenceLogProfile, compute_metric, compute_metrics, get_absolute_emd
+from simod.settings.common_settings import Metric, MetricEngine
 
 test_cases = [
     {
@@ -29,3 +30,51 @@ def test_absolute_timestamp_emd(entry_point, test_data):
     # Test similar log
     emd = get_absolute_emd(original_log, original_log_ids, original_log, simulated_log_ids)
     assert emd == 0.0
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("test_data", test_cases, ids=[test_data["name"] for test_data in test_cases])
+@pytest.mark.parametrize("metric", list(Metric), ids=[metric.value for metric in Metric])
+def test_reference_profile_parity(entry_point, test_data, metric):
+    original_log_ids = test_data["original_log"]["log_ids"]
+    simulated_log_ids = test_data["simulated_log"]["log_ids"]
+    original_log = read_csv_log(entry_point / test_data["original_log"]["log_name"], original_log_ids)
+    simulated_log = read_csv_log(entry_point / test_data["simulated_log"]["log_name"], simulated_log_ids)
+    # Reduce the size of the logs to keep the control-flow distance fast
+    original_log = original_log[
+        original_log[original_log_ids.case].isin(original_log[original_log_ids.case].unique()[:200])
+    ]
+    simulated_log = simulated_log[
+        simulated_log[simulated_log_ids.case].isin(simulated_log[simulated_log_ids.case].unique()[:200])
+    ]
+
+    profile = ReferenceLogProfile.from_event_log(original_log, original_log_ids, [metric])
+    expected = compute_metric(metric, original_log, original_log_ids, simulated_log, simulated_log_ids)
+    actual = compute_metric(metric, None, original_log_ids, simulated_log, simulated_log_ids, reference_profile=profile)
+
+    assert actual == pytest.approx(expected, rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("engine", list(MetricEngine), ids=[engine.value for engine in MetricEngine])
+def test_compute_metrics_single_pass(entry_point, engine):
+    test_data = test_cases[0]
+    original_log_ids = test_data["original_log"]["log_ids"]
+    simulated_log_ids = test_data["simulated_log"]["log_ids"]
+    original_log = read_csv_log(entry_point / test_data["original_log"]["log_name"], original_log_ids)
+    simulated_log = read_csv_log(entry_point / test_data["simulated_log"]["log_name"], simulated_log_ids)
+    metrics = list(Metric)
+
+    expected = {
+        metric: compute_metric(metric, original_log, original_log_ids, simulated_log, simulated_log_ids)
+        for metric in metrics
+    }
+    # With a profile covering only part of the metrics, the rest are computed against the original log
+    profile = ReferenceLogProfile.from_event_log(original_log, original_log_ids, metrics[:5], engine)
+    actual = compute_metrics(
+        metrics, original_log, original_log_ids, simulated_log, simulated_log_ids, profile, engine=engine
+    )
+
+    assert list(actual.keys()) == metrics
+    for metric in metrics:
+        assert actual[metric] == pytest.approx(expected[metric], rel=1e-9, abs=1e-12)
@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+from jellyfish import damerau_levenshtein_distance
+from pix_framework.io.event_log import DEFAULT_XES_IDS, PROSIMOS_LOG_IDS, read_csv_log
+
+from simod.metrics import ReferenceLogProfile, compute_metric
+from simod.native_metrics import (
+    EncodedEventLog,
+    _aligned_variants,
+    approximate_control_flow_log_distance,
+    native_distance,
+)
+from simod.settings.common_settings import Metric, MetricEngine
+
+test_cases = [
+    {
+        "name": "LoanApp_simplified",
+        "original_log": {"log_name": "LoanApp_simplified.csv.gz", "log_ids": DEFAULT_XES_IDS},
+        "simulated_log": {"log_name": "LoanApp_simplified_2.csv.gz", "log_ids": DEFAULT_XES_IDS},
+    },
+    {
+        "name": "LoanApp_simplified_missing_activity",
+        "original_log": {"log_name": "LoanApp_simplified.csv.gz", "log_ids": DEFAULT_XES_IDS},
+        "simulated_log": {"log_name": "LoanApp_simplified_without_approve_loan_offer.csv", "log_ids": DEFAULT_XES_IDS},
+    },
+    {
+        "name": "Insurance_Claims",
+        "original_log": {"log_name": "Insurance_Claims_test.csv", "log_ids": PROSIMOS_LOG_IDS},
+        "simulated_log": {"log_name": "Insurance_Claims_train.csv", "log_ids": PROSIMOS_LOG_IDS},
+    },
+]
+
+
+def _read_logs(entry_point, test_data, timezone=None):
+    original_log_ids = test_data["original_log"]["log_ids"]
+    simulated_log_ids = test_data["simulated_log"]["log_ids"]
+    original_log = read_csv_log(entry_point / test_data["original_log"]["log_name"], original_log_ids)
+    simulated_log = read_csv_log(entry_point / test_data["simulated_log"]["log_name"], simulated_log_ids)
+    if timezone is not None:
+        for event_log, log_ids in [(original_log, original_log_ids), (simulated_log, simulated_log_ids)]:
+            event_log[log_ids.start_time] = event_log[log_ids.start_time].dt.tz_convert(timezone)
+            event_log[log_ids.end_time] = event_log[log_ids.end_time].dt.tz_convert(timezone)
+    return original_log, original_log_ids, simulated_log, simulated_log_ids
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("test_data", test_cases, ids=[test_data["name"] for test_data in test_cases])
+@pytest.mark.parametrize("metric", list(Metric), ids=[metric.value for metric in Metric])
+def test_native_engine_parity(entry_point, test_data, metric):
+    original_log, original_log_ids, simulated_log, simulated_log_ids = _read_logs(entry_point, test_data)
+
+    expected = compute_metric(metric, original_log, original_log_ids, simulated_log, simulated_log_ids)
+    actual = compute_metric(
+        metric, original_log, original_log_ids, simulated_log, simulated_log_ids, engine=MetricEngine.NATIVE
+    )
+
+    assert actual == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("metric", [Metric.CIRCADIAN_EMD, Metric.CIRCADIAN_WORKFORCE_EMD, Metric.ABSOLUTE_EMD])
+def test_native_engine_parity_with_timezone(entry_point, metric):
+    # Weekdays and hours are measured in the timezone of the timestamps
+    original_log, original_log_ids, simulated_log, simulated_log_ids = _read_logs(
+        entry_point, test_cases[0], timezone="America/Los_Angeles"
+    )
+
+    expected = compute_metric(metric, original_log, original_log_ids, simulated_log, simulated_log_ids)
+    actual = compute_metric(
+        metric, original_log, original_log_ids, simulated_log, simulated_log_ids, engine=MetricEngine.NATIVE
+    )
+
+    assert actual == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+
+@pytest.mark.integration
+def test_native_reference_profile(entry_point):
+    original_log, original_log_ids, simulated_log, simulated_log_ids = _read_logs(entry_point, test_cases[0])
+    metrics = list(Metric)
+
+    profile = ReferenceLogProfile.from_event_log(original_log, original_log_ids, metrics, MetricEngine.NATIVE)
+    encoded_original = EncodedEventLog.from_event_log(original_log, original_log_ids)
+    encoded_simulated = EncodedEventLog.from_event_log(simulated_log, simulated_log_ids)
+
+    for metric in metrics:
+        assert profile.distance(metric, simulated_log, simulated_log_ids) == native_distance(
+            metric, encoded_original, encoded_simulated
+        )
+    # Same log, no distance
+    for metric in metrics:
+        assert native_distance(metric, encoded_original, encoded_original) == pytest.approx(0.0, abs=1e-12)
+
+
+def test_encoded_event_log_order(entry_point):
+    event_log = read_csv_log(entry_point / "LoanApp_simplified.csv.gz", DEFAULT_XES_IDS)
+    log_ids = DEFAULT_XES_IDS
+
+    encoded = EncodedEventLog.from_event_log(event_log.sample(frac=1.0, random_state=42), log_ids)
+
+    assert encoded.case_bounds[-1] == len(event_log)
+    assert len(encoded.case_bounds) == event_log[log_ids.case].nunique() + 1
+    # Each case is contiguous and sorted by start time
+    for start, end in zip(encoded.case_bounds[:-1], encoded.case_bounds[1:]):
+        assert (encoded.starts[start + 1 : end] >= encoded.starts[start : end - 1]).all()
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("test_data", test_cases, ids=[test_data["name"] for test_data in test_cases])
+def test_approximate_control_flow_log_distance_bounds(entry_point, test_data):
+    original_log, original_log_ids, simulated_log, simulated_log_ids = _read_logs(entry_point, test_data)
+    original = EncodedEventLog.from_event_log(original_log, original_log_ids)
+    simulated = EncodedEventLog.from_event_log(simulated_log, simulated_log_ids)
+
+    original_variants, original_indexes = original.variants
+    simulated_variants, simulated_indexes = _aligned_variants(original, simulated)
+    approximation = approximate_control_flow_log_distance(
+        list(original_variants),
+        np.bincount(original_indexes),
+        simulated_variants,
+        np.bincount(simulated_indexes),
+    )
+    exact = native_distance(Metric.DL, original, simulated)
+
+    # The exact distance lies within the bounds of the approximation, which never underestimates it
+    assert approximation.lower_bound - 1e-12 <= exact <= approximation.upper_bound + 1e-12
+    assert exact - 1e-12 <= approximation.distance <= approximation.upper_bound + 1e-12
+    assert abs(approximation.distance - exact) <= approximation.error_bound + 1e-12
+
+
+def test_approximate_control_flow_log_distance_not_compared_pairs():
+    # Lower bound of 0.5 (at the cutoff, not compared exactly), but exact normalized distance of 1.0
+    approximation = approximate_control_flow_log_distance(["abcd"], np.array([1]), ["cdxy"], np.array([1]))
+    exact = damerau_levenshtein_distance("abcd", "cdxy") / 4
+
+    assert approximation.lower_bound == 0.5
+    assert approximation.distance >= exact
+    assert approximation.upper_bound >= exact
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("engine", list(MetricEngine), ids=[engine.value for engine in MetricEngine])
+def test_approximate_dl_reference_profile(entry_point, engine):
+    original_log, original_log_ids, simulated_log, simulated_log_ids = _read_logs(entry_point, test_cases[0])
+
+    exact_profile = ReferenceLogProfile.from_event_log(original_log, original_log_ids, [Metric.DL], engine)
+    approximate_profile = ReferenceLogProfile.from_event_log(
+        original_log, original_log_ids, [Metric.DL], engine, approximate_dl=True
+    )
+    exact = exact_profile.distance(Metric.DL, simulated_log, simulated_log_ids)
+    approximate = approximate_profile.distance(Metric.DL, simulated_log, simulated_log_ids)
+
+    assert approximate >= exact - 1e-12
+    assert approximate == pytest.approx(exact, abs=0.01)
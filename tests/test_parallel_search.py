@@ -0,0 +1,147 @@
+import threading
+import time
+
+import pytest
+from hyperopt import STATUS_OK, Trials, hp, tpe
+from hyperopt.base import JOB_STATE_DONE, JOB_STATE_ERROR
+
+from simod.parallel_search import parallel_fmin, replay_suggest
+from simod.successive_halving import successive_halving
+
+
+def test_parallel_fmin():
+    lock = threading.Lock()
+    running, max_running = 0, 0
+
+    def objective(params):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return {"loss": (params["x"] - 0.3) ** 2, "status": STATUS_OK}
+
+    trials = Trials()
+    best = parallel_fmin(objective, {"x": hp.uniform("x", 0, 1)}, max_evals=30, trials=trials, max_parallel_trials=4)
+
+    assert len(trials.trials) == 30
+    assert all(trial["state"] == JOB_STATE_DONE for trial in trials.trials)
+    assert max_running == 4
+    # The candidates asked while others were running are different points
+    assert len({trial["misc"]["vals"]["x"][0] for trial in trials.trials}) == 30
+    assert best["x"] == trials.best_trial["misc"]["vals"]["x"][0]
+    # Continues the search with the trials already evaluated
+    parallel_fmin(objective, {"x": hp.uniform("x", 0, 1)}, max_evals=35, trials=trials, max_parallel_trials=4)
+    assert len(trials.trials) == 35
+
+
+def test_parallel_fmin_error():
+    def objective(params):
+        if params["x"] > 0.5:
+            raise ValueError("Evaluation failed")
+        return {"loss": params["x"], "status": STATUS_OK}
+
+    trials = Trials()
+    with pytest.raises(ValueError):
+        parallel_fmin(objective, {"x": hp.uniform("x", 0, 1)}, max_evals=50, trials=trials, max_parallel_trials=3)
+    assert JOB_STATE_ERROR in [trial["state"] for trial in trials._dynamic_trials]
+
+
+def test_parallel_successive_halving():
+    rungs = []
+
+    def start_rung(fidelity, trials):
+        rungs.append((fidelity, trials))
+
+    def objective(params):
+        time.sleep(0.01)
+        return {"loss": (params["x"] - 0.3) ** 2, "status": STATUS_OK}
+
+    best = successive_halving(
+        objective, {"x": hp.uniform("x", 0, 1)}, num_candidates=20, start_rung=start_rung, max_parallel_trials=4
+    )
+
+    assert [len(trials.trials) for _, trials in rungs] == [20, 6, 2]
+    assert best["x"] == rungs[-1][1].best_trial["misc"]["vals"]["x"][0]
+
+
+@pytest.mark.parametrize("max_parallel_trials", [1, 3])
+def test_parallel_fmin_on_trial_done(max_parallel_trials):
+    num_finished = []
+
+    def objective(params):
+        return {"loss": params["x"], "status": STATUS_OK}
+
+    def on_trial_done(trials):
+        num_finished.append(len([trial for trial in trials.trials if trial["state"] == JOB_STATE_DONE]))
+
+    trials = Trials()
+    parallel_fmin(
+        objective,
+        {"x": hp.uniform("x", 0, 1)},
+        max_evals=10,
+        trials=trials,
+        max_parallel_trials=max_parallel_trials,
+        on_trial_done=on_trial_done,
+    )
+
+    # Called once the finished trials are recorded, until all of them are
+    assert num_finished == sorted(num_finished)
+    assert num_finished[0] > 0
+    assert num_finished[-1] == 10
+
+
+def test_replay_suggest():
+    def objective(params):
+        return {"loss": (params["x"] - 0.3) ** 2, "status": STATUS_OK}
+
+    trials = Trials()
+    points = [{"x": 0.3}, {"x": 0.9}]
+    parallel_fmin(
+        objective,
+        {"x": hp.uniform("x", 0, 1)},
+        max_evals=5,
+        trials=trials,
+        algo=replay_suggest(points, algo=tpe.suggest),
+    )
+
+    # The given points are evaluated first, and the suggestion algorithm takes over from them
+    assert len(trials.trials) == 5
+    assert [trial["misc"]["vals"]["x"][0] for trial in trials.trials[:2]] == [0.3, 0.9]
+    assert trials.best_trial["misc"]["vals"]["x"][0] == 0.3
+
+
+@pytest.mark.parametrize("max_parallel_trials", [1, 3])
+def test_parallel_fmin_stop(max_parallel_trials):
+    def objective(params):
+        return {"loss": params["x"], "status": STATUS_OK}
+
+    trials = Trials()
+    parallel_fmin(
+        objective,
+        {"x": hp.uniform("x", 0, 1)},
+        max_evals=20,
+        trials=trials,
+        max_parallel_trials=max_parallel_trials,
+        stop=lambda: len(trials.trials) >= 5,
+    )
+
+    # Stops launching trials once told, awaiting the running ones
+    assert 5 <= len(trials.trials) < 5 + max_parallel_trials
+    assert all(trial["state"] == JOB_STATE_DONE for trial in trials.trials)
+
+
+def test_parallel_fmin_stop_without_success():
+    trials = Trials()
+    parallel_fmin(
+        lambda params: {"loss": params["x"], "status": STATUS_OK},
+        {"x": hp.uniform("x", 0, 1)},
+        max_evals=20,
+        trials=trials,
+        stop=lambda: True,
+    )
+
+    # Evaluates a trial to return its point even if told to stop from the start
+    assert len(trials.trials) == 1
@@ -0,0 +1,49 @@
+import copy
+
+import pytest
+from pix_framework.discovery.resource_calendar_and_performance.calendar_discovery_parameters import (
+    CalendarDiscoveryParameters,
+    CalendarType,
+)
+from pix_framework.discovery.resource_model import discover_resource_model
+from pix_framework.discovery.resource_profiles import discover_pool_resource_profiles
+from pix_framework.io.event_log import APROMORE_LOG_IDS, read_csv_log
+
+from simod.resource_model.observations import CalendarObservationsCache, discover_observed_resource_model
+
+
+@pytest.mark.parametrize(
+    "discovery_type",
+    [CalendarType.UNDIFFERENTIATED, CalendarType.DIFFERENTIATED_BY_RESOURCE, CalendarType.DIFFERENTIATED_BY_POOL],
+)
+def test_discover_observed_resource_model(entry_point, discovery_type):
+    event_log = read_csv_log(entry_point / "Resource_model_optimization_test.csv", APROMORE_LOG_IDS)
+    observations = CalendarObservationsCache(event_log, APROMORE_LOG_IDS)
+    provided_profiles = (
+        discover_pool_resource_profiles(event_log, APROMORE_LOG_IDS)
+        if discovery_type == CalendarType.DIFFERENTIATED_BY_POOL
+        else None
+    )
+    # Same resource profiles and calendars as the discovery going over the events (the fitting of the duration
+    # distributions is not deterministic)
+    for granularity, confidence, support, participation in [
+        (60, 0.1, 0.7, 0.4),
+        (60, 0.6, 0.2, 0.1),
+        (30, 0.05, 0.9, 0.9),
+        (30, 0.9, 0.9, 0.4),
+    ]:
+        params = CalendarDiscoveryParameters(
+            discovery_type=discovery_type,
+            granularity=granularity,
+            confidence=confidence,
+            support=support,
+            participation=participation,
+        )
+        resource_model = discover_observed_resource_model(observations, params, copy.deepcopy(provided_profiles))
+        expected = discover_resource_model(event_log, APROMORE_LOG_IDS, params, copy.deepcopy(provided_profiles))
+        assert resource_model.to_dict()["resource_profiles"] == expected.to_dict()["resource_profiles"]
+        assert resource_model.to_dict()["resource_calendars"] == expected.to_dict()["resource_calendars"]
+        assert len(resource_model.activity_resource_distributions) == len(expected.activity_resource_distributions)
+    # The observations are built once per granularity (and grouping of the resources)
+    assert observations.misses <= 4
+    assert observations.hits >= 2
@@ -20,15 +20,19 @@ from pix_framework.io.event_log import APROMORE_LOG_IDS
 from simod.event_log.event_log import EventLog
 from simod.resource_model.optimizer import ResourceModelOptimizer
 from simod.resource_model.settings import HyperoptIterationParams
-from simod.settings.common_settings import Metric
+from simod.settings.common_settings import Metric, SearchStrategy
 from simod.settings.resource_model_settings import ResourceModelSettings
 from simod.simulation.parameters.BPS_model import BPSModel
+from simod.trial_store import TrialStore
+
+from ..test_trial_store import start_workers
 
 PROJECT_DIR = Path(__file__).parent.parent.parent
 
 resource_model_config_single_values = {
     "optimization_metric": "absolute_hourly_emd",
     "num_iterations": 5,
+    "search_strategy": "successive_halving",
     "resource_profiles": {
         "discovery_type": "pool",
         "granularity": [15, 60],
@@ -41,6 +45,7 @@ resource_model_config_single_values = {
 resource_model_config_intervals = {
     "optimization_metric": "circadian_emd",
     "num_iterations": 5,
+    "racing": True,
     "resource_profiles": {
         "discovery_type": "differentiated",
         "granularity": [15, 60],
@@ -188,5 +193,87 @@ def test_resource_model_optimizer(entry_point, test_data):
     )
     # Assert that the returned result actually has the smallest distance
     assert len(optimizer.evaluation_measurements) > 0
+    if settings.search_strategy == SearchStrategy.SUCCESSIVE_HALVING:
+        # Candidates evaluated first with a third of the validation cases, and the best one with all of them
+        assert sorted(optimizer.evaluation_measurements["fidelity"].unique()) == [1 / 3, 1.0]
+    iteration_results = pd.DataFrame(optimizer._bayes_trials.results).sort_values(by="loss", ascending=True)
+    assert iteration_results[iteration_results["status"] == STATUS_OK].iloc[0]["output_dir"] == result.output_dir
+
+
+def test_resource_model_optimizer_parallel_trials(entry_point):
+    base_dir = PROJECT_DIR / "outputs" / get_random_folder_id(prefix="test_resource_model_optimizer_")
+    create_folder(base_dir)
+    event_log = EventLog.from_path(entry_point / "Resource_model_optimization_test.csv", APROMORE_LOG_IDS)
+    process_model_path = entry_point / "Resource_model_optimization_test.bpmn"
+    bps_model = BPSModel(
+        process_model=process_model_path,
+        gateway_probabilities=compute_gateway_probabilities(
+            event_log=event_log.train_validation_partition,
+            log_ids=event_log.log_ids,
+            bpmn_graph=BPMNGraph.from_bpmn_path(process_model_path),
+        ),
+        case_arrival_model=discover_case_arrival_model(
+            event_log=event_log.train_validation_partition,
+            log_ids=event_log.log_ids,
+        ),
+    )
+
+    settings = ResourceModelSettings.from_dict(resource_model_config_intervals | {"num_iterations": 6, "racing": False})
+    optimizer = ResourceModelOptimizer(
+        event_log=event_log,
+        bps_model=bps_model,
+        settings=settings,
+        base_directory=base_dir,
+        max_parallel_trials=3,
+    )
+    result = optimizer.run()
+
+    # Same trials and measurements as evaluating the candidates one at a time
+    assert len(optimizer._bayes_trials.trials) == 6
+    assert optimizer.iteration_index == 6
+    assert len(optimizer.evaluation_measurements) == 6 * settings.num_evaluations_per_iteration
+    assert optimizer.evaluation_measurements["output_dir"].nunique() == 6
     iteration_results = pd.DataFrame(optimizer._bayes_trials.results).sort_values(by="loss", ascending=True)
     assert iteration_results[iteration_results["status"] == STATUS_OK].iloc[0]["output_dir"] == result.output_dir
+
+
+@pytest.mark.integration
+def test_resource_model_optimizer_trial_store(entry_point):
+    base_dir = PROJECT_DIR / "outputs" / get_random_folder_id(prefix="test_resource_model_optimizer_")
+    create_folder(base_dir)
+    event_log = EventLog.from_path(entry_point / "Resource_model_optimization_test.csv", APROMORE_LOG_IDS)
+    process_model_path = (entry_point / "Resource_model_optimization_test.bpmn").absolute()
+    bps_model = BPSModel(
+        process_model=process_model_path,
+        gateway_probabilities=compute_gateway_probabilities(
+            event_log=event_log.train_validation_partition,
+            log_ids=event_log.log_ids,
+            bpmn_graph=BPMNGraph.from_bpmn_path(process_model_path),
+        ),
+        case_arrival_model=discover_case_arrival_model(
+            event_log=event_log.train_validation_partition,
+            log_ids=event_log.log_ids,
+        ),
+    )
+    trial_store = TrialStore(base_dir / "trials", poll_interval=0.1)
+    workers = start_workers(trial_store.directory, 2)
+
+    settings = ResourceModelSettings.from_dict(resource_model_config_single_values | {"num_iterations": 4})
+    optimizer = ResourceModelOptimizer(
+        event_log=event_log,
+        bps_model=bps_model,
+        settings=settings,
+        base_directory=base_dir,
+        max_parallel_trials=2,
+        trial_store=trial_store,
+    )
+    result = optimizer.run()
+
+    # The iterations are evaluated by the workers, and their measurements reported to the optimizer
+    assert all(worker.wait(timeout=60) == 0 for worker in workers)
+    # (the 4 candidates of the first rung, and the ones promoted to the full-fidelity rung)
+    assert optimizer.iteration_index == len(optimizer._bayes_trials.trials) + 4
+    assert sorted(optimizer.evaluation_measurements["fidelity"].unique()) == [1 / 3, 1.0]
+    assert optimizer.evaluation_measurements["output_dir"].nunique() == optimizer.iteration_index
+    assert result.output_dir.exists()
+    assert optimizer.best_bps_model.resource_model is not None
@@ -2,6 +2,7 @@ from pathlib import Path
 
 import yaml
 
+from simod.settings.common_settings import BudgetPolicy, MetricEngine, SearchStrategy
 from simod.settings.simod_settings import SimodSettings
 
 settings_5 = """
@@ -114,6 +115,158 @@ def test_configuration_legacy():
     assert ground_truth.to_dict() == legacy.to_dict()
 
 
+def test_configuration_metric_engine():
+    config = yaml.safe_load(settings_5)
+    assert SimodSettings.from_yaml(config).common.metric_engine == MetricEngine.LOG_DISTANCE_MEASURES
+
+    config["common"]["metric_engine"] = "native"
+    result = SimodSettings.from_yaml(config)
+
+    assert result.common.metric_engine == MetricEngine.NATIVE
+    assert result.to_dict()["common"]["metric_engine"] == "native"
+
+
+def test_configuration_approximate_dl_in_optimization():
+    config = yaml.safe_load(settings_5)
+    assert SimodSettings.from_yaml(config).common.approximate_dl_in_optimization is False
+
+    config["common"]["approximate_dl_in_optimization"] = True
+    result = SimodSettings.from_yaml(config)
+
+    assert result.common.approximate_dl_in_optimization is True
+    assert result.to_dict()["common"]["approximate_dl_in_optimization"] is True
+
+
+def test_configuration_simulation_cache():
+    config = yaml.safe_load(settings_5)
+    assert SimodSettings.from_yaml(config).common.simulation_cache_path is None
+
+    config["common"]["simulation_cache_path"] = "simulation_cache"
+    config["common"]["simulation_cache_size"] = 500
+    result = SimodSettings.from_yaml(config, config_dir=Path("/tmp"))
+
+    assert result.common.simulation_cache_path == Path("/tmp/simulation_cache")
+    assert result.common.simulation_cache_size == 500
+    assert result.to_dict()["common"]["simulation_cache_path"] == "/tmp/simulation_cache"
+
+
+def test_configuration_seed():
+    config = yaml.safe_load(settings_5)
+    assert SimodSettings.from_yaml(config).common.seed is None
+
+    config["common"]["seed"] = 42
+    result = SimodSettings.from_yaml(config)
+
+    assert result.common.seed == 42
+    assert result.to_dict()["common"]["seed"] == 42
+
+
+def test_configuration_max_parallel_trials():
+    config = yaml.safe_load(settings_5)
+    assert SimodSettings.from_yaml(config).common.max_parallel_trials == 1
+
+    config["common"]["max_parallel_trials"] = 4
+    result = SimodSettings.from_yaml(config)
+
+    assert result.common.max_parallel_trials == 4
+    assert result.to_dict()["common"]["max_parallel_trials"] == 4
+
+
+def test_configuration_trial_store():
+    config = yaml.safe_load(settings_5)
+    assert SimodSettings.from_yaml(config).common.trial_store_path is None
+
+    config["common"]["trial_store_path"] = "trials"
+    result = SimodSettings.from_yaml(config, config_dir=Path("/tmp"))
+
+    assert result.common.trial_store_path == Path("/tmp/trials")
+    assert result.to_dict()["common"]["trial_store_path"] == "/tmp/trials"
+
+
+def test_configuration_warm_start():
+    config = yaml.safe_load(settings_5)
+    result = SimodSettings.from_yaml(config)
+    assert result.common.warm_start_path is None
+    assert result.common.num_warm_start_points == 5
+
+    config["common"]["warm_start_path"] = "outputs/previous_run"
+    config["common"]["num_warm_start_points"] = 3
+    result = SimodSettings.from_yaml(config, config_dir=Path("/tmp"))
+
+    assert result.common.warm_start_path == Path("/tmp/outputs/previous_run")
+    assert result.common.num_warm_start_points == 3
+    assert result.to_dict()["common"]["warm_start_path"] == "/tmp/outputs/previous_run"
+    assert result.to_dict()["common"]["num_warm_start_points"] == 3
+
+
+def test_configuration_budget():
+    config = yaml.safe_load(settings_5)
+    result = SimodSettings.from_yaml(config)
+    assert result.common.time_budget is None
+    assert result.common.cpu_budget is None
+    assert result.common.budget_policy == BudgetPolicy.ADAPTIVE
+
+    config["common"]["time_budget"] = 3600
+    config["common"]["cpu_budget"] = 36000
+    config["common"]["budget_policy"] = "proportional"
+    result = SimodSettings.from_yaml(config)
+
+    assert result.common.time_budget == 3600
+    assert result.common.cpu_budget == 36000
+    assert result.common.budget_policy == BudgetPolicy.PROPORTIONAL
+    assert result.to_dict()["common"]["time_budget"] == 3600
+    assert result.to_dict()["common"]["budget_policy"] == "proportional"
+
+
+def test_configuration_checkpoint():
+    config = yaml.safe_load(settings_5)
+    assert not SimodSettings.from_yaml(config).common.checkpoint
+
+    config["common"]["checkpoint"] = True
+    result = SimodSettings.from_yaml(config)
+
+    assert result.common.checkpoint
+    assert result.to_dict()["common"]["checkpoint"]
+
+
+def test_configuration_discovery_parameters_step():
+    config = yaml.safe_load(settings_5)
+    assert SimodSettings.from_yaml(config).control_flow.discovery_parameters_step is None
+
+    config["control_flow"]["discovery_parameters_step"] = 0.01
+    result = SimodSettings.from_yaml(config)
+
+    assert result.control_flow.discovery_parameters_step == 0.01
+    assert result.to_dict()["control_flow"]["discovery_parameters_step"] == 0.01
+
+
+def test_configuration_num_inner_iterations():
+    config = yaml.safe_load(settings_5)
+    assert SimodSettings.from_yaml(config).control_flow.num_inner_iterations is None
+
+    config["control_flow"]["num_inner_iterations"] = 2
+    result = SimodSettings.from_yaml(config)
+
+    assert result.control_flow.num_inner_iterations == 2
+    assert result.to_dict()["control_flow"]["num_inner_iterations"] == 2
+
+
+def test_configuration_search_strategy():
+    config = yaml.safe_load(settings_5)
+    result = SimodSettings.from_yaml(config)
+    assert result.control_flow.search_strategy == SearchStrategy.TPE
+    assert result.resource_model.search_strategy == SearchStrategy.TPE
+
+    config["control_flow"]["search_strategy"] = "successive_halving"
+    config["resource_model"]["search_strategy"] = "sh"
+    result = SimodSettings.from_yaml(config)
+
+    assert result.control_flow.search_strategy == SearchStrategy.SUCCESSIVE_HALVING
+    assert result.resource_model.search_strategy == SearchStrategy.SUCCESSIVE_HALVING
+    assert result.to_dict()["control_flow"]["search_strategy"] == "successive_halving"
+    assert result.to_dict()["resource_model"]["search_strategy"] == "successive_halving"
+
+
 def assert_common(config: dict, result: SimodSettings):
     config_common = config["common"]
     result_common = result.common
@@ -170,3 +323,22 @@ def assert_resource_model(config: dict, result: SimodSettings):
             continue
 
         assert config_resource_model[key] == getattr(result_resource_model, key), f"{key} is not equal"
+
+
+def test_configuration_screening():
+    config = yaml.safe_load(settings_5)
+    result = SimodSettings.from_yaml(config)
+    assert not result.control_flow.screening
+    assert not result.resource_model.screening
+
+    config["control_flow"]["screening"] = True
+    config["control_flow"]["screening_margin"] = 0.2
+    config["resource_model"]["screening"] = True
+    result = SimodSettings.from_yaml(config)
+
+    assert result.control_flow.screening
+    assert result.control_flow.screening_margin == 0.2
+    assert result.resource_model.screening
+    assert result.resource_model.screening_margin == 0.1
+    assert result.to_dict()["control_flow"]["screening_margin"] == 0.2
+    assert result.to_dict()["resource_model"]["screening"]
@@ -3,7 +3,7 @@ from pathlib import Path
 import pytest
 from pix_framework.io.event_log import EventLogIDs, read_csv_log
 from simod.settings.common_settings import Metric
-from simod.simulation.prosimos import evaluate_logs
+from simod.simulation.prosimos import create_simulation_pool, evaluate_logs
 
 
 @pytest.mark.parametrize("parallel", [True, False])
@@ -41,3 +41,26 @@ def test_evaluate_logs(parallel):
     )
 
     assert len(results) > 0
+
+
+def test_evaluate_logs_with_shared_pool():
+    metrics = [Metric.CIRCADIAN_EMD, Metric.TWO_GRAM_DISTANCE]
+    assets_dir = Path(__file__).parent / "assets"
+    log_paths = sorted(assets_dir.glob("simulated_log_*.csv"))
+    log_ids = EventLogIDs(
+        case="case_id",
+        activity="activity",
+        resource="resource",
+        start_time="start_time",
+        end_time="end_time",
+    )
+    validation_log = read_csv_log(assets_dir / "validation_log.csv", log_ids)
+
+    expected = evaluate_logs(metrics, log_paths, validation_log, log_ids)
+    with create_simulation_pool(2) as pool:
+        # The same pool is reused by consecutive evaluations
+        first = evaluate_logs(metrics, log_paths, validation_log, log_ids, pool=pool)
+        second = evaluate_logs(metrics, log_paths, validation_log, log_ids, pool=pool)
+
+    assert first == expected
+    assert second == expected
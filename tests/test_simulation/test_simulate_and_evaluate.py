@@ -0,0 +1,247 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from pix_framework.discovery.case_arrival import discover_case_arrival_model
+from pix_framework.discovery.gateway_probabilities import compute_gateway_probabilities
+from pix_framework.discovery.resource_calendar_and_performance.calendar_discovery_parameters import (
+    CalendarDiscoveryParameters,
+)
+from pix_framework.discovery.resource_model import discover_resource_model
+from pix_framework.filesystem.file_manager import create_folder, get_random_folder_id
+from pix_framework.io.bpm_graph import BPMNGraph
+from pix_framework.io.event_log import APROMORE_LOG_IDS
+
+from simod.event_log.event_log import EventLog
+from simod.settings.common_settings import Metric
+from simod.simulation.parameters.BPS_model import BPSModel
+from simod.simulation.prosimos import (
+    ProsimosSettings,
+    _race_in_pool,
+    _simulate_and_evaluate_replica,
+    create_simulation_pool,
+    evaluate_logs,
+    replica_seeds,
+    simulate_and_evaluate,
+)
+
+PROJECT_DIR = Path(__file__).parent.parent.parent
+
+
+def _discover_bps_model(entry_point: Path, output_dir: Path):
+    event_log = EventLog.from_path(entry_point / "Resource_model_optimization_test.csv", APROMORE_LOG_IDS)
+    process_model_path = entry_point / "Resource_model_optimization_test.bpmn"
+    bps_model = BPSModel(
+        process_model=process_model_path,
+        gateway_probabilities=compute_gateway_probabilities(
+            event_log=event_log.train_validation_partition,
+            log_ids=event_log.log_ids,
+            bpmn_graph=BPMNGraph.from_bpmn_path(process_model_path),
+        ),
+        case_arrival_model=discover_case_arrival_model(event_log.train_validation_partition, event_log.log_ids),
+        resource_model=discover_resource_model(
+            event_log.train_validation_partition, event_log.log_ids, CalendarDiscoveryParameters()
+        ),
+        calendar_granularity=60,
+    )
+    bps_model.replace_activity_names_with_ids()
+    parameters_path = bps_model.to_json(output_dir, event_log.process_name)
+    return event_log, bps_model, parameters_path
+
+
+def _measurement_key(measurement: dict):
+    return measurement["run_num"], measurement["metric"].value
+
+
+@pytest.mark.integration
+def test_simulate_and_evaluate(entry_point):
+    output_dir = PROJECT_DIR / "outputs" / get_random_folder_id(prefix="test_simulate_and_evaluate_")
+    create_folder(output_dir)
+    event_log, bps_model, parameters_path = _discover_bps_model(entry_point, output_dir)
+    metrics = [Metric.CIRCADIAN_EMD, Metric.THREE_GRAM_DISTANCE]
+
+    with create_simulation_pool(2) as pool:
+        measurements = simulate_and_evaluate(
+            process_model_path=bps_model.process_model,
+            parameters_path=parameters_path,
+            output_dir=output_dir,
+            simulation_cases=event_log.validation_partition[event_log.log_ids.case].nunique(),
+            simulation_start_time=event_log.validation_partition[event_log.log_ids.start_time].min(),
+            validation_log=event_log.validation_partition,
+            validation_log_ids=event_log.log_ids,
+            metrics=metrics,
+            num_simulations=2,
+            pool=pool,
+        )
+
+    # One measurement per replica and metric, the simulated logs are kept in the output directory
+    assert len(measurements) == 4
+    assert sorted({measurement["run_num"] for measurement in measurements}) == [0, 1]
+    assert {measurement["metric"] for measurement in measurements} == set(metrics)
+    assert all(measurement["distance"] >= 0.0 for measurement in measurements)
+    assert (output_dir / "simulated_log_0.csv").exists()
+    assert (output_dir / "simulated_log_1.csv").exists()
+
+
+@pytest.mark.integration
+def test_simulate_and_evaluate_with_reference_profile(entry_point):
+    output_dir = PROJECT_DIR / "outputs" / get_random_folder_id(prefix="test_simulate_and_evaluate_")
+    create_folder(output_dir)
+    event_log, bps_model, parameters_path = _discover_bps_model(entry_point, output_dir)
+    metrics = [Metric.CIRCADIAN_EMD, Metric.THREE_GRAM_DISTANCE]
+    reference_profile = event_log.validation_profile(metrics)
+
+    # The profile is computed once per partition and metrics
+    assert event_log.validation_profile(metrics) is reference_profile
+
+    with create_simulation_pool(2) as pool:
+        measurements = simulate_and_evaluate(
+            process_model_path=bps_model.process_model,
+            parameters_path=parameters_path,
+            output_dir=output_dir,
+            simulation_cases=event_log.validation_partition[event_log.log_ids.case].nunique(),
+            simulation_start_time=event_log.validation_partition[event_log.log_ids.start_time].min(),
+            validation_log=event_log.shared_validation_partition(),
+            validation_log_ids=event_log.log_ids,
+            metrics=metrics,
+            num_simulations=2,
+            pool=pool,
+            reference_profile=reference_profile,
+        )
+        # Evaluating the same simulated logs against the validation log gives the same distances
+        expected = evaluate_logs(
+            metrics,
+            [output_dir / "simulated_log_0.csv", output_dir / "simulated_log_1.csv"],
+            event_log.validation_partition,
+            event_log.log_ids,
+            pool=pool,
+        )
+
+    event_log.release_shared_partitions()
+
+    assert len(measurements) == 4
+    for measurement, expected_measurement in zip(
+        sorted(measurements, key=_measurement_key), sorted(expected, key=_measurement_key)
+    ):
+        assert measurement["distance"] == pytest.approx(expected_measurement["distance"])
+
+
+@pytest.mark.integration
+def test_simulate_and_evaluate_stop_early(entry_point):
+    output_dir = PROJECT_DIR / "outputs" / get_random_folder_id(prefix="test_simulate_and_evaluate_")
+    create_folder(output_dir)
+    event_log, bps_model, parameters_path = _discover_bps_model(entry_point, output_dir)
+    metrics = [Metric.CIRCADIAN_EMD]
+    evaluated_replicas = []
+
+    def stop_early(measurements):
+        evaluated_replicas.append(len(measurements))
+        return len(measurements) >= 2
+
+    with create_simulation_pool(1) as pool:
+        measurements = simulate_and_evaluate(
+            process_model_path=bps_model.process_model,
+            parameters_path=parameters_path,
+            output_dir=output_dir,
+            simulation_cases=event_log.validation_partition[event_log.log_ids.case].nunique(),
+            simulation_start_time=event_log.validation_partition[event_log.log_ids.start_time].min(),
+            validation_log=event_log.validation_partition,
+            validation_log_ids=event_log.log_ids,
+            metrics=metrics,
+            num_simulations=4,
+            pool=pool,
+            stop_early=stop_early,
+        )
+
+    # With one worker, the replicas finish one by one and the remaining ones are discarded once the rule is satisfied
+    assert evaluated_replicas == [1, 2]
+    assert len(measurements) == 2
+    # The replicas after the first wave were never submitted, so they were not simulated
+    assert len(list(output_dir.glob("simulated_log_*.csv"))) == 2
+
+
+def _measure_replica(arguments, stop_path=None):
+    directory, rep = arguments
+    (directory / f"replica_{rep}").touch()
+    return [{"run_num": rep, "metric": Metric.CIRCADIAN_EMD, "distance": 1.0}]
+
+
+def test_race_in_pool_waves(tmp_path):
+    for name in ["rejected", "accepted"]:
+        create_folder(tmp_path / name)
+
+    with create_simulation_pool(4) as pool:
+        rejected = _race_in_pool(
+            _measure_replica,
+            [(tmp_path / "rejected", rep) for rep in range(8)],
+            pool,
+            lambda measurements: len(measurements) >= 2,
+        )
+        accepted = _race_in_pool(
+            _measure_replica, [(tmp_path / "accepted", rep) for rep in range(8)], pool, lambda measurements: False
+        )
+
+    # The candidate rejected after the first wave does not start the replicas of the next ones, despite idle workers
+    assert len(rejected) == 2
+    assert len(list((tmp_path / "rejected").iterdir())) == 2
+    # The waves of a candidate never rejected cover all its replicas
+    assert sorted(measurement["run_num"] for measurement in accepted) == list(range(8))
+    assert len(list((tmp_path / "accepted").iterdir())) == 8
+
+
+def test_simulate_and_evaluate_replica_stopped(tmp_path):
+    stop_path = tmp_path / "stop"
+    stop_path.touch()
+    settings = ProsimosSettings(
+        bpmn_path=tmp_path / "model.bpmn",
+        parameters_path=tmp_path / "parameters.json",
+        output_log_path=tmp_path / "simulated_log_0.csv",
+        num_simulation_cases=10,
+        simulation_start=pd.Timestamp("2024-01-01T00:00:00Z"),
+    )
+    arguments = (settings, 0, pd.DataFrame(), APROMORE_LOG_IDS, [Metric.CIRCADIAN_EMD], None, None, None)
+
+    # The race is decided: the replica is neither simulated nor evaluated
+    assert _simulate_and_evaluate_replica(arguments, stop_path=stop_path) == []
+    assert not settings.output_log_path.exists()
+
+
+def test_replica_seeds():
+    assert replica_seeds(None, 3) == [None, None, None]
+    seeds = replica_seeds(42, 3)
+    assert len(set(seeds)) == 3
+    # The seed of a replica does not depend on the number of replicas
+    assert replica_seeds(42, 5)[:3] == seeds
+    assert replica_seeds(43, 3) != seeds
+
+
+@pytest.mark.integration
+def test_simulate_and_evaluate_with_seed(entry_point):
+    output_dir = PROJECT_DIR / "outputs" / get_random_folder_id(prefix="test_simulate_and_evaluate_")
+    create_folder(output_dir)
+    event_log, bps_model, parameters_path = _discover_bps_model(entry_point, output_dir)
+    arguments = {
+        "process_model_path": bps_model.process_model,
+        "parameters_path": parameters_path,
+        "simulation_cases": event_log.validation_partition[event_log.log_ids.case].nunique(),
+        "simulation_start_time": event_log.validation_partition[event_log.log_ids.start_time].min(),
+        "validation_log": event_log.validation_partition,
+        "validation_log_ids": event_log.log_ids,
+        "metrics": [Metric.CIRCADIAN_EMD, Metric.CYCLE_TIME_EMD],
+        "num_simulations": 2,
+    }
+    for name in ["first", "second", "third"]:
+        create_folder(output_dir / name)
+
+    with create_simulation_pool(2) as pool:
+        first = simulate_and_evaluate(output_dir=output_dir / "first", pool=pool, seed=42, **arguments)
+        second = simulate_and_evaluate(output_dir=output_dir / "second", pool=pool, seed=42, **arguments)
+        third = simulate_and_evaluate(output_dir=output_dir / "third", pool=pool, seed=7, **arguments)
+
+    # The same seed reproduces the simulated logs, and a different one changes them
+    assert sorted(first, key=_measurement_key) == sorted(second, key=_measurement_key)
+    assert sorted(first, key=_measurement_key) != sorted(third, key=_measurement_key)
+    for rep in range(2):
+        assert (output_dir / "first" / f"simulated_log_{rep}.csv").read_bytes() == (
+            output_dir / "second" / f"simulated_log_{rep}.csv"
+        ).read_bytes()
@@ -0,0 +1,96 @@
+import os
+from operator import itemgetter
+
+import pytest
+from pix_framework.filesystem.file_manager import create_folder, get_random_folder_id
+
+from simod.settings.common_settings import Metric
+from simod.simulation.cache import SimulationCache
+from simod.simulation.prosimos import create_simulation_pool, simulate_and_evaluate
+
+from .test_simulate_and_evaluate import PROJECT_DIR, _discover_bps_model
+
+
+def test_simulation_cache_lru(tmp_path):
+    cache = SimulationCache(tmp_path / "cache", max_entries=2)
+    measurements = [{"run_num": 0, "metric": Metric.CIRCADIAN_EMD, "distance": 0.5}]
+
+    assert cache.get("aa01") is None
+    cache.put("aa01", measurements)
+    cache.put("bb02", measurements)
+    assert cache.get("aa01") == measurements
+    assert (cache.hits, cache.misses) == (1, 1)
+    # The least recently used entry is evicted when the store is full
+    os.utime(cache.directory / "aa" / "aa01.json", (2_000_000_000, 2_000_000_000))
+    os.utime(cache.directory / "bb" / "bb02.json", (1_000_000_000, 1_000_000_000))
+    cache.put("cc03", measurements)
+    assert len(cache) == 2
+    assert cache.get("bb02") is None
+    assert cache.get("aa01") == measurements
+    # The store is reused by other instances (e.g., in later runs)
+    assert SimulationCache(tmp_path / "cache").get("cc03") == measurements
+
+
+def test_simulation_cache_eviction_batch(tmp_path):
+    cache = SimulationCache(tmp_path / "cache", max_entries=10)
+    measurements = [{"run_num": 0, "metric": Metric.CIRCADIAN_EMD, "distance": 0.5}]
+
+    for index in range(10):
+        cache.put(f"{index:02d}", measurements)
+    # Overwriting an entry does not grow the store
+    cache.put("00", measurements)
+    assert len(cache) == 10
+    # Once full, a batch of least recently used entries is evicted, leaving room for the next writes
+    for index in range(10):
+        key = f"{index:02d}"
+        os.utime(cache.directory / key / f"{key}.json", (1_000_000_000 + index, 1_000_000_000 + index))
+    cache.put("10", measurements)
+    assert len(cache) == 9
+    assert cache.get("00") is None
+    assert cache.get("01") is None
+    assert cache.get("10") == measurements
+    cache.put("11", measurements)
+    assert len(cache) == 10
+
+
+@pytest.mark.integration
+def test_simulate_and_evaluate_with_cache(entry_point, tmp_path):
+    output_dir = PROJECT_DIR / "outputs" / get_random_folder_id(prefix="test_simulation_cache_")
+    create_folder(output_dir)
+    event_log, bps_model, parameters_path = _discover_bps_model(entry_point, output_dir)
+    for name in ["first", "second", "third", "unseeded"]:
+        create_folder(output_dir / name)
+    cache = SimulationCache(tmp_path / "cache")
+    arguments = {
+        "process_model_path": bps_model.process_model,
+        "parameters_path": parameters_path,
+        "simulation_cases": event_log.validation_partition[event_log.log_ids.case].nunique(),
+        "simulation_start_time": event_log.validation_partition[event_log.log_ids.start_time].min(),
+        "validation_log": event_log.shared_validation_partition(),
+        "validation_log_ids": event_log.log_ids,
+        "metrics": [Metric.CIRCADIAN_EMD],
+        "num_simulations": 2,
+        "cache": cache,
+        "seed": 42,
+    }
+
+    with create_simulation_pool(2) as pool:
+        simulated = simulate_and_evaluate(output_dir=output_dir / "first", pool=pool, **arguments)
+        cached = simulate_and_evaluate(output_dir=output_dir / "second", pool=pool, **arguments)
+        # Other simulation parameters, other entries
+        parameters_path.write_text(parameters_path.read_text() + " ")
+        resimulated = simulate_and_evaluate(output_dir=output_dir / "third", pool=pool, **arguments)
+        # Without a seed, the replicas are not reproducible, so they are neither cached nor reused
+        unseeded = simulate_and_evaluate(output_dir=output_dir / "unseeded", pool=pool, **{**arguments, "seed": None})
+
+    event_log.release_shared_partitions()
+
+    # The identical candidate reuses the measurements without simulating
+    assert sorted(cached, key=itemgetter("run_num")) == sorted(simulated, key=itemgetter("run_num"))
+    assert not (output_dir / "second" / "simulated_log_0.csv").exists()
+    assert (output_dir / "third" / "simulated_log_0.csv").exists()
+    assert len(resimulated) == 2
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert len(unseeded) == 2
+    assert (output_dir / "unseeded" / "simulated_log_0.csv").exists()
+    assert len(cache) == 4
@@ -0,0 +1,69 @@
+from hyperopt import STATUS_OK, hp
+
+from simod.successive_halving import successive_halving, successive_halving_rungs
+
+
+def test_successive_halving_rungs():
+    assert successive_halving_rungs(1) == [(1, 1.0)]
+    assert successive_halving_rungs(5) == [(5, 1 / 3), (1, 1.0)]
+    assert successive_halving_rungs(20) == [(20, 1 / 9), (6, 1 / 3), (2, 1.0)]
+    # The fidelity is bounded by the minimum one
+    assert successive_halving_rungs(100, min_fidelity=1 / 3) == [(100, 1 / 3), (33, 1.0)]
+
+
+def test_successive_halving():
+    rungs = []
+    evaluations = []
+
+    def start_rung(fidelity, trials):
+        rungs.append((fidelity, trials))
+
+    def objective(params):
+        fidelity = rungs[-1][0]
+        evaluations.append((fidelity, params["x"]))
+        # Noisier loss the lower the fidelity
+        return {"loss": (params["x"] - 0.3) ** 2 + (1 - fidelity) * 0.01, "status": STATUS_OK}
+
+    best = successive_halving(objective, {"x": hp.uniform("x", 0, 1)}, num_candidates=20, start_rung=start_rung)
+
+    assert [fidelity for fidelity, _ in rungs] == [1 / 9, 1 / 3, 1.0]
+    assert [len(trials.trials) for _, trials in rungs] == [20, 6, 2]
+    # Each rung re-evaluates the best candidates of the previous one
+    rung_0 = sorted([x for fidelity, x in evaluations if fidelity == 1 / 9], key=lambda x: (x - 0.3) ** 2)
+    assert sorted(x for fidelity, x in evaluations if fidelity == 1 / 3) == sorted(rung_0[:6])
+    assert best["x"] == rung_0[0]
+
+
+def test_successive_halving_resumed():
+    rungs = []
+    evaluations = []
+
+    def start_rung(fidelity, trials):
+        rungs.append((fidelity, trials))
+
+    def objective(params):
+        evaluations.append((rungs[-1][0], params["x"]))
+        return {"loss": (params["x"] - 0.3) ** 2, "status": STATUS_OK}
+
+    successive_halving(objective, {"x": hp.uniform("x", 0, 1)}, num_candidates=20, start_rung=start_rung)
+    first_rung, second_rung = rungs[0][1], rungs[1][1]
+    # Interrupted in the second rung, with its second candidate not finished
+    second_rung._dynamic_trials = [trial for index, trial in enumerate(second_rung._dynamic_trials) if index != 1][:3]
+    second_rung.refresh()
+    rungs.clear()
+    evaluations.clear()
+
+    successive_halving(
+        objective,
+        {"x": hp.uniform("x", 0, 1)},
+        num_candidates=20,
+        start_rung=start_rung,
+        resumed_rungs=[first_rung, second_rung],
+    )
+
+    # Only the candidates of the second rung not finished (the second, and the last two) are evaluated again
+    assert len([x for fidelity, x in evaluations if fidelity == 1 / 3]) == 3
+    assert len([x for fidelity, x in evaluations if fidelity == 1 / 9]) == 0
+    assert len(second_rung.trials) == 6
+    assert len({trial["misc"]["vals"]["x"][0] for trial in second_rung.trials}) == 6
+    assert [len(trials.trials) for _, trials in rungs] == [20, 6, 2]
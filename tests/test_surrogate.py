@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from hyperopt import STATUS_FAIL, STATUS_OK
+
+from simod.surrogate import FEATURES_KEY, MIN_OBSERVATIONS, SCREENED_KEY, LossSurrogate
+
+
+def _observations(num_observations: int, noise: float = 0.0):
+    rng = np.random.default_rng(42)
+    features = rng.uniform(0.0, 1.0, size=(num_observations, 2))
+    losses = 0.2 + 0.5 * features[:, 0] - 0.1 * features[:, 1] + rng.normal(0.0, noise, size=num_observations)
+    return features.tolist(), losses.tolist()
+
+
+def test_fit():
+    features, losses = _observations(50)
+    surrogate = LossSurrogate.fit(features, losses)
+
+    assert surrogate is not None
+    assert surrogate.predict([0.0, 0.0]) == pytest.approx(0.2, abs=0.05)
+    assert surrogate.predict([1.0, 0.0]) > surrogate.predict([0.0, 0.0]) > surrogate.predict([0.0, 1.0])
+    # The leave-one-out error grows with the noise of the losses
+    noisy_surrogate = LossSurrogate.fit(*_observations(50, noise=0.1))
+    assert noisy_surrogate.error > surrogate.error
+
+
+def test_fit_not_enough_observations():
+    features, losses = _observations(MIN_OBSERVATIONS - 1)
+    assert LossSurrogate.fit(features, losses) is None
+
+
+def test_fit_constant_feature():
+    features, losses = _observations(20)
+    features = [[*candidate_features, 1.0] for candidate_features in features]
+    surrogate = LossSurrogate.fit(features, losses)
+
+    assert surrogate is not None
+    assert np.isfinite(surrogate.predict([0.5, 0.5, 1.0]))
+
+
+def test_screened_loss():
+    features, losses = _observations(50, noise=0.01)
+    surrogate = LossSurrogate.fit(features, losses)
+
+    # Clearly worse than the incumbent: screened out with its predicted loss
+    assert surrogate.screened_loss([1.0, 0.0], incumbent_loss=0.2, margin=0.1) == surrogate.predict([1.0, 0.0])
+    # Close to (or better than) the incumbent: simulated
+    assert surrogate.screened_loss([0.0, 0.0], incumbent_loss=0.2, margin=0.1) is None
+    # Worse, but not by more than the margin
+    assert surrogate.screened_loss([0.5, 0.0], incumbent_loss=0.4, margin=0.5) is None
+
+
+def test_from_results():
+    features, losses = _observations(MIN_OBSERVATIONS)
+    results = [
+        {"loss": loss, "status": STATUS_OK, FEATURES_KEY: candidate_features}
+        for candidate_features, loss in zip(features, losses)
+    ]
+    assert LossSurrogate.from_results(results) is not None
+
+    # The failed, screened, and featureless trials are left out
+    results[0] = {"loss": 1.0, "status": STATUS_FAIL, FEATURES_KEY: features[0]}
+    assert LossSurrogate.from_results(results) is None
+    results[0] = {"loss": losses[0], "status": STATUS_OK, FEATURES_KEY: features[0], SCREENED_KEY: True}
+    assert LossSurrogate.from_results(results) is None
+    results[0] = {"loss": losses[0], "status": STATUS_OK}
+    assert LossSurrogate.from_results(results) is None
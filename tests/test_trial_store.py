@@ -0,0 +1,98 @@
+import os
+import pickle
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from pix_framework.filesystem.file_manager import create_folder, get_random_folder_id
+
+from simod.trial_store import DONE, PENDING, RUNNING, TrialStore
+
+PROJECT_DIR = Path(__file__).parent.parent
+
+
+def slow_square(x: float) -> tuple:
+    time.sleep(0.2)
+    return x**2, os.getpid()
+
+
+def start_workers(directory: Path, num_workers: int) -> list:
+    # Separate processes running the command line, standing in for workers in other nodes
+    environment = os.environ | {"PYTHONPATH": os.pathsep.join([str(PROJECT_DIR), str(PROJECT_DIR / "src")])}
+    return [
+        subprocess.Popen(
+            [sys.executable, "-m", "simod.cli", "worker", "--store", str(directory), "--idle-timeout", "3"],
+            cwd=PROJECT_DIR,
+            env=environment,
+            stdout=subprocess.DEVNULL,
+        )
+        for _ in range(num_workers)
+    ]
+
+
+@pytest.mark.integration
+def test_trial_store_workers():
+    directory = PROJECT_DIR / "outputs" / get_random_folder_id(prefix="test_trial_store_")
+    create_folder(directory)
+    store = TrialStore(directory, poll_interval=0.05)
+    workers = start_workers(directory, 3)
+    stage = store.publish(slow_square)
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(lambda x: store.evaluate(stage, x), range(12)))
+    # A failing trial is reported back
+    with pytest.raises(RuntimeError, match="TypeError"):
+        store.evaluate(stage, "x")
+    store.retire(stage)
+
+    assert [result for result, _ in results] == [x**2 for x in range(12)]
+    # The trials are spread over the workers
+    assert len({pid for _, pid in results}) > 1
+    assert {pid for _, pid in results} <= {worker.pid for worker in workers}
+    assert all(worker.wait(timeout=30) == 0 for worker in workers)
+    assert len(os.listdir(directory / PENDING)) == len(os.listdir(directory / RUNNING)) == 0
+
+
+def test_trial_store_lease():
+    directory = PROJECT_DIR / "outputs" / get_random_folder_id(prefix="test_trial_store_")
+    create_folder(directory)
+    store = TrialStore(directory, poll_interval=0.05, lease=0.5)
+    stage = store.publish(abs)
+
+    result = []
+    evaluation = threading.Thread(target=lambda: result.append(store.evaluate(stage, -2)))
+    evaluation.start()
+    while len(os.listdir(directory / PENDING)) == 0:
+        time.sleep(0.01)
+    # Claimed by a worker that dies before evaluating it
+    store._claim()
+    assert len(os.listdir(directory / RUNNING)) == 1
+
+    # Queued again once the lease expires, and evaluated by another worker
+    assert store.work(max_trials=1, idle_timeout=5) == 1
+    evaluation.join()
+    assert result == [2]
+
+
+def test_trial_store_expired_lease():
+    directory = PROJECT_DIR / "outputs" / get_random_folder_id(prefix="test_trial_store_")
+    create_folder(directory)
+    store = TrialStore(directory, poll_interval=0.05, lease=0.5)
+    stage = store.publish(abs)
+    (directory / PENDING / "trial").write_bytes(pickle.dumps((stage, (-2,))))
+
+    # Claimed by a worker whose lease expires, queued again, and claimed by another worker
+    trial, expired_path = store._claim()
+    os.replace(expired_path, directory / PENDING / trial)
+    _, running_path = store._claim()
+
+    # Only the worker holding the lease reports the trial
+    assert not store._report(trial, expired_path, {"result": 2})
+    assert not (directory / DONE / trial).exists()
+    assert store._report(trial, running_path, {"result": 2})
+    assert pickle.loads((directory / DONE / trial).read_bytes()) == {"result": 2}
+    assert len(os.listdir(directory / RUNNING)) == 0
@@ -1,4 +1,6 @@
-from simod.utilities import parse_single_value_or_interval
+from hyperopt import STATUS_FAIL, STATUS_OK, Trials, fmin, hp, tpe
+
+from simod.utilities import cannot_beat_incumbent, get_incumbent_loss, parse_single_value_or_interval
 
 
 def test_parse_single_value_or_interval(entry_point):
@@ -7,3 +9,29 @@ def test_parse_single_value_or_interval(entry_point):
     assert parse_single_value_or_interval(0.0) == 0.0
     assert parse_single_value_or_interval([0.0, 1.0]) == (0.0, 1.0)
     assert parse_single_value_or_interval([0.32, 0.78]) == (0.32, 0.78)
+
+
+def test_get_incumbent_loss():
+    trials = Trials()
+    assert get_incumbent_loss(trials) is None
+
+    results = iter([{"status": STATUS_OK, "loss": 0.4}, {"status": STATUS_FAIL}, {"status": STATUS_OK, "loss": 0.3}])
+    fmin(
+        lambda _: next(results), hp.uniform("x", 0, 1), tpe.suggest, max_evals=3, trials=trials, show_progressbar=False
+    )
+
+    # Failed trials are not incumbents
+    assert get_incumbent_loss(trials) == 0.3
+
+
+def test_cannot_beat_incumbent():
+    # Undecided without incumbent or with a single replica
+    assert not cannot_beat_incumbent([0.9, 0.9], None)
+    assert not cannot_beat_incumbent([0.9], 0.1)
+    # Clearly worse, clearly better, and too noisy to decide
+    assert cannot_beat_incumbent([0.80, 0.82], 0.3)
+    assert not cannot_beat_incumbent([0.20, 0.22], 0.3)
+    assert not cannot_beat_incumbent([0.1, 0.9], 0.3)
+    # Deterministic replicas
+    assert cannot_beat_incumbent([0.5, 0.5], 0.3)
+    assert not cannot_beat_incumbent([0.3, 0.3], 0.3)
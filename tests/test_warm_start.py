@@ -0,0 +1,43 @@
+import pandas as pd
+from hyperopt import hp
+from pix_framework.discovery.gateway_probabilities import GatewayProbabilitiesDiscoveryMethod
+
+from simod.warm_start import prior_points
+
+
+def test_prior_points(tmp_path):
+    measurements_path = tmp_path / "evaluation_measures.csv"
+    pd.DataFrame(
+        [
+            # Best candidate, with two replicas
+            {"output_dir": "a", "distance": 0.1, "status": "ok", "fidelity": 1.0, "x": 0.2, "method": "discovery"},
+            {"output_dir": "a", "distance": 0.3, "status": "ok", "fidelity": 1.0, "x": 0.2, "method": "discovery"},
+            {"output_dir": "b", "distance": 0.4, "status": "ok", "fidelity": 1.0, "x": 0.7, "method": "equiprobable"},
+            # Evaluated with a fraction of the cases
+            {"output_dir": "c", "distance": 0.0, "status": "ok", "fidelity": 0.5, "x": 0.5, "method": "discovery"},
+            # Failed
+            {"output_dir": "d", "distance": 0.0, "status": "fail", "fidelity": 1.0, "x": 0.4, "method": "discovery"},
+            # Out of the range of the new space
+            {"output_dir": "e", "distance": 0.0, "status": "ok", "fidelity": 1.0, "x": 1.5, "method": "discovery"},
+            # Same point as the best candidate
+            {"output_dir": "f", "distance": 0.5, "status": "ok", "fidelity": 1.0, "x": 0.2, "method": "discovery"},
+        ]
+    ).to_csv(measurements_path, index=False)
+    space = {
+        "output_dir": "unused",
+        "x": hp.uniform("x", 0, 1),
+        "gateway_probabilities_method": hp.choice(
+            "gateway_probabilities_method",
+            [GatewayProbabilitiesDiscoveryMethod.DISCOVERY, GatewayProbabilitiesDiscoveryMethod.EQUIPROBABLE],
+        ),
+    }
+
+    points = prior_points(measurements_path, space, 5, columns={"gateway_probabilities_method": "method"})
+
+    assert points == [
+        {"x": 0.2, "gateway_probabilities_method": 0},
+        {"x": 0.7, "gateway_probabilities_method": 1},
+    ]
+    assert prior_points(measurements_path, space, 1, columns={"gateway_probabilities_method": "method"}) == points[:1]
+    # Candidates without the sampled parameters are skipped
+    assert prior_points(measurements_path, space, 5) == []